@@ -1,4 +1,11 @@
 """App package initialization"""
-from .main import app
 
 __all__ = ["app"]
+
+
+def __getattr__(name):
+    # Imported on first use, so worker processes that only need app.analysis skip the web stack
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
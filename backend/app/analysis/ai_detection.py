@@ -0,0 +1,170 @@
+"""
+AI-generated code estimate
+Stylometric and token-statistics features per file, scored in one batch by a small local model
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from app.config.settings import get_settings
+
+# Feature vector layout; cached vectors are only valid for this order
+FEATURES = (
+    "comment_ratio",         # comment lines / (code + comment lines)
+    "blank_ratio",           # blank lines / all lines
+    "line_length_mean",      # mean length of non-blank lines, in units of 80 columns
+    "line_length_cv",        # spread of non-blank line lengths, std / mean
+    "long_line_ratio",       # non-blank lines over 100 columns
+    "trailing_space_ratio",  # lines ending in spaces or tabs
+    "odd_indent_ratio",      # indented lines whose indent is not a multiple of the file's indent unit
+    "identifier_length",     # mean declared identifier length, in units of 10 characters
+    "token_entropy",         # Shannon entropy of the normalized token stream over its maximum
+    "marker_rate",           # TODO/FIXME/HACK and debug prints per 100 code lines
+    "function_complexity",   # cyclomatic complexity per function, in units of 10
+)
+
+MARKER_RE = re.compile(rb"\b(?:TODO|FIXME|XXX|HACK)\b|\bprint\(|console\.log\(|\bdebugger\b")
+
+MAX_TOP_FILES = 20
+# Smaller files have too few lines for their statistics to mean much; they still count toward the estimate
+MIN_RANKED_LINES = 10
+
+
+@dataclass
+class Model:
+    """Logistic regression over standardised features"""
+    mean: np.ndarray
+    scale: np.ndarray
+    weights: np.ndarray
+    bias: float
+    version: str
+
+
+# Built-in prior: generated code is evenly commented and formatted, has long descriptive names,
+# regular token streams and simple functions, and none of the debug leftovers people commit
+BUILTIN_MODEL = {
+    "version": "builtin-1",
+    "mean": [0.12, 0.14, 0.42, 0.62, 0.03, 0.04, 0.04, 0.85, 0.62, 0.9, 0.32],
+    "scale": [0.1, 0.06, 0.12, 0.2, 0.05, 0.08, 0.08, 0.35, 0.08, 1.5, 0.25],
+    "weights": [0.9, 0.35, 0.2, -0.6, -0.35, -0.8, -0.5, 0.75, -0.45, -0.7, -0.4],
+    "bias": -1.2,
+}
+
+
+@lru_cache(maxsize=1)
+def load_model() -> Model:
+    """The model named by AI_DETECTION_MODEL_PATH, or the built-in prior when it is unset"""
+    path = get_settings().AI_DETECTION_MODEL_PATH
+    spec = BUILTIN_MODEL
+    if path:
+        with open(path) as f:
+            spec = json.load(f)
+        if len(spec["weights"]) != len(FEATURES):
+            raise ValueError(f"{path}: expected {len(FEATURES)} weights, got {len(spec['weights'])}")
+    return Model(
+        mean=np.asarray(spec["mean"], dtype=np.float64),
+        scale=np.asarray(spec["scale"], dtype=np.float64),
+        weights=np.asarray(spec["weights"], dtype=np.float64),
+        bias=float(spec["bias"]),
+        version=str(spec.get("version", path)),
+    )
+
+
+def _entropy(tokens: list) -> float:
+    if len(tokens) < 2:
+        return 0.0
+    _, counts = np.unique([token for token, _ in tokens], return_counts=True)
+    if len(counts) < 2:
+        return 0.0
+    p = counts / counts.sum()
+    return float(-(p * np.log2(p)).sum() / math.log2(len(counts)))
+
+
+def style_features(data: bytes, result: dict, tokens: list) -> list:
+    """
+    Feature vector of one parsed file, in FEATURES order
+
+    Line statistics are array operations over the raw bytes, so the cost is
+    a few passes over the buffer rather than a Python loop per line. `result`
+    is the file's engine result (line counts, functions, identifiers).
+    """
+    buffer = np.frombuffer(bytes(data), dtype=np.uint8)
+    blank_bytes = (buffer == 32) | (buffer == 9) | (buffer == 13)
+    content = np.flatnonzero(~blank_bytes & (buffer != 10))
+    if not len(content):
+        return [0.0] * len(FEATURES)  # empty or whitespace only
+    newlines = np.flatnonzero(buffer == 10)
+    ends = newlines if buffer[-1] == 10 else np.append(newlines, len(buffer))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts
+
+    # Leading whitespace per line: position of the first non-blank byte, found with one scan
+    first = np.searchsorted(content, starts)
+    first_pos = np.where(first < len(content), content[np.minimum(first, len(content) - 1)], len(buffer))
+    has_content = first_pos < ends
+    indent = np.where(has_content, first_pos - starts, 0)
+    spaces = (buffer == 32) | (buffer == 9)
+    last = np.maximum(ends - 1, 0)
+    last = np.maximum(last - (buffer[last] == 13), 0)  # CRLF: look before the \r
+    trailing = has_content & spaces[last]
+
+    filled = lengths[has_content]
+    mean = float(filled.mean()) if len(filled) else 0.0
+    indents = indent[has_content & (indent > 0)]
+    unit = int(indents.min()) if len(indents) else 0
+    odd = float(np.count_nonzero(indents % unit) / len(indents)) if unit else 0.0
+
+    code, comment, blank = result["code"], result["comment"], result["blank"]
+    lines = max(code + comment + blank, 1)
+    identifiers = result.get("identifiers") or []
+    functions = result.get("functions", 0)
+
+    vector = (
+        comment / max(code + comment, 1),
+        blank / lines,
+        mean / 80,
+        float(filled.std() / mean) if mean else 0.0,
+        float(np.count_nonzero(filled > 100) / len(filled)) if len(filled) else 0.0,
+        float(np.count_nonzero(trailing) / lines),
+        odd,
+        sum(len(name) for name, _ in identifiers) / len(identifiers) / 10 if identifiers else 0.0,
+        _entropy(tokens),
+        len(MARKER_RE.findall(data)) * 100 / max(code, 1),
+        result.get("complexity", 0) / max(functions, 1) / 10,
+    )
+    return [round(value, 4) for value in vector]
+
+
+def score_features(matrix: np.ndarray, model: Model = None) -> np.ndarray:
+    """Probability that each row's file was generated, one matrix product for the whole batch"""
+    model = model or load_model()
+    if not len(matrix):
+        return np.zeros(0)
+    z = ((matrix - model.mean) / model.scale) @ model.weights + model.bias
+    return 1 / (1 + np.exp(-z))
+
+
+def ai_estimate(files: list) -> dict:
+    """The dashboard's aiDetection section: a line-weighted estimate and the likeliest files"""
+    files = [f for f in files if f.get("aiFeatures") and len(f["aiFeatures"]) == len(FEATURES)]
+    model = load_model()
+    if not files:
+        return {"percentage": 0.0, "files": 0, "likelyFiles": 0, "topFiles": [], "model": model.version}
+
+    scores = score_features(np.array([f["aiFeatures"] for f in files], dtype=np.float64), model)
+    code = np.array([f["code"] for f in files], dtype=np.float64)
+    percentage = float((scores * code).sum() / code.sum()) if code.sum() else float(scores.mean())
+    ranked = np.flatnonzero(code >= MIN_RANKED_LINES)
+    top = ranked[np.lexsort((ranked, -scores[ranked]))][:MAX_TOP_FILES]
+    return {
+        "percentage": round(percentage, 4),
+        "files": len(files),
+        "likelyFiles": int(np.count_nonzero((scores >= 0.5) & (code >= MIN_RANKED_LINES))),
+        "topFiles": [{"path": files[i]["path"], "score": round(float(scores[i]), 4)} for i in top],
+        "model": model.version,
+    }
@@ -0,0 +1,110 @@
+"""
+Blob metric cache
+Content-addressed store of per-file results so re-analyses only parse changed blobs
+"""
+
+import json
+from datetime import datetime
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from app.config.settings import get_settings
+from app.models.analysis import BlobMetric
+from app.utils.database import SessionLocal
+
+settings = get_settings()
+
+# Stay under SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+def _batches(items: list):
+    for i in range(0, len(items), BATCH_SIZE):
+        yield items[i:i + BATCH_SIZE]
+
+
+class BlobCache:
+    """
+    Size-bounded LRU of per-file metric dicts in the database
+
+    Lives in the database rather than in memory so every worker process and
+    server replica shares it, and so it survives restarts. Entries are never
+    updated in place: a blob's content, and therefore its metrics, cannot change.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_bytes: int = 512 * 1024 * 1024):
+        self.session_factory = session_factory
+        self.max_bytes = max_bytes
+
+    def get_many(self, keys: list) -> dict:
+        """Cached payloads by key; keys not in the cache are absent. Marks hits as recently used"""
+        found = {}
+        with self.session_factory() as db:
+            for batch in _batches(list(keys)):
+                rows = db.execute(
+                    select(BlobMetric.cache_key, BlobMetric.payload).where(BlobMetric.cache_key.in_(batch))
+                ).all()
+                found.update((key, json.loads(payload)) for key, payload in rows)
+            hits = list(found)
+            now = datetime.utcnow()
+            for batch in _batches(hits):
+                db.execute(
+                    update(BlobMetric).where(BlobMetric.cache_key.in_(batch)).values(last_used_at=now)
+                )
+            db.commit()
+        return found
+
+    def put_many(self, entries: dict):
+        """Store payloads by key, then evict down to the size budget"""
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = []
+        for key, payload in entries.items():
+            data = json.dumps(payload, separators=(",", ":"))
+            rows.append({"cache_key": key, "payload": data, "size": len(data), "last_used_at": now})
+
+        with self.session_factory() as db:
+            for batch in _batches(rows):
+                try:
+                    db.execute(BlobMetric.__table__.insert(), batch)
+                    db.commit()
+                except IntegrityError:
+                    # Another worker stored some of these blobs first; keep theirs
+                    db.rollback()
+                    existing = set(db.scalars(
+                        select(BlobMetric.cache_key).where(BlobMetric.cache_key.in_([r["cache_key"] for r in batch]))
+                    ))
+                    fresh = [r for r in batch if r["cache_key"] not in existing]
+                    if fresh:
+                        db.execute(BlobMetric.__table__.insert(), fresh)
+                    db.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes"""
+        removed = 0
+        with self.session_factory() as db:
+            excess = (db.scalar(select(func.coalesce(func.sum(BlobMetric.size), 0))) or 0) - self.max_bytes
+            while excess > 0:
+                oldest = db.execute(
+                    select(BlobMetric.cache_key, BlobMetric.size)
+                    .order_by(BlobMetric.last_used_at, BlobMetric.cache_key)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not oldest:
+                    break
+                victims = []
+                for key, size in oldest:
+                    victims.append(key)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                db.execute(delete(BlobMetric).where(BlobMetric.cache_key.in_(victims)))
+                removed += len(victims)
+            db.commit()
+        return removed
+
+
+blob_cache = BlobCache(max_bytes=settings.ANALYSIS_BLOB_CACHE_MAX_BYTES)
@@ -0,0 +1,162 @@
+"""
+Blob reader
+Long-lived `git cat-file --batch` processes that stream object contents without a process per file
+"""
+
+import os
+import queue
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+from app.analysis.git import GitError
+
+# Initial size of a reader's content buffer; it grows to fit the largest blob read
+INITIAL_BUFFER_BYTES = 64 * 1024
+
+
+class CatFileReader:
+    """
+    One `git cat-file --batch` process and a reusable buffer
+
+    Contents are returned as memoryviews into the buffer, so nothing is
+    copied per blob; a view is only valid until the next read.
+    """
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        )
+        self._buffer = bytearray(INITIAL_BUFFER_BYTES)
+
+    def _read_object(self) -> Optional[memoryview]:
+        header = self._process.stdout.readline()
+        if not header:
+            raise GitError("git cat-file exited unexpectedly")
+        fields = header.split()
+        if len(fields) < 3 or fields[1] == b"missing":
+            return None
+        size = int(fields[2])
+        if size > len(self._buffer):
+            self._buffer = bytearray(1 << (size - 1).bit_length())
+        view = memoryview(self._buffer)[:size]
+        got = 0
+        while got < size:
+            n = self._process.stdout.readinto(view[got:])
+            if not n:
+                raise GitError("git cat-file output ended mid-object")
+            got += n
+        self._process.stdout.read(1)  # newline after the contents
+        return view
+
+    def read(self, sha: str) -> Optional[memoryview]:
+        """Contents of one object, or None if it does not exist"""
+        self._process.stdin.write(f"{sha}\n".encode("ascii"))
+        self._process.stdin.flush()
+        return self._read_object()
+
+    def read_many(self, shas: Iterable[str]) -> Iterator[tuple]:
+        """
+        Yield (sha, contents) for each SHA in order, requests pipelined
+
+        A writer thread feeds the SHAs while this thread reads, so there is
+        no round trip per object and neither pipe can fill up and deadlock.
+        Consume each view before advancing the iterator.
+        """
+        shas = list(shas)
+
+        def feed():
+            try:
+                for sha in shas:
+                    self._process.stdin.write(f"{sha}\n".encode("ascii"))
+                self._process.stdin.flush()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        done = False
+        try:
+            for sha in shas:
+                yield sha, self._read_object()
+            done = True
+        finally:
+            if not done:
+                # Unread output is left in the pipe; the process cannot serve another request
+                self._process.kill()
+                self._process.wait()
+            writer.join()
+
+    def close(self):
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+        for pipe in (self._process.stdin, self._process.stdout):
+            if not pipe.closed:
+                pipe.close()
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+
+class CatFilePool:
+    """
+    Bounded pool of readers for one repository, reused across analyzers
+
+    Readers start on first use and stay alive until the pool is closed, so
+    sampling many commits costs a handful of processes in total.
+    """
+
+    def __init__(self, repo: str, size: int = 2):
+        self.repo = repo
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._readers = []
+
+    @contextmanager
+    def reader(self) -> Iterator[CatFileReader]:
+        """Borrow a reader, starting one if fewer than `size` exist, else waiting for one"""
+        # The idle queue holds readers, or None for a slot whose reader died
+        try:
+            reader = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                start = self._started < self.size
+                if start:
+                    self._started += 1
+            reader = None if start else self._idle.get()
+        if reader is None:
+            reader = CatFileReader(self.repo)
+            with self._lock:
+                self._readers.append(reader)
+        try:
+            yield reader
+        finally:
+            if reader.alive:
+                self._idle.put(reader)
+            else:
+                reader.close()
+                with self._lock:
+                    self._readers.remove(reader)
+                self._idle.put(None)
+
+    def close(self):
+        for reader in self._readers:
+            reader.close()
+        self._readers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,177 @@
+"""
+Duplication detection
+Winnowed rolling-hash fingerprints per file, matched through an inverted index
+"""
+
+import zlib
+from collections import defaultdict, deque
+
+# Tokens per hashed k-gram; shorter matches are not reported
+KGRAM = 30
+
+# Winnowing window: any match of at least KGRAM + WINDOW - 1 tokens is guaranteed to be found
+WINDOW = 20
+
+# Hashes shared by more places than this are boilerplate, not clones, and are skipped
+MAX_POSTINGS = 32
+
+# Clone regions listed individually
+TOP_CLONES = 200
+
+MOD = (1 << 61) - 1
+BASE = 1_000_003
+
+
+def _token_id(token: str) -> int:
+    # crc32 rather than hash(): fingerprints are persisted and must not depend on PYTHONHASHSEED
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def rolling_hashes(ids: list, k: int = KGRAM) -> list:
+    """Rabin-Karp hash of every k-token window"""
+    if len(ids) < k:
+        return []
+    drop = pow(BASE, k - 1, MOD)
+    hashes = []
+    h = 0
+    for i, token in enumerate(ids):
+        if i >= k:
+            h = (h - ids[i - k] * drop) % MOD
+        h = (h * BASE + token) % MOD
+        if i >= k - 1:
+            hashes.append(h)
+    return hashes
+
+
+def winnow(hashes: list, window: int = WINDOW) -> list:
+    """Positions of the rightmost minimal hash of every window, each recorded once"""
+    if not hashes:
+        return []
+    if len(hashes) < window:
+        low = min(hashes)
+        return [max(i for i, h in enumerate(hashes) if h == low)]
+    selected = []
+    candidates = deque()  # positions with increasing hashes
+    for i, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and (not selected or selected[-1] != candidates[0]):
+            selected.append(candidates[0])
+    return selected
+
+
+def fingerprint(tokens: list) -> list:
+    """
+    Fingerprints of a file's (normalized token, line) pairs
+
+    Each is [hash, token position, start line, end line]; plain lists so they
+    can be stored as JSON and matched against other files, analyses or
+    repositories later.
+    """
+    hashes = rolling_hashes([_token_id(token) for token, _ in tokens])
+    return [
+        [hashes[pos], pos, tokens[pos][1], tokens[pos + KGRAM - 1][1]]
+        for pos in winnow(hashes)
+    ]
+
+
+def _clone_pairs(files: list) -> dict:
+    """Matching fingerprints grouped by file pair, via an inverted hash index"""
+    index = defaultdict(list)
+    for file_index, f in enumerate(files):
+        for fp in f.get("fingerprints") or ():
+            index[fp[0]].append((file_index, fp))
+
+    pairs = defaultdict(list)
+    for postings in index.values():
+        if len(postings) < 2 or len(postings) > MAX_POSTINGS:
+            continue
+        for x in range(len(postings)):
+            for y in range(x + 1, len(postings)):
+                a, b = postings[x], postings[y]
+                if (a[0], a[1][1]) > (b[0], b[1][1]):
+                    a, b = b, a
+                # Overlapping windows of one file repeat a run of tokens, not a copy
+                if a[0] == b[0] and b[1][1] - a[1][1] < KGRAM:
+                    continue
+                pairs[(a[0], b[0])].append((a[1], b[1]))
+    return pairs
+
+
+def _regions(matches: list) -> list:
+    """Merge matches on the same diagonal whose gaps winnowing could leave into clone regions"""
+    matches.sort(key=lambda m: (m[1][1] - m[0][1], m[0][1]))
+    regions = []
+    current = None
+    for a, b in matches:
+        offset = b[1] - a[1]
+        if current and current["offset"] == offset and a[1] - current["last"] <= WINDOW + KGRAM:
+            current["last"] = a[1]
+            current["a"][1] = max(current["a"][1], a[3])
+            current["b"][1] = max(current["b"][1], b[3])
+        else:
+            current = {"offset": offset, "first": a[1], "last": a[1], "a": [a[2], a[3]], "b": [b[2], b[3]]}
+            regions.append(current)
+    return regions
+
+
+def _within(inner: list, outer: list) -> bool:
+    return outer[0] <= inner[0] and inner[1] <= outer[1]
+
+
+def _count_lines(ranges: list) -> int:
+    """Lines covered by a set of inclusive [start, end] ranges"""
+    total = 0
+    end = 0
+    for start, stop in sorted(ranges):
+        if stop > end:
+            total += stop - max(start, end + 1) + 1
+            end = stop
+    return total
+
+
+def detect_duplicates(files: list) -> dict:
+    """
+    Clone regions among files carrying "path" and "fingerprints"
+
+    Work is proportional to the number of fingerprints plus matching pairs,
+    not to the number of file pairs. Files from several repositories can be
+    passed together to find clones between them.
+    """
+    files = sorted(files, key=lambda f: f["path"])
+    clones = []
+    ranges = defaultdict(list)
+    for (fa, fb), matches in _clone_pairs(files).items():
+        path_a, path_b = files[fa]["path"], files[fb]["path"]
+        kept = []
+        for region in sorted(_regions(matches), key=lambda r: r["first"] - r["last"]):
+            # A run that repeats with a short period (tables, literals) overlaps itself
+            if fa == fb and region["b"][0] <= region["a"][1]:
+                continue
+            # Shifted alignments of a longer clone already reported for this pair
+            if any(_within(region["a"], k["a"]) and _within(region["b"], k["b"]) for k in kept):
+                continue
+            kept.append(region)
+            clones.append({
+                "a": {"path": path_a, "start": region["a"][0], "end": region["a"][1]},
+                "b": {"path": path_b, "start": region["b"][0], "end": region["b"][1]},
+                "tokens": region["last"] - region["first"] + KGRAM,
+            })
+            ranges[path_a].append(tuple(region["a"]))
+            ranges[path_b].append(tuple(region["b"]))
+
+    by_file = sorted(
+        ({"path": path, "duplicatedLines": _count_lines(spans), "duplications": len(spans)}
+         for path, spans in ranges.items()),
+        key=lambda f: (-f["duplicatedLines"], f["path"])
+    )
+    clones.sort(key=lambda c: (-c["tokens"], c["a"]["path"], c["a"]["start"], c["b"]["path"], c["b"]["start"]))
+    return {
+        "totalDuplications": len(clones),
+        "duplicatedLines": sum(f["duplicatedLines"] for f in by_file),
+        "byFile": by_file,
+        "clones": clones[:TOP_CLONES],
+    }
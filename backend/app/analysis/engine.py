@@ -0,0 +1,276 @@
+"""
+Analysis engine
+Walks a checkout and computes per-file LOC, function counts and complexity in parallel
+"""
+
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app.analysis import git
+from app.analysis.duplication import detect_duplicates, fingerprint
+from app.analysis.languages import SCHEMA_LANGUAGES, VENDORED_DIRS, classify, is_binary, is_skipped_path
+from app.analysis.lines import count_lines
+from app.analysis.parsers import parse_source
+
+# Files larger than this are generated or data, not hand-written source
+MAX_FILE_BYTES = 1_000_000
+
+# Bump whenever per-file results change shape or meaning so cached entries stop matching
+ENGINE_VERSION = 6
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 2000
+
+
+def walk_source_files(root: str) -> list:
+    """Relative paths of candidate source files, skipping vendored trees"""
+    paths = []
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in VENDORED_DIRS and not d.endswith(".egg-info")]
+        rel = os.path.relpath(current, root)
+        for name in files:
+            path = name if rel == "." else f"{rel}/{name}".replace(os.sep, "/")
+            if not is_skipped_path(path):
+                paths.append(path)
+    paths.sort()
+    return paths
+
+
+def cache_key(path: str, sha: str, parse: bool = True) -> str:
+    """
+    Blob cache key of a file; the language is part of it because it is chosen by extension
+
+    Line-count-only results are cached under their own keys since they lack the parse fields.
+    """
+    mode = "" if parse else "lines:"
+    return f"v{ENGINE_VERSION}:{classify(path).name}:{mode}{sha}"
+
+
+def analyze_source(path: str, data: bytes, parse: bool = True) -> Optional[dict]:
+    """
+    Metrics for one file's contents, or None when it is not source text
+
+    Line counts are always computed. With `parse`, the file is also parsed
+    once and that parse feeds the function count, complexity, duplication
+    fingerprints, the declared identifiers, the AI-estimate features and
+    the query sites and models; SQL and Prisma schemas are read for the
+    last two only.
+    """
+    if len(data) > MAX_FILE_BYTES or is_binary(data):
+        return None
+    text = str(data, "utf-8", errors="replace")  # also accepts memoryviews from the blob reader
+    language = classify(path)
+    code, comment, blank = count_lines(text, language)
+    result = {
+        "path": path,
+        "language": language.name,
+        "code": code,
+        "comment": comment,
+        "blank": blank,
+    }
+    if parse and language.parser:
+        parsed = parse_source(language.parser, text)
+        result["functions"] = len(parsed.functions)
+        result["complexity"] = parsed.complexity
+        result["fingerprints"] = fingerprint(parsed.tokens)
+        result["identifiers"] = parsed.identifiers
+        from app.analysis.ai_detection import style_features
+        result["aiFeatures"] = style_features(data, result, parsed.tokens)
+        queries, models = parsed.queries, parsed.models
+    elif parse and language.name in SCHEMA_LANGUAGES:
+        from app.analysis.queries import schema_source
+        queries, models = schema_source(language.name, text)
+    else:
+        queries = models = None
+    # Most files have neither, so the keys are left out of the cached result
+    if queries:
+        result["querySites"] = queries
+    if models:
+        result["models"] = models
+    return result
+
+
+def analyze_file(root: str, path: str, parse: bool = True) -> Optional[dict]:
+    """Read and analyze one file of a checkout"""
+    try:
+        with open(os.path.join(root, path), "rb") as f:
+            data = f.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return None
+    return analyze_source(path, data, parse)
+
+
+def analyze_chunk(root: str, paths: list, parse: bool = True) -> list:
+    """Worker entry point: analyze a batch of files"""
+    results = []
+    for path in paths:
+        result = analyze_file(root, path, parse)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def chunked(items: list, size: int) -> list:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def analyze_files(
+    root: str,
+    paths: list,
+    workers: int = 0,
+    chunk_size: int = 200,
+    progress: Optional[Callable[[int, int], None]] = None,
+    parse: bool = True
+) -> list:
+    """
+    Analyze the given files of a checkout, in a process pool when it pays off
+
+    `workers=0` means one per CPU. Paths are spread over the pool in chunks so
+    per-task overhead stays small while big and small files still balance out.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = len(paths)
+    results = []
+
+    if workers == 1 or total < PARALLEL_THRESHOLD:
+        for done, chunk in enumerate(chunked(paths, chunk_size), 1):
+            results.extend(analyze_chunk(root, chunk, parse))
+            if progress:
+                progress(min(done * chunk_size, total), total)
+        return results
+
+    # Stride the sorted paths over the chunks so one heavy directory is spread across workers
+    chunks = [paths[i::max(1, total // chunk_size)] for i in range(max(1, total // chunk_size))]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        done = 0
+        mapped = executor.map(analyze_chunk, [root] * len(chunks), chunks, [parse] * len(chunks))
+        for chunk_results, chunk in zip(mapped, chunks):
+            results.extend(chunk_results)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    return results
+
+
+def aggregate_loc(files: list) -> dict:
+    """The dashboard's loc section"""
+    by_lang = defaultdict(lambda: {"loc": 0, "comment": 0, "blank": 0, "files": 0})
+    for f in files:
+        lang = by_lang[f["language"]]
+        lang["loc"] += f["code"]
+        lang["comment"] += f["comment"]
+        lang["blank"] += f["blank"]
+        lang["files"] += 1
+    return {
+        "total": sum(lang["loc"] for lang in by_lang.values()),
+        "comment": sum(lang["comment"] for lang in by_lang.values()),
+        "blank": sum(lang["blank"] for lang in by_lang.values()),
+        "files": len(files),
+        "byLang": sorted(
+            ({"lang": name, **counts} for name, counts in by_lang.items()),
+            key=lambda lang: -lang["loc"]
+        ),
+    }
+
+
+def aggregate_complexity(files: list) -> dict:
+    """The dashboard's complexity section, from parsed files"""
+    by_file = [
+        {"path": f["path"], "functions": f["functions"], "complexity": f["complexity"]}
+        for f in files if "complexity" in f
+    ]
+    by_file.sort(key=lambda f: (-f["complexity"], f["path"]))
+    return {
+        "totalScore": sum(f["complexity"] for f in by_file),
+        "functions": sum(f["functions"] for f in by_file),
+        "byFile": by_file,
+    }
+
+
+def aggregate_duplicates(files: list, total_loc: int) -> dict:
+    """The dashboard's duplicates section, from parsed files' fingerprints"""
+    duplicates = detect_duplicates(files)
+    duplicates["percentage"] = round(duplicates["duplicatedLines"] / total_loc, 4) if total_loc else 0.0
+    return duplicates
+
+
+def aggregate(files: list) -> dict:
+    """Roll per-file results up into the dashboard's loc, complexity and duplicates sections"""
+    loc = aggregate_loc(files)
+    return {
+        "loc": loc,
+        "complexity": aggregate_complexity(files),
+        "duplicates": aggregate_duplicates(files, loc["total"]),
+    }
+
+
+def collect_files(
+    root: str,
+    workers: int = 0,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cache=None,
+    parse: bool = True
+) -> tuple:
+    """
+    Per-file results for a checkout, sorted by path, plus the cache statistics
+
+    With a BlobCache, files whose git blob was analyzed before (in any
+    repository) are taken from the cache and only new blobs are read; the
+    statistics are None without one.
+    """
+    paths = walk_source_files(root)
+    if cache is None:
+        return analyze_files(root, paths, workers=workers, progress=progress, parse=parse), None
+
+    blobs = git.blob_shas(root)
+    keys = {path: cache_key(path, blobs[path], parse) for path in paths if path in blobs}
+    cached = cache.get_many(list(set(keys.values())))
+
+    files = []
+    misses = []
+    for path in paths:
+        key = keys.get(path)
+        if key in cached:
+            if cached[key] is not None:
+                files.append({**cached[key], "path": path})
+        else:
+            misses.append(path)
+
+    fresh = {f["path"]: f for f in analyze_files(root, misses, workers=workers, progress=progress, parse=parse)}
+    files.extend(fresh.values())
+    # Blobs that turned out not to be source are cached as None so they are not re-read either
+    cache.put_many({
+        keys[path]: {k: v for k, v in fresh[path].items() if k != "path"} if path in fresh else None
+        for path in misses if path in keys
+    })
+
+    files.sort(key=lambda f: f["path"])
+    hits = len(paths) - len(misses)
+    return files, {
+        "files": len(paths),
+        "hits": hits,
+        "misses": len(misses),
+        "hitRatio": round(hits / len(paths), 4) if paths else 0.0,
+    }
+
+
+def analyze_tree(
+    root: str,
+    workers: int = 0,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cache=None
+) -> dict:
+    """
+    Walk a checkout and return its aggregated loc, complexity and duplicates metrics
+
+    With a BlobCache only new blobs are parsed and the hit ratio is reported
+    under "cache".
+    """
+    files, cache_stats = collect_files(root, workers=workers, progress=progress, cache=cache)
+    metrics = aggregate(files)
+    if cache_stats is not None:
+        metrics["cache"] = cache_stats
+    return metrics
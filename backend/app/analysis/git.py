@@ -0,0 +1,62 @@
+"""
+Git command helpers
+Thin wrappers around the git CLI used by the analysis workers
+"""
+
+import os
+import subprocess
+from typing import Optional
+
+
+class GitError(Exception):
+    """Raised when a git command fails"""
+
+
+def run_git(args: list, cwd: Optional[str] = None, timeout: Optional[float] = None) -> str:
+    """Run a git command and return its stdout"""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            # Never block on a credential prompt for private or missing repos
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        )
+    except subprocess.TimeoutExpired as e:
+        raise GitError(f"git {args[0]} timed out after {timeout}s") from e
+    if result.returncode != 0:
+        raise GitError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def clone(repo_link: str, dest: str, branch: Optional[str] = None, timeout: Optional[float] = None):
+    """Clone a repository into dest"""
+    args = ["clone", "--quiet", "--no-tags", "--single-branch"]
+    if branch:
+        args += ["--branch", branch]
+    run_git([*args, "--", repo_link, dest], timeout=timeout)
+
+
+def head_sha(checkout: str) -> str:
+    """Commit SHA checked out in a working tree"""
+    return run_git(["rev-parse", "HEAD"], cwd=checkout).strip()
+
+
+def commit_count(checkout: str) -> int:
+    """Number of commits reachable from HEAD"""
+    return int(run_git(["rev-list", "--count", "HEAD"], cwd=checkout).strip() or 0)
+
+
+def blob_shas(checkout: str) -> dict:
+    """Map tracked file paths to their blob SHAs, skipping submodules and symlinks"""
+    blobs = {}
+    for entry in run_git(["ls-files", "--stage", "-z"], cwd=checkout).split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        mode, sha, _stage = meta.split(" ")
+        if mode.startswith("100"):
+            blobs[path] = sha
+    return blobs
@@ -0,0 +1,360 @@
+"""
+Commit history miner
+One streaming pass over `git log --numstat` feeds every history metric at once
+"""
+
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from typing import Iterable, Iterator, Optional
+
+from app.analysis.git import GitError
+
+# Record/unit separators cannot appear in names or subjects, so headers parse unambiguously
+RECORD = "\x1e"
+UNIT = "\x1f"
+LOG_FORMAT = f"{RECORD}%H{UNIT}%an{UNIT}%at{UNIT}%s"
+
+# Most recent commits listed individually in perCommit; older ones only count towards totals
+PER_COMMIT_LIMIT = 1000
+
+# Files listed in churn and ownership byFile
+TOP_FILES = 200
+
+# Files (rows) in the change heatmap
+HEATMAP_FILES = 50
+
+# Report sections mine_history can produce, each fed by the same pass
+HISTORY_SECTIONS = ("commits", "churn", "ownership", "heatmap")
+
+
+@dataclass
+class FileChange:
+    path: str
+    added: int
+    deleted: int
+
+
+@dataclass
+class Commit:
+    """A commit header plus its numstat lines"""
+    sha: str
+    author: str
+    timestamp: int
+    message: str
+    files: list = field(default_factory=list)
+
+    @property
+    def day(self) -> str:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).date().isoformat()
+
+    @property
+    def changes(self) -> int:
+        return sum(f.added + f.deleted for f in self.files)
+
+
+# ==================== Streaming ====================
+
+def range_args(since: Optional[date] = None, until: Optional[date] = None) -> list:
+    """git log options limiting history to whole UTC days [since, until]"""
+    args = []
+    if since:
+        args.append(f"--since={datetime.combine(since, time.min).isoformat()}Z")
+    if until:
+        args.append(f"--until={datetime.combine(until, time.max).isoformat(timespec='seconds')}Z")
+    return args
+
+
+def stream_log(
+    checkout: str,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    timeout: Optional[float] = None
+) -> Iterator[str]:
+    """
+    Yield `git log --numstat` output line by line, newest commit first
+
+    The range is applied by git itself, which stops walking history once it
+    is past `since`, so a narrow range costs no more than the commits in it.
+    `timeout` bounds the whole stream: git is killed once it is reached, even
+    mid-output. stderr goes to a temporary file rather than a pipe nobody
+    reads while stdout streams, so a chatty git cannot fill it and stall.
+    On POSIX git runs in its own process group and the whole group is
+    killed, so helpers it spawned cannot hold stdout open past the deadline.
+    """
+    args = [
+        "git", "-c", "core.quotepath=false", "log", "--numstat", "--no-renames",
+        f"--format={LOG_FORMAT}", *range_args(since, until)
+    ]
+
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            args,
+            cwd=checkout,
+            stdout=subprocess.PIPE,
+            stderr=errors,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            start_new_session=os.name == "posix"
+        )
+
+        def kill():
+            if os.name == "posix":
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            else:
+                process.kill()
+
+        deadline = threading.Timer(timeout, kill) if timeout is not None else None
+        if deadline is not None:
+            deadline.daemon = True
+            deadline.start()
+        try:
+            yield from process.stdout
+            process.wait()
+            if process.returncode < 0 and deadline is not None and deadline.finished.is_set():
+                raise GitError(f"git log timed out after {timeout}s")
+            errors.seek(0)
+            stderr = errors.read().decode("utf-8", "replace")
+            if process.returncode != 0 and "does not have any commits" not in stderr:
+                raise GitError(f"git log failed: {stderr.strip()}")
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+            if process.poll() is None:
+                kill()
+                process.wait()
+            process.stdout.close()
+
+
+def parse_log(lines: Iterable[str]) -> Iterator[Commit]:
+    """Group streamed log lines into Commits, holding only one commit at a time"""
+    current = None
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith(RECORD):
+            if current is not None:
+                yield current
+            sha, author, timestamp, message = line[1:].split(UNIT, 3)
+            current = Commit(sha, author, int(timestamp), message)
+        elif line and current is not None:
+            added, deleted, path = line.split("\t", 2)
+            # Binary files report "-" for both counts
+            current.files.append(FileChange(
+                path,
+                int(added) if added.isdigit() else 0,
+                int(deleted) if deleted.isdigit() else 0
+            ))
+    if current is not None:
+        yield current
+
+
+# ==================== Aggregators ====================
+
+class Activity:
+    """Commits and changed lines per day"""
+    key = "activity"
+
+    def __init__(self):
+        self.days = defaultdict(lambda: [0, 0, 0])
+
+    def add(self, commit: Commit):
+        day = self.days[commit.day]
+        day[0] += 1
+        for f in commit.files:
+            day[1] += f.added
+            day[2] += f.deleted
+
+    def result(self) -> list:
+        return [
+            {"date": day, "commits": c, "additions": a, "deletions": d}
+            for day, (c, a, d) in sorted(self.days.items())
+        ]
+
+
+class PerCommit:
+    """Change size of the most recent commits, plus totals over all of them"""
+    key = "perCommit"
+
+    def __init__(self, limit: int = PER_COMMIT_LIMIT):
+        self.limit = limit
+        self.commits = []
+        self.count = 0
+        self.total_changes = 0
+        self.max_changes = 0
+
+    def add(self, commit: Commit):
+        changes = commit.changes
+        self.count += 1
+        self.total_changes += changes
+        self.max_changes = max(self.max_changes, changes)
+        # git log is newest first, so the first `limit` commits are the most recent
+        if len(self.commits) < self.limit:
+            self.commits.append({
+                "sha": commit.sha,
+                "author": commit.author,
+                "date": commit.day,
+                "changes": changes,
+                "files": len(commit.files),
+                "message": commit.message,
+            })
+
+    def result(self) -> list:
+        return self.commits
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "changesPerCommit": {
+                "mean": round(self.total_changes / self.count, 2) if self.count else 0.0,
+                "max": self.max_changes,
+            },
+        }
+
+
+class Churn:
+    """Lines added and deleted, and how often each file changed"""
+    key = "churn"
+
+    def __init__(self, top: int = TOP_FILES):
+        self.top = top
+        self.files = defaultdict(lambda: [0, 0, 0])  # changes, added, deleted
+
+    def add(self, commit: Commit):
+        for f in commit.files:
+            counts = self.files[f.path]
+            counts[0] += 1
+            counts[1] += f.added
+            counts[2] += f.deleted
+
+    def result(self) -> dict:
+        by_file = sorted(
+            ({"path": path, "changes": c, "added": a, "deleted": d, "churn": a + d}
+             for path, (c, a, d) in self.files.items()),
+            key=lambda f: (-f["changes"], -f["churn"], f["path"])
+        )
+        return {
+            "added": sum(f["added"] for f in by_file),
+            "deleted": sum(f["deleted"] for f in by_file),
+            "filesChanged": len(by_file),
+            "byFile": by_file[:self.top],
+        }
+
+
+class Ownership:
+    """Commits and changed lines per author, and each hot file's main author"""
+    key = "ownership"
+
+    def __init__(self, top: int = TOP_FILES):
+        self.top = top
+        self.authors = defaultdict(lambda: [0, 0])  # commits, lines
+        self.files = defaultdict(Counter)
+
+    def add(self, commit: Commit):
+        author = self.authors[commit.author]
+        author[0] += 1
+        for f in commit.files:
+            lines = f.added + f.deleted
+            author[1] += lines
+            self.files[f.path][commit.author] += lines or 1
+
+    def result(self) -> dict:
+        total = sum(lines for _, lines in self.authors.values()) or 1
+        by_author = sorted(
+            ({"author": name, "commits": c, "lines": lines, "share": round(lines / total, 4)}
+             for name, (c, lines) in self.authors.items()),
+            key=lambda a: (-a["lines"], -a["commits"], a["author"])
+        )
+        hot = sorted(self.files.items(), key=lambda item: (-sum(item[1].values()), item[0]))[:self.top]
+        by_file = []
+        for path, counts in hot:
+            owner, lines = counts.most_common(1)[0]
+            by_file.append({
+                "path": path,
+                "owner": owner,
+                "share": round(lines / sum(counts.values()), 4),
+                "authors": len(counts),
+            })
+        return {"byAuthor": by_author, "byFile": by_file}
+
+
+class Heatmap:
+    """Changes per file per month for the most frequently changed files"""
+    key = "heatmap"
+
+    def __init__(self, top: int = HEATMAP_FILES):
+        self.top = top
+        self.files = defaultdict(Counter)
+
+    def add(self, commit: Commit):
+        month = commit.day[:7]
+        for f in commit.files:
+            self.files[f.path][month] += 1
+
+    def result(self) -> dict:
+        hot = sorted(self.files.items(), key=lambda item: (-sum(item[1].values()), item[0]))[:self.top]
+        months = sorted({month for _, counts in hot for month in counts})
+        return {
+            "months": months,
+            "byFile": [
+                {"path": path, "changes": sum(counts.values()), "cells": [counts.get(m, 0) for m in months]}
+                for path, counts in hot
+            ],
+        }
+
+
+# ==================== Entry Point ====================
+
+def mine_history(
+    checkout: str,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    timeout: Optional[float] = None,
+    sections: Iterable[str] = HISTORY_SECTIONS
+) -> dict:
+    """
+    The requested history sections (commits, churn, ownership, heatmap) from a single pass
+
+    Memory is bounded by the number of distinct days, files and authors in
+    the range, never by the number of commits.
+    """
+    sections = set(sections)
+    per_commit = PerCommit()
+    aggregators = []
+    if "commits" in sections:
+        aggregators += [Activity(), per_commit]
+    if "churn" in sections:
+        aggregators.append(Churn())
+    if "ownership" in sections:
+        aggregators.append(Ownership())
+    if "heatmap" in sections:
+        aggregators.append(Heatmap())
+
+    for commit in parse_log(stream_log(checkout, since, until, timeout)):
+        for aggregator in aggregators:
+            aggregator.add(commit)
+
+    results = {aggregator.key: aggregator.result() for aggregator in aggregators}
+    metrics = {key: results[key] for key in ("churn", "ownership", "heatmap") if key in results}
+    if "commits" in sections:
+        metrics["commits"] = {
+            **per_commit.summary(),
+            "perCommit": results["perCommit"],
+            "activity": results["activity"],
+        }
+    return metrics
+
+
+def slice_activity(activity: list, since: Optional[date] = None, until: Optional[date] = None) -> list:
+    """Days of a mined activity series within [since, until], without touching git again"""
+    low = since.isoformat() if since else ""
+    high = until.isoformat() if until else "9999-12-31"
+    return [day for day in activity if low <= day["date"] <= high]
@@ -0,0 +1,360 @@
+"""
+Analysis job queue
+Persistent job table polled by a runner that dispatches work to worker processes
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, update, func
+
+from app.analysis import git
+from app.analysis.mirrors import mirror_cache
+from app.analysis.pipeline import analyze_repository
+from app.analysis.reports import build_report, build_series
+from app.chat.retrieval import build_repository_index, encode_index
+from app.config.settings import get_settings
+from app.models.analysis import AnalysisJob, RetrievalIndex
+from app.utils.database import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+# ==================== Job State Transitions ====================
+
+def report_progress(job_id: int, stage: str, progress: float):
+    """Record a job's current stage; doubles as a heartbeat"""
+    with SessionLocal() as db:
+        db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.job_id == job_id)
+            .values(stage=stage, progress=progress, heartbeat_at=datetime.utcnow())
+        )
+        db.commit()
+
+
+def fail_job(job_id: int, error: str):
+    """Schedule a retry with exponential backoff, or give up after max_attempts"""
+    with SessionLocal() as db:
+        job = db.get(AnalysisJob, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        job.error = error[:2000]
+        job.worker_id = None
+        if job.attempts < job.max_attempts:
+            delay = settings.ANALYSIS_RETRY_BACKOFF_SECONDS * 2 ** max(0, job.attempts - 1)
+            job.status = "queued"
+            job.stage = "retrying"
+            job.next_run_at = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            job.status = "failed"
+            job.stage = "failed"
+        db.commit()
+
+
+def release_job(job_id: int):
+    """Put a claimed job that never started back in the queue"""
+    with SessionLocal() as db:
+        db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.job_id == job_id, AnalysisJob.status == "running")
+            .values(status="queued", stage="queued", worker_id=None, attempts=AnalysisJob.attempts - 1)
+        )
+        db.commit()
+
+
+def complete_job(
+    job_id: int,
+    metrics: dict,
+    index: Optional[dict] = None,
+    worker_id: Optional[str] = None,
+    attempt: Optional[int] = None
+) -> Optional[int]:
+    """
+    Store the report with its time-series rollups, and its chat retrieval index if one was built, and mark the job done
+
+    Only the run that still holds the job may complete it: `worker_id` and
+    `attempt` are the claim it started under. A run whose job was requeued
+    to another worker after a stale heartbeat, or already failed, stores
+    nothing and gets None.
+    """
+    with SessionLocal() as db:
+        owned = [AnalysisJob.job_id == job_id]
+        if attempt is not None:
+            owned.append(AnalysisJob.attempts == attempt)
+        if worker_id is not None:
+            owned += [AnalysisJob.status == "running", AnalysisJob.worker_id == worker_id]
+        else:
+            owned += [AnalysisJob.status.notin_(TERMINAL_STATUSES), AnalysisJob.worker_id.is_(None)]
+        claimed = db.execute(
+            update(AnalysisJob)
+            .where(*owned)
+            .values(status="succeeded", stage="done", progress=1.0, error=None, worker_id=None)
+        )
+        if claimed.rowcount != 1:
+            db.rollback()
+            logger.warning("Analysis job %s was taken over or finished elsewhere; discarding this result", job_id)
+            return None
+
+        job = db.get(AnalysisJob, job_id)
+        report = build_report(job.repo_id, metrics)
+        db.add(report)
+        db.flush()
+        db.add_all(build_series(report.report_id, metrics))
+        if index is not None:
+            db.add(RetrievalIndex(
+                report_id=report.report_id,
+                repo_id=job.repo_id,
+                chunk_count=len(index["chunks"]),
+                payload=encode_index(index)
+            ))
+        job.report_id = report.report_id
+        db.commit()
+        return report.report_id
+
+
+# ==================== Worker Process Entry Point ====================
+
+def _heartbeat(job_id: int, stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        with SessionLocal() as db:
+            db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.job_id == job_id)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+
+
+def run_analysis_job(job_id: int) -> Optional[int]:
+    """
+    Clone the job's repository, compute its metrics and store a Report
+
+    Runs inside a worker process. Failures are recorded on the job itself so
+    the outcome is persisted even if the dispatching server has gone away.
+    """
+    with SessionLocal() as db:
+        job = db.get(AnalysisJob, job_id)
+        if job is None:
+            return None
+        repo_link, branch = job.repo_link, job.branch
+        # The claim this run holds the job under; completing checks it is still ours
+        worker_id, attempt = job.worker_id, job.attempts
+        since, until = job.range_from, job.range_to
+        options = json.loads(job.options) if job.options else None
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat,
+        args=(job_id, stop, max(1.0, settings.ANALYSIS_JOB_TIMEOUT_SECONDS / 4)),
+        daemon=True
+    )
+    heartbeat.start()
+    workdir = tempfile.mkdtemp(prefix=f"devlens-job-{job_id}-", dir=settings.ANALYSIS_WORKDIR or None)
+    try:
+        report_progress(job_id, "cloning", 0.05)
+        checkout = os.path.join(workdir, "checkout")
+        if settings.ANALYSIS_MIRROR_ENABLED:
+            mirror_cache.checkout(repo_link, checkout, branch=branch, timeout=settings.ANALYSIS_JOB_TIMEOUT_SECONDS)
+        else:
+            git.clone(repo_link, checkout, branch=branch, timeout=settings.ANALYSIS_JOB_TIMEOUT_SECONDS)
+
+        metrics = analyze_repository(
+            checkout,
+            lambda stage, fraction: report_progress(job_id, stage, fraction),
+            since=since,
+            until=until,
+            options=options
+        )
+
+        index = None
+        if settings.CHAT_INDEX_ENABLED:
+            report_progress(job_id, "indexing", 0.9)
+            index = build_repository_index(checkout, metrics, settings.CHAT_INDEX_MAX_SOURCE_BYTES)
+        return complete_job(job_id, metrics, index, worker_id=worker_id, attempt=attempt)
+    except Exception as e:
+        logger.warning("Analysis job %s failed: %s", job_id, e)
+        fail_job(job_id, str(e))
+        return None
+    finally:
+        stop.set()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ==================== Runner ====================
+
+class JobRunner:
+    """
+    Polls the job table and hands claimed jobs to a process pool
+
+    Claiming is a conditional UPDATE on status, so several uvicorn workers can
+    each run a JobRunner against the same database without double-dispatch.
+    Jobs whose heartbeat goes stale (crashed worker, restarted server) are put
+    back in the queue.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        per_user_limit: int = 2,
+        poll_interval: float = 1.0,
+        stale_after: int = 600
+    ):
+        self.workers = max(1, workers)
+        self.per_user_limit = max(1, per_user_limit)
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: dict = {}
+
+    def claim_jobs(self, limit: int) -> list:
+        """Atomically move up to `limit` due jobs from queued to running"""
+        now = datetime.utcnow()
+        claimed = []
+        with SessionLocal() as db:
+            running = dict(db.execute(
+                select(AnalysisJob.user_id, func.count())
+                .where(AnalysisJob.status == "running")
+                .group_by(AnalysisJob.user_id)
+            ).all())
+            saturated = [user_id for user_id, count in running.items() if count >= self.per_user_limit]
+            candidates = db.execute(
+                select(AnalysisJob.job_id, AnalysisJob.user_id)
+                .where(
+                    AnalysisJob.status == "queued",
+                    AnalysisJob.next_run_at <= now,
+                    AnalysisJob.user_id.notin_(saturated)
+                )
+                .order_by(AnalysisJob.next_run_at, AnalysisJob.job_id)
+                .limit(limit * 5)
+            ).all()
+            for job_id, user_id in candidates:
+                if len(claimed) >= limit:
+                    break
+                if running.get(user_id, 0) >= self.per_user_limit:
+                    continue
+                result = db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.job_id == job_id, AnalysisJob.status == "queued")
+                    .values(
+                        status="running",
+                        stage="starting",
+                        worker_id=self.worker_id,
+                        heartbeat_at=now,
+                        attempts=AnalysisJob.attempts + 1
+                    )
+                )
+                if result.rowcount == 1:
+                    claimed.append(job_id)
+                    running[user_id] = running.get(user_id, 0) + 1
+            db.commit()
+        return claimed
+
+    def requeue_stale(self) -> int:
+        """
+        Return jobs with an expired heartbeat to the queue
+
+        A job whose worker keeps dying (a crash, the OOM killer) would never
+        record a failure itself, so one out of attempts is failed here instead.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        stale = (AnalysisJob.status == "running", AnalysisJob.heartbeat_at < cutoff)
+        with SessionLocal() as db:
+            db.execute(
+                update(AnalysisJob)
+                .where(*stale, AnalysisJob.attempts >= AnalysisJob.max_attempts)
+                .values(status="failed", stage="failed", worker_id=None,
+                        error="worker stopped responding on every attempt")
+            )
+            result = db.execute(
+                update(AnalysisJob)
+                .where(*stale)
+                .values(status="queued", stage="requeued", worker_id=None, next_run_at=datetime.utcnow())
+            )
+            db.commit()
+            return result.rowcount
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the server process has an event loop and threads running
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _dispatch(self, job_id: int):
+        future = self._get_executor().submit(run_analysis_job, job_id)
+        self._running[job_id] = future
+
+        def done(f):
+            self._running.pop(job_id, None)
+            if f.cancelled():
+                # Never started (server shutting down); hand it back untouched
+                release_job(job_id)
+                return
+            error = f.exception()
+            if error is not None:
+                # The worker died before it could record anything itself
+                logger.error("Analysis worker crashed on job %s: %r", job_id, error)
+                if self._executor is not None and getattr(self._executor, "_broken", False):
+                    self._executor = None
+                fail_job(job_id, f"worker crashed: {error!r}")
+
+        future.add_done_callback(done)
+
+    async def _loop(self):
+        polls = 0
+        while True:
+            try:
+                if polls % 60 == 0:
+                    await asyncio.to_thread(self.requeue_stale)
+                free = self.workers - len(self._running)
+                if free > 0:
+                    for job_id in await asyncio.to_thread(self.claim_jobs, free):
+                        self._dispatch(job_id)
+            except Exception:
+                logger.exception("Analysis job runner poll failed")
+            polls += 1
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        """Start polling for jobs"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop polling; running jobs finish in their worker processes"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_runner = JobRunner(
+    workers=settings.ANALYSIS_WORKERS,
+    per_user_limit=settings.ANALYSIS_MAX_JOBS_PER_USER,
+    poll_interval=settings.ANALYSIS_POLL_INTERVAL_SECONDS,
+    stale_after=settings.ANALYSIS_JOB_TIMEOUT_SECONDS
+)
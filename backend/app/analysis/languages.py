@@ -0,0 +1,110 @@
+"""
+Language classification
+Maps files to languages and their comment syntax, and decides what to skip
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Language:
+    """Comment syntax and parser family of a language"""
+    name: str
+    line_comments: tuple = ()
+    block_comments: tuple = ()  # (open, close) pairs
+    parser: Optional[str] = None  # "python", "js" or None for LOC only
+
+
+PYTHON = Language("Python", ("#",), (), "python")
+JAVASCRIPT = Language("JavaScript", ("//",), (("/*", "*/"),), "js")
+TYPESCRIPT = Language("TypeScript", ("//",), (("/*", "*/"),), "js")
+CSS = Language("CSS", (), (("/*", "*/"),))
+SCSS = Language("SCSS", ("//",), (("/*", "*/"),))
+HTML = Language("HTML", (), (("<!--", "-->"),))
+JAVA = Language("Java", ("//",), (("/*", "*/"),))
+C = Language("C", ("//",), (("/*", "*/"),))
+CPP = Language("C++", ("//",), (("/*", "*/"),))
+CSHARP = Language("C#", ("//",), (("/*", "*/"),))
+GO = Language("Go", ("//",), (("/*", "*/"),))
+RUST = Language("Rust", ("//",), (("/*", "*/"),))
+PHP = Language("PHP", ("//", "#"), (("/*", "*/"),))
+RUBY = Language("Ruby", ("#",), ())
+SHELL = Language("Shell", ("#",), ())
+SQL = Language("SQL", ("--",), (("/*", "*/"),))
+PRISMA = Language("Prisma", ("//",), ())
+YAML = Language("YAML", ("#",), ())
+MARKDOWN = Language("Markdown")
+JSON = Language("JSON")
+OTHER = Language("Other")
+
+EXTENSIONS = {
+    ".py": PYTHON, ".pyw": PYTHON, ".pyi": PYTHON,
+    ".js": JAVASCRIPT, ".jsx": JAVASCRIPT, ".mjs": JAVASCRIPT, ".cjs": JAVASCRIPT,
+    ".ts": TYPESCRIPT, ".tsx": TYPESCRIPT, ".mts": TYPESCRIPT, ".cts": TYPESCRIPT,
+    ".css": CSS, ".scss": SCSS, ".sass": SCSS, ".less": SCSS,
+    ".html": HTML, ".htm": HTML, ".vue": HTML, ".svelte": HTML,
+    ".java": JAVA, ".kt": JAVA, ".scala": JAVA,
+    ".c": C, ".h": C,
+    ".cc": CPP, ".cpp": CPP, ".cxx": CPP, ".hpp": CPP, ".hh": CPP,
+    ".cs": CSHARP,
+    ".go": GO,
+    ".rs": RUST,
+    ".php": PHP,
+    ".rb": RUBY,
+    ".sh": SHELL, ".bash": SHELL, ".zsh": SHELL,
+    ".sql": SQL,
+    ".prisma": PRISMA,
+    ".yml": YAML, ".yaml": YAML,
+    ".md": MARKDOWN, ".rst": MARKDOWN,
+    ".json": JSON,
+}
+
+# Directory names that hold dependencies, build output or tool state rather than project code
+VENDORED_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules", "bower_components", "jspm_packages",
+    "venv", ".venv", "env", ".env", "site-packages", "__pycache__", ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "vendor", "third_party", "third-party",
+    "dist", "build", "out", ".next", ".nuxt", "coverage", "target",
+    ".idea", ".vscode",
+})
+
+BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".svgz",
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".jar", ".war",
+    ".exe", ".dll", ".so", ".dylib", ".o", ".a", ".class", ".pyc", ".pyo", ".whl",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".mp3", ".mp4", ".wav", ".ogg", ".mov", ".avi", ".webm",
+    ".db", ".sqlite", ".sqlite3", ".bin", ".dat", ".lock",
+})
+
+# Generated bundles that would swamp the metrics
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".bundle.js", ".map")
+
+
+# Schema languages read for tables and queries without a source parser
+SCHEMA_LANGUAGES = frozenset({"SQL", "Prisma"})
+
+
+def classify(path: str) -> Language:
+    """Language of a file, by extension"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), OTHER)
+
+
+def is_skipped_path(path: str) -> bool:
+    """True for binary, minified or otherwise non-source files"""
+    lower = path.lower()
+    return os.path.splitext(lower)[1] in BINARY_EXTENSIONS or lower.endswith(MINIFIED_SUFFIXES)
+
+
+def is_vendored_path(path: str) -> bool:
+    """True when any directory of a slash-separated path is vendored"""
+    return any(part in VENDORED_DIRS or part.endswith(".egg-info") for part in path.split("/")[:-1])
+
+
+def is_binary(data: bytes) -> bool:
+    """Heuristic: a NUL byte in the first 8 KiB means binary"""
+    return b"\0" in bytes(data[:8192])  # bytes() so memoryviews work too
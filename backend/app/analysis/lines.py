@@ -0,0 +1,58 @@
+"""
+Line classification
+Splits a source file into code, comment and blank lines
+"""
+
+from app.analysis.languages import Language
+
+
+def count_lines(text: str, language: Language) -> tuple:
+    """Return (code, comment, blank) line counts"""
+    code = comment = blank = 0
+    line_comments = language.line_comments
+    block_comments = language.block_comments
+    closing = None  # delimiter that ends the block comment we are inside
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if closing is not None:
+            end = line.find(closing)
+            if end < 0:
+                comment += 1
+                continue
+            rest = line[end + len(closing):].strip()
+            closing = None
+            if not rest or (line_comments and rest.startswith(line_comments)):
+                comment += 1
+                continue
+            line = rest
+        if not line:
+            blank += 1
+            continue
+        if line_comments and line.startswith(line_comments):
+            comment += 1
+            continue
+
+        is_comment = False
+        for opener, closer in block_comments:
+            if line.startswith(opener):
+                end = line.find(closer, len(opener))
+                if end < 0:
+                    closing = closer
+                    is_comment = True
+                elif not line[end + len(closer):].strip():
+                    is_comment = True
+                break
+        if is_comment:
+            comment += 1
+            continue
+
+        code += 1
+        # Code followed by a block comment that runs onto later lines
+        for opener, closer in block_comments:
+            start = line.rfind(opener)
+            if start > 0 and line.find(closer, start + len(opener)) < 0:
+                closing = closer
+                break
+
+    return code, comment, blank
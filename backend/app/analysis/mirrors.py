@@ -0,0 +1,208 @@
+"""
+Mirror cache
+Bare mirrors of analysed repositories so re-analyses fetch only new objects instead of cloning
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from app.analysis.git import run_git
+from app.config.settings import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: mirrors still work, but concurrent jobs are not serialised
+    fcntl = None
+
+settings = get_settings()
+
+# Touched on every use; its mtime orders mirrors for eviction
+STAMP_FILE = "devlens-last-used"
+
+DEFAULT_PORTS = {"https": "443", "http": "80", "ssh": "22", "git": "9418"}
+
+
+def normalize_url(repo_link: str) -> str:
+    """
+    Canonical form of a repository URL, so equivalent links share one mirror
+
+    Scheme and host are lower-cased, default ports, trailing slashes and a
+    trailing ".git" are dropped, and scp-style `git@host:path` becomes ssh://.
+    Credentials are kept: links with different credentials must not share a
+    mirror, or one user could read a private repository through another's token.
+    """
+    link = repo_link.strip()
+    scp = re.match(r"^([\w.-]+@)?([\w.-]+):(?!//)(.+)$", link)
+    if scp and "://" not in link:
+        link = f"ssh://{scp.group(1) or ''}{scp.group(2)}/{scp.group(3)}"
+
+    parts = urlsplit(link)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc
+    if "@" in netloc:
+        userinfo, host = netloc.rsplit("@", 1)
+        netloc = f"{userinfo}@{host.lower()}"
+    else:
+        netloc = netloc.lower()
+    port = DEFAULT_PORTS.get(scheme)
+    if port and netloc.endswith(f":{port}"):
+        netloc = netloc[:-len(port) - 1]
+
+    path = parts.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return urlunsplit((scheme, netloc, path, "", ""))
+
+
+class MirrorCache:
+    """
+    Directory of bare mirrors, one per normalized repository URL, bounded by disk size
+
+    Each mirror has a lock file. Creating or fetching a mirror holds it
+    exclusively, so concurrent jobs for one repository clone it once and the
+    second job only waits for the first. Checking out holds it shared, and
+    eviction skips any mirror it cannot lock exclusively without waiting.
+    Locks are `flock`s, so they work across worker processes.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 10 * 1024 ** 3, clone_filter: str = ""):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.clone_filter = clone_filter
+
+    def key(self, repo_link: str) -> str:
+        """Directory name of a repository's mirror: readable repo name plus a URL hash"""
+        url = normalize_url(repo_link)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rsplit("/", 1)[-1])[:40] or "repo"
+        return f"{name}-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}.git"
+
+    def path(self, repo_link: str) -> str:
+        return os.path.join(self.root, self.key(repo_link))
+
+    @contextmanager
+    def _lock(self, key: str, exclusive: bool, blocking: bool = True):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{key}.lock"), "a+") as f:
+            if fcntl is None:
+                yield True
+                return
+            flags = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+            try:
+                fcntl.flock(f, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def update(self, repo_link: str, timeout: Optional[float] = None) -> str:
+        """
+        Create the repository's mirror or fetch into it; returns the mirror path
+
+        A new mirror is cloned next to its final path and renamed into place,
+        so a failed or interrupted clone never leaves a half-made mirror.
+        """
+        key = self.key(repo_link)
+        mirror = os.path.join(self.root, key)
+        with self._lock(key, exclusive=True):
+            if os.path.isdir(mirror):
+                run_git(["fetch", "--quiet", "--prune", "origin"], cwd=mirror, timeout=timeout)
+            else:
+                staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+                try:
+                    args = ["clone", "--quiet", "--mirror"]
+                    if self.clone_filter:
+                        args.append(f"--filter={self.clone_filter}")
+                    run_git([*args, "--", repo_link, os.path.join(staging, "mirror")], timeout=timeout)
+                    os.rename(os.path.join(staging, "mirror"), mirror)
+                finally:
+                    shutil.rmtree(staging, ignore_errors=True)
+            self._touch(mirror)
+        return mirror
+
+    def checkout(self, repo_link: str, dest: str, branch: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Check a repository out into dest through its mirror
+
+        The working copy is a local clone of the mirror: objects are
+        hard-linked where the filesystem allows, nothing goes over the
+        network, and it stays valid if the mirror is evicted afterwards.
+        """
+        args = ["clone", "--quiet", "--no-tags", "--single-branch"]
+        if branch:
+            args += ["--branch", branch]
+        while True:
+            mirror = self.update(repo_link, timeout=timeout)
+            with self._lock(self.key(repo_link), exclusive=False):
+                # Another job may have evicted it between the fetch and taking this lock
+                if os.path.isdir(mirror):
+                    run_git([*args, "--", mirror, dest], timeout=timeout)
+                    break
+        self.evict(keep=mirror)
+
+    @staticmethod
+    def _touch(mirror: str):
+        with open(os.path.join(mirror, STAMP_FILE), "w"):
+            pass
+
+    @staticmethod
+    def _size(path: str) -> int:
+        total = 0
+        for current, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(current, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def mirrors(self) -> list:
+        """(last used, size, path) of every mirror, least recently used first"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".") or not name.endswith(".git") or not os.path.isdir(path):
+                continue
+            try:
+                used = os.stat(os.path.join(path, STAMP_FILE)).st_mtime
+            except OSError:
+                used = 0.0
+            entries.append((used, self._size(path), path))
+        entries.sort()
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used mirrors until the total fits max_bytes; returns how many"""
+        entries = self.mirrors()
+        excess = sum(size for _, size, _ in entries) - self.max_bytes
+        removed = 0
+        for _, size, path in entries:
+            if excess <= 0:
+                break
+            if path == keep:
+                continue
+            key = os.path.basename(path)
+            with self._lock(key, exclusive=True, blocking=False) as locked:
+                if not locked:
+                    continue  # in use by another job; try again next time
+                shutil.rmtree(path, ignore_errors=True)
+            excess -= size
+            removed += 1
+        return removed
+
+
+mirror_cache = MirrorCache(
+    root=settings.ANALYSIS_MIRROR_DIR or os.path.join(settings.ANALYSIS_WORKDIR or tempfile.gettempdir(), "devlens-mirrors"),
+    max_bytes=settings.ANALYSIS_MIRROR_MAX_BYTES,
+    clone_filter=settings.ANALYSIS_MIRROR_FILTER
+)
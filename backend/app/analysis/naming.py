@@ -0,0 +1,286 @@
+"""
+Naming quality
+Scores every declared identifier of a repository in one vectorised batch
+"""
+
+import os
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+
+from app.analysis.languages import classify
+from app.analysis.parsers import IDENTIFIER_KINDS
+
+# Characters of a name that are examined; longer names are already flagged as too long
+NAME_WIDTH = 48
+# Rows scored per step, which bounds the code point matrix at ~25 MB
+CHUNK_ROWS = 131072
+MAX_LENGTH = 30
+MAX_FILES_LISTED = 100
+MAX_ISSUES_PER_FILE = 5
+
+LANGUAGES = {"python": 0, "js": 1}
+KIND_CODES = {kind: code for code, kind in enumerate(IDENTIFIER_KINDS)}
+
+SNAKE, CAMEL, PASCAL, UPPER = 1, 2, 4, 8
+STYLE_NAMES = {SNAKE: "snake_case", CAMEL: "camelCase", PASCAL: "PascalCase", UPPER: "UPPER_CASE"}
+
+# Accepted case styles per language and identifier kind (function, class, variable, parameter, constant);
+# the first style listed is the one reported when a name matches none
+CASE_RULES = {
+    "python": ((SNAKE,), (PASCAL,), (SNAKE,), (SNAKE,), (SNAKE, UPPER)),
+    "js": ((CAMEL, PASCAL), (PASCAL,), (CAMEL,), (CAMEL,), (CAMEL, UPPER, PASCAL)),
+}
+ALLOWED_STYLES = np.array([[sum(styles) for styles in CASE_RULES[lang]] for lang in LANGUAGES], dtype=np.uint8)
+EXPECTED_STYLE = [[STYLE_NAMES[styles[0]] for styles in CASE_RULES[lang]] for lang in LANGUAGES]
+
+VAGUE_WORDS = (
+    "data info helper helpers util utils misc stuff thing things foo bar baz qux temp tmp obj "
+    "object dummy whatever something my"
+).split()
+ABBREVIATIONS = (
+    "mgr cnt usr pwd btn cfg ptr calc svc hndlr hdlr nm nbr qty amt acct rslt val vals lst dct "
+    "arr cb evt ctr cntr tbl fld str"
+).split()
+# Single letters that are idiomatic as loop counters, exceptions and type variables
+CONVENTIONAL_LETTERS = np.array([ord(c) for c in "ijknxyzetT"], dtype=np.uint32)
+
+# Issue flags, in the order an identifier's single reported issue is chosen
+VAGUE, ABBREVIATION, CASE, SHORT, LONG, UNCLEAR = 1, 2, 4, 8, 16, 32
+ISSUE_NAMES = {VAGUE: "vague", ABBREVIATION: "abbreviation", CASE: "case", SHORT: "short", LONG: "long", UNCLEAR: "unclear"}
+
+# Inflections derived from every listed word, so the file only needs base forms
+SUFFIXES = ("s", "es", "ed", "er", "ers", "ing", "ings", "ion", "ions", "ize", "izer", "ized", "able", "ly", "ment", "ness")
+
+_BASE = np.uint64(0x100000001B3)  # FNV-1a 64-bit prime, as a polynomial base
+_LENGTH_MIX = np.uint64(0x9E3779B97F4A7C15)
+with np.errstate(over="ignore"):
+    _POWERS = np.cumprod(np.full(NAME_WIDTH, _BASE, dtype=np.uint64), dtype=np.uint64)
+
+
+# ==================== Hashing ====================
+
+def _code_points(names: list) -> np.ndarray:
+    """(rows, NAME_WIDTH) matrix of code points, zero padded and truncated"""
+    return np.array(names, dtype=f"<U{NAME_WIDTH}").view(np.uint32).reshape(len(names), NAME_WIDTH)
+
+
+def _segment_hashes(chars: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    64-bit polynomial hash of each segment of `chars`, segments beginning at `starts`
+
+    Word sets and identifier words go through this same function, so a word
+    is in a set exactly when its hash is.
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=np.uint64)
+    lengths = np.diff(np.append(starts, len(chars)))
+    offsets = np.arange(len(chars)) - np.repeat(starts, lengths)
+    with np.errstate(over="ignore"):
+        terms = chars.astype(np.uint64) * _POWERS[offsets]
+        return np.add.reduceat(terms, starts) ^ (lengths.astype(np.uint64) * _LENGTH_MIX)
+
+
+def _word_set(words) -> np.ndarray:
+    """Sorted unique hashes of lower-case words: the compact form the scorer looks words up in"""
+    words = [word for word in words if word]
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    codes = _code_points(words).ravel()
+    valid = codes != 0
+    lengths = valid.reshape(len(words), NAME_WIDTH).sum(axis=1)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.unique(_segment_hashes(codes[valid], starts))
+
+
+def _inflections(word: str) -> list:
+    forms = [word]
+    stem = word[:-1] if word.endswith("e") else word
+    for suffix in SUFFIXES:
+        forms.append((stem if suffix[0] in "aeiou" else word) + suffix)
+    if word.endswith("y") and len(word) > 2:
+        forms += [word[:-1] + "ies", word[:-1] + "ied"]
+    return forms
+
+
+@lru_cache(maxsize=1)
+def word_sets() -> tuple:
+    """(known words, vague words, abbreviations) as sorted hash arrays, built once per process"""
+    with open(os.path.join(os.path.dirname(__file__), "naming_words.txt")) as f:
+        listed = [word for line in f if not line.startswith("#") for word in line.split()]
+    known = _word_set(chain.from_iterable(_inflections(word) for word in listed))
+    return known, _word_set(VAGUE_WORDS), _word_set(ABBREVIATIONS)
+
+
+def _member(hashes: np.ndarray, table: np.ndarray) -> np.ndarray:
+    if not len(table):
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(table, hashes), len(table) - 1)
+    return table[positions] == hashes
+
+
+# ==================== Scoring ====================
+
+def _shift_right(mask: np.ndarray) -> np.ndarray:
+    """mask[:, p - 1] at column p (False in the first column)"""
+    shifted = np.zeros_like(mask)
+    shifted[:, 1:] = mask[:, :-1]
+    return shifted
+
+
+def _shift_left(mask: np.ndarray) -> np.ndarray:
+    """mask[:, p + 1] at column p (False in the last column)"""
+    shifted = np.zeros_like(mask)
+    shifted[:, :-1] = mask[:, 1:]
+    return shifted
+
+
+def _score_chunk(names: list, kinds: np.ndarray, languages: np.ndarray) -> tuple:
+    n = len(names)
+    rows = np.arange(n)
+    codes = _code_points(names)
+    valid = codes != 0
+    upper = (codes >= 65) & (codes <= 90)
+    lower = (codes >= 97) & (codes <= 122)
+    digit = (codes >= 48) & (codes <= 57)
+    underscore = codes == 95
+
+    # Leading underscores (and $ in JS) mark privacy or framework names, trailing ones dodge keywords;
+    # the body between them is what gets styled
+    leading = np.logical_and.accumulate(underscore | (codes == 36), axis=1)
+    trailing = np.logical_and.accumulate((underscore | ~valid)[:, ::-1], axis=1)[:, ::-1] & valid
+    body = valid & ~leading & ~trailing
+    has_body = body.any(axis=1)
+    first = np.argmax(body, axis=1)
+    first_upper, first_lower = upper[rows, first], lower[rows, first]
+    inner_underscore = (underscore & body).any(axis=1)
+    any_upper, any_lower = (upper & body).any(axis=1), (lower & body).any(axis=1)
+    lengths = np.fromiter(map(len, names), dtype=np.int32, count=n) - leading.sum(axis=1) - trailing.sum(axis=1)
+
+    styles = (
+        (has_body & ~any_upper & ~digit[rows, first]) * SNAKE
+        | (first_lower & ~inner_underscore) * CAMEL
+        | (first_upper & ~inner_underscore & (any_lower | (lengths == 1))) * PASCAL
+        | (any_upper & ~any_lower) * UPPER
+    ).astype(np.uint8)
+    case_ok = (styles & ALLOWED_STYLES[languages, kinds]) != 0
+
+    # Words: split at underscores, lower-to-upper humps, the end of an acronym (HTTPServer) and digit runs
+    word = body & ~underscore
+    previous_word, previous_upper, previous_digit = _shift_right(word), _shift_right(upper), _shift_right(digit)
+    boundary = word & (
+        ~previous_word
+        | (upper & ~previous_upper)
+        | (upper & previous_upper & _shift_left(lower))
+        | (digit != previous_digit)
+    )
+    flat = np.flatnonzero(word.ravel())
+    lowered = np.where(upper, codes + 32, codes).ravel()[flat]
+    starts = np.flatnonzero(boundary.ravel()[flat])
+    hashes = _segment_hashes(lowered, starts)
+    segment_rows = flat[starts] // NAME_WIDTH
+    segment_lengths = np.diff(np.append(starts, len(flat)))
+    numeric = digit.ravel()[flat[starts]]
+
+    known_words, vague_words, abbreviations = word_sets()
+    abbreviated = _member(hashes, abbreviations)
+    vague_word = _member(hashes, vague_words)
+    known = (_member(hashes, known_words) | numeric | (segment_lengths == 1)) & ~abbreviated
+
+    segments = np.bincount(segment_rows, minlength=n)
+    coverage = np.where(
+        segments > 0, np.bincount(segment_rows, weights=known, minlength=n) / np.maximum(segments, 1), 1.0
+    )
+    has_abbreviation = np.bincount(segment_rows, weights=abbreviated, minlength=n) > 0
+    vague_segments = np.bincount(segment_rows, weights=vague_word, minlength=n)
+    vague = (vague_segments > 0) & (np.bincount(segment_rows, weights=vague_word | numeric, minlength=n) == segments)
+
+    short = (lengths <= 1) & ~np.isin(codes[rows, first], CONVENTIONAL_LETTERS)
+    long = lengths > MAX_LENGTH
+    length_score = np.where(short, 0.0, np.clip(1 - (lengths - MAX_LENGTH) / 20, 0.0, 1.0))
+
+    scores = np.clip(
+        0.35 * case_ok + 0.15 * length_score + 0.35 * coverage + 0.15 * ~(vague | has_abbreviation), 0.0, 1.0
+    )
+    flags = (
+        vague * VAGUE | has_abbreviation * ABBREVIATION | ~case_ok * CASE
+        | short * SHORT | long * LONG | (coverage < 0.5) * UNCLEAR
+    ).astype(np.uint8)
+    return scores, flags
+
+
+def score_identifiers(names: list, kinds: np.ndarray, languages: np.ndarray) -> tuple:
+    """
+    Scores in [0, 1] and issue flags of every identifier, computed as array operations
+
+    Names become a matrix of code points; case style, length, word splitting,
+    dictionary, vague-name and abbreviation lookups are masks and hash
+    searches over the whole matrix, with no per-identifier Python code.
+    """
+    scores = np.empty(len(names))
+    flags = np.empty(len(names), dtype=np.uint8)
+    for start in range(0, len(names), CHUNK_ROWS):
+        end = start + CHUNK_ROWS
+        scores[start:end], flags[start:end] = _score_chunk(names[start:end], kinds[start:end], languages[start:end])
+    return scores, flags
+
+
+def _issue(name: str, flag: int, language: int, kind: int) -> str:
+    if flag & VAGUE:
+        return f"vague name: {name}"
+    if flag & ABBREVIATION:
+        return f"abbreviation: {name}"
+    if flag & CASE:
+        return f"inconsistent case: {name} (expected {EXPECTED_STYLE[language][kind]})"
+    if flag & SHORT:
+        return f"too short: {name}"
+    if flag & LONG:
+        return f"too long: {name[:MAX_LENGTH]}…"
+    return f"unclear name: {name}"
+
+
+def naming_quality(files: list) -> dict:
+    """The dashboard's namingQuality section, from parsed files' identifiers"""
+    files = [f for f in files if f.get("identifiers") and classify(f["path"]).parser in LANGUAGES]
+    counts = np.array([len(f["identifiers"]) for f in files], dtype=np.int64)
+    total = int(counts.sum())
+    if not total:
+        return {"score": 1.0, "identifiers": 0, "files": 0, "issues": {name: 0 for name in ISSUE_NAMES.values()}, "byFile": []}
+
+    names, kind_names = zip(*chain.from_iterable(f["identifiers"] for f in files))
+    names = list(names)
+    kinds = np.fromiter(
+        (KIND_CODES.get(kind, KIND_CODES["variable"]) for kind in kind_names), dtype=np.int64, count=total
+    )
+    file_index = np.repeat(np.arange(len(files)), counts)
+    languages = np.repeat(np.array([LANGUAGES[classify(f["path"]).parser] for f in files]), counts)
+
+    scores, flags = score_identifiers(names, kinds, languages)
+
+    file_scores = np.bincount(file_index, weights=scores, minlength=len(files)) / counts
+    listed = np.lexsort((np.arange(len(files)), file_scores))[:MAX_FILES_LISTED]
+
+    # The first few flagged identifiers of each listed file become its issue strings
+    flagged = np.flatnonzero((flags != 0) & np.isin(file_index, listed))
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ranks = np.arange(len(flagged)) - np.searchsorted(flagged, offsets[file_index[flagged]])
+    issues = {int(i): [] for i in listed}
+    for i in flagged[ranks < MAX_ISSUES_PER_FILE]:
+        issues[int(file_index[i])].append(_issue(names[i], int(flags[i]), int(languages[i]), int(kinds[i])))
+
+    return {
+        "score": round(float(scores.mean()), 4),
+        "identifiers": total,
+        "files": len(files),
+        "issues": {name: int(np.count_nonzero(flags & bit)) for bit, name in ISSUE_NAMES.items()},
+        "byFile": [
+            {
+                "path": files[i]["path"],
+                "score": round(float(file_scores[i]), 4),
+                "identifiers": int(counts[i]),
+                "issues": issues[int(i)],
+            }
+            for i in listed
+        ],
+    }
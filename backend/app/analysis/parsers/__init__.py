@@ -0,0 +1,47 @@
+"""
+Source parsers
+One parse per file yields functions, complexity, identifiers, query sites and models
+"""
+
+from dataclasses import dataclass, field
+
+
+# What a declared name is; naming rules differ per kind
+IDENTIFIER_KINDS = ("function", "class", "variable", "parameter", "constant")
+
+
+def is_checked_name(name: str) -> bool:
+    """Dunder names and bare underscores are fixed by the language, not chosen by the author"""
+    return bool(name.strip("_")) and not (name.startswith("__") and name.endswith("__"))
+
+
+@dataclass
+class FunctionInfo:
+    """A function or method found in a source file"""
+    name: str
+    start_line: int
+    end_line: int
+    complexity: int
+
+
+@dataclass
+class ParsedFile:
+    """Everything the analyzers need from a single parse of a file"""
+    functions: list = field(default_factory=list)
+    complexity: int = 0  # cyclomatic complexity of the whole file
+    tokens: list = field(default_factory=list)  # (normalized token, line) pairs for clone detection
+    identifiers: list = field(default_factory=list)  # [name, kind] of every declared name, kind in IDENTIFIER_KINDS
+    queries: list = field(default_factory=list)  # raw SQL and ORM query sites, see analysis.queries.query_site
+    models: list = field(default_factory=list)  # declared tables and ORM models, see analysis.queries.declared_model
+    error: str = ""
+
+
+def parse_source(parser: str, text: str) -> ParsedFile:
+    """Parse source text with the named parser family"""
+    if parser == "python":
+        from app.analysis.parsers.python import parse_python
+        return parse_python(text)
+    if parser == "js":
+        from app.analysis.parsers.js import parse_js
+        return parse_js(text)
+    return ParsedFile()
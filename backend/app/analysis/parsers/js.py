@@ -0,0 +1,493 @@
+"""
+JavaScript / TypeScript / JSX parser
+Tokenizer-based function detection, cyclomatic complexity, declared names, query sites and models
+"""
+
+import re
+
+from app.analysis.parsers import FunctionInfo, ParsedFile, is_checked_name
+from app.analysis.queries import declared_model, orm_site, sql_site
+
+IDENT, KEYWORD, PUNCT, STRING, TEMPLATE, NUMBER, REGEX = (
+    "ident", "keyword", "punct", "string", "template", "number", "regex"
+)
+
+KEYWORDS = frozenset({
+    "break", "case", "catch", "class", "const", "continue", "debugger", "default", "delete",
+    "do", "else", "export", "extends", "finally", "for", "function", "if", "import", "in",
+    "instanceof", "let", "new", "return", "super", "switch", "this", "throw", "try", "typeof",
+    "var", "void", "while", "with", "yield", "await", "async", "static", "of",
+    "interface", "type", "enum", "implements", "public", "private", "protected", "readonly",
+    "abstract", "declare", "namespace",
+})
+
+# Identifiers and literals collapse to placeholders so renamed copies still match
+NORMALIZED = {IDENT: "I", STRING: "S", TEMPLATE: "S", NUMBER: "N", REGEX: "R"}
+
+BRANCH_KEYWORDS = frozenset({"if", "for", "while", "case", "catch"})
+BRANCH_OPERATORS = frozenset({"&&", "||", "??"})
+
+# Keywords after which a `/` starts a regex literal rather than a division
+REGEX_AFTER_KEYWORDS = frozenset({"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "yield", "await"})
+
+# Keywords that start a statement; on a later line they end an arrow's expression body left without `;`
+STATEMENT_KEYWORDS = frozenset({"const", "let", "var", "function", "class", "return", "if", "for", "while",
+                                "do", "switch", "try", "throw", "export", "import"})
+
+# Declaration keyword -> kind of the name that follows it
+DECLARATION_KINDS = {"class": "class", "let": "variable", "var": "variable", "const": "constant"}
+
+# Tokens that may precede a method name in a class body or object literal
+METHOD_PREFIX = frozenset({"{", "}", ";", ",", "static", "async", "get", "set", "*",
+                           "public", "private", "protected", "readonly", "abstract", "override"})
+
+# Array methods whose callback runs once per element
+ITERATING_METHODS = frozenset({"forEach", "map", "flatMap", "reduce"})
+
+# Prisma model delegate methods (`prisma.user.findMany(...)`); the generic names only count on a client
+PRISMA_METHODS = frozenset({
+    "findMany", "findUnique", "findUniqueOrThrow", "findFirst", "findFirstOrThrow",
+    "createMany", "updateMany", "deleteMany", "groupBy", "aggregate",
+})
+PRISMA_SHARED_METHODS = frozenset({"create", "update", "upsert", "delete", "count"})
+PRISMA_CLIENTS = frozenset({"prisma", "db", "tx", "client"})
+# Sequelize static model methods (`User.findAll(...)`)
+SEQUELIZE_METHODS = frozenset({
+    "findAll", "findOne", "findByPk", "findAndCountAll", "findOrCreate", "bulkCreate",
+    "create", "update", "upsert", "destroy", "count",
+})
+SEQUELIZE_ASSOCIATIONS = frozenset({"belongsTo", "hasMany", "hasOne", "belongsToMany"})
+# Methods that touch one row, or only the rows they are given
+SINGLE_ROW_METHODS = frozenset({
+    "findOne", "findByPk", "findUnique", "findUniqueOrThrow", "findFirst", "findFirstOrThrow",
+    "create", "createMany", "bulkCreate", "findOrCreate", "upsert",
+})
+# Built-ins that share method names with models
+JS_GLOBALS = frozenset({"Object", "Array", "Promise", "Math", "JSON", "Date", "Reflect", "Number", "String", "Map", "Set"})
+
+TEMPLATE_VALUE_RE = re.compile(r"\$\{[^}]*\}")
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\f\v]+)
+  | (?P<nl>\n)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>'(?:\\.|[^'\\\n])*'?|"(?:\\.|[^"\\\n])*"?)
+  | (?P<template>`(?:\\[\s\S]|\$\{(?:[^{}`]|\{[^{}]*\})*\}|[^`\\])*`?)
+  | (?P<number>(?:0[xXbBoO][0-9a-fA-F_]+|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?)n?)
+  | (?P<ident>[A-Za-z_$\u00c0-\uffff][\w$\u00c0-\uffff]*)
+  | (?P<punct>=>|\?\.|\?\?=|\?\?|&&=|\|\|=|&&|\|\||===|!==|==|!=|<=|>=|\.\.\.|\+\+|--|[^\s])
+""", re.VERBOSE)
+
+REGEX_RE = re.compile(r"/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-zA-Z]*")
+
+
+def tokenize(text: str) -> list:
+    """Split source into (kind, value, line) tuples, dropping whitespace and comments"""
+    tokens = []
+    append = tokens.append
+    line = 1
+    pos = 0
+    end = len(text)
+    match = TOKEN_RE.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:  # pragma: no cover - the punct group matches any character
+            pos += 1
+            continue
+        kind = m.lastgroup
+        value = m.group()
+        if kind == "ws":
+            pass
+        elif kind == "nl":
+            line += 1
+        elif kind == "line_comment":
+            pass
+        elif kind == "block_comment":
+            line += value.count("\n")
+        elif kind == "punct" and value == "/" and _regex_allowed(tokens):
+            rm = REGEX_RE.match(text, pos)
+            if rm is not None:
+                value = rm.group()
+                append((REGEX, value, line))
+                pos = rm.end()
+                continue
+            append((PUNCT, value, line))
+        elif kind == "string" and (len(value) < 2 or value[-1] != value[0]):
+            # Unterminated on this line: an apostrophe in JSX text, not a string
+            append((PUNCT, value[0], line))
+            pos += 1
+            continue
+        elif kind == "ident":
+            append((KEYWORD if value in KEYWORDS else IDENT, value, line))
+        elif kind == "template":
+            append((TEMPLATE, value, line))
+            line += value.count("\n")
+        else:
+            append((kind, value, line))
+        pos = m.end()
+    return tokens
+
+
+def _regex_allowed(tokens: list) -> bool:
+    if not tokens:
+        return True
+    kind, value, _ = tokens[-1]
+    if kind == PUNCT:
+        return value not in (")", "]", "}")
+    if kind == KEYWORD:
+        return value in REGEX_AFTER_KEYWORDS
+    return False
+
+
+def _matching_open(tokens: list, close_index: int) -> int:
+    """Index of the `(` matching the `)` at close_index, or -1"""
+    depth = 0
+    for i in range(close_index, -1, -1):
+        value = tokens[i][1]
+        if value == ")":
+            depth += 1
+        elif value == "(":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _assigned_name(tokens: list, index: int) -> str:
+    """Name of `name = <fn>` / `name: <fn>` where the function starts at index"""
+    if index >= 2 and tokens[index - 1][1] in ("=", ":") and tokens[index - 2][0] == IDENT:
+        return tokens[index - 2][1]
+    return "<anonymous>"
+
+
+def parse_js(text: str) -> ParsedFile:
+    """Parse JavaScript, TypeScript or JSX source"""
+    tokens = tokenize(text)
+    functions = []
+    module_decisions = 0
+
+    # [brace_depth_of_body, name, start_line, decisions, expression]: expression is None for a `{` body,
+    # and for an arrow's expression body the (paren, bracket) depths it started at
+    stack = []
+    pending = None  # function whose `{` body has not been seen yet: [name, line, paren_depth, params_closed]
+    brace_depth = 0
+    paren_depth = 0
+    bracket_depth = 0
+
+    def add_decision():
+        nonlocal module_decisions
+        if stack:
+            stack[-1][3] += 1
+        else:
+            module_decisions += 1
+
+    def expression_ends(kind: str, value: str, line: int, previous_line: int) -> bool:
+        """Whether a token ends the arrow expression body on top of the stack"""
+        braces, (parens, brackets) = stack[-1][0], stack[-1][4]
+        # A bracket closing one opened before the body, e.g. the `)` of `map(x => x.id)`
+        if value == ")":
+            return paren_depth == parens
+        if value == "]":
+            return bracket_depth == brackets
+        if value == "}":
+            return brace_depth == braces
+        if brace_depth != braces or paren_depth != parens or bracket_depth != brackets:
+            return False
+        if kind == PUNCT:
+            return value in (",", ";")
+        # Automatic semicolon insertion: a statement starting on a later line
+        return kind == KEYWORD and value in STATEMENT_KEYWORDS and line > previous_line
+
+    def close_function(entry: list, end_line: int):
+        _, name, start_line, decisions, _ = entry
+        functions.append(FunctionInfo(name, start_line, end_line, 1 + decisions))
+
+    count = len(tokens)
+    for i, (kind, value, line) in enumerate(tokens):
+        while stack and stack[-1][4] is not None and expression_ends(kind, value, line, tokens[i - 1][2]):
+            close_function(stack.pop(), tokens[i - 1][2])
+
+        if kind == KEYWORD:
+            if value in BRANCH_KEYWORDS:
+                add_decision()
+            elif value == "function":
+                j = i + 1
+                if j < count and tokens[j][1] == "*":
+                    j += 1
+                name = tokens[j][1] if j < count and tokens[j][0] == IDENT else _assigned_name(tokens, i)
+                pending = [name, line, paren_depth, False]
+            continue
+
+        if kind == IDENT:
+            # Method shorthand: `name(...) {` in a class body or object literal
+            if (i + 1 < count and tokens[i + 1][1] == "("
+                    and (i == 0 or tokens[i - 1][1] in METHOD_PREFIX)
+                    and pending is None):
+                pending = [value, line, paren_depth, False]
+            continue
+
+        if kind != PUNCT:
+            continue
+
+        if value == "(":
+            paren_depth += 1
+        elif value == ")":
+            paren_depth -= 1
+            if pending is not None and paren_depth == pending[2]:
+                pending[3] = True
+                # Anything but `{` or a return type annotation means it was a call, not a definition
+                nxt = tokens[i + 1][1] if i + 1 < count else ""
+                if nxt not in ("{", ":"):
+                    pending = None
+        elif value == "{":
+            brace_depth += 1
+            if pending is not None and pending[3] and paren_depth == pending[2]:
+                stack.append([brace_depth, pending[0], pending[1], 0, None])
+                pending = None
+        elif value == "}":
+            if stack and stack[-1][0] == brace_depth:
+                close_function(stack.pop(), line)
+            brace_depth -= 1
+        elif value == "[":
+            bracket_depth += 1
+        elif value == "]":
+            bracket_depth -= 1
+        elif value == "=>":
+            # Arrow function; find where its parameter list starts to recover a name
+            start = i - 1
+            if start >= 0 and tokens[start][1] == ")":
+                start = _matching_open(tokens, start)
+            if start > 0 and tokens[start - 1][1] == "async":
+                start -= 1
+            name = _assigned_name(tokens, start) if start >= 0 else "<anonymous>"
+            if i + 1 < count and tokens[i + 1][1] == "{":
+                pending = [name, line, paren_depth, True]
+            else:
+                # Expression body: its decisions are the arrow's until the expression ends
+                stack.append([brace_depth, name, line, 0, (paren_depth, bracket_depth)])
+        elif value == ";":
+            if pending is not None and pending[3]:
+                pending = None
+        elif value in BRANCH_OPERATORS:
+            add_decision()
+        elif value == "?":
+            # Ternary; skip TypeScript optional markers like `a?: T` and `(a?)`
+            nxt = tokens[i + 1][1] if i + 1 < count else ""
+            if nxt not in (":", ")", ",", "="):
+                add_decision()
+
+    while stack:
+        close_function(stack.pop(), tokens[-1][2])
+
+    functions.sort(key=lambda f: f.start_line)
+    queries, models = query_sites(tokens)
+    return ParsedFile(
+        functions=functions,
+        complexity=module_decisions + sum(f.complexity for f in functions),
+        tokens=normalized_tokens(tokens),
+        identifiers=declared_identifiers(tokens, functions),
+        queries=queries,
+        models=models
+    )
+
+
+def _closing(tokens: list, open_index: int) -> int:
+    """Index of the bracket closing the one at open_index, or the end of the stream"""
+    depth = 0
+    for i in range(open_index, len(tokens)):
+        value = tokens[i][1]
+        if value in ("(", "[", "{"):
+            depth += 1
+        elif value in (")", "]", "}"):
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens)
+
+
+def _orm_call(tokens: list, i: int, in_loop: bool):
+    """The Prisma or Sequelize query started by the method name at i, or None"""
+    method = tokens[i][1]
+    base_kind, base, _ = tokens[i - 2]
+    chained = i >= 3 and tokens[i - 3][1] in (".", "?.")
+    if base_kind != IDENT:
+        return None
+    if chained and (method in PRISMA_METHODS or (
+            method in PRISMA_SHARED_METHODS and i >= 4 and tokens[i - 4][1] in PRISMA_CLIENTS)):
+        kind = "prisma"
+    elif not chained and method in SEQUELIZE_METHODS and base[:1].isupper() and base not in JS_GLOBALS:
+        kind = "sequelize"
+    else:
+        return None
+    arguments = [value for argument_kind, value, _ in tokens[i + 2:_closing(tokens, i + 1)] if argument_kind == IDENT]
+    return orm_site(
+        kind, [method], tokens[i][2], in_loop,
+        filtered="where" in arguments or method in SINGLE_ROW_METHODS,
+        extra_joins=arguments.count("include")
+    )
+
+
+def _sequelize_model(tokens: list, name: str, line: int, start: int) -> dict:
+    """A Sequelize model from its attributes object at start and the options object after it"""
+    model = declared_model(name, line, "sequelize")
+    model["primaryKey"] = True  # Sequelize adds an `id` primary key unless told otherwise
+    end = _closing(tokens, start)
+    depth = 0
+    attribute = None
+    for j in range(start + 1, end):
+        kind, value, _ = tokens[j]
+        following = tokens[j + 1][1] if j + 1 < end else ""
+        if value in ("(", "[", "{"):
+            depth += 1
+        elif value in (")", "]", "}"):
+            depth -= 1
+        elif depth == 0 and kind in (IDENT, STRING) and following == ":":
+            attribute = value.strip("'\"")
+            model["columns"] += 1
+        elif attribute and kind == IDENT and following == ":" and tokens[j + 2][1] != "false":
+            if value in ("primaryKey", "unique"):
+                model["indexed"].append(attribute)
+            if value == "references":
+                model["foreignKeys"].append(attribute)
+                model["relationships"] += 1
+
+    # Options: `indexes: [{ fields: ['a', 'b'] }]`
+    options = end + 2 if end + 2 < len(tokens) and tokens[end + 1][1] == "," and tokens[end + 2][1] == "{" else None
+    if options is not None:
+        for j in range(options, _closing(tokens, options) - 2):
+            if tokens[j][1] == "fields" and tokens[j + 1][1] == ":" and tokens[j + 2][1] == "[":
+                model["indexed"].append(tokens[j + 3][1].strip("'\""))
+    return model
+
+
+def query_sites(tokens: list) -> tuple:
+    """
+    Query sites and Sequelize models of a token stream
+
+    Loop bodies (`for`, `while`, `do`) and the callbacks of iterating array
+    methods are tracked so a query inside one is marked as an N+1 suspect.
+    Tagged templates like sql`...` bind their values as parameters, so only
+    untagged interpolation and concatenation count as string-built SQL.
+    """
+    sites = []
+    models = {}
+    associations = []
+    loops = []  # ("{", brace depth) of loop bodies and ("(", paren depth) of iterating callbacks
+    brace_depth = paren_depth = 0
+    header = None  # paren depth outside the `(...)` of a for/while header being read
+    body_next = False
+    count = len(tokens)
+    for i, (kind, value, line) in enumerate(tokens):
+        previous = tokens[i - 1][1] if i else ""
+        following = tokens[i + 1][1] if i + 1 < count else ""
+        if kind == KEYWORD:
+            if value in ("for", "while") and following == "(":
+                header = paren_depth
+            elif value == "do" and following == "{":
+                body_next = True
+        elif kind == PUNCT:
+            if value == "(":
+                paren_depth += 1
+                if previous in ITERATING_METHODS and i >= 2 and tokens[i - 2][1] in (".", "?."):
+                    loops.append(("(", paren_depth))
+            elif value == ")":
+                if loops and loops[-1] == ("(", paren_depth):
+                    loops.pop()
+                paren_depth -= 1
+                if header is not None and paren_depth == header:
+                    header = None
+                    body_next = following == "{"
+            elif value == "{":
+                brace_depth += 1
+                if body_next:
+                    loops.append(("{", brace_depth))
+                    body_next = False
+            elif value == "}":
+                if loops and loops[-1] == ("{", brace_depth):
+                    loops.pop()
+                brace_depth -= 1
+        elif kind in (STRING, TEMPLATE):
+            text = value[1:-1]
+            interpolated = kind == TEMPLATE and "${" in text
+            tagged = kind == TEMPLATE and i > 0 and tokens[i - 1][0] == IDENT
+            site = sql_site(
+                TEMPLATE_VALUE_RE.sub("?", text) if interpolated else text, line, bool(loops),
+                dynamic=(interpolated and not tagged) or following == "+"
+            )
+            if site is not None:
+                sites.append(site)
+        elif kind == IDENT and following == "(" and previous in (".", "?.") and i >= 2:
+            site = _orm_call(tokens, i, bool(loops))
+            if site is not None:
+                sites.append(site)
+            elif value == "define" and i + 4 < count and tokens[i + 2][0] == STRING and tokens[i + 4][1] == "{":
+                name = tokens[i + 2][1][1:-1]
+                models[name] = _sequelize_model(tokens, name, line, i + 4)
+            elif (value == "init" and i + 2 < count and tokens[i + 2][1] == "{"
+                    and tokens[i - 2][0] == IDENT and tokens[i - 2][1][:1].isupper()):
+                models[tokens[i - 2][1]] = _sequelize_model(tokens, tokens[i - 2][1], line, i + 2)
+            elif value in SEQUELIZE_ASSOCIATIONS and tokens[i - 2][0] == IDENT:
+                associations.append(tokens[i - 2][1])
+
+    for name in associations:
+        if name in models:
+            models[name]["relationships"] += 1
+    return sites, list(models.values())
+
+
+def declared_identifiers(tokens: list, functions: list) -> list:
+    """[name, kind] of the classes, variables, parameters and functions a file declares"""
+    found = {}
+    count = len(tokens)
+    for i, (kind, value, _) in enumerate(tokens):
+        nxt = tokens[i + 1] if i + 1 < count else None
+        if nxt is None:
+            break
+        if kind == KEYWORD and value in DECLARATION_KINDS and nxt[0] == IDENT:
+            found.setdefault(nxt[1], DECLARATION_KINDS[value])
+        elif kind == IDENT and nxt[1] == "=>":
+            found.setdefault(value, "parameter")  # `x => ...`
+        elif value == ")" and nxt[1] in ("=>", "{"):
+            start = _matching_open(tokens, i)
+            # `name(...) {` and `function (...) {` define; `if (...) {` and calls do not
+            if start < 0 or (nxt[1] == "{" and (start == 0 or not (
+                    tokens[start - 1][0] == IDENT or tokens[start - 1][1] == "function"))):
+                continue
+            depth = 0
+            for j in range(start + 1, i):
+                part_kind, part, _ = tokens[j]
+                if part in ("(", "[", "{"):
+                    depth += 1
+                elif part in (")", "]", "}"):
+                    depth -= 1
+                elif (depth == 0 and part_kind == IDENT and tokens[j - 1][1] in ("(", ",", "...")
+                        and tokens[j + 1][1] in (",", ")", "=", ":", "?")):
+                    found.setdefault(part, "parameter")
+    for function in functions:
+        if function.name != "<anonymous>":
+            found[function.name] = "function"
+    return [[name, kind] for name, kind in found.items() if is_checked_name(name)]
+
+
+def normalized_tokens(tokens: list) -> list:
+    """(placeholder, line) pairs for clone detection, leaving out import statements"""
+    result = []
+    importing = False
+    statement_start = True
+    for i, (kind, value, line) in enumerate(tokens):
+        if importing:
+            # An import ends at its module specifier, the only string in it
+            if kind == STRING:
+                importing = False
+                statement_start = True
+            continue
+        if statement_start and value == ";":
+            continue
+        if (kind == KEYWORD and value == "import" and statement_start
+                and (i + 1 >= len(tokens) or tokens[i + 1][1] not in ("(", "."))):
+            importing = True
+            continue
+        result.append((NORMALIZED.get(kind, value), line))
+        statement_start = value in (";", "}")
+    return result
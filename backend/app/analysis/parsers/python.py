@@ -0,0 +1,418 @@
+"""
+Python parser
+Functions, cyclomatic complexity, declared names, query sites and models from the standard library ast
+"""
+
+import ast
+import io
+import keyword
+import tokenize
+
+from app.analysis.parsers import FunctionInfo, ParsedFile, is_checked_name
+from app.analysis.queries import declared_model, orm_site, sql_site
+
+# Nodes that add one independent path
+BRANCH_NODES = (
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+    ast.ExceptHandler, ast.Assert, ast.comprehension,
+)
+
+
+# SQLAlchemy statement builders, when called on a model or table
+SQLALCHEMY_BUILDERS = frozenset({"select", "update", "delete", "insert"})
+# Calls inside a query chain's arguments that add a join or a subquery
+LOADER_CALLS = frozenset({"joinedload", "selectinload", "subqueryload", "contains_eager"})
+SUBQUERY_CALLS = frozenset({"Subquery", "Exists", "OuterRef"})
+
+# Model declarations: SQLAlchemy column and relationship calls, Django relation fields, index declarations
+COLUMN_CALLS = frozenset({"Column", "mapped_column"})
+RELATIONSHIP_CALLS = frozenset({"relationship", "relation", "ManyToManyField", "GenericRelation"})
+DJANGO_FOREIGN_KEYS = frozenset({"ForeignKey", "OneToOneField"})
+INDEX_CALLS = frozenset({"Index", "UniqueConstraint", "PrimaryKeyConstraint"})
+
+# Token types that carry no structure for clone detection
+SKIPPED_TOKENS = frozenset({
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+    tokenize.ENCODING, tokenize.ENDMARKER,
+})
+
+
+def _dotted(node) -> str:
+    """`models.ForeignKey` for an attribute chain of names, empty for anything else"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        prefix = _dotted(node.value)
+        return f"{prefix}.{node.attr}" if prefix else ""
+    return ""
+
+
+def _called(call: ast.Call) -> str:
+    """Last name of what a call calls: `Column` for both `Column(...)` and `sa.Column(...)`"""
+    func = call.func
+    return func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else ""
+
+
+def _keyword_is(call: ast.Call, name: str, value) -> bool:
+    return any(
+        keyword.arg == name and isinstance(keyword.value, ast.Constant) and keyword.value.value is value
+        for keyword in call.keywords
+    )
+
+
+def _column_name(node):
+    """A column named by a string, `Model.column` or a bare name"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _targets_model(call: ast.Call) -> bool:
+    """`select(User)`, `delete(Report.__table__)`, `select(func.count())`: built on a model or table"""
+    if not call.args:
+        return False
+    root = call.args[0]
+    while isinstance(root, (ast.Attribute, ast.Call)):
+        root = root.value if isinstance(root, ast.Attribute) else root.func
+    return isinstance(root, ast.Name) and (root.id[:1].isupper() or root.id == "func")
+
+
+def _leading_columns(call: ast.Call) -> list:
+    """Leading column of an Index / UniqueConstraint / models.Index declaration"""
+    if _called(call) == "Index" and call.args:
+        columns = call.args[1:]  # the first argument is the index name
+    else:
+        columns = list(call.args)
+    fields = next((keyword.value for keyword in call.keywords if keyword.arg == "fields"), None)
+    if isinstance(fields, (ast.List, ast.Tuple)):
+        columns = fields.elts
+    column = _column_name(columns[0]) if columns else None
+    return [column] if column else []
+
+
+def declared_python_model(node: ast.ClassDef):
+    """The SQLAlchemy or Django model a class declares, or None for any other class"""
+    fields = []
+    meta = []
+    for statement in node.body:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name):
+            fields.append((statement.targets[0].id, statement.value))
+        elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name) and statement.value:
+            fields.append((statement.target.id, statement.value))
+        elif isinstance(statement, ast.ClassDef) and statement.name == "Meta":
+            meta = statement.body
+
+    calls = [(name, value) for name, value in fields if isinstance(value, ast.Call)]
+    if any(_dotted(value.func).startswith("models.") for _, value in calls):
+        kind = "django"
+    elif any(_called(value) in COLUMN_CALLS for _, value in calls) or any(name == "__tablename__" for name, _ in fields):
+        kind = "sqlalchemy"
+    else:
+        return None
+
+    model = declared_model(node.name, node.lineno, kind)
+    # Django adds an `id` primary key unless a field declares one
+    model["primaryKey"] = kind == "django"
+    for name, call in calls:
+        called = _called(call)
+        if called in RELATIONSHIP_CALLS:
+            model["relationships"] += 1
+            continue
+        if kind == "django" and not (called.endswith("Field") or called in DJANGO_FOREIGN_KEYS):
+            continue
+        if kind == "sqlalchemy" and called not in COLUMN_CALLS:
+            continue
+        model["columns"] += 1
+        if _keyword_is(call, "primary_key", True):
+            model["primaryKey"] = True
+        if any(_keyword_is(call, flag, True) for flag in ("primary_key", "unique", "index", "db_index")):
+            model["indexed"].append(name)
+        if called in DJANGO_FOREIGN_KEYS:
+            # Django indexes foreign keys unless told not to
+            model["relationships"] += 1
+            model["foreignKeys"].append(name)
+            if not _keyword_is(call, "db_index", False):
+                model["indexed"].append(name)
+        elif any(isinstance(arg, ast.Call) and _called(arg) == "ForeignKey" for arg in call.args):
+            model["foreignKeys"].append(name)
+
+    declarations = [value for name, value in fields if name == "__table_args__"]
+    declarations += [
+        statement.value for statement in meta
+        if isinstance(statement, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id in ("indexes", "constraints", "unique_together", "index_together")
+            for target in statement.targets
+        )
+    ]
+    for declaration in declarations:
+        for inner in ast.walk(declaration):
+            if isinstance(inner, ast.Call) and _called(inner) in INDEX_CALLS:
+                model["indexed"].extend(_leading_columns(inner))
+                if _called(inner) == "PrimaryKeyConstraint":
+                    model["primaryKey"] = True
+            elif isinstance(inner, (ast.Tuple, ast.List)) and inner.elts and isinstance(inner.elts[0], ast.Constant):
+                # unique_together = [("user", "day")]: the tuple's first field leads the index
+                column = _column_name(inner.elts[0])
+                if column:
+                    model["indexed"].append(column)
+    return model
+
+
+class _ComplexityVisitor(ast.NodeVisitor):
+    """
+    Collects functions, attributing each decision point to its innermost
+    function, the names the file declares, its models, and its query sites
+    with whether they run inside a loop
+    """
+
+    def __init__(self):
+        self.functions = []
+        self.module_decisions = 0
+        self.identifiers = {}  # name -> kind, first declaration wins except for defs
+        self.queries = []
+        self.models = []
+        self._stack = []  # decision counters of the enclosing functions
+        self._loops = 0  # loop bodies around the node being visited
+        self._seen = set()  # ids of calls and strings already recorded as part of a query
+
+    def declare_constants(self, body: list):
+        """Module and class level assignments, where UPPER_CASE constants are allowed"""
+        for node in body:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target] if isinstance(node, ast.AnnAssign) else []
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    self.identifiers.setdefault(target.id, "constant")
+
+    def _add(self, count: int):
+        if self._stack:
+            self._stack[-1] += count
+        else:
+            self.module_decisions += count
+
+    def _visit_function(self, node, name: str):
+        self.identifiers[name] = "function"
+        self._stack.append(0)
+        self.generic_visit(node)
+        decisions = self._stack.pop()
+        self.functions.append(FunctionInfo(
+            name=name,
+            start_line=node.lineno,
+            end_line=getattr(node, "end_lineno", node.lineno) or node.lineno,
+            complexity=1 + decisions
+        ))
+
+    def visit_FunctionDef(self, node):
+        self._visit_function(node, node.name)
+
+    def visit_AsyncFunctionDef(self, node):
+        self._visit_function(node, node.name)
+
+    def visit_ClassDef(self, node):
+        self.identifiers[node.name] = "class"
+        self.declare_constants(node.body)
+        model = declared_python_model(node)
+        if model is not None:
+            self.models.append(model)
+        self.generic_visit(node)
+
+    # ---- Loops: what runs once per iteration ----
+
+    def _visit_loop(self, once: list, repeated: list):
+        self._add(1)
+        for child in once:
+            self.visit(child)
+        self._loops += 1
+        for child in repeated:
+            self.visit(child)
+        self._loops -= 1
+
+    def visit_For(self, node):
+        self._visit_loop([node.target, node.iter, *node.orelse], node.body)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self._visit_loop(node.orelse, [node.test, *node.body])
+
+    def _visit_comprehension(self, node):
+        # The first iterable is evaluated once; everything else runs per item
+        first = node.generators[0]
+        self.visit(first.iter)
+        self._loops += 1
+        self._add(1 + len(first.ifs))
+        for child in (first.target, *first.ifs, *node.generators[1:]):
+            self.visit(child)
+        for child in (node.key, node.value) if isinstance(node, ast.DictComp) else (node.elt,):
+            self.visit(child)
+        self._loops -= 1
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _visit_comprehension
+
+    # ---- Query sites ----
+
+    def _record(self, site):
+        if site is not None:
+            self.queries.append(site)
+
+    def _sql_string(self, node, dynamic: bool = False):
+        self._seen.add(id(node))
+        self._record(sql_site(node.value, node.lineno, self._loops > 0, dynamic))
+
+    def visit_Expr(self, node):
+        # Docstrings and other bare strings are prose, not queries
+        if not (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str) and id(node) not in self._seen:
+            self._sql_string(node)
+
+    def visit_JoinedStr(self, node):
+        text = "".join(part.value if isinstance(part, ast.Constant) else "?" for part in node.values)
+        dynamic = any(isinstance(part, ast.FormattedValue) for part in node.values)
+        self._record(sql_site(text, node.lineno, self._loops > 0, dynamic))
+        for part in node.values:
+            if isinstance(part, ast.FormattedValue):
+                self.visit(part.value)
+
+    def visit_BinOp(self, node):
+        # "... WHERE id = %s" % value and "..." + value splice values into the SQL text
+        left = node.left
+        if isinstance(node.op, (ast.Mod, ast.Add)) and isinstance(left, ast.Constant) and isinstance(left.value, str):
+            self._sql_string(left, dynamic=True)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if id(node) not in self._seen:
+            self._record(self._query_chain(node))
+        self.generic_visit(node)
+
+    def _query_chain(self, node):
+        """The query an ORM call chain builds, recorded once at its outermost call"""
+        methods = []
+        calls = []
+        base = node
+        while isinstance(base, ast.Call) and isinstance(base.func, ast.Attribute):
+            methods.append(base.func.attr)
+            calls.append(base)
+            base = base.func.value
+        methods.reverse()
+
+        if isinstance(base, ast.Constant) and isinstance(base.value, str) and methods[:1] == ["format"]:
+            self._sql_string(base, dynamic=True)
+            return None
+        filtered = False
+        if isinstance(base, ast.Call) and isinstance(base.func, ast.Name) and base.func.id in SQLALCHEMY_BUILDERS:
+            if not _targets_model(base):
+                return None
+            kind = "sqlalchemy"
+            calls.append(base)
+            methods.insert(0, base.func.id)
+            filtered = base.func.id == "insert"
+        elif "query" in methods or (isinstance(base, ast.Attribute) and base.attr == "query"):
+            kind = "sqlalchemy"  # session.query(Model)..., Flask-SQLAlchemy Model.query...
+        elif isinstance(base, ast.Attribute) and base.attr == "objects":
+            kind = "django"
+        else:
+            return None
+
+        self._seen.update(id(call) for call in calls)
+        nested = [
+            _called(inner)
+            for call in calls
+            for argument in (*call.args, *(keyword.value for keyword in call.keywords))
+            for inner in ast.walk(argument) if isinstance(inner, ast.Call)
+        ]
+        return orm_site(
+            kind, methods, node.lineno, self._loops > 0, filtered=filtered,
+            extra_joins=sum(name in LOADER_CALLS for name in nested),
+            extra_subqueries=sum(name in SUBQUERY_CALLS for name in nested)
+        )
+
+    def visit_arg(self, node):
+        if node.arg not in ("self", "cls"):
+            self.identifiers.setdefault(node.arg, "parameter")
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Store):
+            self.identifiers.setdefault(node.id, "variable")
+
+    def visit_Attribute(self, node):
+        if isinstance(node.ctx, ast.Store) and isinstance(node.value, ast.Name) and node.value.id == "self":
+            self.identifiers.setdefault(node.attr, "variable")
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        self._add(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_match_case(self, node):
+        self._add(1)
+        self.generic_visit(node)
+
+    def generic_visit(self, node):
+        if isinstance(node, BRANCH_NODES):
+            self._add(1)
+            if isinstance(node, ast.comprehension):
+                self._add(len(node.ifs))
+        super().generic_visit(node)
+
+
+def normalized_tokens(text: str) -> list:
+    """
+    Tokens with identifiers and literals replaced by placeholders, so renamed
+    copies still match. Import statements are left out: every module has them.
+    """
+    tokens = []
+    statement_start = True
+    importing = False
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            if tok.type == tokenize.NEWLINE:
+                statement_start = True
+                importing = False
+                continue
+            if tok.type in SKIPPED_TOKENS or importing:
+                continue
+            if statement_start and tok.type == tokenize.NAME and tok.string in ("import", "from"):
+                importing = True
+                continue
+            statement_start = False
+            if tok.type == tokenize.NAME:
+                value = tok.string if keyword.iskeyword(tok.string) else "I"
+            elif tok.type == tokenize.NUMBER:
+                value = "N"
+            elif tok.type == tokenize.STRING:
+                value = "S"
+            else:
+                value = tok.string
+            tokens.append((value, tok.start[0]))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return tokens
+
+
+def parse_python(text: str) -> ParsedFile:
+    """Parse Python source"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError) as e:
+        return ParsedFile(error=f"syntax error: {e}")
+
+    visitor = _ComplexityVisitor()
+    visitor.declare_constants(tree.body)
+    visitor.visit(tree)
+    functions = sorted(visitor.functions, key=lambda f: f.start_line)
+    return ParsedFile(
+        functions=functions,
+        complexity=visitor.module_decisions + sum(f.complexity for f in functions),
+        tokens=normalized_tokens(text),
+        identifiers=[[name, kind] for name, kind in visitor.identifiers.items() if is_checked_name(name)],
+        queries=visitor.queries,
+        models=visitor.models
+    )
@@ -0,0 +1,51 @@
+"""
+Analysis pipeline
+Turns a local checkout into the aggregated metrics JSON the dashboard renders
+"""
+
+from datetime import date
+from typing import Callable, Optional
+
+from app.analysis.blob_cache import blob_cache
+from app.analysis.planner import compile_plan, execute_plan
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+ProgressCallback = Callable[[str, float], None]
+
+
+def _no_progress(stage: str, fraction: float):
+    pass
+
+
+def analyze_repository(
+    checkout: str,
+    progress: ProgressCallback = _no_progress,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    options: Optional[list] = None
+) -> dict:
+    """
+    Compute the metrics for a checkout that the selected SPL options ask for
+
+    since/until bound the history metrics. The report also records the plan
+    that ran and each stage's wall time.
+    """
+    plan = compile_plan(options)
+    metrics = execute_plan(
+        plan,
+        checkout,
+        progress=progress,
+        since=since,
+        until=until,
+        workers=settings.ANALYSIS_ENGINE_WORKERS,
+        cache=blob_cache if settings.ANALYSIS_BLOB_CACHE_ENABLED else None,
+        timeout=settings.ANALYSIS_JOB_TIMEOUT_SECONDS,
+        snapshots=settings.ANALYSIS_SNAPSHOT_COUNT
+    )
+    metrics["timeRange"] = {
+        "from": since.isoformat() if since else None,
+        "to": until.isoformat() if until else None,
+    }
+    return metrics
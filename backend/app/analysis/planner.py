@@ -0,0 +1,344 @@
+"""
+Analysis planner
+Compiles the selected SPL options into a dependency-ordered plan of analyzers
+
+Analyzers declare the passes they need. Shared passes (one parse per file,
+one history scan) run at most once however many analyzers read them, and
+nothing that was not asked for runs at all.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Optional
+
+from app.analysis.engine import aggregate_complexity, aggregate_duplicates, aggregate_loc, collect_files
+from app.analysis.history import HISTORY_SECTIONS, mine_history
+from app.analysis.snapshots import snapshot_series
+
+# What OptionPanel sends when the user keeps the preselected options
+DEFAULT_OPTIONS = ["LOC", "Code Complexity", "Commit Activity"]
+
+ProgressCallback = Callable[[str, float], None]
+
+
+@dataclass(frozen=True)
+class Analyzer:
+    """One node of the plan; `provides` lists passes whose output this one also produces"""
+    name: str
+    run: Callable[["PlanContext"], None]
+    requires: tuple = ()
+    provides: tuple = ()
+    weight: float = 0.0  # share of the job's progress bar
+
+
+@dataclass
+class PlanContext:
+    """Inputs of a plan run, the shared pass outputs and the metrics being built"""
+    checkout: str
+    planned: frozenset
+    since: Optional[date] = None
+    until: Optional[date] = None
+    workers: int = 0
+    cache: object = None
+    timeout: Optional[float] = None
+    snapshots: int = 30
+    progress: Callable[[float], None] = lambda fraction: None
+    state: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+
+
+@dataclass
+class Plan:
+    """Analyzers in execution order, and the selected options nothing implements"""
+    options: list
+    analyzers: list
+    skipped: list
+
+
+ANALYZERS: dict = {}
+
+
+def analyzer(name: str, requires: tuple = (), provides: tuple = (), weight: float = 0.0):
+    """Register an analyzer; registration order breaks ties between independent nodes"""
+    def register(func):
+        ANALYZERS[name] = Analyzer(name, func, requires, provides, weight)
+        return func
+    return register
+
+
+# Selected option (case-insensitive) -> analyzers it needs. Labels come from
+# splOptions.js, including group labels and the default "Commit Activity".
+OPTION_ANALYZERS = {
+    "loc": ("loc",),
+    "code complexity": ("complexity",),
+    "time complexity": ("complexity",),
+    "number of functions": ("complexity",),
+    "code duplication": ("duplication",),
+    "code quality": ("complexity", "duplication"),
+    "commit": ("commits",),
+    "commit activity": ("commits",),
+    "commit regularity": ("commits",),
+    "number of commits": ("commits",),
+    "changes per commit": ("commits",),
+    "meaningfulness": ("commits",),
+    "activity graph": ("commits",),
+    "code ownership": ("ownership",),
+    "churn rate": ("churn",),
+    "file change heatmap": ("heatmap",),
+    "performance": ("churn", "heatmap", "queries"),
+    "naming conventions": ("naming",),
+    "ai generated code %": ("ai",),
+    "ai detection": ("ai",),
+    "query complexity": ("queries",),
+    "database design": ("schema",),
+}
+
+# Section -> the analyzer adding its timeseries from past snapshots. Sampling
+# history is the dearest pass, so a section only grows a timeseries when a
+# history option is also selected.
+TIMESERIES_ANALYZERS = {
+    "loc": "loc_timeseries",
+    "complexity": "complexity_timeseries",
+}
+
+
+# ==================== Shared Passes ====================
+
+def _source_pass(ctx: PlanContext, parse: bool):
+    files, cache_stats = collect_files(
+        ctx.checkout,
+        workers=ctx.workers,
+        progress=lambda done, total: ctx.progress(done / max(total, 1)),
+        cache=ctx.cache,
+        parse=parse
+    )
+    ctx.state["files"] = files
+    if cache_stats is not None:
+        ctx.metrics["cache"] = cache_stats
+
+
+@analyzer("lines", weight=3)
+def lines_pass(ctx: PlanContext):
+    """Read every source file once and count its lines"""
+    _source_pass(ctx, parse=False)
+
+
+@analyzer("parse", provides=("lines",), weight=6)
+def parse_pass(ctx: PlanContext):
+    """Read and parse every source file once: lines, functions, complexity, fingerprints"""
+    _source_pass(ctx, parse=True)
+
+
+@analyzer("history", weight=2)
+def history_pass(ctx: PlanContext):
+    """One git log scan feeding only the history sections in the plan"""
+    ctx.state["history"] = mine_history(
+        ctx.checkout, ctx.since, ctx.until,
+        timeout=ctx.timeout,
+        sections=[section for section in HISTORY_SECTIONS if section in ctx.planned]
+    )
+
+
+@analyzer("snapshots", weight=3)
+def snapshots_pass(ctx: PlanContext):
+    """LOC, and complexity when its timeseries is planned, at sampled past commits through one blob reader"""
+    ctx.state["snapshots"] = snapshot_series(
+        ctx.checkout, ctx.snapshots, ctx.since, ctx.until,
+        parse="complexity_timeseries" in ctx.planned,
+        cache=ctx.cache,
+        timeout=ctx.timeout
+    ) if ctx.snapshots else []
+
+
+# ==================== Report Sections ====================
+
+@analyzer("loc", requires=("lines",))
+def loc_section(ctx: PlanContext):
+    ctx.metrics["loc"] = aggregate_loc(ctx.state["files"])
+
+
+@analyzer("loc_timeseries", requires=("loc", "snapshots"))
+def loc_timeseries_section(ctx: PlanContext):
+    ctx.metrics["loc"]["timeseries"] = [{"date": point["date"], "loc": point["loc"]} for point in ctx.state["snapshots"]]
+
+
+@analyzer("complexity", requires=("parse",))
+def complexity_section(ctx: PlanContext):
+    ctx.metrics["complexity"] = aggregate_complexity(ctx.state["files"])
+
+
+@analyzer("complexity_timeseries", requires=("complexity", "snapshots"))
+def complexity_timeseries_section(ctx: PlanContext):
+    ctx.metrics["complexity"]["timeseries"] = [
+        {"date": point["date"], "score": point["complexity"]} for point in ctx.state["snapshots"]
+    ]
+
+
+@analyzer("duplication", requires=("parse",))
+def duplication_section(ctx: PlanContext):
+    files = ctx.state["files"]
+    ctx.metrics["duplicates"] = aggregate_duplicates(files, sum(f["code"] for f in files))
+
+
+@analyzer("naming", requires=("parse",))
+def naming_section(ctx: PlanContext):
+    from app.analysis.naming import naming_quality
+    ctx.metrics["namingQuality"] = naming_quality(ctx.state["files"])
+
+
+@analyzer("ai", requires=("parse",))
+def ai_section(ctx: PlanContext):
+    from app.analysis.ai_detection import ai_estimate
+    estimate = ai_estimate(ctx.state["files"])
+    ctx.metrics["aiDetection"] = estimate
+    ctx.metrics["aiPercentage"] = estimate["percentage"]
+
+
+@analyzer("queries", requires=("parse",))
+def queries_section(ctx: PlanContext):
+    from app.analysis.queries import query_complexity
+    ctx.metrics["queryComplexity"] = query_complexity(ctx.state["files"])
+
+
+@analyzer("schema", requires=("parse",))
+def schema_section(ctx: PlanContext):
+    from app.analysis.queries import database_design
+    ctx.metrics["databaseDesign"] = database_design(ctx.state["files"])
+
+
+@analyzer("commits", requires=("history",))
+def commits_section(ctx: PlanContext):
+    ctx.metrics["commits"] = ctx.state["history"]["commits"]
+
+
+@analyzer("churn", requires=("history", "lines"))
+def churn_section(ctx: PlanContext):
+    churn = ctx.state["history"]["churn"]
+    total_loc = sum(f["code"] for f in ctx.state["files"])
+    churn["rate"] = round((churn["added"] + churn["deleted"]) / max(total_loc, 1), 4)
+    ctx.metrics["churn"] = churn
+
+
+@analyzer("ownership", requires=("history",))
+def ownership_section(ctx: PlanContext):
+    ctx.metrics["ownership"] = ctx.state["history"]["ownership"]
+
+
+@analyzer("heatmap", requires=("history",))
+def heatmap_section(ctx: PlanContext):
+    ctx.metrics["heatmap"] = ctx.state["history"]["heatmap"]
+
+
+# ==================== Planning ====================
+
+def compile_plan(options: Optional[list] = None) -> Plan:
+    """
+    Resolve options to analyzers, add their dependencies and order them
+
+    A pass another planned node provides is dropped (a parse also counts
+    lines), and dependents are ordered after the provider instead. LOC and
+    complexity timeseries are added only alongside a history option. Options
+    nothing implements yet are listed in `skipped` rather than rejected.
+    """
+    options = list(options or DEFAULT_OPTIONS)
+    targets = []
+    skipped = []
+    for option in options:
+        names = OPTION_ANALYZERS.get(option.strip().lower())
+        if names is None:
+            skipped.append(option)
+        else:
+            targets.extend(names)
+    if any("history" in ANALYZERS[name].requires for name in targets):
+        targets.extend(TIMESERIES_ANALYZERS[name] for name in list(targets) if name in TIMESERIES_ANALYZERS)
+
+    # Dependency closure
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(ANALYZERS[name].requires)
+
+    provider = {name: name for name in needed}
+    for name in needed:
+        for provided in ANALYZERS[name].provides:
+            if provided in needed:
+                provider[provided] = name
+    nodes = {provider[name] for name in needed}
+
+    # Depth-first topological order, visiting nodes in registration order for a stable plan
+    ordered = []
+    state = {}
+
+    def visit(name: str):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Analyzer dependency cycle through {name}")
+        state[name] = "visiting"
+        for dependency in ANALYZERS[name].requires:
+            visit(provider[dependency])
+        state[name] = "done"
+        ordered.append(name)
+
+    for name in ANALYZERS:
+        if name in nodes:
+            visit(name)
+    return Plan(options=options, analyzers=ordered, skipped=skipped)
+
+
+def execute_plan(
+    plan: Plan,
+    checkout: str,
+    progress: Optional[ProgressCallback] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    workers: int = 0,
+    cache=None,
+    timeout: Optional[float] = None,
+    snapshots: int = 30,
+    start: float = 0.1,
+    end: float = 0.85
+) -> dict:
+    """
+    Run a plan and return its metrics, with per-stage wall times under "timings"
+
+    Progress is reported per stage between `start` and `end`, split by the
+    stages' weights.
+    """
+    ctx = PlanContext(
+        checkout=checkout,
+        planned=frozenset(plan.analyzers),
+        since=since,
+        until=until,
+        workers=workers,
+        cache=cache,
+        timeout=timeout,
+        snapshots=snapshots
+    )
+    weights = [ANALYZERS[name].weight for name in plan.analyzers]
+    scale = (end - start) / (sum(weights) or 1)
+
+    stages = {}
+    position = start
+    began = time.perf_counter()
+    for name, weight in zip(plan.analyzers, weights):
+        if progress is not None:
+            progress(name, position)
+            ctx.progress = lambda fraction, name=name, low=position, span=weight * scale: (
+                progress(name, low + span * fraction)
+            )
+        stage_start = time.perf_counter()
+        ANALYZERS[name].run(ctx)
+        stages[name] = round((time.perf_counter() - stage_start) * 1000, 1)
+        position += weight * scale
+
+    ctx.metrics["plan"] = {"options": plan.options, "analyzers": plan.analyzers, "skipped": plan.skipped}
+    ctx.metrics["timings"] = {
+        "stages": stages,
+        "totalMs": round((time.perf_counter() - began) * 1000, 1),
+    }
+    return ctx.metrics
@@ -0,0 +1,405 @@
+"""
+Query complexity and database design
+Query sites and declared models recorded by the per-file parse, scored across the repository
+"""
+
+import re
+from collections import Counter
+
+# Statements that are SQL rather than prose; a docstring saying "select rows from" is skipped by the parsers
+SQL_RE = re.compile(
+    r"^\s*\(?\s*(?:SELECT\b[\s\S]+?\bFROM\b|INSERT\s+INTO\b|UPDATE\s+[\w.\"`\[\]]+\s+SET\b"
+    r"|DELETE\s+FROM\b|WITH\s+(?:RECURSIVE\s+)?\w+\s+AS\s*\()",
+    re.IGNORECASE
+)
+JOIN_RE = re.compile(r"\bJOIN\b", re.IGNORECASE)
+SUBQUERY_RE = re.compile(r"\(\s*SELECT\b", re.IGNORECASE)
+FILTER_RE = re.compile(r"\b(?:WHERE|LIMIT|FETCH\s+FIRST|TOP\s*\(?\d)", re.IGNORECASE)
+SELECT_STAR_RE = re.compile(r"\bSELECT\s+(?:DISTINCT\s+)?(?:\w+\.)?\*", re.IGNORECASE)
+INSERT_RE = re.compile(r"^\s*INSERT\b", re.IGNORECASE)
+
+# ORM methods, by what they add to a query; shared by the Python and JS parsers
+JOIN_METHODS = frozenset({
+    "join", "outerjoin", "joinedload", "selectinload", "subqueryload", "contains_eager",
+    "select_related", "prefetch_related",
+})
+SUBQUERY_METHODS = frozenset({"subquery", "scalar_subquery", "cte", "Subquery", "Exists", "OuterRef"})
+FILTER_METHODS = frozenset({
+    "filter", "filter_by", "where", "get", "get_or_404", "first", "first_or_404", "one", "one_or_none",
+    "exclude", "limit", "paginate", "slice", "exists", "in_bulk", "latest", "earliest",
+})
+# Calls that read or write every row a query matches
+FETCH_ALL_METHODS = frozenset({
+    "all", "fetchall", "iterator", "values", "values_list", "scalars", "update", "delete", "destroy",
+    "findAll", "findAndCountAll", "findMany", "updateMany", "deleteMany",
+})
+
+# Site score: a plain query costs 1, and each of these adds its weight
+WEIGHTS = {"joins": 2, "subqueries": 3, "unfiltered": 3, "inLoop": 5, "dynamic": 2, "selectStar": 1}
+DEEP_JOINS = 3
+
+# Model score deductions
+NO_PRIMARY_KEY = 30
+UNINDEXED_FOREIGN_KEY = 15
+WIDE_TABLE = 10
+WIDE_TABLE_COLUMNS = 30
+
+MAX_FILES_LISTED = 100
+MAX_HOTSPOTS = 20
+MAX_HOTSPOTS_PER_FILE = 5
+MAX_ISSUES = 50
+
+
+# ==================== Per-file Extraction ====================
+
+def query_site(
+    line: int,
+    kind: str,
+    joins: int = 0,
+    subqueries: int = 0,
+    unfiltered: bool = False,
+    in_loop: bool = False,
+    dynamic: bool = False,
+    select_star: bool = False
+) -> dict:
+    """One query found in a file, as cached with the file's other results"""
+    return {
+        "line": line,
+        "kind": kind,
+        "joins": joins,
+        "subqueries": subqueries,
+        "unfiltered": unfiltered,
+        "inLoop": in_loop,
+        "dynamic": dynamic,
+        "selectStar": select_star,
+    }
+
+
+def is_sql(text: str) -> bool:
+    return bool(SQL_RE.match(text))
+
+
+def sql_site(sql: str, line: int, in_loop: bool = False, dynamic: bool = False):
+    """The query site of a raw SQL string, or None when the string is not SQL"""
+    if not SQL_RE.match(sql):
+        return None
+    return query_site(
+        line, "sql",
+        joins=len(JOIN_RE.findall(sql)),
+        subqueries=len(SUBQUERY_RE.findall(sql)),
+        unfiltered=not INSERT_RE.match(sql) and not FILTER_RE.search(sql),
+        in_loop=in_loop,
+        dynamic=dynamic,
+        select_star=bool(SELECT_STAR_RE.search(sql))
+    )
+
+
+def orm_site(kind: str, methods: list, line: int, in_loop: bool = False, filtered: bool = False,
+             extra_joins: int = 0, extra_subqueries: int = 0) -> dict:
+    """
+    The query site of an ORM call chain, from its method names in call order
+
+    A chain is unfiltered when nothing narrows it and it ends by reading or
+    writing every matched row; a chain that is only being built is not flagged.
+    """
+    filtered = filtered or any(method in FILTER_METHODS for method in methods)
+    return query_site(
+        line, kind,
+        joins=sum(method in JOIN_METHODS for method in methods) + extra_joins,
+        subqueries=sum(method in SUBQUERY_METHODS for method in methods) + extra_subqueries,
+        unfiltered=not filtered and bool(methods) and methods[-1] in FETCH_ALL_METHODS,
+        in_loop=in_loop
+    )
+
+
+def declared_model(name: str, line: int, kind: str) -> dict:
+    """A table or ORM model found in a file; the parser fills in its columns"""
+    return {
+        "name": name,
+        "line": line,
+        "kind": kind,
+        "columns": 0,
+        "primaryKey": False,
+        "foreignKeys": [],
+        "indexed": [],
+        "relationships": 0,
+    }
+
+
+def _line_at(text: str, position: int) -> int:
+    return text.count("\n", 0, position) + 1
+
+
+def _split_top_level(body: str) -> list:
+    """Comma-separated parts of a column list, ignoring commas inside parentheses"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(body):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+    parts.append(body[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(name: str) -> str:
+    return name.strip().strip("`\"[]").split(".")[-1].strip("`\"[]").lower()
+
+
+SQL_COMMENT_RE = re.compile(r"--[^\n]*|/\*[\s\S]*?\*/")
+CREATE_TABLE_RE = re.compile(
+    r"\bCREATE\s+(?:TEMP(?:ORARY)?\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"`\[\]]+)\s*\(", re.IGNORECASE
+)
+CREATE_INDEX_RE = re.compile(
+    r"\bCREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?[\w.\"`\[\]]*\s*"
+    r"ON\s+([\w.\"`\[\]]+)\s*(?:USING\s+\w+\s*)?\(\s*([\w\"`\[\]]+)",
+    re.IGNORECASE
+)
+CONSTRAINT_RE = re.compile(r"^(?:CONSTRAINT\s+\S+\s+)?(PRIMARY\s+KEY|FOREIGN\s+KEY|UNIQUE|INDEX|KEY|CHECK)\b"
+                           r"\s*(?:\w+\s*)?\(\s*([^)]*)\)", re.IGNORECASE)
+
+
+def parse_sql(text: str) -> tuple:
+    """
+    Query sites and tables of a .sql file
+
+    Tables come from CREATE TABLE (inline PRIMARY KEY, UNIQUE and REFERENCES
+    included) and CREATE INDEX anywhere in the file; every other statement
+    that reads or writes rows is a query site.
+    """
+    text = SQL_COMMENT_RE.sub(lambda m: "\n" * m.group().count("\n"), text)
+    models = {}
+    for match in CREATE_TABLE_RE.finditer(text):
+        depth, end = 1, match.end()
+        while end < len(text) and depth:
+            depth += {"(": 1, ")": -1}.get(text[end], 0)
+            end += 1
+        model = declared_model(_unquote(match.group(1)), _line_at(text, match.start()), "sql")
+        for part in _split_top_level(text[match.end():end - 1]):
+            constraint = CONSTRAINT_RE.match(part)
+            if constraint:
+                what, columns = constraint.group(1).upper(), [_unquote(c) for c in constraint.group(2).split(",")]
+                if what.startswith("PRIMARY"):
+                    model["primaryKey"] = True
+                if what.startswith("FOREIGN"):
+                    model["foreignKeys"].extend(columns)
+                    model["relationships"] += 1
+                if what in ("UNIQUE", "INDEX", "KEY") or what.startswith("PRIMARY"):
+                    model["indexed"].append(columns[0])
+                continue
+            column = _unquote(part.split()[0])
+            upper = part.upper()
+            model["columns"] += 1
+            if "PRIMARY KEY" in upper:
+                model["primaryKey"] = True
+            if re.search(r"\bREFERENCES\b", upper):
+                model["foreignKeys"].append(column)
+                model["relationships"] += 1
+            if "PRIMARY KEY" in upper or re.search(r"\bUNIQUE\b", upper):
+                model["indexed"].append(column)
+        models[model["name"]] = model
+    for match in CREATE_INDEX_RE.finditer(text):
+        table = models.get(_unquote(match.group(1)))
+        if table is not None:
+            table["indexed"].append(_unquote(match.group(2)))
+
+    sites = []
+    position = 0
+    for statement in text.split(";"):
+        offset = len(statement) - len(statement.lstrip())
+        site = sql_site(statement, _line_at(text, position + offset))
+        if site is not None:
+            sites.append(site)
+        position += len(statement) + 1
+    return sites, list(models.values())
+
+
+PRISMA_MODEL_RE = re.compile(r"^\s*model\s+(\w+)\s*\{(.*?)^\s*\}", re.MULTILINE | re.DOTALL)
+PRISMA_LIST_RE = re.compile(r"@@(id|index|unique)\s*\(\s*(?:fields\s*:\s*)?\[\s*(\w+)")
+PRISMA_RELATION_FIELDS_RE = re.compile(r"@relation\([^)]*fields\s*:\s*\[\s*([\w\s,]+)\]")
+
+
+def parse_prisma(text: str) -> tuple:
+    """Models of a Prisma schema; fields typed with another model are relations, not columns"""
+    blocks = PRISMA_MODEL_RE.findall(text)
+    names = {name for name, _ in blocks}
+    models = []
+    for match in PRISMA_MODEL_RE.finditer(text):
+        name, body = match.groups()
+        model = declared_model(name, _line_at(text, match.start()), "prisma")
+        for raw in body.splitlines():
+            line = raw.split("//")[0].strip()
+            if not line:
+                continue
+            if line.startswith("@@"):
+                found = PRISMA_LIST_RE.match(line)
+                if found:
+                    model["indexed"].append(found.group(2))
+                    model["primaryKey"] = model["primaryKey"] or found.group(1) == "id"
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            field, type_name = parts[0], parts[1].rstrip("?[]")
+            if type_name in names:
+                model["relationships"] += 1
+                relation = PRISMA_RELATION_FIELDS_RE.search(line)
+                if relation:
+                    model["foreignKeys"].extend(column.strip() for column in relation.group(1).split(","))
+                continue
+            model["columns"] += 1
+            if "@id" in line:
+                model["primaryKey"] = True
+            if "@id" in line or "@unique" in line:
+                model["indexed"].append(field)
+        models.append(model)
+    return [], models
+
+
+def schema_source(language: str, text: str) -> tuple:
+    """(query sites, models) of a schema file the source parsers do not handle"""
+    if language == "SQL":
+        return parse_sql(text)
+    if language == "Prisma":
+        return parse_prisma(text)
+    return [], []
+
+
+# ==================== Scoring ====================
+
+def site_score(site: dict) -> int:
+    return 1 + sum(weight * int(site[field]) for field, weight in WEIGHTS.items())
+
+
+def site_issues(site: dict) -> list:
+    issues = []
+    if site["inLoop"]:
+        issues.append("n+1")
+    if site["unfiltered"]:
+        issues.append("unfiltered")
+    if site["joins"] >= DEEP_JOINS:
+        issues.append("deep joins")
+    if site["subqueries"]:
+        issues.append("subquery")
+    if site["dynamic"]:
+        issues.append("dynamic sql")
+    if site["selectStar"]:
+        issues.append("select *")
+    return issues
+
+
+def _hotspot(site: dict, path: str = None) -> dict:
+    spot = {"line": site["line"], "kind": site["kind"], "score": site_score(site), "issues": site_issues(site)}
+    return {"path": path, **spot} if path is not None else spot
+
+
+def query_complexity(files: list) -> dict:
+    """
+    The dashboard's queryComplexity section
+
+    Every query site is scored from its joins, subqueries, missing filters,
+    string-built SQL and whether it runs inside a loop (an N+1 suspect).
+    `byFile` gives each file's total for the treemap, with its worst sites as
+    the drill-down.
+    """
+    by_file = []
+    kinds = Counter()
+    issues = Counter()
+    spots = []
+    total = 0
+    for f in files:
+        sites = f.get("querySites")
+        if not sites:
+            continue
+        ranked = sorted(sites, key=lambda site: (-site_score(site), site["line"]))
+        score = sum(site_score(site) for site in sites)
+        total += score
+        kinds.update(site["kind"] for site in sites)
+        for site in sites:
+            issues.update(site_issues(site))
+        spots.extend((site_score(site), f["path"], site) for site in ranked[:MAX_HOTSPOTS])
+        by_file.append({
+            "path": f["path"],
+            "sites": len(sites),
+            "score": score,
+            "nPlusOne": sum(site["inLoop"] for site in sites),
+            "hotspots": [_hotspot(site) for site in ranked[:MAX_HOTSPOTS_PER_FILE]],
+        })
+
+    sites = sum(f["sites"] for f in by_file)
+    by_file.sort(key=lambda f: (-f["score"], f["path"]))
+    spots.sort(key=lambda spot: (-spot[0], spot[1], spot[2]["line"]))
+    return {
+        "sites": sites,
+        "score": total,
+        "averageScore": round(total / sites, 2) if sites else 0.0,
+        "nPlusOne": issues["n+1"],
+        "issues": dict(issues),
+        "byKind": dict(kinds),
+        "byFile": by_file[:MAX_FILES_LISTED],
+        "hotspots": [_hotspot(site, path) for _, path, site in spots[:MAX_HOTSPOTS]],
+    }
+
+
+def model_issues(model: dict) -> list:
+    """(issue, column) pairs of one model"""
+    issues = []
+    if not model["primaryKey"]:
+        issues.append(("no primary key", None))
+    indexed = set(model["indexed"])
+    issues.extend(("unindexed foreign key", column) for column in model["foreignKeys"] if column not in indexed)
+    if model["columns"] > WIDE_TABLE_COLUMNS:
+        issues.append(("wide table", None))
+    return issues
+
+
+def model_score(issues: list) -> int:
+    unindexed = sum(issue == "unindexed foreign key" for issue, _ in issues)
+    return max(0, 100
+               - NO_PRIMARY_KEY * any(issue == "no primary key" for issue, _ in issues)
+               - UNINDEXED_FOREIGN_KEY * min(unindexed, 3)
+               - WIDE_TABLE * any(issue == "wide table" for issue, _ in issues))
+
+
+def database_design(files: list) -> dict:
+    """
+    The dashboard's databaseDesign section
+
+    Each declared model or table loses points for a missing primary key,
+    foreign keys that do not lead any index (every join and cascade on them
+    scans) and very wide rows; the repository score is the mean over models.
+    """
+    by_model = []
+    issues = []
+    for f in files:
+        for model in f.get("models") or ():
+            found = model_issues(model)
+            by_model.append({
+                "path": f["path"],
+                "line": model["line"],
+                "name": model["name"],
+                "kind": model["kind"],
+                "columns": model["columns"],
+                "relationships": model["relationships"],
+                "indexes": len(set(model["indexed"])),
+                "score": model_score(found),
+            })
+            issues.extend(
+                {"path": f["path"], "line": model["line"], "model": model["name"], "issue": issue,
+                 **({"column": column} if column else {})}
+                for issue, column in found
+            )
+
+    by_model.sort(key=lambda model: (model["score"], model["path"], model["line"]))
+    return {
+        "score": round(sum(model["score"] for model in by_model) / len(by_model), 1) if by_model else None,
+        "models": len(by_model),
+        "relationships": sum(model["relationships"] for model in by_model),
+        "indexes": sum(model["indexes"] for model in by_model),
+        "unindexedForeignKeys": sum(issue["issue"] == "unindexed foreign key" for issue in issues),
+        "byModel": by_model,
+        "issues": issues[:MAX_ISSUES],
+    }
@@ -0,0 +1,100 @@
+"""
+Report storage
+Metrics are serialised once, when the report is written, and stored as gzip-
+and brotli-compressed JSON next to indexed summary columns; responses send
+those bytes as they are
+"""
+
+import gzip
+import json
+from typing import Optional
+
+from app.analysis.timeseries import build_rollups, encode_points
+from app.models.user import Report, ReportSeries
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is used instead, only slower
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # reports are then stored and served as gzip only
+    brotli = None
+
+# Fast levels compress metrics JSON nearly as well as level 9 at a fraction of the CPU
+COMPRESS_LEVEL = 6
+# Brotli is paid once per report at write time and shaves a further ~15% off every response
+BROTLI_QUALITY = 9
+
+
+def _serialize(metrics: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(metrics, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(metrics, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_metrics(metrics: dict) -> bytes:
+    """Serialise and compress a metrics dict for Report.payload"""
+    return gzip.compress(_serialize(metrics), COMPRESS_LEVEL)
+
+
+def encode_brotli(raw: bytes) -> Optional[bytes]:
+    """Report.payload_br for serialised metrics; None when brotli is not installed"""
+    return brotli.compress(raw, quality=BROTLI_QUALITY) if brotli is not None else None
+
+
+def metrics_json(payload: bytes) -> bytes:
+    """The stored metrics as JSON bytes, without parsing them"""
+    return gzip.decompress(payload)
+
+
+def decode_metrics(payload: bytes) -> dict:
+    return json.loads(metrics_json(payload))
+
+
+def summary_columns(metrics: dict) -> dict:
+    """Values of Report's summary columns, so listings and filters never touch the payload"""
+    loc = metrics.get("loc") or {}
+    complexity = metrics.get("complexity") or {}
+    return {
+        "loc_total": loc.get("total"),
+        "file_count": loc.get("files"),
+        "function_count": complexity.get("functions"),
+        "complexity_total": complexity.get("totalScore"),
+        "commit_count": (metrics.get("commits") or {}).get("count"),
+        "duplication_pct": (metrics.get("duplicates") or {}).get("percentage"),
+        "churn_rate": (metrics.get("churn") or {}).get("rate"),
+    }
+
+
+def build_report(repo_id: int, metrics: dict) -> Report:
+    """A Report row for a metrics dict"""
+    raw = _serialize(metrics)
+    return Report(
+        repo_id=repo_id,
+        payload=gzip.compress(raw, COMPRESS_LEVEL),
+        payload_br=encode_brotli(raw),
+        payload_size=len(raw),
+        **summary_columns(metrics)
+    )
+
+
+def series_rows(report_id: int, metrics: dict) -> list:
+    """Values of the report_series rows holding the day/week/month rollups of a report's time series"""
+    return [
+        {
+            "report_id": report_id,
+            "series": name,
+            "resolution": resolution,
+            "points": len(points),
+            "payload": encode_points(points),
+        }
+        for name, rollups in build_rollups(metrics).items()
+        for resolution, points in rollups.items()
+    ]
+
+
+def build_series(report_id: int, metrics: dict) -> list:
+    """ReportSeries rows for a stored report's metrics dict"""
+    return [ReportSeries(**row) for row in series_rows(report_id, metrics)]
@@ -0,0 +1,125 @@
+"""
+History snapshots
+LOC and complexity at sampled past commits, read through one long-lived blob reader
+"""
+
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from app.analysis.catfile import CatFilePool
+from app.analysis.engine import MAX_FILE_BYTES, analyze_source, cache_key
+from app.analysis.git import GitError, run_git
+from app.analysis.history import range_args
+from app.analysis.languages import is_skipped_path, is_vendored_path
+
+
+def sample_commits(
+    checkout: str,
+    count: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    timeout: Optional[float] = None
+) -> list:
+    """(day, sha) of the last first-parent commit on each of the `count` most recent commit days, oldest first"""
+    try:
+        output = run_git(
+            ["log", "--first-parent", "--format=%H %ct", *range_args(since, until)],
+            cwd=checkout, timeout=timeout
+        )
+    except GitError as e:
+        if "does not have any commits" in str(e):
+            return []
+        raise
+    samples = {}
+    for line in output.splitlines():
+        sha, timestamp = line.split()
+        day = datetime.fromtimestamp(int(timestamp), timezone.utc).date().isoformat()
+        if day not in samples:  # newest first, so this is the day's last commit
+            if len(samples) == count:
+                break
+            samples[day] = sha
+    return sorted(samples.items())
+
+
+def tree_blobs(checkout: str, commit: str, timeout: Optional[float] = None) -> list:
+    """(path, blob sha, size) of a commit's candidate source files, from one ls-tree call"""
+    blobs = []
+    for entry in run_git(["ls-tree", "-r", "-l", "-z", commit], cwd=checkout, timeout=timeout).split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        mode, kind, sha, size = meta.split()
+        if kind != "blob" or not mode.startswith("100") or is_vendored_path(path) or is_skipped_path(path):
+            continue
+        blobs.append((path, sha, int(size)))
+    return blobs
+
+
+def _summary(result: Optional[dict]) -> Optional[tuple]:
+    if result is None:
+        return None
+    return result["code"], result.get("complexity", 0)
+
+
+def snapshot_series(
+    checkout: str,
+    count: int = 30,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    parse: bool = False,
+    cache=None,
+    timeout: Optional[float] = None
+) -> list:
+    """
+    LOC (and with `parse`, complexity) at up to `count` sampled commit days
+
+    Blobs are memoised by cache key across snapshots, so a file unchanged
+    over the month is analysed once. Known blobs come from the blob cache,
+    and the rest are streamed from a single `git cat-file --batch` process
+    instead of one `git show` per file per commit. Newly analysed blobs are
+    added to the cache.
+    """
+    memo = {}
+    series = []
+    with CatFilePool(checkout, size=1) as pool:
+        for day, commit in sample_commits(checkout, count, since, until, timeout):
+            blobs = tree_blobs(checkout, commit, timeout)
+            keys = [(path, sha, size, cache_key(path, sha, parse)) for path, sha, size in blobs]
+            unknown = list({key for _, _, _, key in keys if key not in memo})
+            if cache is not None and unknown:
+                for key, result in cache.get_many(unknown).items():
+                    memo[key] = _summary(result)
+
+            wanted = {}
+            for path, sha, size, key in keys:
+                if key in memo or key in wanted:
+                    continue
+                if size > MAX_FILE_BYTES:
+                    memo[key] = None
+                else:
+                    wanted[key] = (path, sha)
+
+            fresh = {}
+            if wanted:
+                with pool.reader() as reader:
+                    entries = list(wanted.items())
+                    # The reader's generator goes first so zip runs it to completion
+                    for (_, data), (key, (path, _)) in zip(reader.read_many(sha for _, (_, sha) in entries), entries):
+                        result = analyze_source(path, data, parse) if data is not None else None
+                        memo[key] = _summary(result)
+                        fresh[key] = {k: v for k, v in result.items() if k != "path"} if result else None
+            if cache is not None and fresh:
+                cache.put_many(fresh)
+
+            loc = complexity = files = 0
+            for _, _, _, key in keys:
+                summary = memo[key]
+                if summary is not None:
+                    loc += summary[0]
+                    complexity += summary[1]
+                    files += 1
+            point = {"date": day, "sha": commit, "loc": loc, "files": files}
+            if parse:
+                point["complexity"] = complexity
+            series.append(point)
+    return series
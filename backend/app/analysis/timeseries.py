@@ -0,0 +1,152 @@
+"""
+Report time series
+Day/week/month rollups computed once at report time, and LTTB downsampling for charts
+"""
+
+import gzip
+import json
+from datetime import date, timedelta
+from typing import Optional
+
+RESOLUTIONS = ("day", "week", "month")
+
+# Series name -> (metrics section, key inside it, value field, how points combine within a bucket).
+# Levels (LOC, complexity) keep the last value of a bucket; counts (activity) are summed.
+SERIES = {
+    "loc": ("loc", "timeseries", "loc", "last"),
+    "complexity": ("complexity", "timeseries", "score", "last"),
+    "activity": ("commits", "activity", "commits", "sum"),
+}
+
+
+def series_points(metrics: dict, name: str) -> list:
+    """Raw daily points of a series from a metrics dict, sorted by date; empty when not computed"""
+    section, key, _, _ = SERIES[name]
+    points = (metrics.get(section) or {}).get(key) or []
+    return sorted(points, key=lambda point: point["date"])
+
+
+def bucket_start(day: str, resolution: str) -> str:
+    """First day of the week (Monday) or month an ISO date falls in"""
+    if resolution == "day":
+        return day
+    if resolution == "month":
+        return day[:8] + "01"
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+def rollup(points: list, resolution: str, how: str) -> list:
+    """Points combined per bucket, each dated by the bucket's first day"""
+    if resolution == "day":
+        return list(points)
+    buckets = {}
+    for point in points:
+        start = bucket_start(point["date"], resolution)
+        current = buckets.get(start)
+        if current is None or how == "last":
+            buckets[start] = {**point, "date": start}
+        else:
+            for field, value in point.items():
+                if field != "date" and isinstance(value, (int, float)):
+                    current[field] = current.get(field, 0) + value
+    return [buckets[start] for start in sorted(buckets)]
+
+
+def build_rollups(metrics: dict) -> dict:
+    """{series: {resolution: points}} for every series the report has"""
+    rollups = {}
+    for name, (_, _, _, how) in SERIES.items():
+        points = series_points(metrics, name)
+        if points:
+            rollups[name] = {resolution: rollup(points, resolution, how) for resolution in RESOLUTIONS}
+    return rollups
+
+
+def encode_points(points: list) -> bytes:
+    return gzip.compress(json.dumps(points, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_points(payload: bytes) -> list:
+    return json.loads(gzip.decompress(payload))
+
+
+def in_range(points: list, since: Optional[str] = None, until: Optional[str] = None) -> list:
+    """Points dated within [since, until]; ISO dates compare as strings"""
+    return [p for p in points if (since is None or p["date"] >= since) and (until is None or p["date"] <= until)]
+
+
+def lttb(points: list, threshold: int, field: str) -> list:
+    """
+    Largest-Triangle-Three-Buckets downsampling to at most `threshold` points
+
+    Keeps the first and last point, and from each bucket in between the point
+    forming the largest triangle with the previously kept point and the next
+    bucket's average, so peaks and dips survive while flat stretches thin out.
+    """
+    n = len(points)
+    if threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:threshold]
+
+    xs = [date.fromisoformat(p["date"]).toordinal() for p in points]
+    ys = [float(p.get(field) or 0) for p in points]
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if next_start >= n - 1:
+            avg_x, avg_y = xs[-1], ys[-1]
+        else:
+            avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+            avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        best, best_area = start, -1.0
+        ax, ay = xs[a], ys[a]
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def select_series(
+    rollups: dict,
+    name: str,
+    max_points: int,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    resolution: str = "auto"
+) -> dict:
+    """
+    The chart series for a date window in at most `max_points` points
+
+    `auto` picks the finest rollup that fits. When even months are too many,
+    the series is LTTB-downsampled: daily levels keep their shape, while
+    counts are downsampled from the monthly sums so no commits go missing.
+    A fixed `resolution` returns that rollup, downsampled if it does not fit.
+    """
+    _, _, field, how = SERIES[name]
+    candidates = RESOLUTIONS if resolution == "auto" else (resolution,)
+    for candidate in candidates:
+        # A bucket counts as in range when the window starts inside it
+        points = in_range(rollups[candidate], since and bucket_start(since, candidate), until)
+        if len(points) <= max_points:
+            return {"series": name, "resolution": candidate, "downsampled": False, "total": len(points), "points": points}
+
+    source = candidates[-1] if resolution != "auto" or how == "sum" else "day"
+    points = in_range(rollups[source], since and bucket_start(since, source), until)
+    return {
+        "series": name,
+        "resolution": source,
+        "downsampled": True,
+        "total": len(points),
+        "points": lttb(points, max_points, field),
+    }
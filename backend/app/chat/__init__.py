@@ -0,0 +1 @@
+"""Repository chat package initialization"""
@@ -0,0 +1,80 @@
+"""
+Chat providers
+Pluggable text generators that stream an answer chunk by chunk
+"""
+
+import asyncio
+import re
+from typing import AsyncIterator
+
+
+class ChatProvider:
+    """Interface for model backends"""
+    name = "base"
+
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the answer to a prompt as it is generated"""
+        raise NotImplementedError
+
+
+class LocalProvider(ChatProvider):
+    """
+    Deterministic stand-in model for tests and offline development
+
+    Answers by quoting the context it was given, word by word, so the whole
+    streaming path can be exercised without network access or API keys.
+    """
+    name = "local"
+
+    def __init__(self, token_delay: float = 0.0):
+        self.token_delay = token_delay
+
+    @staticmethod
+    def answer(prompt: str) -> str:
+        question = prompt.rsplit("Question:", 1)[-1].strip()
+        sources = re.findall(r"^\[\d+\] (.+)$", prompt, flags=re.MULTILINE)
+        if not sources:
+            return f"I have no repository context for: {question}"
+        lines = [f"Here is what the analysis says about: {question}", ""]
+        lines += [f"- {source}" for source in sources]
+        return "\n".join(lines)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        for word in re.findall(r"\S+\s*", self.answer(prompt)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word
+
+
+class GeminiProvider(ChatProvider):
+    """Google Gemini through google-generativeai's async streaming API"""
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-pro"):
+        try:
+            import google.generativeai as genai
+        except ImportError as e:
+            raise RuntimeError("CHAT_PROVIDER is gemini but google-generativeai is not installed") from e
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(model)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        # Cancelling the consumer cancels this iteration, which closes the upstream stream
+        response = await self._model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+def create_provider(kind: str, api_key: str = "", model: str = "gemini-pro", token_delay: float = 0.0) -> ChatProvider:
+    """Build the provider named by CHAT_PROVIDER; "auto" uses Gemini when a key is configured"""
+    if kind == "auto":
+        kind = "gemini" if api_key else "local"
+    if kind == "local":
+        return LocalProvider(token_delay)
+    if kind == "gemini":
+        if not api_key:
+            raise ValueError("CHAT_PROVIDER is gemini but GEMINI_API_KEY is not set")
+        return GeminiProvider(api_key, model)
+    raise ValueError(f"Unsupported chat provider: {kind}")
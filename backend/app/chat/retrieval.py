@@ -0,0 +1,200 @@
+"""
+Retrieval index
+BM25 index over a repository's source, report metrics and commit summaries, built once per analysis
+"""
+
+import gzip
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+from app.analysis.engine import MAX_FILE_BYTES, walk_source_files
+from app.analysis.languages import OTHER, classify, is_binary
+
+# Lines of source per chunk, and the overlap between consecutive chunks
+CHUNK_LINES = 40
+CHUNK_OVERLAP = 5
+
+# Files above this are usually generated; they would crowd out everything else
+MAX_INDEXED_FILE_BYTES = 100_000
+
+# Commits per commit-summary chunk
+COMMITS_PER_CHUNK = 25
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "of", "to", "in", "is", "it", "for", "on", "with", "as",
+    "be", "by", "this", "that", "are", "was", "at", "from", "what", "which", "how", "do",
+    "does", "me", "my", "i", "you", "can", "about", "there", "their", "its", "self",
+})
+
+
+def terms(text: str) -> list:
+    """Lower-cased search terms; identifiers also contribute their camelCase/snake_case parts"""
+    result = []
+    for word in WORD_RE.findall(text):
+        lower = word.lower()
+        if lower not in STOPWORDS and len(lower) > 1:
+            result.append(lower)
+        parts = CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            result.extend(p.lower() for p in parts if len(p) > 1 and p.lower() not in STOPWORDS)
+    return result
+
+
+# ==================== Chunking ====================
+
+def _chunk(kind: str, title: str, text: str, path: str = "", start: int = 0, end: int = 0) -> dict:
+    return {"kind": kind, "title": title, "path": path, "start": start, "end": end, "text": text}
+
+
+def source_chunks(checkout: str, max_bytes: int) -> list:
+    """Overlapping line windows of the checkout's source files, up to max_bytes of text"""
+    chunks = []
+    budget = max_bytes
+    for path in walk_source_files(checkout):
+        if budget <= 0:
+            break
+        if classify(path) is OTHER:
+            continue
+        try:
+            with open(os.path.join(checkout, path), "rb") as f:
+                data = f.read(MAX_FILE_BYTES + 1)
+        except OSError:
+            continue
+        if len(data) > MAX_INDEXED_FILE_BYTES or is_binary(data):
+            continue
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        step = CHUNK_LINES - CHUNK_OVERLAP
+        for start in range(0, max(len(lines), 1), step):
+            window = lines[start:start + CHUNK_LINES]
+            text = "\n".join(window)
+            if not text.strip():
+                continue
+            end = start + len(window)
+            chunks.append(_chunk("source", f"{path}:{start + 1}-{end}", text, path, start + 1, end))
+            budget -= len(text)
+            if end >= len(lines):
+                break
+    return chunks
+
+
+def metric_chunks(metrics: dict) -> list:
+    """Plain-language summaries of the report sections"""
+    chunks = []
+    loc = metrics.get("loc") or {}
+    complexity = metrics.get("complexity") or {}
+    commits = metrics.get("commits") or {}
+    duplicates = metrics.get("duplicates") or {}
+    churn = metrics.get("churn") or {}
+
+    languages = ", ".join(f"{lang['lang']} {lang['loc']} lines" for lang in loc.get("byLang", [])[:10])
+    chunks.append(_chunk("overview", "Repository overview", "\n".join([
+        f"Lines of code (LOC): {loc.get('total', 0)} in {loc.get('files', 0)} files; "
+        f"{loc.get('comment', 0)} comment lines, {loc.get('blank', 0)} blank lines.",
+        f"Languages: {languages or 'none detected'}.",
+        f"Cyclomatic complexity total: {complexity.get('totalScore', 0)} over {complexity.get('functions', 0)} functions.",
+        f"Commits: {commits.get('count', 0)}.",
+        f"Code duplication: {duplicates.get('totalDuplications', 0)} clones, "
+        f"{duplicates.get('percentage', 0):.1%} of lines duplicated.",
+        f"Churn rate: {churn.get('rate', 0)} changed lines per line of code.",
+    ])))
+
+    if complexity.get("byFile"):
+        chunks.append(_chunk("metrics", "Most complex files", "\n".join(
+            f"{f['path']}: complexity {f['complexity']}, {f['functions']} functions"
+            for f in complexity["byFile"][:20]
+        )))
+    if duplicates.get("clones"):
+        chunks.append(_chunk("metrics", "Duplicated code", "\n".join(
+            f"{c['a']['path']} lines {c['a']['start']}-{c['a']['end']} duplicates "
+            f"{c['b']['path']} lines {c['b']['start']}-{c['b']['end']} ({c['tokens']} tokens)"
+            for c in duplicates["clones"][:20]
+        )))
+    if churn.get("byFile"):
+        chunks.append(_chunk("metrics", "Most frequently changed files (churn, hotspots)", "\n".join(
+            f"{f['path']}: changed in {f['changes']} commits, +{f['added']} -{f['deleted']}"
+            for f in churn["byFile"][:20]
+        )))
+    ownership = metrics.get("ownership") or {}
+    if ownership.get("byAuthor"):
+        chunks.append(_chunk("metrics", "Code ownership by author (contributors)", "\n".join(
+            f"{a['author']}: {a['commits']} commits, {a['lines']} changed lines ({a['share']:.0%})"
+            for a in ownership["byAuthor"][:20]
+        )))
+    return chunks
+
+
+def commit_chunks(metrics: dict) -> list:
+    """Commit messages in batches, newest first"""
+    per_commit = (metrics.get("commits") or {}).get("perCommit") or []
+    chunks = []
+    for i in range(0, len(per_commit), COMMITS_PER_CHUNK):
+        batch = per_commit[i:i + COMMITS_PER_CHUNK]
+        chunks.append(_chunk(
+            "commits",
+            f"Commits {batch[-1]['date']} to {batch[0]['date']}",
+            "\n".join(f"{c['sha'][:8]} {c['date']} {c['author']} ({c['changes']} lines changed): {c['message']}"
+                      for c in batch)
+        ))
+    return chunks
+
+
+# ==================== Index ====================
+
+def build_index(chunks: list) -> dict:
+    """Inverted index with BM25 statistics; plain data so it can be stored as JSON"""
+    postings = defaultdict(list)
+    lengths = []
+    for i, chunk in enumerate(chunks):
+        counts = Counter(terms(f"{chunk['title']}\n{chunk['text']}"))
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings[term].append([i, tf])
+    return {
+        "chunks": chunks,
+        "postings": dict(postings),
+        "lengths": lengths,
+        "avgdl": sum(lengths) / len(lengths) if lengths else 0.0,
+    }
+
+
+def build_repository_index(checkout: str, metrics: dict, max_source_bytes: int) -> dict:
+    """Index of everything the chat can ground answers in, built once at analysis time"""
+    return build_index(metric_chunks(metrics) + commit_chunks(metrics) + source_chunks(checkout, max_source_bytes))
+
+
+def encode_index(index: dict) -> bytes:
+    return gzip.compress(json.dumps(index, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_index(payload: bytes) -> dict:
+    return json.loads(gzip.decompress(payload))
+
+
+def search(index: dict, query: str, k: int = 6) -> list:
+    """The k chunks ranking highest under BM25 for the query"""
+    chunks = index["chunks"]
+    if not chunks:
+        return []
+    n = len(chunks)
+    lengths = index["lengths"]
+    avgdl = index["avgdl"] or 1.0
+    scores = defaultdict(float)
+    for term in set(terms(query)):
+        posting = index["postings"].get(term)
+        if not posting:
+            continue
+        idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+        for chunk_id, tf in posting:
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[chunk_id] / avgdl)
+            scores[chunk_id] += idf * tf * (BM25_K1 + 1) / norm
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+    return [chunks[chunk_id] for chunk_id, _ in ranked]
@@ -0,0 +1,48 @@
+"""
+Chat statistics
+Time-to-first-token and prompt size of recent chat requests
+"""
+
+import threading
+from collections import deque
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ChatStats:
+    """Counters plus a window of recent requests for percentiles"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._ttft = deque(maxlen=window)
+        self._prompt_chars = deque(maxlen=window)
+        self.counters = {"requests": 0, "completed": 0, "cancelled": 0, "errors": 0}
+
+    def record(self, outcome: str, ttft: float, prompt_chars: int):
+        """Record one request; outcome is completed, cancelled or errors; ttft in seconds or None"""
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters[outcome] += 1
+            self._prompt_chars.append(prompt_chars)
+            if ttft is not None:
+                self._ttft.append(ttft)
+
+    def stats(self) -> dict:
+        with self._lock:
+            ttft = list(self._ttft)
+            prompt = list(self._prompt_chars)
+        return {
+            **self.counters,
+            "ttft_p50_ms": round(_percentile(ttft, 0.5) * 1000, 1),
+            "ttft_p95_ms": round(_percentile(ttft, 0.95) * 1000, 1),
+            "prompt_chars_mean": round(sum(prompt) / len(prompt)) if prompt else 0,
+            "prompt_chars_p95": _percentile(prompt, 0.95),
+        }
+
+
+chat_stats = ChatStats()
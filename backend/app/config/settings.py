@@ -11,15 +11,101 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./devlens.db"
+    DATABASE_ASYNC: bool = True  # Async driver picked from DATABASE_URL
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_MIGRATE_ON_STARTUP: bool = False  # Migrate in each worker's startup instead of `python server.py migrate`
+    DB_SLOW_QUERY_MS: float = 200  # Statements slower than this are logged with their route; 0 disables
     
     # JWT Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Auth cache (verified tokens and /auth/me profiles)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: int = 300
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_REVOCATION_CAPACITY: int = 100_000  # Revoked ids the Bloom filter is sized for; it grows past this
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 2.0  # How soon a logout in one worker reaches the others
+    
+    # Shared cache backend for multi-worker deployments, e.g. redis://localhost:6379/0
+    # Empty keeps everything in-process
+    CACHE_BACKEND_URL: str = ""
+
+    # Report responses
+    REPORT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Compressed report bodies kept in memory per worker; 0 disables
+    
+    # Repository comparison
+    COMPARE_MAX_REPOS: int = 50
+    COMPARE_CACHE_TTL_SECONDS: int = 300
+    COMPARE_CACHE_MAX_ENTRIES: int = 1000
+    
+    # Repository chat
+    CHAT_PROVIDER: str = "auto"  # "gemini", "local" or "auto" (gemini when GEMINI_API_KEY is set)
+    GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-pro"
+    CHAT_TOP_K: int = 6  # Retrieved chunks per prompt
+    CHAT_MAX_PROMPT_CHARS: int = 12000
+    CHAT_INDEX_ENABLED: bool = True  # Build the retrieval index when an analysis completes
+    CHAT_INDEX_MAX_SOURCE_BYTES: int = 4_000_000
+    CHAT_INDEX_CACHE_ENTRIES: int = 32  # Decoded indexes kept in memory per worker
+    CHAT_LOCAL_TOKEN_DELAY: float = 0.0  # Seconds between tokens of the local provider
+
+    # Password hashing pool ("thread" or "process")
+    PASSWORD_HASH_POOL: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Rate limiting and admission control
+    RATE_LIMIT_ENABLED: bool = True
+    # "<METHOD> <path> <ip|user|route> <limit>/<seconds>" entries; a path ending in * is a prefix
+    RATE_LIMIT_RULES: str = (
+        "POST /auth/login ip 10/60, POST /auth/register ip 5/600, "
+        "POST /analyses user 5/60, POST /analyses ip 30/60"
+    )
+    # "<METHOD> <path> <max>" entries; requests past the cap get 503 until one finishes (per worker)
+    RATE_LIMIT_CONCURRENCY: str = "POST /auth/login 32, POST /auth/register 16, POST /analyses 16"
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # In-process buckets; least recently used dropped past this
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Key clients by X-Forwarded-For; only behind a proxy that sets it
+    
+    # Repository analysis jobs
+    ANALYSIS_RUNNER_ENABLED: bool = True
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_MAX_JOBS_PER_USER: int = 2
+    ANALYSIS_MAX_ATTEMPTS: int = 3
+    ANALYSIS_RETRY_BACKOFF_SECONDS: int = 30
+    ANALYSIS_POLL_INTERVAL_SECONDS: float = 1.0
+    ANALYSIS_JOB_TIMEOUT_SECONDS: int = 600  # Heartbeat age after which a job is requeued
+    ANALYSIS_WORKDIR: str = ""  # Scratch space for checkouts; empty uses the system temp dir
+    ANALYSIS_ALLOWED_SCHEMES: str = "https,http,ssh,git"
+    ANALYSIS_ENGINE_WORKERS: int = 0  # Processes per analysis for parsing files; 0 = one per CPU
+    ANALYSIS_BLOB_CACHE_ENABLED: bool = True  # Reuse per-file metrics of unchanged git blobs
+    ANALYSIS_BLOB_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Least recently used entries evicted past this
+    ANALYSIS_SNAPSHOT_COUNT: int = 30  # Commit days sampled for the LOC/complexity timeseries; 0 disables
+    ANALYSIS_MIRROR_ENABLED: bool = True  # Keep bare mirrors so re-analyses fetch instead of cloning
+    ANALYSIS_MIRROR_DIR: str = ""  # Empty uses devlens-mirrors under ANALYSIS_WORKDIR or the system temp dir
+    ANALYSIS_MIRROR_MAX_BYTES: int = 10 * 1024 ** 3  # Least recently used mirrors evicted past this
+    ANALYSIS_MIRROR_FILTER: str = ""  # Partial clone filter, e.g. blob:none; history metrics then fetch blobs lazily
+    AI_DETECTION_MODEL_PATH: str = ""  # JSON weights for the AI-code estimator; empty uses the built-in model
+    
+    # Instrumentation
+    METRICS_ENABLED: bool = True  # Per-route latency, query and pool metrics on GET /metrics
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0  # /health reports the database unready past this
+    PROFILER_ENABLED: bool = True  # Admins may profile a request by sending an X-Profile header
+    PROFILER_INTERVAL_MS: float = 2.0
+    PROFILER_MAX_SECONDS: float = 30.0  # Sampling stops after this even if the request has not finished
+    PROFILER_DIR: str = ""  # Empty uses devlens-profiles under the system temp dir
+    PROFILER_KEEP: int = 20  # Newest profiles kept on disk
+    
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    SERVER_WORKERS: int = 0  # Production worker processes; 0 = one per available CPU
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # Seconds in-flight requests get to finish on shutdown
+    SERVER_KEEPALIVE: int = 5
+    SERVER_BACKLOG: int = 2048
     
     class Config:
         env_file = ".env"
@@ -3,13 +3,26 @@ DevLens FastAPI Application
 Main application instance with middleware and routes
 """
 
-from fastapi import FastAPI
+import logging
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config.settings import get_settings
-from app.routes import auth
-from app.utils.database import init_db
+from app.routes import auth, analyses, chat, compare, history, metrics, reports
+from app.analysis.jobs import job_runner
+from app.utils.database import async_engine, engine, init_db, ping_database
+from app.utils.migrations import pending_migrations
+from app.utils.hashing import password_hasher, PasswordHasherBusy
+from app.utils.auth_cache import auth_cache
+from app.utils.rate_limit import RateLimitMiddleware, rate_limiter
+from app.utils.report_cache import report_bodies
+from app.utils.revocation import revocation_list
+from app.chat.stats import chat_stats
+from app.utils.instrumentation import InstrumentationMiddleware, all_pool_stats, instrument_engine
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="DevLens API",
@@ -17,6 +30,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Rate limits and concurrency caps; added first so CORS headers reach its 429/503 answers too
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, identify_user=auth.token_subject)
+
 # CORS middleware - MUST be before routes
 app.add_middleware(
     CORSMiddleware,
@@ -26,13 +43,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
+# Latency, query and pool metrics for /metrics; outermost so it times everything
+if settings.METRICS_ENABLED:
+    app.add_middleware(InstrumentationMiddleware, authorize_profile=metrics.profile_allowed)
+    instrument_engine(engine, "sync")
+    if async_engine is not None:
+        instrument_engine(async_engine, "async")
+
+# Schema changes run once before the workers start (python server.py migrate), not per worker
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    if settings.DB_MIGRATE_ON_STARTUP:
+        init_db()
+    else:
+        pending = pending_migrations()
+        if pending:
+            logger.error("Database schema is out of date (%s); run: python server.py migrate", ", ".join(pending))
+    await revocation_list.start()
+    if settings.ANALYSIS_RUNNER_ENABLED:
+        await job_runner.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await revocation_list.stop()
+    await job_runner.stop()
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+# Load shedding when the password hashing pool is full
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 # Include routers
 app.include_router(auth.router)
+app.include_router(analyses.router)
+app.include_router(reports.router)
+app.include_router(history.router)
+app.include_router(compare.router)
+app.include_router(chat.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -44,4 +102,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    database = await ping_database(settings.HEALTH_DB_TIMEOUT_SECONDS)
+    body = {
+        "status": "healthy" if database["ready"] else "unhealthy",
+        "database": {**database, "pools": all_pool_stats()},
+        "auth_cache": auth_cache.stats(),
+        "revocations": revocation_list.stats(),
+        "report_cache": report_bodies.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "chat": chat_stats.stats()
+    }
+    if not database["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
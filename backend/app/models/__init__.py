@@ -1,4 +1,5 @@
 """Models package initialization"""
-from .user import User, Repository, Report, Compare
+from .user import User, Repository, Report, ReportSeries, RevokedToken, Compare
+from .analysis import AnalysisJob, BlobMetric, RetrievalIndex
 
-__all__ = ["User", "Repository", "Report", "Compare"]
+__all__ = ["User", "Repository", "Report", "ReportSeries", "RevokedToken", "Compare", "AnalysisJob", "BlobMetric", "RetrievalIndex"]
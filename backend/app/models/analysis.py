@@ -0,0 +1,69 @@
+"""
+Analysis job models
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Text, Index, LargeBinary
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import deferred, relationship
+from app.utils.database import Base
+from datetime import datetime
+
+
+class AnalysisJob(Base):
+    """Queued repository analysis, persisted so jobs survive restarts"""
+    __tablename__ = "analysis_jobs"
+
+    job_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    repo_id = Column(Integer, ForeignKey("repository.repo_id"), nullable=False)
+    report_id = Column(Integer, ForeignKey("report.report_id"), nullable=True)
+    repo_link = Column(String(255), nullable=False)
+    branch = Column(String(100))
+    options = Column(Text)  # JSON list of selected SPL options
+    range_from = Column(Date)  # History window; open-ended when null
+    range_to = Column(Date)
+
+    status = Column(String(20), nullable=False, default="queued")
+    stage = Column(String(50), nullable=False, default="queued")
+    progress = Column(Float, nullable=False, default=0.0)
+    error = Column(Text)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    next_run_at = Column(DateTime, default=datetime.utcnow)
+    worker_id = Column(String(100))
+    heartbeat_at = Column(DateTime)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    repository = relationship("Repository")
+    report = relationship("Report")
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_next_run", "status", "next_run_at"),
+        Index("ix_analysis_jobs_user_status", "user_id", "status"),
+        Index("ix_analysis_jobs_repo", "repo_id", "job_id", "status"),
+    )
+
+
+class BlobMetric(Base):
+    """Per-file metrics keyed by git blob SHA, shared across every analysis"""
+    __tablename__ = "blob_metrics"
+
+    cache_key = Column(String(120), primary_key=True)  # engine version, language and blob SHA
+    payload = Column(Text, nullable=False)  # JSON; "null" for blobs that are not source text
+    size = Column(Integer, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class RetrievalIndex(Base):
+    """Chat retrieval index of one report, built while the analysed checkout is still on disk"""
+    __tablename__ = "retrieval_indexes"
+
+    report_id = Column(Integer, ForeignKey("report.report_id"), primary_key=True)
+    repo_id = Column(Integer, ForeignKey("repository.repo_id"), nullable=False, index=True)
+    chunk_count = Column(Integer, nullable=False)
+    payload = deferred(Column(LargeBinary().with_variant(LONGBLOB, "mysql")))  # gzip-compressed JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,8 +2,9 @@
 Database models
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index, LargeBinary
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import deferred, relationship
 from app.utils.database import Base
 from datetime import datetime
 
@@ -46,19 +47,64 @@ class Repository(Base):
         back_populates="compared_repos"
     )
 
+    # Covering indexes for the keyset-paginated history (GET /me/analyses),
+    # unfiltered and filtered to one repository link
+    __table_args__ = (
+        Index("ix_repository_user_timestamp", "user_id", "timestamp", "repo_id", "repo_link"),
+        Index("ix_repository_user_link_timestamp", "user_id", "repo_link", "timestamp", "repo_id"),
+    )
+
 
 class Report(Base):
-    """Report model"""
+    """Report model - compressed metrics JSON plus summary columns for listing and filtering"""
     __tablename__ = "report"
 
     report_id = Column(Integer, primary_key=True, index=True)
     repo_id = Column(Integer, ForeignKey("repository.repo_id"))
-    metrics = Column(String(1000))
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    # gzip-compressed aggregated metrics JSON; only loaded when asked for
+    payload = deferred(Column(LargeBinary().with_variant(LONGBLOB, "mysql")))
+    payload_br = deferred(Column(LargeBinary().with_variant(LONGBLOB, "mysql")))  # the same JSON, brotli-compressed
+    payload_size = Column(Integer)  # uncompressed bytes
+
+    # Summary columns
+    loc_total = Column(Integer)
+    file_count = Column(Integer)
+    function_count = Column(Integer)
+    complexity_total = Column(Integer)
+    commit_count = Column(Integer)
+    duplication_pct = Column(Float)
+    churn_rate = Column(Float)
+
     # Relationships
     repository = relationship("Repository", back_populates="report")
 
+    __table_args__ = (
+        Index("ix_report_repo_timestamp", "repo_id", "timestamp"),
+    )
+
+
+class RevokedToken(Base):
+    """JWT id revoked by logout; kept until the token would have expired anyway"""
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # workers sync by "id greater than the last seen"
+    jti = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ReportSeries(Base):
+    """One day/week/month rollup of a report's time series, stored when the report is built"""
+    __tablename__ = "report_series"
+
+    report_id = Column(Integer, ForeignKey("report.report_id"), primary_key=True)
+    series = Column(String(20), primary_key=True)  # loc, complexity, activity
+    resolution = Column(String(10), primary_key=True)  # day, week, month
+    points = Column(Integer, nullable=False)
+    payload = deferred(Column(LargeBinary().with_variant(LONGBLOB, "mysql")))  # gzip-compressed JSON points
+
 
 class Compare(Base):
     """Compare model - Many-to-many relationship table"""
@@ -1,4 +1,4 @@
 """Routes package initialization"""
-from . import auth
+from . import auth, analyses, chat, compare, history, metrics, reports
 
-__all__ = ["auth"]
+__all__ = ["auth", "analyses", "chat", "compare", "history", "metrics", "reports"]
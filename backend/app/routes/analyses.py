@@ -0,0 +1,223 @@
+"""
+Repository Analysis Routes
+Submit analysis jobs and follow their progress
+"""
+
+import asyncio
+import json
+from datetime import date
+from typing import Optional
+from urllib.parse import urlparse
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analysis.jobs import TERMINAL_STATUSES
+from app.analysis.planner import DEFAULT_OPTIONS
+from app.analysis.reports import metrics_json
+from app.config.settings import get_settings
+from app.models.analysis import AnalysisJob
+from app.models.user import Repository, Report
+from app.routes.auth import get_current_user
+from app.utils.database import get_db, open_session
+
+settings = get_settings()
+
+router = APIRouter(prefix="/analyses", tags=["Analyses"])
+
+
+# ==================== Pydantic Models ====================
+
+class TimeRange(BaseModel):
+    """Commit history window; either end may be left open"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_: Optional[date] = Field(None, alias="from")
+    to: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_order(self):
+        if self.from_ and self.to and self.from_ > self.to:
+            raise ValueError("time_range.from must not be after time_range.to")
+        return self
+
+
+class AnalysisRequest(BaseModel):
+    """Analysis submission request model"""
+    repo_link: str = Field(..., min_length=1, max_length=100)
+    branch: Optional[str] = Field(None, max_length=100)
+    options: list[str] = Field(default_factory=lambda: list(DEFAULT_OPTIONS))
+    time_range: Optional[TimeRange] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "repo_link": "https://github.com/octocat/Hello-World",
+                "branch": "master",
+                "options": DEFAULT_OPTIONS,
+                "time_range": {"from": "2025-09-01", "to": "2025-10-26"}
+            }
+        }
+
+
+class AnalysisStatus(BaseModel):
+    """Analysis job status response model"""
+    job_id: int
+    repo_id: int
+    repo_link: str
+    status: str
+    stage: str
+    progress: float
+    attempts: int
+    error: Optional[str] = None
+    report_id: Optional[int] = None
+    metrics: Optional[dict] = None
+
+
+# ==================== Helpers ====================
+
+def validate_repo_link(repo_link: str):
+    """Only accept clone URLs using an allowed scheme"""
+    allowed = {scheme.strip() for scheme in settings.ANALYSIS_ALLOWED_SCHEMES.split(",") if scheme.strip()}
+    scheme = urlparse(repo_link).scheme
+    # scp-style git@host:owner/repo.git counts as ssh
+    if not scheme and "@" in repo_link and ":" in repo_link:
+        scheme = "ssh"
+    if scheme not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Repository link must use one of: {', '.join(sorted(allowed))}"
+        )
+
+
+def job_status(job: AnalysisJob, metrics: Optional[dict] = None) -> AnalysisStatus:
+    return AnalysisStatus(
+        job_id=job.job_id,
+        repo_id=job.repo_id,
+        repo_link=job.repo_link,
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        attempts=job.attempts,
+        error=job.error,
+        report_id=job.report_id,
+        metrics=metrics
+    )
+
+
+async def load_job(db: AsyncSession, job_id: int, user_id: int) -> AnalysisJob:
+    """Fetch a job owned by the user, or 404"""
+    job = await db.get(AnalysisJob, job_id, populate_existing=True)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    return job
+
+
+# ==================== Analysis Routes ====================
+
+@router.post("", response_model=AnalysisStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis(
+    request_data: AnalysisRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a repository for analysis
+
+    Returns immediately with a job id; poll `GET /analyses/{job_id}` or
+    stream `GET /analyses/{job_id}/events` for progress.
+    """
+    validate_repo_link(request_data.repo_link)
+
+    repository = Repository(repo_link=request_data.repo_link, user_id=current_user["user_id"])
+    db.add(repository)
+    await db.flush()
+
+    job = AnalysisJob(
+        user_id=current_user["user_id"],
+        repo_id=repository.repo_id,
+        repo_link=request_data.repo_link,
+        branch=request_data.branch,
+        options=json.dumps(request_data.options),
+        range_from=request_data.time_range.from_ if request_data.time_range else None,
+        range_to=request_data.time_range.to if request_data.time_range else None,
+        status="queued",
+        stage="queued",
+        progress=0.0,
+        attempts=0,
+        max_attempts=settings.ANALYSIS_MAX_ATTEMPTS
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    return job_status(job)
+
+
+@router.get("/{job_id}", response_model=AnalysisStatus)
+async def get_analysis(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get an analysis job's status, including the metrics once it has succeeded
+
+    The stored metrics JSON is spliced into the response as-is rather than
+    parsed and re-serialised, which matters for reports of several megabytes.
+    """
+    job = await load_job(db, job_id, current_user["user_id"])
+
+    payload = None
+    if job.status == "succeeded" and job.report_id is not None:
+        payload = await db.scalar(select(Report.payload).where(Report.report_id == job.report_id))
+
+    body = job_status(job).model_dump_json(exclude={"metrics"}).encode("utf-8")
+    if payload is not None:
+        body = body[:-1] + b',"metrics":' + metrics_json(payload) + b"}"
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{job_id}/events")
+async def stream_analysis(
+    job_id: int,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream job progress as Server-Sent Events until the job finishes
+    """
+    await load_job(db, job_id, current_user["user_id"])
+    await db.close()
+    user_id = current_user["user_id"]
+
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            session = open_session()
+            try:
+                job = await load_job(session, job_id, user_id)
+            finally:
+                await session.close()
+            current = job_status(job)
+            state = (current.status, current.stage, current.progress, current.attempts)
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {current.model_dump_json()}\n\n"
+            if current.status in TERMINAL_STATUSES:
+                yield f"event: {current.status}\ndata: {current.model_dump_json()}\n\n"
+                return
+            await asyncio.sleep(settings.ANALYSIS_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -5,15 +5,19 @@ Handles user login, registration, and JWT token management
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, Field
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 
-from app.models.user import User
+from app.models.user import RevokedToken, User
 from app.utils.database import get_db
+from app.utils.hashing import password_hasher
+from app.utils.auth_cache import auth_cache
+from app.utils.revocation import revocation_list
 from app.utils.auth import (
-    hash_password,
-    verify_password,
     create_access_token,
     validate_password_strength,
     decode_access_token
@@ -24,6 +28,7 @@ settings = get_settings()
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
 
 # ==================== Pydantic Models ====================
@@ -82,7 +87,7 @@ class UserResponse(BaseModel):
 # ==================== Authentication Routes ====================
 
 @router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserRegistration, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegistration, db: AsyncSession = Depends(get_db)):
     """
     Register a new user
     
@@ -109,15 +114,19 @@ async def register_user(user_data: UserRegistration, db: Session = Depends(get_d
         )
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This email is already registered"
         )
     
+    # Return the pooled connection while bcrypt runs in the hashing pool
+    await db.close()
+    
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         firstname=user_data.firstName,
         lastname=user_data.lastName,
@@ -128,8 +137,9 @@ async def register_user(user_data: UserRegistration, db: Session = Depends(get_d
     
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        await auth_cache.invalidate_user(new_user.email)
         
         return {
             "message": "Registration successful!",
@@ -140,7 +150,7 @@ async def register_user(user_data: UserRegistration, db: Session = Depends(get_d
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create user: {str(e)}"
@@ -148,7 +158,7 @@ async def register_user(user_data: UserRegistration, db: Session = Depends(get_d
 
 
 @router.post("/login", response_model=Token)
-async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """
     Login user and return JWT token
     
@@ -159,7 +169,8 @@ async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
     """
     
     # Find user by email
-    user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(
@@ -168,8 +179,11 @@ async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Return the pooled connection while bcrypt runs in the hashing pool
+    await db.close()
+    
     # Verify password
-    if not verify_password(user_data.password, user.password):
+    if not await password_hasher.verify(user_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -194,42 +208,129 @@ async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/me", response_model=UserResponse)
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """
-    Get current authenticated user information
+def verified_payload(token: str) -> Optional[dict]:
+    """Payload of a valid bearer token that has not been revoked, or None"""
     
-    Requires valid JWT token in Authorization header
-    """
+    # Verified tokens are cached until their exp, so repeat polls skip the decode
+    payload = auth_cache.get_token(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            return None
+        auth_cache.put_token(token, payload)
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    # In-memory denylist check, no query
+    if revocation_list.is_revoked(payload.get("jti")):
+        return None
+    return payload
+
+
+def token_subject(token: str) -> Optional[str]:
+    """Email a valid bearer token was issued to, or None; per-user rate limits key on it"""
+    payload = verified_payload(token)
+    return payload.get("sub") if payload is not None else None
+
+
+async def resolve_profile(token: str, db: AsyncSession) -> Optional[dict]:
+    """Cached profile of the user a bearer token belongs to, or None if the token is invalid"""
     
-    payload = decode_access_token(token)
+    payload = verified_payload(token)
     if payload is None:
-        raise credentials_exception
+        return None
     
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
+        return None
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
+    profile = await auth_cache.get_profile(email)
+    if profile is None:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        profile = {
+            "user_id": user.user_id,
+            "email": user.email,
+            "firstName": user.firstname,
+            "lastName": user.lastname,
+            "role": user.role
+        }
+        await auth_cache.put_profile(email, profile, payload.get("exp"))
     
-    return UserResponse(
-        email=user.email,
-        firstName=user.firstname,
-        lastName=user.lastname
-    )
+    return profile
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Dependency resolving the bearer token to the user's cached profile
+    
+    The profile carries user_id, email, firstName, lastName and role
+    """
+    
+    profile = await resolve_profile(token, db)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return profile
+
+
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[dict]:
+    """Dependency like get_current_user for routes guests may use; None without a token"""
+    if token is None:
+        return None
+    return await get_current_user(token, db)
+
+
+async def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """Dependency allowing only users with the admin role"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(current_user: dict = Depends(get_current_user)):
+    """
+    Get current authenticated user information
+    
+    Requires valid JWT token in Authorization header
+    """
+    return UserResponse(**current_user)
 
 
 @router.post("/logout")
-async def logout_user():
+async def logout_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """
-    Logout user (client should delete the token)
+    Logout user by revoking the token's jti
+    
+    The token stops working at once in this worker and within
+    TOKEN_REVOCATION_SYNC_SECONDS in the others.
     """
+    payload = verified_payload(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if jti and exp:
+        db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(exp)))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent logout, possibly in another worker, revoked it first
+            await db.rollback()
+        revocation_list.add(jti, exp)
+    auth_cache.forget_token(token)
     return {"message": "Successfully logged out"}
@@ -0,0 +1,214 @@
+"""
+Chat Routes
+Repository-grounded answers streamed token by token over Server-Sent Events
+"""
+
+import asyncio
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.chat.providers import ChatProvider, create_provider
+from app.chat.retrieval import decode_index, search
+from app.chat.stats import chat_stats
+from app.config.settings import get_settings
+from app.models.analysis import RetrievalIndex
+from app.models.user import Repository
+from app.routes.auth import get_optional_user
+from app.utils.cache import TTLCache
+from app.utils.database import get_db
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/chat", tags=["Chat"])
+
+# Decoded indexes per (user, repository); an analysed repository's index never changes
+index_cache = TTLCache(settings.CHAT_INDEX_CACHE_ENTRIES)
+INDEX_CACHE_TTL_SECONDS = 3600
+
+SYSTEM_PROMPT = (
+    "You are DevLens, an assistant that answers questions about a software repository "
+    "using the analysis context below. Cite the sources you use by their [number]. "
+    "If the context does not contain the answer, say so instead of guessing."
+)
+
+
+# ==================== Pydantic Models ====================
+
+# Earlier turns are clipped rather than rejected, since the client sends back whole answers
+HISTORY_TEXT_MAX_CHARS = 4000
+
+
+class ChatMessage(BaseModel):
+    """A previous turn of the conversation"""
+    role: Literal["user", "assistant"]
+    text: str
+
+    @field_validator("text")
+    @classmethod
+    def clip_text(cls, text: str) -> str:
+        return text[:HISTORY_TEXT_MAX_CHARS]
+
+
+class ChatRequest(BaseModel):
+    """Chat request model"""
+    message: str = Field(..., min_length=1, max_length=4000)
+    repo_id: Optional[int] = None
+    history: list[ChatMessage] = Field(default_factory=list, max_length=10)
+
+
+# ==================== Helpers ====================
+
+@lru_cache()
+def get_provider() -> ChatProvider:
+    """The configured provider, created on first use"""
+    return create_provider(
+        settings.CHAT_PROVIDER,
+        api_key=settings.GEMINI_API_KEY,
+        model=settings.GEMINI_MODEL,
+        token_delay=settings.CHAT_LOCAL_TOKEN_DELAY
+    )
+
+
+async def load_index(db: AsyncSession, user_id: int, repo_id: int) -> dict:
+    """The latest retrieval index of a repository the user owns, or 404"""
+    key = (user_id, repo_id)
+    index = index_cache.get(key)
+    if index is not None:
+        return index
+
+    payload = await db.scalar(
+        select(RetrievalIndex.payload)
+        .join(Repository, Repository.repo_id == RetrievalIndex.repo_id)
+        .where(RetrievalIndex.repo_id == repo_id, Repository.user_id == user_id)
+        .order_by(RetrievalIndex.report_id.desc())
+        .limit(1)
+    )
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No analysed repository to chat about"
+        )
+    index = await asyncio.to_thread(decode_index, payload)
+    index_cache.set(key, index, INDEX_CACHE_TTL_SECONDS)
+    return index
+
+
+def retrieve(index: dict, request_data: ChatRequest) -> list:
+    """The overview chunk plus the best matches for the question and the last user turn"""
+    query = request_data.message
+    previous = [m.text for m in request_data.history if m.role == "user"]
+    if previous:
+        query = f"{previous[-1]}\n{query}"
+    chunks = [c for c in index["chunks"][:1] if c["kind"] == "overview"]
+    chunks += [c for c in search(index, query, settings.CHAT_TOP_K) if c not in chunks]
+    return chunks
+
+
+def build_prompt(chunks: list, request_data: ChatRequest, max_chars: int) -> tuple:
+    """Prompt text and the chunks that fit in it; lower-ranked chunks are dropped first"""
+    tail = []
+    if request_data.history:
+        tail.append("Conversation so far:")
+        tail += [f"{m.role.capitalize()}: {m.text}" for m in request_data.history]
+        tail.append("")
+    tail.append(f"Question: {request_data.message}")
+    tail = "\n".join(tail)
+
+    budget = max_chars - len(SYSTEM_PROMPT) - len(tail)
+    context = []
+    used = []
+    for chunk in chunks:
+        block = f"[{len(used) + 1}] {chunk['title']}\n{chunk['text']}\n"
+        if len(block) > budget:
+            continue
+        budget -= len(block)
+        context.append(block)
+        used.append(chunk)
+
+    parts = [SYSTEM_PROMPT, ""]
+    if context:
+        parts += ["Context:", *context]
+    parts.append(tail)
+    return "\n".join(parts), used
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# ==================== Chat Routes ====================
+
+@router.post("")
+async def chat(
+    request_data: ChatRequest,
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Answer a question about a repository, streamed as Server-Sent Events
+
+    Emits `token` events as the model produces text, then one `done` event
+    with the sources and timings (or `error`). Closing the connection
+    cancels generation upstream. Guests may chat without a repository
+    context; grounding in an analysed repository needs its owner's token.
+    """
+    started = time.perf_counter()
+    chunks = []
+    if request_data.repo_id is not None:
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Log in to chat about an analysed repository",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        index = await load_index(db, current_user["user_id"], request_data.repo_id)
+        chunks = retrieve(index, request_data)
+    await db.close()
+
+    prompt, used = build_prompt(chunks, request_data, settings.CHAT_MAX_PROMPT_CHARS)
+    retrieval_ms = (time.perf_counter() - started) * 1000
+    provider = get_provider()
+
+    async def events():
+        ttft = None
+        outcome = "cancelled"
+        try:
+            async for text in provider.stream(prompt):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                yield sse("token", {"text": text})
+            outcome = "completed"
+            yield sse("done", {
+                "sources": [c["title"] for c in used],
+                "ttft_ms": round((ttft or 0) * 1000, 1),
+                "retrieval_ms": round(retrieval_ms, 1),
+                "prompt_chars": len(prompt),
+                "prompt_tokens": len(prompt) // 4,
+            })
+        except Exception:
+            outcome = "errors"
+            logger.exception("Chat generation failed with provider %s", provider.name)
+            yield sse("error", {"detail": "The model failed to answer, please retry"})
+        finally:
+            chat_stats.record(outcome, ttft, len(prompt))
+            logger.info(
+                "chat provider=%s outcome=%s ttft_ms=%s prompt_chars=%d sources=%d",
+                provider.name, outcome, round(ttft * 1000, 1) if ttft is not None else None,
+                len(prompt), len(used)
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,118 @@
+"""
+Compare Routes
+Side-by-side metric summaries for several of a user's repositories
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config.settings import get_settings
+from app.models.user import Repository
+from app.routes.auth import get_current_user
+from app.routes.reports import SUMMARY_COLUMNS, ReportSummary
+from app.utils.cache import create_cache_backend
+from app.utils.database import get_db
+
+settings = get_settings()
+
+router = APIRouter(prefix="/compare", tags=["Compare"])
+
+compare_cache = create_cache_backend(settings.CACHE_BACKEND_URL, settings.COMPARE_CACHE_MAX_ENTRIES)
+
+
+# ==================== Pydantic Models ====================
+
+class RepositorySummary(BaseModel):
+    """One repository's column in a comparison"""
+    repo_id: int
+    repo_link: str
+    timestamp: Optional[datetime] = None
+    report: Optional[ReportSummary] = None  # latest report; null while the analysis is pending
+
+
+class CompareResponse(BaseModel):
+    """Comparison response model"""
+    repositories: list[RepositorySummary]
+    missing: list[int]  # requested ids that do not exist or belong to someone else
+
+
+# ==================== Helpers ====================
+
+def parse_repo_ids(repo_ids: str) -> list:
+    """Comma-separated ids, de-duplicated in request order"""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in repo_ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="repo_ids must be a comma-separated list of integers"
+        )
+    if not ids or len(ids) > settings.COMPARE_MAX_REPOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Compare between 1 and {settings.COMPARE_MAX_REPOS} repositories"
+        )
+    return ids
+
+
+async def load_summaries(db: AsyncSession, user_id: int, ids: list) -> dict:
+    """
+    Summaries by repo id in two queries, whatever the number of repositories
+
+    Reports come in through selectinload restricted to the summary columns,
+    so no report payload is read.
+    """
+    repositories = (await db.scalars(
+        select(Repository)
+        .where(Repository.repo_id.in_(ids), Repository.user_id == user_id)
+        .options(selectinload(Repository.report).load_only(*SUMMARY_COLUMNS))
+    )).all()
+
+    summaries = {}
+    for repository in repositories:
+        latest = max(repository.report, key=lambda r: (r.timestamp, r.report_id), default=None)
+        summaries[repository.repo_id] = RepositorySummary(
+            repo_id=repository.repo_id,
+            repo_link=repository.repo_link,
+            timestamp=repository.timestamp,
+            report=ReportSummary.model_validate(latest) if latest is not None else None
+        ).model_dump(mode="json")
+    return summaries
+
+
+# ==================== Compare Routes ====================
+
+@router.get("", response_model=CompareResponse)
+async def compare_repositories(
+    repo_ids: str = Query(..., description="Comma-separated repository ids, e.g. 1,2,3"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compare the latest report summaries of up to COMPARE_MAX_REPOS repositories
+
+    Results are cached per user and repository set. Each analysis gets its own
+    repository row and reports are never rewritten, so only complete results
+    (every repository found and analysed) are cached and they cannot go stale.
+    """
+    ids = parse_repo_ids(repo_ids)
+    key = f"compare:{current_user['user_id']}:{','.join(map(str, sorted(ids)))}"
+
+    summaries = await compare_cache.get(key)
+    if summaries is None:
+        summaries = await load_summaries(db, current_user["user_id"], ids)
+        if len(summaries) == len(ids) and all(s["report"] is not None for s in summaries.values()):
+            await compare_cache.set(key, summaries, settings.COMPARE_CACHE_TTL_SECONDS)
+
+    # JSON round trips through a shared backend turn the int keys into strings
+    summaries = {int(repo_id): summary for repo_id, summary in summaries.items()}
+    return CompareResponse(
+        repositories=[summaries[repo_id] for repo_id in ids if repo_id in summaries],
+        missing=[repo_id for repo_id in ids if repo_id not in summaries]
+    )
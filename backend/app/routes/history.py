@@ -0,0 +1,165 @@
+"""
+Analysis History Routes
+A user's past analyses, newest first, in keyset-paginated pages
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import AnalysisJob
+from app.models.user import Repository, Report
+from app.routes.auth import get_current_user
+from app.routes.reports import SUMMARY_COLUMNS, ReportSummary
+from app.utils.database import get_db
+
+router = APIRouter(prefix="/me", tags=["History"])
+
+
+# ==================== Pydantic Models ====================
+
+class AnalysisHistoryItem(BaseModel):
+    """One submitted analysis with its job state and latest report summary"""
+    repo_id: int
+    repo_link: str
+    timestamp: datetime
+    job_id: Optional[int] = None
+    status: Optional[str] = None
+    report: Optional[ReportSummary] = None
+
+
+class AnalysisHistoryPage(BaseModel):
+    """A page of analyses; pass `next_cursor` back as `cursor` for the next one"""
+    items: list[AnalysisHistoryItem]
+    next_cursor: Optional[str] = None
+
+
+# ==================== Helpers ====================
+
+def encode_cursor(timestamp: datetime, repo_id: int) -> str:
+    """Opaque cursor naming the last row of a page by its (timestamp, repo_id) key"""
+    raw = json.dumps([timestamp.isoformat(), repo_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, repo_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(repo_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def history_query(
+    user_id: int,
+    limit: int,
+    after: Optional[tuple] = None,
+    repo_link: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None
+):
+    """
+    One page of a user's repositories, newest first
+
+    Rows are read in (user_id, [repo_link,] timestamp, repo_id) index order
+    and the page starts strictly after the cursor's key, so every page costs
+    the same index seek however deep it is, unlike OFFSET which walks and
+    discards every earlier row.
+    """
+    query = select(Repository.repo_id, Repository.repo_link, Repository.timestamp).where(Repository.user_id == user_id)
+    if repo_link is not None:
+        query = query.where(Repository.repo_link == repo_link)
+    if since is not None:
+        query = query.where(Repository.timestamp >= datetime.combine(since, time.min))
+    if until is not None:
+        query = query.where(Repository.timestamp < datetime.combine(until + timedelta(days=1), time.min))
+    if after is not None:
+        timestamp, repo_id = after
+        # (timestamp, repo_id) < cursor, spelled with a plain upper bound first so the
+        # index is entered at the cursor instead of walked from the newest row
+        query = query.where(
+            Repository.timestamp <= timestamp,
+            or_(Repository.timestamp < timestamp, Repository.repo_id < repo_id)
+        )
+    return query.order_by(Repository.timestamp.desc(), Repository.repo_id.desc()).limit(limit)
+
+
+def latest_per_repo(repo_id, columns: list, order: tuple, repo_ids: list):
+    """
+    Newest row (as `columns`) for each of the page's repositories, in one windowed query
+
+    ROW_NUMBER() needs window function support: MySQL 8.0+ or SQLite 3.25+.
+    """
+    rank = func.row_number().over(partition_by=repo_id, order_by=order).label("rank")
+    ranked = select(*columns, rank).where(repo_id.in_(repo_ids)).subquery()
+    return select(*[column for column in ranked.c if column.name != "rank"]).where(ranked.c.rank == 1)
+
+
+# ==================== History Routes ====================
+
+@router.get("/analyses", response_model=AnalysisHistoryPage)
+async def list_analyses(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    repo: Optional[str] = Query(None, max_length=100, description="Only analyses of this repository link"),
+    since: Optional[date] = Query(None, alias="from"),
+    until: Optional[date] = Query(None, alias="to"),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List the current user's analyses, newest first
+
+    Three queries per page whatever its depth: the keyset page of
+    repositories, then the latest job and the latest report summary of
+    just those repositories.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    rows = (await db.execute(
+        history_query(current_user["user_id"], limit + 1, after, repo, since, until)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return AnalysisHistoryPage(items=[])
+
+    repo_ids = [row.repo_id for row in rows]
+    jobs = {
+        job.repo_id: job
+        for job in (await db.execute(latest_per_repo(
+            AnalysisJob.repo_id, [AnalysisJob.repo_id, AnalysisJob.job_id, AnalysisJob.status], (AnalysisJob.job_id.desc(),), repo_ids
+        ))).all()
+    }
+    reports = {
+        report.repo_id: report
+        for report in (await db.execute(latest_per_repo(
+            Report.repo_id, SUMMARY_COLUMNS, (Report.timestamp.desc(), Report.report_id.desc()), repo_ids
+        ))).all()
+    }
+
+    items = [
+        AnalysisHistoryItem(
+            repo_id=row.repo_id,
+            repo_link=row.repo_link,
+            timestamp=row.timestamp,
+            job_id=jobs[row.repo_id].job_id if row.repo_id in jobs else None,
+            status=jobs[row.repo_id].status if row.repo_id in jobs else None,
+            report=ReportSummary.model_validate(reports[row.repo_id]) if row.repo_id in reports else None,
+        )
+        for row in rows
+    ]
+    last = rows[-1]
+    return AnalysisHistoryPage(
+        items=items,
+        next_cursor=encode_cursor(last.timestamp, last.repo_id) if has_more else None
+    )
@@ -0,0 +1,51 @@
+"""
+Monitoring Routes
+Prometheus metrics and stored request profiles
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse, Response
+from starlette.datastructures import Headers
+
+from app.config.settings import get_settings
+from app.routes.auth import require_admin, resolve_profile
+from app.utils.database import open_session
+from app.utils.instrumentation import profile_store
+from app.utils.metrics import CONTENT_TYPE, registry
+
+settings = get_settings()
+
+router = APIRouter(tags=["Monitoring"])
+
+
+async def profile_allowed(scope: dict) -> bool:
+    """Whether the request's bearer token belongs to an admin; gates the X-Profile header"""
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    db = open_session()
+    try:
+        profile = await resolve_profile(token, db)
+    finally:
+        await db.close()
+    return profile is not None and profile.get("role") == "admin"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, database and pool metrics in the Prometheus text format"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, current_user: dict = Depends(require_admin)):
+    """
+    Sampled stacks of a request sent with `X-Profile: 1`, in the folded
+    format flame graph tools read
+    """
+    profile = profile_store.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(profile)
@@ -0,0 +1,235 @@
+"""
+Report Routes
+Report summaries and stored metrics for a user's repositories
+"""
+
+import hashlib
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analysis.timeseries import SERIES, decode_points, select_series
+from app.models.user import Repository, Report, ReportSeries
+from app.routes.auth import get_current_user
+from app.utils.database import get_db
+from app.utils.report_cache import ReportBody, negotiate, report_bodies
+
+router = APIRouter(prefix="/repositories", tags=["Reports"])
+
+# Everything but the payload, so listings never read or decompress report bodies
+SUMMARY_COLUMNS = (
+    Report.report_id, Report.repo_id, Report.timestamp, Report.payload_size,
+    Report.loc_total, Report.file_count, Report.function_count, Report.complexity_total,
+    Report.commit_count, Report.duplication_pct, Report.churn_rate,
+)
+
+
+# ==================== Pydantic Models ====================
+
+class ReportSummary(BaseModel):
+    """Report summary response model"""
+    model_config = ConfigDict(from_attributes=True)
+
+    report_id: int
+    repo_id: int
+    timestamp: datetime
+    payload_size: Optional[int] = None
+    loc_total: Optional[int] = None
+    file_count: Optional[int] = None
+    function_count: Optional[int] = None
+    complexity_total: Optional[int] = None
+    commit_count: Optional[int] = None
+    duplication_pct: Optional[float] = None
+    churn_rate: Optional[float] = None
+
+
+def report_not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Report not found"
+    )
+
+
+def series_not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Series not found"
+    )
+
+
+# Stored reports never change, so a report id (plus the query) identifies a response body;
+# clients revalidate with If-None-Match and get a 304 without the body being read or sent
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+VARY_HEADERS = {**CACHE_HEADERS, "Vary": "Accept-Encoding"}
+
+
+def report_etag(report_id: int, *parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16] if parts else "full"
+    return f'"r{report_id}-{digest}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETags name exact bytes, so each content coding of a body gets its own"""
+    return etag if encoding == "identity" else f'{etag[:-1]}.{encoding}"'
+
+
+def not_modified(request: Request, *etags: str) -> Optional[str]:
+    """Which of these ETags the request's If-None-Match already names, if any"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return next((etag for etag in etags if "*" in tags or etag in tags), None)
+
+
+async def owned_report_id(db: AsyncSession, repo_id: int, user_id: int, report_id: Optional[int] = None) -> int:
+    """The given report, or the newest one with a payload, if the repository belongs to the user"""
+    query = (
+        select(Report.report_id)
+        .join(Repository, Repository.repo_id == Report.repo_id)
+        .where(Report.repo_id == repo_id, Repository.user_id == user_id, Report.payload.is_not(None))
+    )
+    if report_id is not None:
+        query = query.where(Report.report_id == report_id)
+    found = await db.scalar(query.order_by(Report.timestamp.desc(), Report.report_id.desc()).limit(1))
+    if found is None:
+        raise report_not_found()
+    return found
+
+
+# ==================== Report Routes ====================
+
+@router.get("/{repo_id}/reports", response_model=list[ReportSummary])
+async def list_reports(
+    repo_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List a repository's reports, newest first, from the summary columns only
+    """
+    rows = (await db.execute(
+        select(*SUMMARY_COLUMNS)
+        .join(Repository, Repository.repo_id == Report.repo_id)
+        .where(Report.repo_id == repo_id, Repository.user_id == current_user["user_id"])
+        .order_by(Report.timestamp.desc(), Report.report_id.desc())
+        .limit(limit)
+    )).all()
+    return [ReportSummary.model_validate(row) for row in rows]
+
+
+@router.get("/{repo_id}/reports/latest")
+async def latest_report(
+    repo_id: int,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the metrics JSON of a repository's most recent report
+
+    The newest report is found on the (repo_id, timestamp) index; when the
+    client already holds it (If-None-Match) the answer is a 304 and the
+    payload is never read. Otherwise the body is sent exactly as it was
+    compressed when the report was written, in the best coding the client
+    accepts (brotli, gzip, else inflated), from the per-worker cache of hot
+    reports or else the database.
+    """
+    report_id = await owned_report_id(db, repo_id, current_user["user_id"])
+    etag = report_etag(report_id)
+    held = not_modified(request, *(encoded_etag(etag, encoding) for encoding in ("gzip", "br", "identity")))
+    if held:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": held, **VARY_HEADERS})
+
+    body = report_bodies.get(report_id)
+    if body is None:
+        row = (await db.execute(
+            select(Report.payload, Report.payload_br).where(Report.report_id == report_id)
+        )).one()
+        body = ReportBody(gzip=row.payload, br=row.payload_br)
+        report_bodies.set(report_id, body, body.size)
+
+    encoding = negotiate(request.headers.get("accept-encoding"), body.encodings)
+    headers = {"ETag": encoded_etag(etag, encoding), **VARY_HEADERS}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body.content(encoding), media_type="application/json", headers=headers)
+
+
+@router.get("/{repo_id}/reports/latest/timeseries/{series}")
+async def latest_timeseries(
+    repo_id: int,
+    series: str,
+    request: Request,
+    since: Optional[date] = Query(None, alias="from"),
+    until: Optional[date] = Query(None, alias="to"),
+    max_points: int = Query(500, ge=3, le=10000),
+    resolution: Literal["auto", "day", "week", "month"] = "auto",
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a time series of a repository's most recent report; see report_timeseries"""
+    report_id = await owned_report_id(db, repo_id, current_user["user_id"])
+    return await timeseries_response(db, request, report_id, series, since, until, max_points, resolution)
+
+
+@router.get("/{repo_id}/reports/{report_id}/timeseries/{series}")
+async def report_timeseries(
+    repo_id: int,
+    report_id: int,
+    series: str,
+    request: Request,
+    since: Optional[date] = Query(None, alias="from"),
+    until: Optional[date] = Query(None, alias="to"),
+    max_points: int = Query(500, ge=3, le=10000),
+    resolution: Literal["auto", "day", "week", "month"] = "auto",
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a report's loc, complexity or activity series in at most `max_points` points
+
+    Served from the day/week/month rollups stored with the report: `auto`
+    returns the finest one that fits the `from`/`to` window, and falls back
+    to an LTTB-downsampled series when none does.
+    """
+    report_id = await owned_report_id(db, repo_id, current_user["user_id"], report_id)
+    return await timeseries_response(db, request, report_id, series, since, until, max_points, resolution)
+
+
+async def timeseries_response(
+    db: AsyncSession,
+    request: Request,
+    report_id: int,
+    series: str,
+    since: Optional[date],
+    until: Optional[date],
+    max_points: int,
+    resolution: str
+) -> Response:
+    if series not in SERIES:
+        raise series_not_found()
+    since_text = since.isoformat() if since else None
+    until_text = until.isoformat() if until else None
+    etag = report_etag(report_id, series, since_text, until_text, max_points, resolution)
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **CACHE_HEADERS})
+
+    rows = (await db.execute(
+        select(ReportSeries.resolution, ReportSeries.payload)
+        .where(ReportSeries.report_id == report_id, ReportSeries.series == series)
+    )).all()
+    if not rows:
+        raise series_not_found()
+    rollups = {row.resolution: decode_points(row.payload) for row in rows}
+    body = select_series(rollups, series, max_points, since_text, until_text, resolution)
+    return JSONResponse(
+        content={"report_id": report_id, "from": since_text, "to": until_text, **body},
+        headers={"ETag": etag, **CACHE_HEADERS}
+    )
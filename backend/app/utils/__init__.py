@@ -1,12 +1,20 @@
 """Utils package initialization"""
-from .database import get_db, init_db
-from .auth import hash_password, verify_password, create_access_token, validate_password_strength
-
-__all__ = [
-    "get_db",
-    "init_db",
-    "hash_password",
-    "verify_password",
-    "create_access_token",
-    "validate_password_strength"
-]
+from importlib import import_module
+
+# Resolved on first access, so importing one utility does not load the others
+_EXPORTS = {
+    "get_db": "database",
+    "init_db": "database",
+    "hash_password": "auth",
+    "verify_password": "auth",
+    "create_access_token": "auth",
+    "validate_password_strength": "auth",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
@@ -6,6 +6,7 @@ Password hashing and JWT token management
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import uuid4
 import jwt
 from app.config.settings import get_settings
 
@@ -26,8 +27,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+    """Create JWT access token with a unique `jti`, so logout can revoke it"""
     to_encode = data.copy()
+    to_encode.setdefault("jti", uuid4().hex)
     
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
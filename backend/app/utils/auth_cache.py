@@ -0,0 +1,99 @@
+"""
+Authentication cache
+Verified JWT payloads and user profiles for the /auth/me fast path
+"""
+
+import time
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.utils.cache import CacheBackend, TTLCache, create_cache_backend
+
+settings = get_settings()
+
+
+class AuthCache:
+    """
+    Two-level cache for authenticated requests
+
+    Decoded token payloads are immutable, so they stay in a per-process
+    TTL/LRU cache keyed by the token signature. User profiles can change, so
+    they go to the (possibly shared) backend keyed by email, where
+    invalidate_user() reaches every worker. No entry outlives its token's exp.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 300, max_entries: int = 10000, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._tokens = TTLCache(max_entries)
+        self.counters = {
+            "token_hits": 0,
+            "token_misses": 0,
+            "profile_hits": 0,
+            "profile_misses": 0,
+        }
+
+    def _ttl_for(self, expires_at: Optional[float]) -> float:
+        if expires_at is None:
+            return self.ttl
+        return min(self.ttl, expires_at - time.time())
+
+    @staticmethod
+    def _profile_key(email: str) -> str:
+        return f"profile:{email.lower()}"
+
+    def get_token(self, token: str) -> Optional[dict]:
+        """Return the cached payload for an already verified token"""
+        if not self.enabled:
+            return None
+        entry = self._tokens.get(token.rsplit(".", 1)[-1])
+        # Compare the whole token so a reused signature cannot pick up another payload
+        if entry is not None and entry[0] == token:
+            self.counters["token_hits"] += 1
+            return entry[1]
+        self.counters["token_misses"] += 1
+        return None
+
+    def put_token(self, token: str, payload: dict):
+        """Remember a verified token payload until its exp"""
+        if self.enabled:
+            self._tokens.set(token.rsplit(".", 1)[-1], (token, payload), self._ttl_for(payload.get("exp")))
+
+    def forget_token(self, token: str):
+        """Drop a token from the local cache"""
+        self._tokens.delete(token.rsplit(".", 1)[-1])
+
+    async def get_profile(self, email: str) -> Optional[dict]:
+        """Return the cached profile for a user"""
+        if not self.enabled:
+            return None
+        profile = await self.backend.get(self._profile_key(email))
+        self.counters["profile_hits" if profile is not None else "profile_misses"] += 1
+        return profile
+
+    async def put_profile(self, email: str, profile: dict, expires_at: Optional[float] = None):
+        """Cache a user profile, never past the exp of the token that loaded it"""
+        if self.enabled:
+            await self.backend.set(self._profile_key(email), profile, self._ttl_for(expires_at))
+
+    async def invalidate_user(self, email: str):
+        """Drop a user's cached profile after it is created or changed"""
+        await self.backend.delete(self._profile_key(email))
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit ratios"""
+        stats = dict(self.counters)
+        for kind in ("token", "profile"):
+            total = stats[f"{kind}_hits"] + stats[f"{kind}_misses"]
+            stats[f"{kind}_hit_ratio"] = round(stats[f"{kind}_hits"] / total, 4) if total else 0.0
+        stats["local_tokens"] = len(self._tokens)
+        return stats
+
+
+auth_cache = AuthCache(
+    create_cache_backend(settings.CACHE_BACKEND_URL, settings.AUTH_CACHE_MAX_ENTRIES),
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    enabled=settings.AUTH_CACHE_ENABLED
+)
@@ -0,0 +1,185 @@
+"""
+Caching primitives
+In-process TTL/LRU and size-bounded LRU caches, and pluggable shared cache backends
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries carry their own expiry
+
+    Expiry is wall-clock (time.time) so callers can align it with JWT `exp`.
+    Expired entries are dropped lazily on access and by LRU eviction.
+    """
+
+    def __init__(self, max_entries: int = 10000, clock=time.time):
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SizedLRU:
+    """
+    In-process LRU cache bounded by the total size of its values
+
+    Callers give each value's size in bytes; least recently used entries are
+    evicted until the total fits `max_bytes`. A value bigger than the whole
+    budget is not stored at all.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, size: int) -> bool:
+        """Store a value; False when it is too big to cache"""
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return False
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.counters["evictions"] += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_ratio": round(self.counters["hits"] / total, 4) if total else 0.0,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheBackend:
+    """Interface for caches shared between uvicorn workers"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process backend
+
+    The default for single-worker setups and the stand-in for a shared
+    backend in tests: hand one instance to several consumers to simulate
+    several workers talking to the same store.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._cache = TTLCache(max_entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        self._cache.delete(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis backend; values are stored as JSON"""
+
+    def __init__(self, url: str, prefix: str = "devlens:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        if ttl > 0:
+            await self._client.set(self._prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self._client.delete(self._prefix + key)
+
+
+def create_cache_backend(url: str, max_entries: int = 10000) -> CacheBackend:
+    """Build the cache backend named by a CACHE_BACKEND_URL value"""
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend(max_entries)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
@@ -2,36 +2,173 @@
 Database connection and session management
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+# Async driver for each sync backend that DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+    "postgresql": "asyncpg",
+}
+
+
+def make_async_url(url: str) -> str:
+    """Translate a sync DATABASE_URL to the matching async driver URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database backend '{backend}'")
+    if parsed.get_driver_name() in ("aiosqlite", "aiomysql", "asyncmy", "asyncpg"):
+        return url
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """Connection pool options shared by the sync and async engines"""
+    options = {"pool_pre_ping": True, "pool_recycle": 3600}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory SQLite lives on a single static connection
+            return options
+        if parsed.get_driver_name() == "aiosqlite":
+            # aiosqlite defaults to NullPool, which reopens the file on every session
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    return options
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, used by the request handlers
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_url = make_async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
 
-def get_db():
+def reset_pools_after_fork():
+    """
+    Forget pooled connections inherited from a parent process
+
+    A forked worker must open its own connections; using the parent's would
+    interleave several processes on one socket. close=False leaves those
+    sockets to the parent instead of closing them underneath it.
+    """
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+class SyncSessionAdapter:
+    """
+    Awaitable facade over a sync Session
+
+    Lets the routes use one AsyncSession-style code path when DATABASE_ASYNC
+    is off. Every call still blocks the event loop, exactly like the old sync
+    handlers did; this mode exists for comparison and for drivers without an
+    async counterpart.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.sync_session.scalar(statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        self.sync_session.delete(instance)
+
+    async def flush(self):
+        self.sync_session.flush()
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def refresh(self, instance):
+        self.sync_session.refresh(instance)
+
+    async def close(self):
+        self.sync_session.close()
+
+
+def open_session():
+    """New session in the configured mode; the caller must close it"""
+    if AsyncSessionLocal is not None:
+        return AsyncSessionLocal()
+    return SyncSessionAdapter(SessionLocal())
+
+
+async def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
+    db = open_session()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def ping_database(timeout: float) -> dict:
+    """Run SELECT 1 on the engine the routes use; readiness and latency for /health"""
+    def ping_sync():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def ping():
+        if async_engine is None:
+            await asyncio.to_thread(ping_sync)
+            return
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping(), timeout)
+    except asyncio.TimeoutError:
+        return {"ready": False, "error": f"No response within {timeout}s"}
+    except Exception as e:
+        # /health is public, so only the exception type is reported
+        return {"ready": False, "error": type(e).__name__}
+    return {"ready": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
 
 
 def init_db():
-    """Initialize database - create all tables"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database - create all tables and apply pending migrations"""
+    from app.utils.migrations import migrate
+    migrate(engine)
@@ -0,0 +1,105 @@
+"""
+Password hashing executor
+Runs bcrypt hashing and verification off the event loop in a bounded pool
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.utils.auth import hash_password, verify_password
+
+settings = get_settings()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool has no room for more work"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Bounded bcrypt executor
+
+    At most `workers` hashes run at once and at most `max_pending` more wait
+    in the queue. Anything beyond that is shed with PasswordHasherBusy so a
+    login burst cannot pile up unbounded work behind the event loop.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_pending: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash pool kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Total number of jobs that may be running or queued"""
+        return self.workers + self.max_pending
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running or queued"""
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Release on completion rather than when the caller stops waiting, so a
+        # disconnected client still counts until its bcrypt round is done
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """Hash password in the pool"""
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password in the pool"""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        """Stop the pool, waiting for running jobs to finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    kind=settings.PASSWORD_HASH_POOL,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
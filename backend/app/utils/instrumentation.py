@@ -0,0 +1,307 @@
+"""
+Performance instrumentation
+Per-route latency, database query timing, connection pool gauges and an on-demand sampling profiler
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config.settings import get_settings
+from app.utils.metrics import registry
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Query latencies are much shorter than request latencies
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_LOG_CHARS = 500
+
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests being served", ["method"]
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"]
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement latency", ["engine", "operation"], QUERY_BUCKETS
+)
+db_slow_queries = registry.counter(
+    "db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_MS, by route", ["engine", "route"]
+)
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a pooled connection, including opening one", ["engine"],
+    QUERY_BUCKETS
+)
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "Pooled connections by state", ["engine", "state"]
+)
+db_pool_saturation = registry.gauge(
+    "db_pool_saturation", "Checked-out connections over pool_size + max_overflow", ["engine"]
+)
+
+# ASGI scope of the request being served, for labelling work done on its behalf
+current_request: ContextVar[Optional[dict]] = ContextVar("current_request", default=None)
+
+# Engines registered through instrument_engine(), by label
+instrumented_engines = {}
+
+
+def route_label(scope: Optional[dict]) -> str:
+    """Route template of a request ("/analyses/{job_id}"), so label values stay bounded"""
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+# ==================== Database ====================
+
+def _operation(statement: str) -> str:
+    verb = statement.lstrip()[:6].upper()
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def _wrap_pool(engine, name: str):
+    """Time pool.connect(); the pool has no event that fires before a checkout waits"""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start, engine=name)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(engine, name: str):
+    """Time every statement and pool checkout of a sync or async engine"""
+    engine = getattr(engine, "sync_engine", engine)
+    if name in instrumented_engines:
+        return
+    instrumented_engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        db_query_duration.observe(elapsed, engine=name, operation=_operation(statement))
+        if settings.DB_SLOW_QUERY_MS and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+            route = route_label(current_request.get())
+            db_slow_queries.inc(engine=name, route=route)
+            logger.warning(
+                "Slow query (%.1f ms, %s engine) on %s: %s",
+                elapsed * 1000, name, route, " ".join(statement.split())[:STATEMENT_LOG_CHARS]
+            )
+
+    # dispose() replaces the pool, so the replacement is wrapped again
+    event.listen(engine, "engine_disposed", lambda disposed: _wrap_pool(disposed, name))
+    _wrap_pool(engine, name)
+
+
+def pool_stats(engine) -> dict:
+    """Size, checked-out, idle and overflow connections of a queue pool"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        # Static and per-thread pools (in-memory SQLite) have no queue to saturate
+        return {"pool": type(pool).__name__}
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    capacity = size + max_overflow if max_overflow >= 0 else 0
+    return {
+        "pool": type(pool).__name__,
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+def all_pool_stats() -> dict:
+    return {name: pool_stats(engine) for name, engine in instrumented_engines.items()}
+
+
+def _collect_pool_gauges():
+    for name, stats in all_pool_stats().items():
+        if "size" not in stats:
+            continue
+        for state in ("checked_out", "idle", "overflow"):
+            db_pool_connections.set(stats[state], engine=name, state=state)
+        db_pool_saturation.set(stats["saturation"], engine=name)
+
+
+registry.on_collect(_collect_pool_gauges)
+
+
+# ==================== Profiler ====================
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack from a timer thread
+
+    Stacks are counted in the folded format flame graph tools read
+    ("outer;inner count" per line). The sampled thread runs the event loop,
+    so samples taken while the request awaits I/O show the loop and any
+    other request it was serving at the time.
+    """
+
+    def __init__(self, interval: float, max_seconds: float, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = StackCounter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="devlens-profiler", daemon=True)
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Finished profiles as files in a directory shared by the workers of a host
+
+    Any worker can then serve a profile recorded by another; only the newest
+    `keep` files are kept.
+    """
+
+    def __init__(self, root: str, keep: int = 20):
+        self.root = root
+        self.keep = keep
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.root, f"{profile_id}.folded")
+
+    def save(self, profile_id: str, header: str, profiler: SamplingProfiler):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(profile_id), "w") as f:
+            f.write(header)
+            f.write(profiler.folded())
+        profiles = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.root) if entry.name.endswith(".folded")
+        )
+        for _, path in profiles[:-self.keep]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def load(self, profile_id: str) -> Optional[str]:
+        try:
+            uuid.UUID(hex=profile_id)
+        except ValueError:
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+profile_store = ProfileStore(
+    settings.PROFILER_DIR or os.path.join(tempfile.gettempdir(), "devlens-profiles"),
+    settings.PROFILER_KEEP
+)
+
+
+# ==================== Middleware ====================
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording in-flight requests and per-route latency
+
+    The route template is read from the scope after the router has matched
+    it. Requests with an `X-Profile` header are profiled when
+    `authorize_profile` (an async check of the request scope) allows it; the
+    response then carries an `X-Profile-Id` naming the stored profile.
+    """
+
+    def __init__(self, app, authorize_profile: Optional[Callable[[dict], Awaitable[bool]]] = None):
+        self.app = app
+        self.authorize_profile = authorize_profile
+
+    async def _profiler(self, scope: dict) -> Optional[SamplingProfiler]:
+        if not settings.PROFILER_ENABLED or self.authorize_profile is None:
+            return None
+        if "x-profile" not in Headers(scope=scope) or not await self.authorize_profile(scope):
+            return None
+        return SamplingProfiler(settings.PROFILER_INTERVAL_MS / 1000, settings.PROFILER_MAX_SECONDS).start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500  # unless a response starts, the error handler answers 500
+        profiler = await self._profiler(scope)
+        profile_id = uuid.uuid4().hex if profiler else None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_id:
+                    MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        token = current_request.set(scope)
+        http_requests_in_progress.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method=method)
+            current_request.reset(token)
+            route = route_label(scope)
+            http_request_duration.observe(elapsed, method=method, route=route, status=str(status_code))
+            if profiler:
+                profiler.stop()
+                header = (
+                    f"# {method} {scope['path']} ({route}) -> {status_code} in {elapsed * 1000:.1f} ms, "
+                    f"{profiler.samples} samples every {settings.PROFILER_INTERVAL_MS} ms\n"
+                )
+                profile_store.save(profile_id, header, profiler)
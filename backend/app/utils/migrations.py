@@ -0,0 +1,185 @@
+"""
+Schema migrations
+Ordered, idempotent upgrades that bring databases created by older versions up to date
+
+Run with: python -m app.utils.migrations
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, inspect, select, text
+
+from app.utils.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = []
+
+
+class SchemaMigration(Base):
+    """Versions of the migrations already applied to this database"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+def migration(version: int, description: str):
+    """Register an upgrade step; steps run in version order and must be safe on new databases"""
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+# ==================== Helpers ====================
+
+def _columns(conn, table: str) -> set:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _add_missing_columns(conn, table: str, names: list):
+    """ALTER TABLE ADD COLUMN for model columns the table does not have yet"""
+    existing = _columns(conn, table)
+    model = Base.metadata.tables[table]
+    for name in names:
+        if name not in existing:
+            column_type = model.c[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+
+
+def _create_missing_indexes(conn, table: str):
+    existing = {index["name"] for index in inspect(conn).get_indexes(table)}
+    for index in Base.metadata.tables[table].indexes:
+        if index.name not in existing:
+            index.create(bind=conn)
+
+
+# ==================== Migrations ====================
+
+@migration(1, "report: compressed payload, summary columns, (repo_id, timestamp) index")
+def _report_payload(conn):
+    from app.analysis.reports import encode_metrics, summary_columns
+
+    _add_missing_columns(conn, "report", [
+        "payload", "payload_size", "loc_total", "file_count", "function_count",
+        "complexity_total", "commit_count", "duplication_pct", "churn_rate",
+    ])
+    _create_missing_indexes(conn, "report")
+
+    # Older versions kept the metrics JSON in a text column; move it into the payload
+    if "metrics" not in _columns(conn, "report"):
+        return
+    rows = conn.execute(text(
+        "SELECT report_id, metrics FROM report WHERE payload IS NULL AND metrics IS NOT NULL"
+    )).all()
+    report = Base.metadata.tables["report"]
+    for report_id, raw in rows:
+        try:
+            metrics = json.loads(raw)
+        except ValueError:
+            # String(1000) truncated larger reports; there is nothing to recover
+            logger.warning("Report %s has unreadable legacy metrics; left without payload", report_id)
+            continue
+        conn.execute(
+            report.update().where(report.c.report_id == report_id).values(
+                payload=encode_metrics(metrics),
+                payload_size=len(raw.encode("utf-8")),
+                **summary_columns(metrics)
+            )
+        )
+
+
+@migration(2, "analysis_jobs: history range columns")
+def _job_range(conn):
+    _add_missing_columns(conn, "analysis_jobs", ["range_from", "range_to"])
+
+
+@migration(3, "report_series: time-series rollups of existing reports")
+def _report_series(conn):
+    from app.analysis.reports import decode_metrics, series_rows
+
+    series = Base.metadata.tables["report_series"]
+    report = Base.metadata.tables["report"]
+    done = set(conn.execute(select(series.c.report_id).distinct()).scalars())
+    ids = conn.execute(select(report.c.report_id).where(report.c.payload.is_not(None))).scalars().all()
+    for report_id in ids:
+        if report_id in done:
+            continue
+        payload = conn.scalar(select(report.c.payload).where(report.c.report_id == report_id))
+        rows = series_rows(report_id, decode_metrics(payload))
+        if rows:
+            conn.execute(series.insert(), rows)
+
+
+@migration(4, "repository, analysis_jobs: covering indexes for the analysis history")
+def _history_indexes(conn):
+    _create_missing_indexes(conn, "repository")
+    _create_missing_indexes(conn, "analysis_jobs")
+
+
+@migration(5, "report: brotli-compressed copy of the payload")
+def _report_brotli(conn):
+    from app.analysis.reports import encode_brotli, metrics_json
+
+    _add_missing_columns(conn, "report", ["payload_br"])
+    report = Base.metadata.tables["report"]
+    ids = conn.execute(
+        select(report.c.report_id).where(report.c.payload.is_not(None), report.c.payload_br.is_(None))
+    ).scalars().all()
+    for report_id in ids:
+        payload = conn.scalar(select(report.c.payload).where(report.c.report_id == report_id))
+        compressed = encode_brotli(metrics_json(payload))
+        if compressed is None:
+            # Like reports written without brotli, these are then served as gzip
+            logger.warning("brotli is not installed; %d reports keep only their gzip payload", len(ids))
+            return
+        conn.execute(report.update().where(report.c.report_id == report_id).values(payload_br=compressed))
+
+
+# ==================== Runner ====================
+
+def pending_migrations(bind=engine) -> list:
+    """Missing tables and unapplied migrations; empty when the schema is current"""
+    import app.models  # noqa: F401  register every table on Base.metadata
+
+    existing = set(inspect(bind).get_table_names())
+    pending = [f"table {name}" for name in Base.metadata.tables if name not in existing]
+    done = set()
+    if SchemaMigration.__tablename__ in existing:
+        with bind.connect() as conn:
+            done = set(conn.execute(select(SchemaMigration.version)).scalars())
+    pending += [f"migration {version}" for version, _, _ in MIGRATIONS if version not in done]
+    return pending
+
+
+def migrate(bind=engine) -> list:
+    """Create missing tables, then apply pending migrations; returns the versions applied"""
+    import app.models  # noqa: F401  register every table on Base.metadata
+
+    Base.metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        done = set(conn.execute(select(SchemaMigration.version)).scalars())
+
+    applied = []
+    for version, description, fn in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            fn(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        logger.info("Applied migration %s: %s", version, description)
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    versions = migrate()
+    print(f"Applied migrations: {versions}" if versions else "Database is up to date")
@@ -0,0 +1,339 @@
+"""
+Rate limiting and admission control
+Token buckets per client IP, user or route, and concurrency caps on expensive
+routes, applied by an ASGI middleware before a request reaches its route
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.config.settings import get_settings
+
+settings = get_settings()
+
+SCOPES = ("ip", "user", "route")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """`limit` requests per `period` seconds for each client IP, user or the route as a whole"""
+    method: str
+    path: str  # exact, or a prefix when it ends in "*"
+    scope: str
+    limit: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens refilled per second; a full bucket allows a burst of `limit`"""
+        return self.limit / self.period
+
+
+def _route(method: str, path: str) -> tuple:
+    return method.upper(), path.rstrip("/") or "/"
+
+
+def parse_rules(spec: str) -> list:
+    """
+    Rules from a RATE_LIMIT_RULES value
+
+    Comma-separated "<METHOD> <path> <ip|user|route> <limit>/<seconds>"
+    entries, e.g. "POST /auth/login ip 10/60, POST /analyses user 5/60".
+    """
+    rules = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            method, path, scope, quota = entry.split()
+            limit, period = quota.split("/")
+            rule = Rule(*_route(method, path), scope.lower(), int(limit), float(period))
+        except ValueError as e:
+            raise ValueError(f"Invalid rate limit rule {entry!r}; expected '<METHOD> <path> <scope> <limit>/<seconds>'") from e
+        if rule.scope not in SCOPES or rule.limit < 1 or rule.period <= 0:
+            raise ValueError(f"Invalid rate limit rule {entry!r}; scope is one of {', '.join(SCOPES)}, limit and seconds > 0")
+        rules.append(rule)
+    return rules
+
+
+def parse_caps(spec: str) -> dict:
+    """(method, path) -> in-flight cap, from comma-separated "<METHOD> <path> <max>" entries"""
+    caps = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            method, path, cap = entry.split()
+            caps[_route(method, path)] = int(cap)
+        except ValueError as e:
+            raise ValueError(f"Invalid concurrency cap {entry!r}; expected '<METHOD> <path> <max>'") from e
+    return caps
+
+
+# ==================== Backends ====================
+
+class RateLimitBackend:
+    """Where token buckets live; shared between uvicorn workers unless in-process"""
+
+    async def take(self, buckets: list) -> float:
+        """
+        Take one token from each of a request's (key, limit, rate) buckets
+
+        All or nothing: 0 when every bucket had a token and each gave one,
+        else seconds until they all will, and no bucket is charged.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process buckets, at most `max_keys` of them
+
+    Each bucket is a token count and the time it was last refilled, updated
+    in O(1) per request. Past `max_keys` the least recently used bucket is
+    dropped. A stale bucket has refilled anyway, so the clients that lose
+    anything are only the ones idle longest while many new keys arrive.
+    Hand one instance to several limiters to stand in for a shared backend.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max(1, max_keys)
+        self.evictions = 0
+        self._clock = clock
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refilled(self, key: str, limit: int, rate: float, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(float(limit), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        return bucket
+
+    async def take(self, buckets: list) -> float:
+        now = self._clock()
+        with self._lock:
+            refilled = [(self._refilled(key, limit, rate, now), rate) for key, limit, rate in buckets]
+            wait = max((0.0, *((1 - bucket[0]) / rate for bucket, rate in refilled if bucket[0] < 1)))
+            if wait == 0:
+                for bucket, _ in refilled:
+                    bucket[0] -= 1
+            return wait
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+# Refill and take atomically on the Redis server's clock, so workers on different hosts agree;
+# ARGV holds a limit and a rate per key
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens, wait = {}, 0
+for i, key in ipairs(KEYS) do
+  local limit, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  local state = redis.call("HMGET", key, "tokens", "ts")
+  local ts = tonumber(state[2]) or now
+  tokens[i] = math.min(limit, (tonumber(state[1]) or limit) + math.max(0, now - ts) * rate)
+  if tokens[i] < 1 then
+    wait = math.max(wait, (1 - tokens[i]) / rate)
+  end
+end
+for i, key in ipairs(KEYS) do
+  local limit, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  if wait == 0 then
+    tokens[i] = tokens[i] - 1
+  end
+  redis.call("HSET", key, "tokens", tostring(tokens[i]), "ts", tostring(now))
+  redis.call("PEXPIRE", key, math.ceil((limit - tokens[i]) / rate * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Redis buckets that expire once they would be full again, so memory is bounded by active clients"""
+
+    def __init__(self, url: str, prefix: str = "devlens:rl:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, buckets: list) -> float:
+        keys = [self._prefix + key for key, _, _ in buckets]
+        args = [value for _, limit, rate in buckets for value in (limit, rate)]
+        return float(await self._script(keys=keys, args=args))
+
+
+def create_rate_limit_backend(url: str, max_keys: int = 100_000) -> RateLimitBackend:
+    """Build the bucket backend named by a CACHE_BACKEND_URL value"""
+    if not url or url.startswith("memory://"):
+        return MemoryRateLimitBackend(max_keys)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitBackend(url)
+    raise ValueError(f"Unsupported rate limit backend URL: {url}")
+
+
+# ==================== Limiter ====================
+
+class RateLimiter:
+    """
+    Rules and concurrency caps by route, and the bookkeeping of what they turned away
+
+    Exact routes are found with one dict lookup, so the work per request is
+    constant: a lookup, one backend call for the matching rules' buckets,
+    and a counter for a capped route. Concurrency caps count requests in flight in this worker.
+    """
+
+    def __init__(self, rules: list, caps: dict, backend: RateLimitBackend, trust_forwarded: bool = False):
+        self.backend = backend
+        self.trust_forwarded = trust_forwarded
+        self.caps = caps
+        self.inflight = {route: 0 for route in caps}
+        self.counters = {"limited": 0, "shed": 0}
+        self._exact: dict = {}
+        self._prefixed = []
+        for index, rule in enumerate(rules):
+            if rule.path.endswith("*"):
+                self._prefixed.append((index, rule))
+            else:
+                self._exact.setdefault((rule.method, rule.path), []).append((index, rule))
+
+    def rules_for(self, method: str, path: str) -> list:
+        route = _route(method, path)
+        matched = self._exact.get(route, [])
+        if self._prefixed:
+            matched = matched + [
+                (index, rule) for index, rule in self._prefixed
+                if rule.method == route[0] and route[1].startswith(rule.path[:-1])
+            ]
+        return matched
+
+    def client_ip(self, scope: dict) -> str:
+        if self.trust_forwarded:
+            forwarded = Headers(scope=scope).get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def retry_after(self, rules: list, ip: str, user: Optional[str]) -> float:
+        """
+        Charge the request to each matching rule's bucket; 0 when allowed
+
+        A request one rule turns away costs the others nothing, so a client
+        retrying against a per-user limit keeps its per-IP quota.
+        """
+        buckets = []
+        for index, rule in rules:
+            if rule.scope == "route":
+                who = "*"
+            elif rule.scope == "user" and user is not None:
+                who = f"user:{user}"
+            else:
+                # Anonymous requests to a per-user rule are limited by IP instead
+                who = f"ip:{ip}"
+            buckets.append((f"{index}:{who}", rule.limit, rule.rate))
+        return await self.backend.take(buckets)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "inflight": {f"{method} {path}": count for (method, path), count in self.inflight.items()},
+            "backend": self.backend.stats(),
+        }
+
+
+def too_many_requests(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, please retry later"},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+def server_busy() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying a RateLimiter
+
+    A request over a rule's rate gets 429, and one arriving while its route
+    is at its concurrency cap gets 503. Both answers carry Retry-After and
+    come before any body is read or any route code runs. `identify_user`
+    maps a bearer token to a stable user key (None when invalid) for the
+    per-user rules.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, identify_user: Optional[Callable[[str], Optional[str]]] = None):
+        self.app = app
+        self.limiter = limiter
+        self.identify_user = identify_user
+
+    def _user(self, scope: dict) -> Optional[str]:
+        if self.identify_user is None:
+            return None
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return self.identify_user(token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        rules = limiter.rules_for(scope["method"], scope["path"])
+        if rules:
+            user = self._user(scope) if any(rule.scope == "user" for _, rule in rules) else None
+            wait = await limiter.retry_after(rules, limiter.client_ip(scope), user)
+            if wait > 0:
+                limiter.counters["limited"] += 1
+                await too_many_requests(wait)(scope, receive, send)
+                return
+
+        route = _route(scope["method"], scope["path"])
+        cap = limiter.caps.get(route)
+        if cap is None:
+            await self.app(scope, receive, send)
+            return
+        if limiter.inflight[route] >= cap:
+            limiter.counters["shed"] += 1
+            await server_busy()(scope, receive, send)
+            return
+        limiter.inflight[route] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.inflight[route] -= 1
+
+
+rate_limiter = RateLimiter(
+    parse_rules(settings.RATE_LIMIT_RULES),
+    parse_caps(settings.RATE_LIMIT_CONCURRENCY),
+    create_rate_limit_backend(settings.CACHE_BACKEND_URL, settings.RATE_LIMIT_MAX_KEYS),
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED
+)
@@ -0,0 +1,91 @@
+"""
+Report response cache
+Stored reports' compressed bodies kept per worker, and Accept-Encoding negotiation
+"""
+
+import gzip
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.utils.cache import SizedLRU
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class ReportBody:
+    """A report's metrics JSON in the encodings it was stored in"""
+    gzip: bytes
+    br: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.gzip) + len(self.br or b"")
+
+    @property
+    def encodings(self) -> tuple:
+        """Content codings this body can be sent in, best first"""
+        return ("br", "gzip", "identity") if self.br is not None else ("gzip", "identity")
+
+    def content(self, encoding: str) -> bytes:
+        """
+        The body in a content coding
+
+        Compressed codings are the stored bytes as they are. identity is
+        inflated from gzip on each call rather than cached at several times
+        the size, since browsers and HTTP clients all accept gzip.
+        """
+        if encoding == "br" and self.br is not None:
+            return self.br
+        if encoding == "gzip":
+            return self.gzip
+        return gzip.decompress(self.gzip)
+
+
+def accepted_codings(header: str) -> dict:
+    """Content coding -> q-value of an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header: Optional[str], available: tuple) -> str:
+    """
+    The content coding to answer an Accept-Encoding header with
+
+    The highest q-value wins, ties going to the order of `available`. `*`
+    stands for codings the header does not name. identity is acceptable
+    unless excluded, but when the header does not name it, any coding
+    that is named comes first. When nothing available is acceptable the
+    answer is identity, which RFC 9110 allows instead of a 406.
+    """
+    if not header:
+        return "identity"
+    accepted = accepted_codings(header)
+    wildcard = accepted.get("*")
+    best, best_q = "identity", 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q is None:
+            q = 0.001 if coding == "identity" else 0.0
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# Report ids are never reused and reports never change, so entries need no expiry or invalidation
+report_bodies = SizedLRU(settings.REPORT_CACHE_MAX_BYTES)
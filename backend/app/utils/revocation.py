@@ -0,0 +1,190 @@
+"""
+Token revocation
+Revoked JWT ids, checked in memory through a Bloom filter and synced between workers through the database
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from app.config.settings import get_settings
+from app.models.user import RevokedToken
+from app.utils.database import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# revoked_tokens.expires_at is naive UTC
+EPOCH = datetime(1970, 1, 1)
+
+# Ids are handed out before commit, so a slow transaction can land below ids already synced;
+# each sync re-reads this many ids back and skips the ones it knows
+SYNC_OVERLAP = 64
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Sized for `capacity` items at `error_rate` false positives. Items cannot
+    be removed; the owner rebuilds it from the exact set instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Two 64-bit halves of one digest give every position (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationList:
+    """
+    Denylist of JWT ids (`jti`) that must no longer authenticate
+
+    The request path only touches memory: a Bloom filter answers "certainly
+    not revoked" for almost every token, and only its rare positives are
+    confirmed against the exact {jti: exp} set. Logout writes revocations to
+    the revoked_tokens table; each worker pulls rows newer than the last one
+    it saw every `sync_interval` seconds, so a logout reaches other workers
+    within that interval and takes effect at once in the worker that served
+    it. Entries are pruned, from memory and the table, once their token has
+    expired anyway, so memory is bounded by the tokens revoked within one
+    ACCESS_TOKEN_EXPIRE_MINUTES window.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, sync_interval: float = 2.0, sessions=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._sessions = sessions or SessionLocal
+        self._expiry: dict = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"checks": 0, "bloom_positives": 0, "revoked_hits": 0, "syncs": 0}
+
+    def is_revoked(self, jti: Optional[str], now: Optional[float] = None) -> bool:
+        """Whether a token id was revoked; tokens without a jti predate revocation and pass"""
+        self.counters["checks"] += 1
+        if not jti or jti not in self._bloom:
+            return False
+        self.counters["bloom_positives"] += 1
+        expires_at = self._expiry.get(jti)
+        if expires_at is None or expires_at <= (now or time.time()):
+            return False
+        self.counters["revoked_hits"] += 1
+        return True
+
+    def _remember(self, jti: str, expires_at: float):
+        with self._lock:
+            if jti not in self._expiry:
+                self._expiry[jti] = expires_at
+                if len(self._expiry) > self._bloom.capacity:
+                    self._rebuild(max(self.capacity, 2 * len(self._expiry)))
+                else:
+                    self._bloom.add(jti)
+
+    def _rebuild(self, capacity: int):
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._expiry:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def add(self, jti: str, expires_at: float):
+        """Deny a token id in this worker at once; the caller stores it in revoked_tokens for the others"""
+        if expires_at > time.time():
+            self._remember(jti, expires_at)
+
+    def sync(self) -> int:
+        """Pull revocations other workers stored since the last sync; returns how many were new"""
+        with self._sessions() as db:
+            rows = db.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.id > self._last_id - SYNC_OVERLAP)
+                .order_by(RevokedToken.id)
+            ).all()
+        now = time.time()
+        added = 0
+        for row_id, jti, expires_at in rows:
+            self._last_id = max(self._last_id, row_id)
+            exp = (expires_at - EPOCH).total_seconds()
+            if exp > now and jti not in self._expiry:
+                self._remember(jti, exp)
+                added += 1
+        self.counters["syncs"] += 1
+        return added
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget entries whose token has expired, in memory and in the table; returns how many"""
+        now = now or time.time()
+        with self._lock:
+            expired = [jti for jti, expires_at in self._expiry.items() if expires_at <= now]
+            for jti in expired:
+                del self._expiry[jti]
+            if expired:
+                self._rebuild(max(self.capacity, 2 * len(self._expiry)))
+        with self._sessions() as db:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcfromtimestamp(now)))
+            db.commit()
+        return len(expired)
+
+    async def _loop(self):
+        syncs = 0
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+                if syncs % 30 == 0:
+                    await asyncio.to_thread(self.prune)
+            except Exception:
+                logger.exception("Token revocation sync failed")
+            syncs += 1
+            await asyncio.sleep(self.sync_interval)
+
+    async def start(self):
+        """Load the current denylist, then keep it in sync and pruned in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Check counters and the in-memory footprint"""
+        return {**self.counters, "entries": len(self._expiry), "bloom_bytes": self._bloom.nbytes}
+
+
+revocation_list = RevocationList(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS
+)
@@ -0,0 +1,85 @@
+"""
+Blob reader benchmark
+Reads every blob of a generated repository through one `git cat-file --batch`
+process and through one `git show` per file, then times 30 daily LOC snapshots
+
+Run with: python -m benchmarks.bench_catfile [--files 10000] [--days 30]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.analysis.catfile import CatFileReader  # noqa: E402
+from app.analysis.snapshots import snapshot_series, tree_blobs  # noqa: E402
+from benchmarks.synthetic import generate_repo  # noqa: E402
+
+
+def git(cwd, *args, env=None):
+    subprocess.run(
+        ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, env={**os.environ, **(env or {})}
+    )
+
+
+def make_history(root, days):
+    """One commit per day, each changing a few files"""
+    paths = sorted(path for path, _, _ in tree_blobs(root, "HEAD")) if days else []
+    for day in range(1, days):
+        for path in paths[day * 5:day * 5 + 5]:
+            with open(os.path.join(root, path), "a") as f:
+                f.write("\n")
+        stamp = f"2025-09-{day + 1:02d}T12:00:00+00:00"
+        git(root, "commit", "-q", "-am", f"day {day}", env={"GIT_AUTHOR_DATE": stamp, "GIT_COMMITTER_DATE": stamp})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="devlens-bench-")
+    try:
+        generate_repo(root, args.files)
+        git(root, "init", "-q")
+        git(root, "add", ".")
+        stamp = "2025-09-01T12:00:00+00:00"
+        git(root, "commit", "-q", "-m", "initial", env={"GIT_AUTHOR_DATE": stamp, "GIT_COMMITTER_DATE": stamp})
+        make_history(root, args.days)
+        blobs = tree_blobs(root, "HEAD")
+        print(f"generated {len(blobs)} files, {args.days} commit days at {root}")
+
+        start = time.perf_counter()
+        total = 0
+        for _, sha, _ in blobs:
+            total += len(subprocess.run(["git", "show", sha], cwd=root, capture_output=True, check=True).stdout)
+        per_file = time.perf_counter() - start
+        print(f"git show per file:   {per_file:.2f}s  ({len(blobs) / per_file:.0f} blobs/s, {total} bytes)")
+
+        reader = CatFileReader(root)
+        start = time.perf_counter()
+        total = 0
+        for _, data in reader.read_many(sha for _, sha, _ in blobs):
+            total += len(data)
+        batch = time.perf_counter() - start
+        reader.close()
+        print(f"cat-file --batch:    {batch:.2f}s  ({len(blobs) / batch:.0f} blobs/s, {total} bytes)  "
+              f"{per_file / batch:.0f}x faster")
+
+        start = time.perf_counter()
+        series = snapshot_series(root, count=args.days)
+        elapsed = time.perf_counter() - start
+        print(f"{len(series)} daily LOC snapshots: {elapsed:.2f}s "
+              f"(first {series[0]['loc']} loc, last {series[-1]['loc']} loc)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
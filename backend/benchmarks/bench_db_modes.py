@@ -0,0 +1,99 @@
+"""
+Sync vs async database mode load test
+Compares requests/sec for /auth/login and /auth/me with DATABASE_ASYNC off and on
+
+Run with: python -m benchmarks.bench_db_modes [--duration 5] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+EMAIL = "bench.user@example.com"
+PASSWORD = "BenchPass123"
+
+
+async def hammer(client, method: str, url: str, duration: float, concurrency: int, **kwargs) -> dict:
+    """Keep `concurrency` requests in flight for `duration` seconds"""
+    deadline = time.perf_counter() + duration
+    counts = {"ok": 0, "failed": 0}
+
+    async def loop():
+        while time.perf_counter() < deadline:
+            response = await client.request(method, url, **kwargs)
+            counts["ok" if response.status_code == 200 else "failed"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"requests_per_sec": counts["ok"] / elapsed, **counts}
+
+
+async def run_mode(duration: float, concurrency: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.utils.database import init_db
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={
+            "firstName": "Bench",
+            "lastName": "User",
+            "email": EMAIL,
+            "password": PASSWORD,
+            "confirmPassword": PASSWORD
+        })
+        login = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        return {
+            "/auth/login": await hammer(client, "POST", "/auth/login", duration, concurrency,
+                                        json={"email": EMAIL, "password": PASSWORD}),
+            "/auth/me": await hammer(client, "GET", "/auth/me", duration, concurrency, headers=headers),
+        }
+
+
+def spawn(mode: str, duration: float, concurrency: int) -> dict:
+    """Run one mode in a fresh interpreter, since settings are read at import"""
+    env = dict(
+        os.environ,
+        SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark-secret-key"),
+        DATABASE_URL="sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"),
+        DATABASE_ASYNC="true" if mode == "async" else "false",
+        # Every request comes from one client, so rate limits would measure 429s instead of the routes
+        RATE_LIMIT_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_db_modes", "--child",
+         "--duration", str(duration), "--concurrency", str(concurrency)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_mode(args.duration, args.concurrency))))
+        return
+
+    results = {mode: spawn(mode, args.duration, args.concurrency) for mode in ("sync", "async")}
+    print(f"{'endpoint':<14}{'sync req/s':>14}{'async req/s':>14}")
+    for endpoint in results["sync"]:
+        print(f"{endpoint:<14}{results['sync'][endpoint]['requests_per_sec']:>14.1f}"
+              f"{results['async'][endpoint]['requests_per_sec']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
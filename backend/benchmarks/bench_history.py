@@ -0,0 +1,122 @@
+"""
+Analysis history pagination benchmark
+Seeds a SQLite database with one heavy user among many, then times the three
+statements of a GET /me/analyses page at increasing depths, against OFFSET paging
+
+Run with: python -m benchmarks.bench_history [--pages 10000] [--limit 50] [--users 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+
+from app.models.analysis import AnalysisJob  # noqa: E402
+from app.models.user import Report, Repository, User  # noqa: E402
+from app.routes.history import SUMMARY_COLUMNS, history_query, latest_per_repo  # noqa: E402
+from app.utils.database import Base  # noqa: E402
+
+LINKS = [f"https://github.com/example/project-{i}" for i in range(20)]
+
+
+def seed(engine, rows: int, users: int, seed: int = 7):
+    """`rows` analyses for user 1, and as many again spread over the other users"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": u, "firstname": "Bench", "lastname": str(u), "email": f"bench{u}@example.com",
+             "password": "x"}
+            for u in range(1, users + 1)
+        ])
+        batch = 50_000
+        for offset in range(0, 2 * rows, batch):
+            ids = range(offset + 1, min(offset + batch, 2 * rows) + 1)
+            repositories, jobs, reports = [], [], []
+            for repo_id in ids:
+                user_id = 1 if repo_id % 2 else rng.randint(2, users)
+                link = rng.choice(LINKS)
+                # Whole seconds, so many analyses tie on timestamp and the repo_id tiebreak is exercised
+                timestamp = start + timedelta(seconds=repo_id // 4)
+                repositories.append({"repo_id": repo_id, "repo_link": link, "timestamp": timestamp,
+                                     "user_id": user_id})
+                jobs.append({"user_id": user_id, "repo_id": repo_id, "repo_link": link, "status": "succeeded",
+                             "stage": "done", "progress": 1.0, "attempts": 1, "max_attempts": 3})
+                reports.append({"repo_id": repo_id, "timestamp": timestamp, "loc_total": rng.randint(1, 10**6),
+                                "file_count": rng.randint(1, 5000), "commit_count": rng.randint(1, 10**4)})
+            conn.execute(insert(Repository), repositories)
+            conn.execute(insert(AnalysisJob), jobs)
+            conn.execute(insert(Report), reports)
+
+
+def keyset_page(conn, limit: int, after=None):
+    rows = conn.execute(history_query(1, limit + 1, after)).all()[:limit]
+    repo_ids = [row.repo_id for row in rows]
+    conn.execute(latest_per_repo([AnalysisJob.repo_id, AnalysisJob.job_id, AnalysisJob.status],
+                                 (AnalysisJob.job_id.desc(),), repo_ids)).all()
+    conn.execute(latest_per_repo([Report.repo_id, *SUMMARY_COLUMNS],
+                                 (Report.timestamp.desc(), Report.report_id.desc()), repo_ids)).all()
+    return rows
+
+
+def offset_page(conn, limit: int, page: int):
+    query = (
+        select(Repository.repo_id, Repository.repo_link, Repository.timestamp)
+        .where(Repository.user_id == 1)
+        .order_by(Repository.timestamp.desc(), Repository.repo_id.desc())
+        .limit(limit).offset(page * limit)
+    )
+    return conn.execute(query).all()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10_000, help="pages of history for the heavy user")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = args.pages * args.limit
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'history.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        seed(engine, rows, args.users)
+        print(f"seeded {2 * rows:,} analyses ({rows:,} for the measured user) in {time.perf_counter() - start:.1f}s")
+
+        with engine.connect() as conn:
+            # The cursor of page n is the key of its predecessor's last row
+            keys = conn.execute(history_query(1, rows)).all()
+            depths = [d for d in (1, 10, 100, 1_000, 10_000, 100_000) if d <= args.pages]
+            print(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+            for depth in depths:
+                last = keys[(depth - 1) * args.limit - 1] if depth > 1 else None
+                after = (last.timestamp, last.repo_id) if last else None
+                page = keyset_page(conn, args.limit, after)
+                assert [row.repo_id for row in page] == [
+                    row.repo_id for row in keys[(depth - 1) * args.limit:depth * args.limit]
+                ]
+                keyset = timed(lambda: keyset_page(conn, args.limit, after), args.repeat)
+                offset = timed(lambda: offset_page(conn, args.limit, depth - 1), max(1, args.repeat // 4))
+                print(f"{depth:>8} {keyset:>10.2f} {offset:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Login burst benchmark
+Measures login p99 latency and /health latency while concurrent logins run
+
+Run with: python -m benchmarks.bench_login [--concurrency 200]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+# Every request comes from one client, so rate limits would measure 429s instead of the routes
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.utils.database import init_db  # noqa: E402
+
+EMAIL = "bench.user@example.com"
+PASSWORD = "BenchPass123"
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def timed(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return time.perf_counter() - start, response.status_code
+
+
+async def run(concurrency: int):
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={
+            "firstName": "Bench",
+            "lastName": "User",
+            "email": EMAIL,
+            "password": PASSWORD,
+            "confirmPassword": PASSWORD
+        })
+
+        logins = [
+            asyncio.create_task(timed(client, "POST", "/auth/login", json={"email": EMAIL, "password": PASSWORD}))
+            for _ in range(concurrency)
+        ]
+
+        health = []
+        while not all(task.done() for task in logins):
+            elapsed, _ = await timed(client, "GET", "/health")
+            health.append(elapsed)
+            await asyncio.sleep(0.01)
+
+        results = [task.result() for task in logins]
+
+    ok = [elapsed for elapsed, code in results if code == 200]
+    shed = sum(1 for _, code in results if code == 503)
+
+    print(f"concurrent logins: {concurrency}")
+    print(f"  succeeded: {len(ok)}  shed (503): {shed}")
+    if ok:
+        print(f"  login p50: {statistics.median(ok) * 1000:.1f} ms  p99: {percentile(ok, 99) * 1000:.1f} ms")
+    if health:
+        print(f"/health samples: {len(health)}")
+        print(f"  p50: {statistics.median(health) * 1000:.2f} ms  p99: {percentile(health, 99) * 1000:.2f} ms  "
+              f"max: {max(health) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency))
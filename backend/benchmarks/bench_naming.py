@@ -0,0 +1,80 @@
+"""
+Naming quality benchmark
+Times the vectorised scorer over synthetic identifiers, against scoring them one at a time
+
+Run with: python -m benchmarks.bench_naming [--identifiers 1000000] [--files 20000]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.analysis.naming import naming_quality, word_sets  # noqa: E402
+from app.analysis.parsers import IDENTIFIER_KINDS  # noqa: E402
+
+WORDS = "user count page load report row total value index request handler data tmp usr cnt get set item list".split()
+
+
+def synthetic_name(rng: random.Random, kind: str, language: str) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 3))
+    if rng.random() < 0.05:
+        return rng.choice("qwxyzab")
+    if kind == "class":
+        return "".join(word.capitalize() for word in words)
+    if kind == "constant" and rng.random() < 0.7:
+        return "_".join(words).upper()
+    if (language == "js") != (rng.random() < 0.1):
+        return words[0] + "".join(word.capitalize() for word in words[1:])
+    return "_".join(words)
+
+
+def synthetic_files(count: int, files: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    per_file = max(1, count // files)
+    result = []
+    for i in range(files):
+        extension = "py" if i % 2 else "js"
+        language = "python" if extension == "py" else "js"
+        kinds = [rng.choice(IDENTIFIER_KINDS) for _ in range(per_file)]
+        result.append({
+            "path": f"src/module_{i}.{extension}",
+            "identifiers": [[synthetic_name(rng, kind, language), kind] for kind in kinds],
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--identifiers", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--scalar-sample", type=int, default=20_000,
+                        help="identifiers scored one call at a time, to estimate the per-name cost")
+    args = parser.parse_args()
+
+    files = synthetic_files(args.identifiers, args.files)
+    total = sum(len(f["identifiers"]) for f in files)
+
+    start = time.perf_counter()
+    word_sets()
+    print(f"word sets built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    report = naming_quality(files)
+    elapsed = time.perf_counter() - start
+    print(f"batched: {total} identifiers in {elapsed:.2f} s ({total / elapsed:,.0f}/s), score {report['score']}")
+
+    sample = [{"path": f["path"], "identifiers": [identifier]}
+              for f in files for identifier in f["identifiers"]][:args.scalar_sample]
+    start = time.perf_counter()
+    for single in sample:
+        naming_quality([single])
+    per_name = (time.perf_counter() - start) / len(sample)
+    print(f"one at a time: {per_name * 1e6:.0f} us/identifier, ~{per_name * total:.0f} s for {total} "
+          f"({per_name * total / elapsed:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
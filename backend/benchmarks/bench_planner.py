@@ -0,0 +1,77 @@
+"""
+Analysis planner benchmark
+Times an SPL-1 "LOC only" plan against a plan with every implemented option
+
+Run with: python -m benchmarks.bench_planner [--files 20000] [--commits 200] [--workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.analysis.planner import OPTION_ANALYZERS, compile_plan, execute_plan  # noqa: E402
+from benchmarks.synthetic import generate_repo  # noqa: E402
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def make_history(root, commits):
+    """Commit the generated tree, then touch a few files per commit"""
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "initial")
+    paths = sorted(
+        os.path.relpath(os.path.join(current, name), root)
+        for current, _, files in os.walk(root) if ".git" not in current
+        for name in files
+    )
+    for i in range(commits):
+        for path in paths[i * 3 % len(paths):i * 3 % len(paths) + 3]:
+            with open(os.path.join(root, path), "a") as f:
+                f.write("\n")
+        git(root, "commit", "-q", "-am", f"change {i}")
+
+
+def timed_plan(root, options, workers):
+    plan = compile_plan(options)
+    start = time.perf_counter()
+    metrics = execute_plan(plan, root, workers=workers)
+    elapsed = time.perf_counter() - start
+    stages = "  ".join(f"{name} {ms:.0f}ms" for name, ms in metrics["timings"]["stages"].items())
+    print(f"{' + '.join(options) if len(options) < 4 else f'{len(options)} options'}: {elapsed:.2f}s")
+    print(f"  {stages}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="devlens-bench-")
+    try:
+        generate_repo(root, args.files)
+        make_history(root, args.commits)
+        print(f"generated {args.files} files and {args.commits + 1} commits at {root}")
+
+        loc_only = timed_plan(root, ["LOC"], args.workers)
+        full = timed_plan(root, sorted(OPTION_ANALYZERS), args.workers)
+        print(f"LOC only takes {loc_only / full:.0%} of the full plan's time")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
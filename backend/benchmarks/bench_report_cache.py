@@ -0,0 +1,138 @@
+"""
+Report response benchmark
+Bytes/sec and CPU per request for a multi-megabyte report: parsed, re-encoded
+and compressed on every view (the naive path) against the bodies compressed
+once at write time and kept in the report cache, then end to end through
+GET /repositories/{id}/reports/latest
+
+Run with: python -m benchmarks.bench_report_cache [--files 50000] [--commits 20000] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+# Every request comes from one client, so rate limits would measure 429s instead of the routes
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.analysis.reports import COMPRESS_LEVEL, build_report, decode_metrics  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import Repository, User  # noqa: E402
+from app.utils.auth import create_access_token  # noqa: E402
+from app.utils.database import SessionLocal, init_db  # noqa: E402
+from app.utils.report_cache import ReportBody, report_bodies  # noqa: E402
+
+EMAIL = "bench.user@example.com"
+
+
+def synthetic_metrics(files: int, commits: int, seed: int = 42) -> dict:
+    """A dashboard payload shaped like a large repository's"""
+    rng = random.Random(seed)
+    paths = [f"src/pkg{i // 500}/mod{(i // 50) % 10}/file_{i}.py" for i in range(files)]
+    return {
+        "loc": {"total": files * 120, "files": files,
+                "byLang": [{"lang": "Python", "loc": files * 120, "files": files}],
+                "timeseries": [{"date": f"2020-01-{d % 28 + 1:02d}", "loc": d * 100} for d in range(3650)]},
+        "complexity": {"totalScore": files * 9, "functions": files * 4,
+                       "byFile": [{"path": p, "functions": rng.randint(1, 30), "complexity": rng.randint(1, 90)}
+                                  for p in paths]},
+        "commits": {"count": commits,
+                    "perCommit": [{"sha": f"{rng.getrandbits(160):040x}", "author": f"dev{i % 40}",
+                                   "date": f"2021-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "message": f"change {i}",
+                                   "changes": rng.randint(1, 400)} for i in range(commits)]},
+        "namingQuality": {"score": 81.5,
+                          "byFile": [{"path": p, "score": rng.randint(40, 100), "identifiers": rng.randint(5, 200)}
+                                     for p in paths]},
+    }
+
+
+def per_request(fn, requests: int) -> dict:
+    """CPU ms and wall bytes/sec of `requests` calls of fn, which returns the bytes sent"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    sent = sum(len(fn()) for _ in range(requests))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {"cpu_ms": cpu / requests * 1000, "bytes_per_sec": sent / wall, "bytes": sent // requests}
+
+
+def report_row(metrics: dict) -> int:
+    with SessionLocal() as db:
+        db.add(User(firstname="Bench", lastname="User", email=EMAIL, password="unused"))
+        db.flush()
+        user_id = db.scalar(select(User.user_id).where(User.email == EMAIL))
+        repository = Repository(repo_link="https://example.com/bench", user_id=user_id)
+        db.add(repository)
+        db.flush()
+        db.add(build_report(repository.repo_id, metrics))
+        db.commit()
+        return repository.repo_id
+
+
+async def end_to_end(repo_id: int, requests: int, encoding: str) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}", "Accept-Encoding": encoding}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        url = f"/repositories/{repo_id}/reports/latest"
+        assert (await client.get(url, headers=headers)).status_code == 200
+        wall, cpu, sent = time.perf_counter(), time.process_time(), 0
+        for _ in range(requests):
+            # Raw bytes, so the client's own decompression is not counted as the server's CPU
+            async with client.stream("GET", url, headers=headers) as response:
+                async for chunk in response.aiter_raw():
+                    sent += len(chunk)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {"cpu_ms": cpu / requests * 1000, "bytes_per_sec": sent / wall, "bytes": sent // requests}
+
+
+def show(label: str, result: dict):
+    print(f"{label:<34}{result['bytes']:>12,}{result['cpu_ms']:>12.2f}{result['bytes_per_sec'] / 1e6:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--commits", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    metrics = synthetic_metrics(args.files, args.commits)
+    start = time.process_time()
+    report = build_report(1, metrics)
+    written = time.process_time() - start
+    body = ReportBody(gzip=report.payload, br=report.payload_br)
+    print(f"report: {report.payload_size:,} bytes of JSON, gzip {len(report.payload):,}, "
+          f"brotli {len(report.payload_br or b''):,}; written once in {written * 1000:.0f} ms CPU")
+
+    naive_runs = max(1, args.requests // 20)
+    print(f"\n{'per request':<34}{'bytes':>12}{'CPU ms':>12}{'MB/s sent':>14}")
+    show("naive: parse, json.dumps, gzip", per_request(
+        lambda: gzip.compress(json.dumps(decode_metrics(report.payload)).encode("utf-8"), COMPRESS_LEVEL),
+        naive_runs
+    ))
+    show("naive: parse, json.dumps", per_request(
+        lambda: json.dumps(decode_metrics(report.payload)).encode("utf-8"), naive_runs
+    ))
+    show("cached: gzip", per_request(lambda: body.content("gzip"), args.requests))
+    if body.br is not None:
+        show("cached: br", per_request(lambda: body.content("br"), args.requests))
+    show("cached: identity (inflated)", per_request(lambda: body.content("identity"), args.requests))
+
+    init_db()
+    repo_id = report_row(metrics)
+    print(f"\n{'GET .../reports/latest':<34}{'bytes':>12}{'CPU ms':>12}{'MB/s sent':>14}")
+    for encoding in ("br", "gzip", "identity"):
+        show(f"Accept-Encoding: {encoding}", asyncio.run(end_to_end(repo_id, args.requests, encoding)))
+    print(f"\nreport cache: {report_bodies.stats()}")
+
+
+if __name__ == "__main__":
+    main()
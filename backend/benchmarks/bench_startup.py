@@ -0,0 +1,126 @@
+"""
+Startup benchmark
+Import time of the app, where it goes, and time from launch to the first served request
+
+Run with: python -m benchmarks.bench_startup [--runs 5] [--workers 1]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def environment(database: str, **extra) -> dict:
+    return {
+        **os.environ,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key"),
+        "DATABASE_URL": f"sqlite:///{database}",
+        "ANALYSIS_RUNNER_ENABLED": "false",
+        **extra,
+    }
+
+
+def import_seconds(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip())
+
+
+def import_breakdown(env: dict, top: int) -> list:
+    """Self import time summed by top-level package, largest first"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    totals = defaultdict(int)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        package = name.split(".")[0]
+        if package == "app":
+            package = ".".join(name.split(".")[:2])
+        totals[package] += int(self_us)
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_request(env: dict, args: list, timeout: float = 60) -> tuple:
+    """Seconds from launch until /health answers 200, and from SIGTERM until the server exits"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--prod", "--host", "127.0.0.1", "--port", str(port), *args],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if time.perf_counter() - start > timeout or process.poll() is not None:
+                raise RuntimeError("server did not come up")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+        stop = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=timeout)
+        return ready, time.perf_counter() - stop
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    workdir = tempfile.mkdtemp(prefix="devlens-bench-")
+
+    env = environment(os.path.join(workdir, "import.db"))
+    imports = [import_seconds(env) for _ in range(args.runs)]
+    print(f"import app.main: median {statistics.median(imports) * 1000:.0f} ms over {args.runs} runs")
+    for package, self_us in import_breakdown(env, 10):
+        print(f"  {package:<28} {self_us / 1000:7.1f} ms")
+
+    modes = [
+        ("migrate in startup hook", ["--no-migrate"], {"DB_MIGRATE_ON_STARTUP": "true"}),
+        ("migrate step, then serve", [], {}),
+        ("pre-migrated database", ["--no-migrate"], {}),
+    ]
+    print(f"\ntime to first request, {args.workers} workers (median of {args.runs}):")
+    for label, server_args, extra in modes:
+        ready, drain = [], []
+        for run in range(args.runs):
+            database = os.path.join(workdir, f"{label[:7].replace(' ', '')}-{run}.db")
+            if label == "pre-migrated database":
+                subprocess.run([sys.executable, "server.py", "migrate"], cwd=BACKEND,
+                               env=environment(database), capture_output=True, check=True)
+            up, down = first_request(environment(database, **extra), [*server_args, "--workers", str(args.workers)])
+            ready.append(up)
+            drain.append(down)
+        print(f"  {label:<26} first request {statistics.median(ready) * 1000:6.0f} ms   "
+              f"graceful stop {statistics.median(drain) * 1000:5.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmark regression suite package initialization"""
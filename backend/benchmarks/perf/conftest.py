@@ -0,0 +1,95 @@
+"""
+Benchmark regression suite configuration
+Command-line options, the metric recorder, and the results/baseline files
+
+Run with: pytest benchmarks/perf [--perf-sizes 1k,10k,100k] [--perf-threshold 0.3] [--perf-update-baseline]
+"""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+# Every request comes from one client, so rate limits would measure 429s instead of the routes
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+# Settings are read at import, so point the app at a throwaway database before anything imports it
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "perf.db")
+
+from benchmarks.regression import compare, describe, load_json, machine, metric, update_baseline, write_json  # noqa: E402
+from benchmarks.synthetic import SIZES  # noqa: E402
+
+HERE = os.path.dirname(__file__)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "benchmark regression suite")
+    group.addoption("--perf-baseline", default=os.path.join(HERE, "baseline.json"),
+                    help="committed baseline to compare against")
+    group.addoption("--perf-output", default=os.path.join(HERE, "results.json"),
+                    help="where this run's results are written")
+    group.addoption("--perf-threshold", type=float, default=None,
+                    help="allowed regression as a fraction, replacing every threshold of the baseline")
+    group.addoption("--perf-sizes", default="1k,10k",
+                    help=f"comma-separated synthetic repository sizes out of {', '.join(SIZES)}")
+    group.addoption("--perf-workers", type=int, default=1, help="analysis workers, 0 = one per CPU")
+    group.addoption("--perf-update-baseline", action="store_true",
+                    help="write this run's results into the baseline instead of failing on regressions")
+
+
+def pytest_configure(config):
+    config.perf_results = {}
+    config.perf_regressions = []
+
+
+def pytest_generate_tests(metafunc):
+    if "repo_size" in metafunc.fixturenames:
+        sizes = [size.strip() for size in metafunc.config.getoption("--perf-sizes").split(",") if size.strip()]
+        unknown = [size for size in sizes if size not in SIZES]
+        if unknown:
+            raise pytest.UsageError(f"Unknown --perf-sizes {', '.join(unknown)}; choose from {', '.join(SIZES)}")
+        metafunc.parametrize("repo_size", sizes, scope="session")
+
+
+class Recorder:
+    """Collects one test's metrics into the session results and checks them against the baseline"""
+
+    def __init__(self, config):
+        self.config = config
+        self.recorded = {}
+
+    def record(self, name: str, value: float, unit: str):
+        self.recorded[name] = metric(value, unit)
+        self.config.perf_results[name] = self.recorded[name]
+
+    def check(self):
+        """Fail the test when any metric it recorded regressed past its threshold"""
+        if self.config.getoption("--perf-update-baseline"):
+            return
+        regressions = compare(
+            self.recorded,
+            load_json(self.config.getoption("--perf-baseline")),
+            self.config.getoption("--perf-threshold")
+        )
+        self.config.perf_regressions.extend(regressions)
+        if regressions:
+            pytest.fail("Performance regressed:\n  " + "\n  ".join(describe(r) for r in regressions), pytrace=False)
+
+
+@pytest.fixture
+def perf(request):
+    return Recorder(request.config)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.perf_results:
+        return
+    write_json(config.getoption("--perf-output"), {
+        "machine": machine(),
+        "metrics": config.perf_results,
+        "regressions": config.perf_regressions,
+    })
+    if config.getoption("--perf-update-baseline"):
+        path = config.getoption("--perf-baseline")
+        write_json(path, update_baseline(load_json(path), config.perf_results))
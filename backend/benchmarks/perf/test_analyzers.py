@@ -0,0 +1,52 @@
+"""
+Benchmark every analyzer over deterministic synthetic repositories with long histories
+Run with: pytest benchmarks/perf/test_analyzers.py [--perf-sizes 1k,10k,100k]
+"""
+
+import time
+
+import pytest
+
+from app.analysis.planner import OPTION_ANALYZERS, compile_plan, execute_plan
+from benchmarks.regression import PeakMemory
+from benchmarks.synthetic import SIZES, generate_history, generate_repo
+
+SNAPSHOTS = 10
+
+# Plan runs per size; each stage keeps its fastest round, which shrugs off a busy machine
+ROUNDS = {"1k": 5, "10k": 3, "100k": 1}
+
+
+@pytest.fixture(scope="session")
+def synthetic_repo(repo_size, tmp_path_factory):
+    files, commits = SIZES[repo_size]
+    root = str(tmp_path_factory.mktemp(f"repo-{repo_size}"))
+    generate_repo(root, files)
+    generate_history(root, commits)
+    return root
+
+
+def test_full_plan(synthetic_repo, repo_size, perf, request):
+    """Test the plan with every option, and each of its stages, stays within the baseline"""
+    plan = compile_plan(sorted(OPTION_ANALYZERS))
+    totals = []
+    stages = {}
+    with PeakMemory() as memory:
+        for _ in range(ROUNDS[repo_size]):
+            start = time.perf_counter()
+            metrics = execute_plan(plan, synthetic_repo, workers=request.config.getoption("--perf-workers"),
+                                   snapshots=SNAPSHOTS)
+            totals.append(time.perf_counter() - start)
+            for stage, ms in metrics["timings"]["stages"].items():
+                stages[stage] = min(ms, stages.get(stage, ms))
+
+    files, commits = SIZES[repo_size]
+    assert metrics["loc"]["files"] >= files
+    assert metrics["commits"]["count"] == commits + 1
+
+    prefix = f"analyzers.{repo_size}"
+    perf.record(f"{prefix}.total", min(totals), "s")
+    for stage, ms in stages.items():
+        perf.record(f"{prefix}.stage.{stage}", ms, "ms")
+    perf.record(f"{prefix}.memory_growth", memory.growth_mb, "MB")
+    perf.check()
@@ -0,0 +1,88 @@
+"""
+Benchmark register, login and /auth/me through the ASGI app against SQLite
+Run with: pytest benchmarks/perf/test_api.py
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+from app.utils.database import init_db
+from benchmarks.regression import PeakMemory, percentile
+
+PASSWORD = "BenchPass123"
+CONCURRENCY = 4
+
+# Requests per endpoint; bcrypt bounds the first two
+REQUESTS = {"register": 24, "login": 24, "me": 2_000}
+
+
+def user(index: int) -> dict:
+    return {
+        "firstName": "Bench",
+        "lastName": "User",
+        "email": f"bench.user{index}@example.com",
+        "password": PASSWORD,
+        "confirmPassword": PASSWORD
+    }
+
+
+async def run_load(client, count: int, concurrency: int, send) -> dict:
+    """`count` requests made by `send(client, index)`, `concurrency` in flight at a time"""
+    latencies = []
+    failures = []
+    indexes = iter(range(count))
+
+    async def worker():
+        for index in indexes:
+            start = time.perf_counter()
+            response = await send(client, index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 300:
+                failures.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": count / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "failures": failures,
+    }
+
+
+async def auth_load() -> dict:
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        register = await run_load(
+            client, REQUESTS["register"], CONCURRENCY,
+            lambda c, i: c.post("/auth/register", json=user(i))
+        )
+        login = await run_load(
+            client, REQUESTS["login"], CONCURRENCY,
+            lambda c, i: c.post("/auth/login", json={"email": user(i)["email"], "password": PASSWORD})
+        )
+        token = (await client.post("/auth/login", json={"email": user(0)["email"], "password": PASSWORD})
+                 ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        me = await run_load(client, REQUESTS["me"], CONCURRENCY, lambda c, i: c.get("/auth/me", headers=headers))
+    return {"register": register, "login": login, "me": me}
+
+
+def test_auth_throughput(perf):
+    """Test register, login and /auth/me throughput and latency stay within the baseline"""
+    with PeakMemory() as memory:
+        results = asyncio.run(auth_load())
+
+    for endpoint, result in results.items():
+        assert result["failures"] == [], f"{endpoint} failed: {result['failures'][:5]}"
+        perf.record(f"api.{endpoint}.throughput", result["rps"], "req/s")
+        perf.record(f"api.{endpoint}.p50", result["p50"], "ms")
+        perf.record(f"api.{endpoint}.p99", result["p99"], "ms")
+    perf.record("api.memory_growth", memory.growth_mb, "MB")
+    perf.check()
@@ -0,0 +1,183 @@
+"""
+Benchmark regression checking
+Metrics recorded by the pytest benchmark suite, peak-memory tracking, and the
+comparison of a run against the committed baseline
+
+A metric is a name such as "api.login.p99" with a value, a unit and which
+direction is better. A result regresses when it is worse than the baseline by
+more than the threshold (a fraction; the longest matching name prefix wins)
+and by more than the unit's noise floor, so a 3 ms stage cannot fail a run by
+taking 8 ms.
+"""
+
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Optional
+
+DEFAULT_THRESHOLD = 0.25
+
+# Absolute differences below these never count, whatever the ratio
+DEFAULT_FLOORS = {"ms": 10.0, "s": 0.25, "MB": 16.0, "req/s": 0.0}
+
+HIGHER_IS_BETTER = {"req/s"}
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def metric(value: float, unit: str) -> dict:
+    return {
+        "value": round(value, 3),
+        "unit": unit,
+        "better": "higher" if unit in HIGHER_IS_BETTER else "lower",
+    }
+
+
+class PeakMemory:
+    """
+    Resident-set high-water mark of this process over a block, in MB
+
+    `growth_mb` is how far the peak rose above the resident set at entry, so
+    memory an earlier benchmark left allocated does not count against the
+    next one. On Linux the kernel's VmHWM is reset on entry. Elsewhere
+    ru_maxrss only ever grows, so `growth_mb` is what the block added to the
+    process's peak so far. Worker processes count through the children's
+    ru_maxrss, but only when a child of the block set a new high, since that
+    figure is never reset either.
+    """
+
+    def __enter__(self):
+        self.children_kb = _children_kb()
+        self.resettable = _reset_hwm()
+        self.start_mb = (_status_kb("VmRSS") if self.resettable else _maxrss_kb()) / 1024
+        return self
+
+    def __exit__(self, *exc):
+        own = _status_kb("VmHWM") if self.resettable else _maxrss_kb()
+        children = _children_kb()
+        self.peak_mb = max(own, children if children > self.children_kb else 0.0) / 1024
+        self.growth_mb = max(0.0, self.peak_mb - self.start_mb)
+        return False
+
+
+def _reset_hwm() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _status_kb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return float(line.split()[1])
+    return _maxrss_kb()
+
+
+def _maxrss_kb() -> float:
+    return _to_kb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def _children_kb() -> float:
+    return _to_kb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def _to_kb(maxrss: int) -> float:
+    # macOS reports bytes, Linux kilobytes
+    return maxrss / 1024 if sys.platform == "darwin" else float(maxrss)
+
+
+def threshold_for(name: str, thresholds: dict, default: float = DEFAULT_THRESHOLD) -> float:
+    """The threshold of the longest prefix of `name` in `thresholds`, else "default" or `default`"""
+    matches = [prefix for prefix in thresholds if prefix != "default" and name.startswith(prefix)]
+    if matches:
+        return thresholds[max(matches, key=len)]
+    return thresholds.get("default", default)
+
+
+def compare(results: dict, baseline: dict, threshold: Optional[float] = None) -> list:
+    """
+    Regressions of `results` against `baseline`, worst first
+
+    `threshold` replaces every threshold of the baseline. Metrics the
+    baseline does not know are not compared.
+    """
+    thresholds = baseline.get("thresholds", {}) if threshold is None else {"default": threshold}
+    floors = {**DEFAULT_FLOORS, **baseline.get("floors", {})}
+
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get("metrics", {}).get(name)
+        if expected is None or not expected["value"]:
+            continue
+        if result["better"] == "higher":
+            worse_by = expected["value"] - result["value"]
+        else:
+            worse_by = result["value"] - expected["value"]
+        ratio = worse_by / expected["value"]
+        allowed = threshold_for(name, thresholds)
+        if ratio > allowed and worse_by > floors.get(result["unit"], 0.0):
+            regressions.append({
+                "metric": name,
+                "baseline": expected["value"],
+                "value": result["value"],
+                "unit": result["unit"],
+                "change": round(ratio, 3),
+                "threshold": allowed,
+            })
+    regressions.sort(key=lambda r: -r["change"])
+    return regressions
+
+
+def describe(regression: dict) -> str:
+    return (
+        f"{regression['metric']}: {regression['value']} {regression['unit']} vs baseline "
+        f"{regression['baseline']} ({regression['change']:+.0%}, allowed {regression['threshold']:.0%})"
+    )
+
+
+def load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def machine() -> dict:
+    """Where a run happened, stored next to its results since timings only compare on like hardware"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def update_baseline(baseline: dict, results: dict) -> dict:
+    """The baseline with these results' values replacing the old ones; thresholds and floors are kept"""
+    return {
+        "thresholds": baseline.get("thresholds", {"default": DEFAULT_THRESHOLD}),
+        "floors": baseline.get("floors", DEFAULT_FLOORS),
+        "machine": machine(),
+        "metrics": {**baseline.get("metrics", {}), **results},
+    }
@@ -0,0 +1,196 @@
+"""
+Synthetic repository generator
+Deterministic source trees and git histories for the analyzer benchmarks
+"""
+
+import os
+import random
+import subprocess
+
+PYTHON_TEMPLATE = '''"""Module {index}"""
+
+import os
+
+
+class Service{index}:
+    """Service {index}"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def process_items(self, items):
+        # Filter and transform items
+        results = []
+        for item in items:
+            if item and item.get("enabled"):
+                results.append(self.transform(item))
+            elif item is None:
+                continue
+        return results
+
+    def transform(self, item):
+        return {{key: value for key, value in item.items() if value is not None}}
+
+
+def helper_{index}(value, threshold={threshold}):
+    if value > threshold and value % 2 == 0:
+        return value * 2
+    return value
+'''
+
+JS_TEMPLATE = '''import React, {{ useState }} from "react";
+
+// Component {index}
+export function Widget{index}({{ items, onSelect }}) {{
+  const [active, setActive] = useState(null);
+
+  const handleClick = (item) => {{
+    if (item && item.enabled) {{
+      setActive(item.id);
+      onSelect?.(item);
+    }}
+  }};
+
+  /* Render the list */
+  return (
+    <ul>
+      {{items.map((item) => (
+        <li key={{item.id}} onClick={{() => handleClick(item)}}>
+          {{active === item.id ? <b>{{item.label}}</b> : item.label}}
+        </li>
+      ))}}
+    </ul>
+  );
+}}
+
+export const score{index} = (a, b) => (a > {threshold} || b > {threshold} ? a + b : a - b);
+'''
+
+TS_TEMPLATE = '''export interface Record{index} {{
+  id: number;
+  name?: string;
+}}
+
+export class Store{index} {{
+  private records: Record{index}[] = [];
+
+  add(record: Record{index}): void {{
+    if (!this.records.find((r) => r.id === record.id)) {{
+      this.records.push(record);
+    }}
+  }}
+
+  find(id: number): Record{index} | undefined {{
+    for (const record of this.records) {{
+      if (record.id === id) return record;
+    }}
+    return undefined;
+  }}
+}}
+'''
+
+CSS_TEMPLATE = '''/* Styles {index} */
+.widget-{index} {{
+  display: flex;
+  padding: {threshold}px;
+}}
+'''
+
+TEMPLATES = [
+    ("py", PYTHON_TEMPLATE),
+    ("jsx", JS_TEMPLATE),
+    ("ts", TS_TEMPLATE),
+    ("js", JS_TEMPLATE),
+    ("css", CSS_TEMPLATE),
+]
+
+
+def generate_repo(root: str, files: int, seed: int = 42, vendored: int = 0) -> str:
+    """
+    Write `files` source files under root in nested package directories
+
+    `vendored` extra files go into node_modules/ and venv/ so the walker's
+    skipping is exercised too. Returns root.
+    """
+    rng = random.Random(seed)
+    for index in range(files):
+        ext, template = TEMPLATES[index % len(TEMPLATES)]
+        directory = os.path.join(root, "src", f"pkg{index // 500}", f"mod{(index // 50) % 10}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file_{index}.{ext}"), "w") as f:
+            f.write(template.format(index=index, threshold=rng.randint(1, 100)))
+
+    for index in range(vendored):
+        directory = os.path.join(root, "node_modules" if index % 2 else "venv", f"dep{index // 100}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"vendored_{index}.js"), "w") as f:
+            f.write(JS_TEMPLATE.format(index=index, threshold=1))
+
+    with open(os.path.join(root, "logo.png"), "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + bytes(range(256)))
+    return root
+
+
+# Benchmark suite repository sizes -> (files, commits after the initial one)
+SIZES = {
+    "1k": (1_000, 2_000),
+    "10k": (10_000, 5_000),
+    "100k": (100_000, 10_000),
+}
+
+AUTHORS = ["alice", "bob", "carol", "dave", "erin", "frank"]
+EPOCH = 1_600_000_000
+
+
+def git(cwd, *args, **kwargs):
+    return subprocess.run(
+        ["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, **kwargs
+    )
+
+
+def generate_history(root: str, commits: int, files_per_commit: int = 3, seed: int = 42) -> str:
+    """
+    Commit the tree under root, then `commits` more commits that each append to a few files
+
+    The follow-up commits go through one `git fast-import` stream, so a history
+    of thousands of commits takes seconds. Authors, dates and the files touched
+    come from `seed`, so the same arguments always give the same commit ids.
+    """
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_DATE": f"{EPOCH} +0000",
+        "GIT_COMMITTER_DATE": f"{EPOCH} +0000",
+    }
+    git(root, "init", "-q", "-b", "main")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "initial", env=env)
+    paths = git(root, "ls-files", "*.py", "*.js", "*.jsx", "*.ts", text=True).stdout.split()
+
+    rng = random.Random(seed)
+    contents = {}
+    stream = []
+    for i in range(commits):
+        author = rng.choice(AUTHORS)
+        when = EPOCH + (i + 1) * 3600
+        message = f"change {i}".encode()
+        stream.append(
+            f"commit refs/heads/main\n"
+            f"author {author} <{author}@example.com> {when} +0000\n"
+            f"committer {author} <{author}@example.com> {when} +0000\n"
+            f"data {len(message)}\n".encode() + message + b"\n"
+        )
+        if i == 0:
+            stream.append(b"from refs/heads/main^0\n")
+        for path in rng.sample(paths, min(files_per_commit, len(paths))):
+            if path not in contents:
+                with open(os.path.join(root, path), "rb") as f:
+                    contents[path] = f.read()
+            contents[path] += f"// change {i}\n".encode() if not path.endswith(".py") else f"# change {i}\n".encode()
+            stream.append(f"M 100644 inline {path}\ndata {len(contents[path])}\n".encode() + contents[path] + b"\n")
+        stream.append(b"\n")
+
+    if stream:
+        git(root, "fast-import", "--quiet", input=b"".join(stream))
+        git(root, "reset", "-q", "--hard", "main")
+    return root
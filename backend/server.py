@@ -1,19 +1,140 @@
 """
 DevLens Backend Server Entry Point
 Run this file to start the server
+
+    python server.py                  # development: one process, auto-reload
+    python server.py --prod           # production: one worker per CPU, uvloop/httptools, no reload
+    python server.py migrate          # apply schema migrations and exit
 """
 
+import argparse
+import compileall
+import importlib.util
+import logging
+import os
+
 import uvicorn
-from app.main import app
 from app.config.settings import get_settings
 
 settings = get_settings()
+logger = logging.getLogger("devlens.server")
 
-if __name__ == "__main__":
+APP = "app.main:app"
+
+
+def default_workers() -> int:
+    """One worker per CPU this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def fastest(preferred: str, fallback: str) -> str:
+    """`preferred` when the package is installed (uvloop, httptools), else the pure-Python fallback"""
+    return preferred if importlib.util.find_spec(preferred) else fallback
+
+
+def migrate():
+    """Bring the schema up to date once, before any worker serves requests"""
+    from app.utils.migrations import migrate as run_migrations
+    from app.utils.database import engine
+    versions = run_migrations()
+    # The gunicorn master forks the workers after this; none of them should inherit its connection
+    engine.dispose()
+    logger.info("Applied migrations: %s", versions if versions else "none, database is up to date")
+
+
+def serve_development(host: str, port: int):
+    uvicorn.run(APP, host=host, port=port, reload=True, log_level="info")
+
+
+def serve_production(host: str, port: int, workers: int):
+    """
+    Multi-worker server with graceful drain
+
+    Bytecode is compiled up front so cold workers do not compile on import.
+    With gunicorn installed the app is imported once and forked (preload),
+    so workers share its memory and start without importing; otherwise
+    uvicorn's supervisor spawns the workers. On SIGTERM workers stop
+    accepting, finish in-flight requests for up to SERVER_GRACEFUL_TIMEOUT
+    seconds, then run the shutdown hooks.
+    """
+    compileall.compile_dir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"), quiet=1)
+    loop, http = fastest("uvloop", "asyncio"), fastest("httptools", "h11")
+    logger.info("Starting %s workers on %s:%s (loop=%s, http=%s)", workers, host, port, loop, http)
+
+    if importlib.util.find_spec("gunicorn") and workers > 1:
+        serve_gunicorn(host, port, workers)
+        return
     uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=True,
+        APP,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        reload=False,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
         log_level="info"
     )
+
+
+def post_fork(server, worker):
+    """Gunicorn hook: connections the preloaded app opened in the master stay the master's"""
+    from app.utils.database import reset_pools_after_fork
+    reset_pools_after_fork()
+
+
+def serve_gunicorn(host: str, port: int, workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            for key, value in {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "backlog": settings.SERVER_BACKLOG,
+                "keepalive": settings.SERVER_KEEPALIVE,
+                "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+                "post_fork": post_fork,
+            }.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    PreloadedApplication().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DevLens backend server")
+    parser.add_argument("command", nargs="?", choices=["serve", "migrate"], default="serve")
+    parser.add_argument("--prod", action="store_true", help="multi-worker production mode without reload")
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="production worker processes (0 = one per CPU)")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--no-migrate", action="store_true", help="skip the migration step before serving")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+
+    if args.command == "migrate":
+        migrate()
+        return
+    if not args.no_migrate:
+        migrate()
+    if args.prod:
+        serve_production(args.host, args.port, args.workers or default_workers())
+    else:
+        serve_development(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
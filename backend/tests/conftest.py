@@ -0,0 +1,9 @@
+"""
+Shared test configuration
+Many tests log in from the same TestClient address, so rate limits are off
+unless a test wraps the app in its own RateLimitMiddleware
+"""
+
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
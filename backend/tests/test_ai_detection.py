@@ -0,0 +1,142 @@
+"""
+Test the AI-generated code estimator
+Run with: pytest tests/test_ai_detection.py
+"""
+
+import json
+import subprocess
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.analysis import ai_detection
+from app.analysis.ai_detection import FEATURES, ai_estimate, score_features, style_features
+from app.analysis.blob_cache import BlobCache
+from app.analysis.engine import analyze_source, collect_files
+from app.analysis.planner import compile_plan, execute_plan
+from app.models.analysis import BlobMetric  # noqa: F401  registers the cache table
+from app.utils.database import Base
+
+TIDY = (
+    '"""Order totals"""\n'
+    "\n"
+    "\n"
+    "def calculate_order_total(order_items, discount_rate):\n"
+    "    # Sum the line totals before applying the discount\n"
+    "    subtotal = sum(item.price * item.quantity for item in order_items)\n"
+    "    # Apply the discount to the subtotal\n"
+    "    return subtotal * (1 - discount_rate)\n"
+)
+
+SCRAPPY = (
+    "def f(a,b):  \n"
+    "   x=0   \n"
+    "   for i in a:\n"
+    "      if i>b: x+=i  # TODO fix\n"
+    "     elif i: print(i)\n"
+    "   return x\n"
+)
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def test_feature_vector_layout():
+    """Test a parsed file gets one value per feature, and line statistics come from the bytes"""
+    result = analyze_source("scrappy.py", SCRAPPY.encode())
+    features = dict(zip(FEATURES, result["aiFeatures"]))
+    assert len(result["aiFeatures"]) == len(FEATURES)
+    assert features["trailing_space_ratio"] == pytest.approx(2 / 6, abs=1e-3)
+    assert features["odd_indent_ratio"] > 0
+    assert features["marker_rate"] > 0
+
+    crlf = analyze_source("tidy.py", TIDY.replace("\n", "\r\n").encode())
+    assert dict(zip(FEATURES, crlf["aiFeatures"]))["trailing_space_ratio"] == 0
+    assert style_features(b"", {"code": 0, "comment": 0, "blank": 0}, []) == [0.0] * len(FEATURES)
+    assert analyze_source("pkg/__init__.py", b"\n \r\n")["aiFeatures"] == [0.0] * len(FEATURES)
+
+
+def test_line_counts_only_have_no_features():
+    """Test a line-count-only pass skips the estimator features"""
+    assert "aiFeatures" not in analyze_source("tidy.py", TIDY.encode(), parse=False)
+
+
+def test_scores_rank_tidy_above_scrappy():
+    """Test the built-in model scores consistently formatted code above scrappy code"""
+    tidy = analyze_source("tidy.py", TIDY.encode())["aiFeatures"]
+    scrappy = analyze_source("scrappy.py", SCRAPPY.encode())["aiFeatures"]
+    scores = score_features(np.array([tidy, scrappy]))
+    assert ((scores > 0) & (scores < 1)).all()
+    assert scores[0] > scores[1]
+
+
+def test_estimate_is_weighted_by_code_lines():
+    """Test the repository estimate weights files by code lines and ranks only sizeable files"""
+    tidy = analyze_source("tidy.py", TIDY.encode())
+    scrappy = analyze_source("scrappy.py", SCRAPPY.encode())
+    big = {**tidy, "path": "big.py", "code": 100}
+    estimate = ai_estimate([tidy, scrappy, big, {"path": "README.md", "code": 3}])
+    scores = score_features(np.array([tidy["aiFeatures"], scrappy["aiFeatures"], big["aiFeatures"]]))
+    expected = (scores * [tidy["code"], scrappy["code"], 100]).sum() / (tidy["code"] + scrappy["code"] + 100)
+    assert estimate["files"] == 3
+    assert estimate["percentage"] == pytest.approx(expected, abs=1e-4)
+    assert [f["path"] for f in estimate["topFiles"]] == ["big.py"]
+    assert ai_estimate([])["percentage"] == 0.0
+
+
+def test_model_file_override(tmp_path, monkeypatch):
+    """Test AI_DETECTION_MODEL_PATH replaces the built-in weights and is validated"""
+    path = tmp_path / "model.json"
+    path.write_text('{"version": "custom", "mean": [0], "scale": [1], "weights": [1], "bias": 0}')
+    monkeypatch.setattr(ai_detection, "get_settings", lambda: type("S", (), {"AI_DETECTION_MODEL_PATH": str(path)}))
+    ai_detection.load_model.cache_clear()
+    try:
+        with pytest.raises(ValueError):
+            ai_detection.load_model()
+        spec = {"version": "custom", "mean": [0] * len(FEATURES), "scale": [1] * len(FEATURES),
+                "weights": [0] * len(FEATURES), "bias": 0}
+        path.write_text(json.dumps(spec))
+        assert ai_detection.load_model().version == "custom"
+        assert score_features(np.ones((2, len(FEATURES)))).tolist() == [0.5, 0.5]
+    finally:
+        ai_detection.load_model.cache_clear()
+
+
+def test_features_cached_by_blob(tmp_path):
+    """Test a re-run takes unchanged files' features from the blob cache"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(bind=engine)
+    cache = BlobCache(sessionmaker(bind=engine))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "tidy.py").write_text(TIDY)
+    (repo / "scrappy.py").write_text(SCRAPPY)
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+
+    first, _ = collect_files(str(repo), workers=1, cache=cache)
+    (repo / "scrappy.py").write_text(SCRAPPY + "# changed\n")
+    git(repo, "commit", "-q", "-am", "change")
+    second, stats = collect_files(str(repo), workers=1, cache=cache)
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert [f["aiFeatures"] for f in first if f["path"] == "tidy.py"] == \
+        [f["aiFeatures"] for f in second if f["path"] == "tidy.py"]
+
+
+def test_planner_maps_ai_options(tmp_path):
+    """Test both AI options plan one parse and fill aiPercentage and aiDetection"""
+    (tmp_path / "tidy.py").write_text(TIDY)
+    git(tmp_path, "init", "-q")
+    plan = compile_plan(["AI generated code %", "AI Detection"])
+    assert plan.analyzers == ["parse", "ai"]
+
+    metrics = execute_plan(plan, str(tmp_path))
+    assert metrics["aiDetection"]["files"] == 1
+    assert metrics["aiPercentage"] == metrics["aiDetection"]["percentage"]
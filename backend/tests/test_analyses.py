@@ -0,0 +1,198 @@
+"""
+Test the repository analysis job pipeline
+Run with: pytest tests/test_analyses.py
+"""
+
+import subprocess
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.analysis.jobs import JobRunner, complete_job, run_analysis_job, fail_job
+from app.analysis.mirrors import mirror_cache
+from app.config.settings import get_settings
+from app.main import app
+from app.models.analysis import AnalysisJob
+from app.utils.database import init_db, SessionLocal
+
+client = TestClient(app)
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def local_repo(tmp_path):
+    """A two-commit repository reachable through a file:// URL"""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    (repo / "app.py").write_text("def main():\n    return 1\n\n\nmain()\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+    (repo / "index.js").write_text("const x = 1;\nconsole.log(x);\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "add js")
+    return f"file://{repo}"
+
+
+@pytest.fixture
+def auth_headers(monkeypatch, tmp_path):
+    """Register a fresh user, allow file:// links and return bearer headers"""
+    init_db()
+    monkeypatch.setattr(get_settings(), "ANALYSIS_ALLOWED_SCHEMES", "https,file")
+    monkeypatch.setattr(mirror_cache, "root", str(tmp_path / "mirrors"))
+    monkeypatch.setenv("ANALYSIS_MIRROR_DIR", str(tmp_path / "mirrors"))  # for spawned workers
+    email = f"jobs_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Job",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_submit_returns_job_immediately(auth_headers, local_repo):
+    """Test submitting an analysis queues a job without running it"""
+    response = client.post("/analyses", json={"repo_link": local_repo}, headers=auth_headers)
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+
+
+def test_submit_rejects_disallowed_scheme(auth_headers):
+    """Test links outside ANALYSIS_ALLOWED_SCHEMES are refused"""
+    response = client.post("/analyses", json={"repo_link": "ftp://example.com/repo"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_worker_completes_job(auth_headers, local_repo):
+    """Test a worker run stores a report that GET /analyses/{id} returns"""
+    job_id = client.post("/analyses", json={"repo_link": local_repo}, headers=auth_headers).json()["job_id"]
+
+    assert run_analysis_job(job_id) is not None
+
+    body = client.get(f"/analyses/{job_id}", headers=auth_headers).json()
+    assert body["status"] == "succeeded"
+    assert body["metrics"]["commits"]["count"] == 2
+    assert body["metrics"]["loc"]["total"] > 0
+
+
+def test_time_range_limits_history(auth_headers, local_repo):
+    """Test time_range is stored on the job and applied to the history metrics"""
+    response = client.post(
+        "/analyses",
+        json={"repo_link": local_repo, "time_range": {"from": "2000-01-01", "to": "2000-12-31"}},
+        headers=auth_headers
+    )
+    job_id = response.json()["job_id"]
+    run_analysis_job(job_id)
+
+    metrics = client.get(f"/analyses/{job_id}", headers=auth_headers).json()["metrics"]
+    assert metrics["commits"]["count"] == 0
+    assert metrics["timeRange"] == {"from": "2000-01-01", "to": "2000-12-31"}
+
+    reversed_range = {"from": "2025-02-01", "to": "2025-01-01"}
+    response = client.post("/analyses", json={"repo_link": local_repo, "time_range": reversed_range}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_failed_job_is_retried_then_failed(auth_headers):
+    """Test failures back off until max_attempts is reached"""
+    job_id = client.post("/analyses", json={"repo_link": "file:///nonexistent/repo"}, headers=auth_headers).json()["job_id"]
+
+    run_analysis_job(job_id)
+    with SessionLocal() as db:
+        job = db.get(AnalysisJob, job_id)
+        assert job.status == "queued"
+        assert job.stage == "retrying"
+        job.attempts = job.max_attempts
+        db.commit()
+
+    fail_job(job_id, "still broken")
+    with SessionLocal() as db:
+        assert db.get(AnalysisJob, job_id).status == "failed"
+
+
+def test_stale_job_is_failed_after_max_attempts(auth_headers):
+    """Test a job whose worker keeps dying is requeued until it runs out of attempts"""
+    job_id = client.post("/analyses", json={"repo_link": "file:///nonexistent/repo"}, headers=auth_headers).json()["job_id"]
+    runner = JobRunner(workers=1)
+    silent = datetime.utcnow() - timedelta(seconds=runner.stale_after + 60)
+
+    for attempts, status in ((1, "queued"), (3, "failed")):
+        with SessionLocal() as db:
+            job = db.get(AnalysisJob, job_id)
+            job.status, job.attempts, job.max_attempts, job.heartbeat_at = "running", attempts, 3, silent
+            db.commit()
+        runner.requeue_stale()
+        with SessionLocal() as db:
+            job = db.get(AnalysisJob, job_id)
+            assert job.status == status
+    assert job.stage == "failed" and "stopped responding" in job.error
+
+
+def test_superseded_run_cannot_complete_job(auth_headers):
+    """Test only the run holding the current claim stores a report, and never on a finished job"""
+    job_id = client.post("/analyses", json={"repo_link": "file:///nonexistent/repo"}, headers=auth_headers).json()["job_id"]
+    runner = JobRunner(workers=1)
+    metrics = {"loc": {"total": 1, "files": 1}}
+
+    def claim():
+        with SessionLocal() as db:
+            db.execute(update(AnalysisJob).where(AnalysisJob.job_id == job_id)
+                       .values(status="queued", worker_id=None, next_run_at=datetime.utcnow()))
+            db.commit()
+        assert job_id in runner.claim_jobs(limit=1000)
+        with SessionLocal() as db:
+            job = db.get(AnalysisJob, job_id)
+            return job.worker_id, job.attempts
+
+    first = claim()
+    # A stale heartbeat handed the job to a second run before the first one finished
+    second = claim()
+    assert complete_job(job_id, metrics, worker_id=first[0], attempt=first[1]) is None
+    with SessionLocal() as db:
+        assert db.get(AnalysisJob, job_id).report_id is None
+
+    report_id = complete_job(job_id, metrics, worker_id=second[0], attempt=second[1])
+    assert report_id is not None
+    with SessionLocal() as db:
+        job = db.get(AnalysisJob, job_id)
+        assert (job.status, job.report_id, job.worker_id) == ("succeeded", report_id, None)
+
+    third = claim()
+    with SessionLocal() as db:
+        db.execute(update(AnalysisJob).where(AnalysisJob.job_id == job_id).values(status="failed"))
+        db.commit()
+    assert complete_job(job_id, metrics, worker_id=third[0], attempt=third[1]) is None
+    with SessionLocal() as db:
+        assert db.get(AnalysisJob, job_id).status == "failed"
+
+
+def test_claim_respects_per_user_limit(auth_headers, local_repo):
+    """Test one user cannot occupy more than per_user_limit workers"""
+    job_ids = {
+        client.post("/analyses", json={"repo_link": local_repo}, headers=auth_headers).json()["job_id"]
+        for _ in range(2)
+    }
+    runner = JobRunner(workers=10, per_user_limit=1)
+
+    claimed = set(runner.claim_jobs(limit=50))
+
+    assert len(claimed & job_ids) == 1
+
+
+def test_unknown_job_is_not_found(auth_headers):
+    """Test jobs of other users or missing jobs return 404"""
+    response = client.get("/analyses/999999999", headers=auth_headers)
+    assert response.status_code == 404
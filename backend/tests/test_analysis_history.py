@@ -0,0 +1,151 @@
+"""
+Test the keyset-paginated analysis history
+Run with: pytest tests/test_analysis_history.py
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select, text
+
+from app.analysis.reports import build_report
+from app.main import app
+from app.models.analysis import AnalysisJob
+from app.models.user import Repository, User
+from app.routes.history import decode_cursor, encode_cursor, history_query
+from app.utils.database import Base, SessionLocal, async_engine, engine, init_db
+
+client = TestClient(app)
+
+START = datetime(2024, 1, 1)
+
+
+def register() -> tuple:
+    email = f"history_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "History", "lastName": "User", "email": email,
+        "password": "TestPass123", "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.user_id).where(User.email == email))
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def owner():
+    """A user with 25 analyses over 25 days, of two repositories; two share a timestamp"""
+    init_db()
+    user_id, headers = register()
+    with SessionLocal() as db:
+        repositories = []
+        for i in range(25):
+            timestamp = START + timedelta(days=min(i, 23))
+            link = "https://example.com/a" if i % 2 else "https://example.com/b"
+            repository = Repository(repo_link=link, user_id=user_id, timestamp=timestamp)
+            db.add(repository)
+            db.flush()
+            repositories.append(repository)
+            db.add(AnalysisJob(user_id=user_id, repo_id=repository.repo_id, repo_link=link,
+                               status="succeeded" if i % 3 else "failed"))
+            if i % 3:
+                db.add(build_report(repository.repo_id, {"loc": {"total": i}}))
+        db.commit()
+        ids = [repository.repo_id for repository in repositories]
+    return {"headers": headers, "user_id": user_id, "repo_ids": ids}
+
+
+def walk(headers: dict, **params) -> list:
+    pages, cursor = [], None
+    while True:
+        body = client.get("/me/analyses", params={**params, **({"cursor": cursor} if cursor else {})},
+                          headers=headers).json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_analysis_once(owner):
+    """Test cursor pages return all analyses newest first, without gaps or repeats, ties included"""
+    pages = walk(owner["headers"], limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    items = [item for page in pages for item in page]
+    assert [item["repo_id"] for item in items] == sorted(owner["repo_ids"], reverse=True)
+    assert items[0]["timestamp"] == items[1]["timestamp"]
+
+    exact = walk(owner["headers"], limit=25)
+    assert [len(page) for page in exact] == [25]
+
+
+def test_rows_carry_job_and_latest_report(owner):
+    """Test each row joins its job status and, when one exists, its latest report summary"""
+    items = [item for page in walk(owner["headers"], limit=50) for item in page]
+    for item in items:
+        i = owner["repo_ids"].index(item["repo_id"])
+        assert item["status"] == ("succeeded" if i % 3 else "failed")
+        if i % 3:
+            assert item["report"]["loc_total"] == i and item["report"]["repo_id"] == item["repo_id"]
+            assert "payload" not in item["report"]
+        else:
+            assert item["report"] is None
+
+
+def test_filters_by_repository_and_dates(owner):
+    """Test the repository link and inclusive from/to date filters"""
+    only_a = [item for page in walk(owner["headers"], limit=4, repo="https://example.com/a") for item in page]
+    assert len(only_a) == 12 and {item["repo_link"] for item in only_a} == {"https://example.com/a"}
+
+    window = client.get("/me/analyses", params={"from": "2024-01-03", "to": "2024-01-05"},
+                        headers=owner["headers"]).json()["items"]
+    assert sorted(item["timestamp"][:10] for item in window) == ["2024-01-03", "2024-01-04", "2024-01-05"]
+
+
+def test_history_is_private(owner):
+    """Test a user only sees their own analyses and bad cursors are rejected"""
+    _, stranger = register()
+    assert client.get("/me/analyses", headers=stranger).json() == {"items": [], "next_cursor": None}
+    assert client.get("/me/analyses").status_code == 401
+    assert client.get("/me/analyses", params={"cursor": "not-a-cursor"}, headers=stranger).status_code == 400
+    assert client.get("/me/analyses", params={"limit": 0}, headers=stranger).status_code == 422
+
+
+def test_cursor_round_trip():
+    """Test cursors encode the (timestamp, repo_id) key losslessly"""
+    key = (datetime(2024, 5, 6, 7, 8, 9, 123456), 42)
+    assert decode_cursor(encode_cursor(*key)) == key
+
+
+def test_page_is_a_constant_number_of_queries(owner):
+    """Test a page costs the same few statements however many rows it holds"""
+    statements = []
+    routes_engine = async_engine.sync_engine if async_engine is not None else engine
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(routes_engine, "before_cursor_execute", count)
+    try:
+        for limit in (1, 25):
+            statements.clear()
+            client.get("/me/analyses", params={"limit": limit}, headers=owner["headers"])
+            history = [s for s in statements if "repository" in s or "analysis_jobs" in s or "report" in s]
+            assert len(history) == 3
+    finally:
+        event.remove(routes_engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("repo_link", [None, "https://example.com/a"])
+def test_page_query_uses_covering_index(tmp_path, repo_link):
+    """Test a deep page seeks the history index instead of scanning or sorting"""
+    private = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(bind=private)
+    query = history_query(1, 50, (START, 1000), repo_link)
+    compiled = query.compile(private, compile_kwargs={"literal_binds": True})
+    with private.connect() as conn:
+        plan = " ".join(str(row) for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all())
+    expected = "ix_repository_user_link_timestamp" if repo_link else "ix_repository_user_timestamp"
+    assert expected in plan and "timestamp<?" in plan
+    assert "TEMP B-TREE" not in plan
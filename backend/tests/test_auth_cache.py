@@ -0,0 +1,101 @@
+"""
+Test the auth token and profile cache
+Run with: pytest tests/test_auth_cache.py
+"""
+
+import asyncio
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.auth_cache import AuthCache, auth_cache
+from app.utils.cache import MemoryCacheBackend, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    """Test entries vanish once their ttl has passed"""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, clock=clock)
+    cache.set("a", 1, ttl=5)
+    assert cache.get("a") == 1
+    clock.now += 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the cache stays bounded and evicts the coldest entry"""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_token_entry_never_outlives_exp():
+    """Test token entries are capped at the token's exp"""
+    cache = AuthCache(MemoryCacheBackend(), ttl=300)
+    cache.put_token("h.p.sig", {"sub": "a@example.com", "exp": time.time() - 1})
+    assert cache.get_token("h.p.sig") is None
+
+
+def test_token_lookup_checks_whole_token():
+    """Test a different token sharing a signature is not served from cache"""
+    cache = AuthCache(MemoryCacheBackend(), ttl=300)
+    cache.put_token("h.p.sig", {"sub": "a@example.com", "exp": time.time() + 60})
+    assert cache.get_token("h.other.sig") is None
+    assert cache.get_token("h.p.sig")["sub"] == "a@example.com"
+
+
+def test_invalidation_reaches_all_workers():
+    """Test two workers sharing a backend both see an invalidation"""
+    shared = MemoryCacheBackend()
+    worker_a = AuthCache(shared, ttl=300)
+    worker_b = AuthCache(shared, ttl=300)
+
+    async def run():
+        await worker_a.put_profile("a@example.com", {"email": "a@example.com"}, time.time() + 60)
+        assert await worker_b.get_profile("a@example.com") is not None
+        await worker_b.invalidate_user("a@example.com")
+        return await worker_a.get_profile("a@example.com")
+
+    assert asyncio.run(run()) is None
+    assert worker_b.stats()["profile_hits"] == 1
+
+
+def test_me_served_from_cache():
+    """Test repeated /auth/me calls hit the token and profile caches"""
+    email = f"cache_{uuid.uuid4().hex[:8]}@example.com"
+    with TestClient(app) as client:
+        client.post("/auth/register", json={
+            "firstName": "Cache",
+            "lastName": "User",
+            "email": email,
+            "password": "TestPass123",
+            "confirmPassword": "TestPass123"
+        })
+        token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        before = auth_cache.stats()
+        first = client.get("/auth/me", headers=headers)
+        second = client.get("/auth/me", headers=headers)
+        after = auth_cache.stats()
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["email"] == email
+    assert after["token_hits"] - before["token_hits"] == 1
+    assert after["profile_hits"] - before["profile_hits"] == 1
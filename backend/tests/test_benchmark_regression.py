@@ -0,0 +1,65 @@
+"""
+Test the benchmark suite's baseline comparison
+Run with: pytest tests/test_benchmark_regression.py
+"""
+
+from benchmarks.regression import PeakMemory, compare, metric, threshold_for, update_baseline
+
+BASELINE = {
+    "thresholds": {"default": 0.25, "api.": 0.5, "api.me.": 0.1},
+    "floors": {"ms": 10.0, "MB": 16.0},
+    "metrics": {
+        "api.me.p99": metric(100.0, "ms"),
+        "api.login.p99": metric(100.0, "ms"),
+        "api.me.throughput": metric(1000.0, "req/s"),
+        "analyzers.1k.stage.ai": metric(1.0, "ms"),
+        "analyzers.1k.memory_growth": metric(100.0, "MB"),
+    },
+}
+
+
+def test_threshold_longest_prefix_wins():
+    """Test per-prefix thresholds, falling back to the default"""
+    thresholds = BASELINE["thresholds"]
+    assert threshold_for("api.me.p99", thresholds) == 0.1
+    assert threshold_for("api.login.p99", thresholds) == 0.5
+    assert threshold_for("analyzers.1k.total", thresholds) == 0.25
+    assert threshold_for("anything", {}) == 0.25
+
+
+def test_compare_flags_only_real_regressions():
+    """Test direction, thresholds and noise floors, and that unknown metrics are ignored"""
+    results = {
+        "api.me.p99": metric(125.0, "ms"),            # +25% over a 10% threshold, +25 ms clears the floor
+        "api.login.p99": metric(140.0, "ms"),         # +40% is within the api threshold
+        "api.me.throughput": metric(850.0, "req/s"),  # 15% slower
+        "analyzers.1k.stage.ai": metric(8.0, "ms"),   # +700% but under the 10 ms floor
+        "analyzers.1k.memory_growth": metric(60.0, "MB"),  # improvements never fail
+        "analyzers.1k.total": metric(9.0, "s"),       # not in the baseline
+    }
+    regressions = compare(results, BASELINE)
+    assert [r["metric"] for r in regressions] == ["api.me.p99", "api.me.throughput"]
+    assert regressions[0]["change"] == 0.25 and regressions[0]["threshold"] == 0.1
+
+    overridden = compare(results, BASELINE, threshold=0.5)
+    assert [r["metric"] for r in overridden] == []
+    assert [r["metric"] for r in compare(results, BASELINE, threshold=0.1)] == [
+        "api.login.p99", "api.me.p99", "api.me.throughput"
+    ]
+    assert compare(results, {}) == []
+
+
+def test_update_baseline_keeps_thresholds():
+    """Test --perf-update-baseline replaces values and keeps the configured thresholds"""
+    updated = update_baseline(BASELINE, {"api.me.p99": metric(125.0, "ms")})
+    assert updated["thresholds"] == BASELINE["thresholds"]
+    assert updated["metrics"]["api.me.p99"]["value"] == 125.0
+    assert updated["metrics"]["api.login.p99"]["value"] == 100.0
+
+
+def test_peak_memory_sees_allocations():
+    """Test the high-water mark covers memory allocated and freed inside the block"""
+    with PeakMemory() as memory:
+        block = b"x" * (64 * 1024 * 1024)
+        del block
+    assert memory.peak_mb >= 64 and memory.growth_mb >= 60
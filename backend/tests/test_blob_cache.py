@@ -0,0 +1,83 @@
+"""
+Test the content-addressed blob metric cache
+Run with: pytest tests/test_blob_cache.py
+"""
+
+import subprocess
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.analysis.blob_cache import BlobCache
+from app.analysis.engine import analyze_tree
+from app.models.analysis import BlobMetric
+from app.utils.database import Base
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def cache_sessions(tmp_path):
+    """Session factory on a private database so other tests' blobs never hit"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    for i in range(5):
+        (repo / f"mod{i}.py").write_text(f"def f{i}(x):\n    return x if x else {i}\n")
+    (repo / "copy.py").write_text("def f0(x):\n    return x if x else 0\n")
+    (repo / "data.bin.txt").write_bytes(b"\0binary")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+def test_reanalysis_only_parses_changed_blobs(repo, cache_sessions):
+    cache = BlobCache(cache_sessions)
+    first = analyze_tree(str(repo), workers=1, cache=cache)
+    # copy.py has the same blob as mod0.py but both are looked up before either is stored
+    assert first["cache"] == {"files": 7, "hits": 0, "misses": 7, "hitRatio": 0.0}
+
+    (repo / "mod1.py").write_text("def f1(x):\n    if x:\n        return 1\n    return 2\n")
+    git(repo, "commit", "-q", "-am", "change one file")
+    second = analyze_tree(str(repo), workers=1, cache=cache)
+
+    assert second["cache"]["hits"] == 6
+    assert second["cache"]["misses"] == 1
+    assert second["cache"]["hitRatio"] == round(6 / 7, 4)
+    # Merged results match a from-scratch analysis
+    uncached = analyze_tree(str(repo), workers=1)
+    assert {k: v for k, v in second.items() if k != "cache"} == uncached
+
+
+def test_eviction_drops_least_recently_used(cache_sessions):
+    cache = BlobCache(cache_sessions, max_bytes=10_000)
+    cache.put_many({"old": {"code": 1}, "new": {"code": 2}})
+    cache.get_many(["new"])  # touch
+
+    cache.max_bytes = len('{"code":2}')
+    cache.evict()
+
+    assert set(cache.get_many(["old", "new"])) == {"new"}
+    with cache_sessions() as db:
+        assert db.scalar(select(func.count()).select_from(BlobMetric)) == 1
+
+
+def test_concurrent_inserts_keep_first_copy(cache_sessions):
+    first = BlobCache(cache_sessions)
+    second = BlobCache(cache_sessions)
+    first.put_many({"a": {"code": 1}})
+    second.put_many({"a": {"code": 99}, "b": {"code": 2}})
+    assert first.get_many(["a", "b"]) == {"a": {"code": 1}, "b": {"code": 2}}
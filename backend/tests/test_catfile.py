@@ -0,0 +1,110 @@
+"""
+Test the cat-file blob reader and history snapshots
+Run with: pytest tests/test_catfile.py
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from app.analysis import snapshots
+from app.analysis.catfile import INITIAL_BUFFER_BYTES, CatFilePool, CatFileReader
+from app.analysis.snapshots import snapshot_series
+
+
+def git(cwd, *args, env=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+        env={**os.environ, **(env or {})}
+    ).stdout
+
+
+def commit_on(repo, day, message):
+    stamp = f"{day}T12:00:00+00:00"
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message, env={"GIT_AUTHOR_DATE": stamp, "GIT_COMMITTER_DATE": stamp})
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Three days of history: a file added, a file added, one file changed"""
+    git(tmp_path, "init", "-q")
+    (tmp_path / "stable.py").write_text("def stable(a):\n    if a:\n        return 1\n    return 0\n")
+    commit_on(tmp_path, "2025-09-01", "stable")
+    (tmp_path / "grow.py").write_text("x = 1\n")
+    commit_on(tmp_path, "2025-09-02", "grow")
+    (tmp_path / "grow.py").write_text("x = 1\ny = 2\nz = 3\n")
+    commit_on(tmp_path, "2025-09-03", "more")
+    return tmp_path
+
+
+def blob_sha(repo, path):
+    return git(repo, "rev-parse", f"HEAD:{path}").strip()
+
+
+def test_reader_streams_blobs(repo):
+    """Test single and pipelined reads return exact contents, and missing objects are None"""
+    (repo / "big.txt").write_bytes(b"a" * (INITIAL_BUFFER_BYTES * 3 + 7))
+    commit_on(repo, "2025-09-04", "big")
+    reader = CatFileReader(str(repo))
+    try:
+        assert bytes(reader.read(blob_sha(repo, "grow.py"))) == b"x = 1\ny = 2\nz = 3\n"
+        assert reader.read("0" * 40) is None
+
+        shas = [blob_sha(repo, p) for p in ("big.txt", "stable.py", "grow.py")]
+        sizes = [len(data) for _, data in reader.read_many(shas)]
+        assert sizes == [INITIAL_BUFFER_BYTES * 3 + 7, 55, 18]
+        # The process is still usable after a pipelined batch
+        assert bytes(reader.read(shas[2])).startswith(b"x = 1")
+    finally:
+        reader.close()
+
+
+def test_pool_reuses_readers_and_replaces_broken_ones(repo):
+    """Test borrowing twice gets the same process, and an abandoned batch retires it"""
+    sha = blob_sha(repo, "stable.py")
+    with CatFilePool(str(repo), size=1) as pool:
+        with pool.reader() as first:
+            pass
+        with pool.reader() as second:
+            assert second is first
+            batch = second.read_many([sha, sha, sha])
+            next(batch)
+            batch.close()  # abandoned mid-stream
+        with pool.reader() as third:
+            assert third is not first
+            assert bytes(third.read(sha)).startswith(b"def stable")
+
+
+def test_snapshot_series_reuses_unchanged_blobs(repo, monkeypatch):
+    """Test one point per commit day, and a blob unchanged across days is analysed once"""
+    analysed = []
+    real = snapshots.analyze_source
+
+    def counting(path, data, parse=True):
+        analysed.append(path)
+        return real(path, data, parse)
+
+    monkeypatch.setattr(snapshots, "analyze_source", counting)
+    series = snapshot_series(str(repo), count=30, parse=True)
+
+    assert [p["date"] for p in series] == ["2025-09-01", "2025-09-02", "2025-09-03"]
+    assert [p["loc"] for p in series] == [4, 5, 7]
+    assert [p["complexity"] for p in series] == [2, 2, 2]
+    assert analysed.count("stable.py") == 1
+    assert analysed.count("grow.py") == 2
+
+
+def test_snapshot_count_keeps_most_recent_days(repo):
+    """Test sampling keeps the latest commit days"""
+    series = snapshot_series(str(repo), count=2)
+    assert [p["date"] for p in series] == ["2025-09-02", "2025-09-03"]
+    assert "complexity" not in series[0]
+
+
+def test_snapshot_series_of_empty_repository(tmp_path):
+    """Test a repository without commits has an empty series"""
+    git(tmp_path, "init", "-q")
+    assert snapshot_series(str(tmp_path)) == []
@@ -0,0 +1,203 @@
+"""
+Test the streaming repository chat
+Run with: pytest tests/test_chat.py
+"""
+
+import asyncio
+import json
+import subprocess
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analysis.jobs import run_analysis_job
+from app.analysis.mirrors import mirror_cache
+from app.chat.providers import LocalProvider, create_provider
+from app.chat.retrieval import build_index, decode_index, encode_index, search, terms
+from app.config.settings import get_settings
+from app.main import app
+from app.routes import chat
+from app.utils.cache import TTLCache
+from app.utils.database import init_db
+
+client = TestClient(app)
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def register(prefix: str) -> dict:
+    email = f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Chat",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for raw in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in raw.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def auth_headers(monkeypatch, tmp_path):
+    """A fresh user, the local provider and an empty index cache"""
+    init_db()
+    monkeypatch.setattr(get_settings(), "ANALYSIS_ALLOWED_SCHEMES", "https,file")
+    monkeypatch.setattr(mirror_cache, "root", str(tmp_path / "mirrors"))
+    monkeypatch.setattr(chat, "get_provider", lambda: LocalProvider())
+    monkeypatch.setattr(chat, "index_cache", TTLCache())
+    return register("chat")
+
+
+@pytest.fixture
+def analysed_repo(auth_headers, tmp_path):
+    """Repository id of a local repository analysed by a worker run"""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    (repo / "billing.py").write_text(
+        "def compute_invoice_total(items):\n"
+        "    return sum(item.price for item in items)\n"
+    )
+    (repo / "auth.py").write_text("def verify_password(plain, hashed):\n    return plain == hashed\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "add billing and auth")
+
+    job = client.post("/analyses", json={"repo_link": f"file://{repo}"}, headers=auth_headers).json()
+    assert run_analysis_job(job["job_id"]) is not None
+    return job["repo_id"]
+
+
+def test_terms_split_identifiers():
+    """Test camelCase and snake_case identifiers are searchable by their parts"""
+    assert {"computeinvoicetotal", "compute", "invoice", "total"} <= set(terms("computeInvoiceTotal"))
+    assert {"verify", "password"} <= set(terms("verify_password"))
+
+
+def test_search_ranks_relevant_chunk_first():
+    """Test BM25 puts the chunk about the query first, and survives encoding"""
+    index = build_index([
+        {"kind": "source", "title": "a.py:1-2", "text": "def render_page(): pass", "path": "a.py", "start": 1, "end": 2},
+        {"kind": "source", "title": "b.py:1-2", "text": "def parse_invoice(raw): pass", "path": "b.py", "start": 1, "end": 2},
+        {"kind": "source", "title": "c.py:1-2", "text": "def send_email(): pass", "path": "c.py", "start": 1, "end": 2},
+    ])
+    index = decode_index(encode_index(index))
+    assert search(index, "which function reads an invoice?", k=1)[0]["path"] == "b.py"
+    assert search(index, "unrelated words", k=3) == []
+
+
+def test_local_provider_streams_words():
+    """Test the offline provider yields several chunks"""
+    async def collect():
+        return [token async for token in LocalProvider().stream("[1] Overview\ntext\n\nQuestion: hi")]
+    tokens = asyncio.run(collect())
+    assert len(tokens) > 1
+    assert "Overview" in "".join(tokens)
+
+
+def test_auto_provider_without_key_is_local():
+    """Test "auto" falls back to the local provider when no API key is configured"""
+    assert isinstance(create_provider("auto", api_key=""), LocalProvider)
+    with pytest.raises(ValueError):
+        create_provider("gemini", api_key="")
+
+
+def test_chat_streams_grounded_answer(auth_headers, analysed_repo):
+    """Test a chat about an analysed repository streams tokens then a done event with sources"""
+    response = client.post("/chat", json={
+        "message": "How is the invoice total computed?",
+        "repo_id": analysed_repo
+    }, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "done"
+    assert kinds.count("token") > 1
+
+    done = events[-1][1]
+    assert done["sources"][0] == "Repository overview"
+    assert any(source.startswith("billing.py") for source in done["sources"])
+    assert 0 < done["prompt_chars"] <= get_settings().CHAT_MAX_PROMPT_CHARS
+    assert done["ttft_ms"] >= 0
+
+    answer = "".join(data["text"] for kind, data in events if kind == "token")
+    assert "billing.py" in answer
+
+
+def test_prompt_respects_budget(auth_headers, analysed_repo, monkeypatch):
+    """Test context is trimmed to CHAT_MAX_PROMPT_CHARS"""
+    monkeypatch.setattr(get_settings(), "CHAT_MAX_PROMPT_CHARS", 600)
+    response = client.post("/chat", json={"message": "invoice", "repo_id": analysed_repo}, headers=auth_headers)
+    done = parse_events(response.text)[-1][1]
+    assert done["prompt_chars"] <= 600
+
+
+def test_provider_failure_emits_error_event(auth_headers, analysed_repo, monkeypatch):
+    """Test a provider exception ends the stream with an error event"""
+    class FailingProvider(LocalProvider):
+        async def stream(self, prompt):
+            yield "partial "
+            raise RuntimeError("upstream closed")
+
+    monkeypatch.setattr(chat, "get_provider", lambda: FailingProvider())
+    response = client.post("/chat", json={"message": "invoice", "repo_id": analysed_repo}, headers=auth_headers)
+    assert [kind for kind, _ in parse_events(response.text)] == ["token", "error"]
+
+
+def test_long_assistant_turn_in_history_is_clipped(auth_headers, analysed_repo):
+    """Test an answer longer than the history limit does not end the conversation"""
+    response = client.post("/chat", json={
+        "message": "And the tax?",
+        "repo_id": analysed_repo,
+        "history": [
+            {"role": "user", "text": "How is the invoice total computed?"},
+            {"role": "assistant", "text": "The total is summed in billing.py. " * 500},
+        ]
+    }, headers=auth_headers)
+    assert response.status_code == 200
+    assert parse_events(response.text)[-1][0] == "done"
+    assert len(chat.ChatMessage(role="assistant", text="x" * 10_000).text) == chat.HISTORY_TEXT_MAX_CHARS
+
+
+def test_chat_about_other_users_repository_is_not_found(auth_headers, analysed_repo):
+    """Test a user cannot read another user's retrieval index"""
+    response = client.post("/chat", json={"message": "hello", "repo_id": analysed_repo}, headers=register("other"))
+    assert response.status_code == 404
+
+
+def test_guest_chat_is_ungrounded(auth_headers, analysed_repo):
+    """Test a guest without a token gets an answer, but not about an analysed repository"""
+    response = client.post("/chat", json={"message": "hello"})
+    assert response.status_code == 200
+    done = parse_events(response.text)[-1]
+    assert done[0] == "done" and done[1]["sources"] == []
+
+    response = client.post("/chat", json={"message": "invoice", "repo_id": analysed_repo})
+    assert response.status_code == 401
+
+    response = client.post("/chat", json={"message": "hello"}, headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+
+def test_health_reports_chat_stats(auth_headers, analysed_repo):
+    """Test /health exposes time-to-first-token and prompt size statistics"""
+    client.post("/chat", json={"message": "invoice", "repo_id": analysed_repo}, headers=auth_headers)
+    stats = client.get("/health").json()["chat"]
+    assert stats["completed"] >= 1
+    assert "ttft_p95_ms" in stats and stats["prompt_chars_mean"] > 0
@@ -0,0 +1,127 @@
+"""
+Test the repository comparison endpoint
+Run with: pytest tests/test_compare.py
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+
+from app.analysis.reports import build_report
+from app.main import app
+from app.models.user import Repository, User
+from app.routes import compare
+from app.utils.cache import MemoryCacheBackend
+from app.utils.database import SessionLocal, async_engine, engine, init_db
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def owner(monkeypatch):
+    """A fresh user with an empty comparison cache"""
+    init_db()
+    monkeypatch.setattr(compare, "compare_cache", MemoryCacheBackend())
+    email = f"compare_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Compare",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/auth/me", headers=headers)  # warm the auth cache so only compare queries are counted
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.user_id).where(User.email == email))
+    return {"headers": headers, "user_id": user_id}
+
+
+def make_repositories(user_id: int, count: int, reports: int = 2) -> list:
+    ids = []
+    with SessionLocal() as db:
+        for i in range(count):
+            repository = Repository(repo_link=f"https://example.com/repo{i}", user_id=user_id)
+            db.add(repository)
+            db.flush()
+            for version in range(reports):
+                db.add(build_report(repository.repo_id, {"loc": {"total": i * 100 + version}}))
+                db.flush()
+            ids.append(repository.repo_id)
+        db.commit()
+    return ids
+
+
+class QueryCounter:
+    """Counts SQL statements on both the sync and async engines"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", self)
+
+
+def test_compare_returns_latest_summaries_in_order(owner):
+    ids = make_repositories(owner["user_id"], 3)
+    requested = [ids[2], ids[0], 999999999]
+
+    response = client.get(f"/compare?repo_ids={','.join(map(str, requested))}", headers=owner["headers"])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["repo_id"] for r in body["repositories"]] == [ids[2], ids[0]]
+    assert [r["report"]["loc_total"] for r in body["repositories"]] == [201, 1]
+    assert body["missing"] == [999999999]
+
+
+def test_query_count_is_constant(owner):
+    counts = []
+    for size in (2, 10, 40):
+        ids = make_repositories(owner["user_id"], size)
+        with QueryCounter() as counter:
+            response = client.get(f"/compare?repo_ids={','.join(map(str, ids))}", headers=owner["headers"])
+        assert response.status_code == 200
+        assert len(response.json()["repositories"]) == size
+        counts.append(counter.count)
+    assert counts[0] == counts[1] == counts[2]
+    assert counts[0] <= 2
+
+
+def test_identical_sets_are_served_from_cache(owner):
+    ids = make_repositories(owner["user_id"], 3)
+    first = client.get(f"/compare?repo_ids={ids[0]},{ids[1]},{ids[2]}", headers=owner["headers"]).json()
+
+    with QueryCounter() as counter:
+        second = client.get(f"/compare?repo_ids={ids[2]},{ids[1]},{ids[0]}", headers=owner["headers"]).json()
+
+    assert counter.count == 0
+    assert second["repositories"] == first["repositories"][::-1]
+
+
+def test_pending_analyses_are_not_cached(owner):
+    ids = make_repositories(owner["user_id"], 1, reports=0)
+    client.get(f"/compare?repo_ids={ids[0]}", headers=owner["headers"])
+
+    with QueryCounter() as counter:
+        body = client.get(f"/compare?repo_ids={ids[0]}", headers=owner["headers"]).json()
+    assert counter.count > 0
+    assert body["repositories"][0]["report"] is None
+
+
+def test_compare_validates_repo_ids(owner):
+    assert client.get("/compare?repo_ids=1,x", headers=owner["headers"]).status_code == 400
+    too_many = ",".join(str(i) for i in range(51))
+    assert client.get(f"/compare?repo_ids={too_many}", headers=owner["headers"]).status_code == 400
@@ -0,0 +1,70 @@
+"""
+Test database URL and engine helpers
+Run with: pytest tests/test_database.py
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.utils.database import make_async_url, engine_options
+from app.utils.migrations import migrate, pending_migrations
+
+
+def test_make_async_url_maps_drivers():
+    """Test sync URLs are mapped onto their async drivers"""
+    assert make_async_url("sqlite:///./devlens.db") == "sqlite+aiosqlite:///./devlens.db"
+    assert make_async_url("mysql+pymysql://u:p@localhost/devlens_db") == "mysql+aiomysql://u:p@localhost/devlens_db"
+    assert make_async_url("postgresql://u:p@localhost/devlens_db") == "postgresql+asyncpg://u:p@localhost/devlens_db"
+
+
+def test_make_async_url_keeps_async_drivers():
+    """Test URLs that already name an async driver are left alone"""
+    assert make_async_url("mysql+asyncmy://u:p@localhost/db") == "mysql+asyncmy://u:p@localhost/db"
+
+
+def test_make_async_url_rejects_unknown_backend():
+    """Test unsupported backends fail loudly"""
+    with pytest.raises(ValueError):
+        make_async_url("oracle://u:p@localhost/db")
+
+
+def test_engine_options_pool_sizing():
+    """Test pool sizing is skipped only for in-memory SQLite"""
+    assert "pool_size" in engine_options("mysql+aiomysql://u:p@localhost/db")
+    assert "pool_size" in engine_options("sqlite+aiosqlite:///./devlens.db")
+    assert "pool_size" not in engine_options("sqlite:///:memory:")
+
+
+def test_pending_migrations(tmp_path):
+    """Test a new database reports its missing tables and migrations until migrated"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    pending = pending_migrations(engine)
+    assert "table users" in pending and "migration 1" in pending
+
+    migrate(engine)
+    assert pending_migrations(engine) == []
+
+
+def test_utils_package_imports_lazily():
+    """Test importing app.utils loads a utility module only when it is used"""
+    code = (
+        "import sys, app.utils; assert 'app.utils.auth' not in sys.modules; "
+        "app.utils.hash_password; assert 'app.utils.auth' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "SECRET_KEY": "x"})
+
+
+def test_migrate_leaves_no_pooled_connection_to_fork(tmp_path):
+    """Test server.py migrate returns its connection, so preforked workers never share one"""
+    code = (
+        "import server; from app.utils.database import engine, reset_pools_after_fork; "
+        "server.migrate(); assert engine.pool.checkedin() == 0, engine.pool.status(); "
+        "engine.connect().close(); reset_pools_after_fork(); assert engine.pool.checkedin() == 0"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env={
+        **os.environ, "SECRET_KEY": "x", "DATABASE_URL": f"sqlite:///{tmp_path / 'fork.db'}"
+    })
@@ -0,0 +1,82 @@
+"""
+Test the rolling-hash duplication detector
+Run with: pytest tests/test_duplication.py
+"""
+
+import json
+
+from app.analysis.duplication import KGRAM, detect_duplicates, fingerprint, rolling_hashes, winnow
+from app.analysis.engine import analyze_tree
+from app.analysis.parsers.js import parse_js
+from app.analysis.parsers.python import parse_python
+
+PYTHON_FUNCTION = '''
+def {name}(items, limit):
+    total = 0
+    for item in items:
+        if item.{attr} > limit and not item.hidden:
+            total += item.{attr} * 2
+        elif item.{attr} < 0:
+            total -= 1
+    return {{"total": total, "count": len(items)}}
+'''
+
+
+def test_rolling_hash_matches_direct_hash():
+    ids = list(range(100))
+    hashes = rolling_hashes(ids, k=5)
+    assert len(hashes) == 96
+    assert hashes[10] == rolling_hashes(ids[10:15], k=5)[0]
+
+
+def test_winnow_picks_one_per_window():
+    hashes = [5, 3, 8, 3, 9, 1, 7, 7, 2, 6]
+    selected = winnow(hashes, window=4)
+    assert selected == [3, 5, 8]
+    # Every window of 4 contains a selected position
+    assert all(any(i <= p < i + 4 for p in selected) for i in range(len(hashes) - 3))
+
+
+def test_renamed_copy_is_found_across_files(tmp_path):
+    (tmp_path / "a.py").write_text("import os\n" + PYTHON_FUNCTION.format(name="summarize", attr="price"))
+    (tmp_path / "b.py").write_text("x = 1\n\n" + PYTHON_FUNCTION.format(name="tally", attr="weight"))
+    (tmp_path / "c.py").write_text("def other(a):\n    return [a, a + 1]\n")
+
+    duplicates = analyze_tree(str(tmp_path), workers=1)["duplicates"]
+
+    assert duplicates["totalDuplications"] == 1
+    clone = duplicates["clones"][0]
+    assert (clone["a"]["path"], clone["b"]["path"]) == ("a.py", "b.py")
+    # Regions are as precise as the winnowed fingerprints: within a window of the true start
+    assert 3 <= clone["a"]["start"] <= 6
+    assert clone["b"]["start"] == clone["a"]["start"] + 1
+    assert clone["a"]["end"] - clone["a"]["start"] == clone["b"]["end"] - clone["b"]["start"]
+    assert {f["path"] for f in duplicates["byFile"]} == {"a.py", "b.py"}
+
+
+def test_js_clone_and_imports_ignored():
+    body = "export function f(a) {\n  if (a && a.ok) {\n    return a.items.map((x) => x.id * 2).filter(Boolean);\n  }\n  return [];\n}\n"
+    files = [
+        {"path": "a.js", "fingerprints": fingerprint(parse_js(body).tokens)},
+        {"path": "b.js", "fingerprints": fingerprint(parse_js(body.replace("items", "rows")).tokens)},
+    ]
+    assert detect_duplicates(files)["totalDuplications"] == 1
+
+    imports = "".join(f'import {{ thing{i} }} from "./module{i}";\n' for i in range(30))
+    assert parse_js(imports).tokens == []
+
+
+def test_repetitive_table_is_not_a_self_clone():
+    table = "VALUES = [\n" + "".join(f"    ({i}, 'x'),\n" for i in range(200)) + "]\n"
+    files = [{"path": "table.py", "fingerprints": fingerprint(parse_python(table).tokens)}]
+    assert detect_duplicates(files)["totalDuplications"] == 0
+
+
+def test_fingerprints_are_persistable():
+    tokens = parse_python(PYTHON_FUNCTION.format(name="f", attr="a") * 3).tokens
+    fps = fingerprint(tokens)
+    assert fps and all(len(fp) == 4 for fp in fps)
+    assert json.loads(json.dumps(fps)) == fps
+    # Stable across runs: derived from crc32, not the salted built-in hash
+    assert fingerprint(tokens) == fps
+    assert all(fp[3] >= fp[2] for fp in fps) and fps[0][1] + KGRAM <= len(tokens)
@@ -0,0 +1,112 @@
+"""
+Test the LOC and complexity engine
+Run with: pytest tests/test_engine.py
+"""
+
+from app.analysis.engine import aggregate, analyze_files, analyze_tree, walk_source_files
+from app.analysis.languages import PYTHON, JAVASCRIPT, classify
+from app.analysis.lines import count_lines
+from app.analysis.parsers.js import parse_js
+from app.analysis.parsers.python import parse_python
+from benchmarks.synthetic import generate_repo
+
+
+def test_count_lines_python_and_js():
+    python = "# header\nimport os\n\n\ndef f():  # trailing\n    return 1\n"
+    assert count_lines(python, PYTHON) == (3, 1, 2)
+
+    js = "/* a\n   b */\nconst x = 1; /* starts\nends */\n\n// done\n"
+    assert count_lines(js, JAVASCRIPT) == (1, 4, 1)
+
+
+def test_python_complexity():
+    parsed = parse_python(
+        "def f(a, b):\n"
+        "    if a and b:\n"
+        "        return [x for x in a if x]\n"
+        "    for i in b:\n"
+        "        pass\n"
+        "    return a if b else None\n"
+        "\n"
+        "class C:\n"
+        "    def g(self):\n"
+        "        return 1\n"
+    )
+    by_name = {f.name: f for f in parsed.functions}
+    # if + and + comprehension + its if + for + ternary
+    assert by_name["f"].complexity == 7
+    assert by_name["g"].complexity == 1
+    assert parsed.complexity == 8
+
+
+def test_js_complexity_and_jsx():
+    parsed = parse_js(
+        "function outer(a) {\n"
+        "  if (a && a.ok) { return a.value ?? 0; }\n"
+        "  return a ? 1 : 2;\n"
+        "}\n"
+        "const arrow = (x) => {\n"
+        "  for (const y of x) { console.log(y); }\n"
+        "};\n"
+        "class K { method() { return /re}/.test('x'); } }\n"
+        "const View = () => <p>Don't {ok ? 'a' : 'b'}</p>;\n"
+    )
+    by_name = {f.name: f for f in parsed.functions}
+    assert by_name["outer"].complexity == 5
+    assert by_name["arrow"].complexity == 2
+    assert by_name["method"].complexity == 1
+    assert "View" in by_name
+
+
+def test_js_expression_bodied_arrows():
+    parsed = parse_js(
+        "const fallback = (x) => x || 1;\n"
+        "const pick = a => a ? b : c\n"
+        "function total(items) {\n"
+        "  return items.map(item => item.price ?? 0).filter(p => p && p > 0).length;\n"
+        "}\n"
+        "const make = (a) => ({\n"
+        "  key: a && a.id,\n"
+        "});\n"
+    )
+    by_name = {f.name: f for f in parsed.functions}
+    assert by_name["fallback"].complexity == 2
+    assert by_name["pick"].complexity == 2 and by_name["pick"].end_line == 2
+    # The callbacks' operators are theirs, not the enclosing function's
+    assert by_name["total"].complexity == 1
+    assert sorted(f.complexity for f in parsed.functions if f.name == "<anonymous>") == [2, 2]
+    assert (by_name["make"].complexity, by_name["make"].end_line) == (2, 8)
+    assert parsed.complexity == 11
+
+
+def test_walk_skips_vendored_and_binary(tmp_path):
+    generate_repo(str(tmp_path), 10, vendored=10)
+    (tmp_path / "app.min.js").write_text("var a=1;")
+    paths = walk_source_files(str(tmp_path))
+    assert len(paths) == 10
+    assert all(p.startswith("src/") for p in paths)
+
+
+def test_parallel_matches_inline(tmp_path, monkeypatch):
+    generate_repo(str(tmp_path), 60)
+    paths = walk_source_files(str(tmp_path))
+    inline = aggregate(analyze_files(str(tmp_path), paths, workers=1))
+
+    monkeypatch.setattr("app.analysis.engine.PARALLEL_THRESHOLD", 10)
+    parallel = aggregate(analyze_files(str(tmp_path), paths, workers=2, chunk_size=7))
+    assert parallel == inline
+
+
+def test_analyze_tree_aggregates_by_language(tmp_path):
+    (tmp_path / "a.py").write_text("def f(x):\n    return x or 1\n")
+    (tmp_path / "b.ts").write_text("export const g = (n: number) => n > 1 ? n : 0;\n")
+    (tmp_path / "notes.md").write_text("# Notes\n")
+    metrics = analyze_tree(str(tmp_path), workers=1)
+
+    assert metrics["loc"]["files"] == 3
+    langs = {lang["lang"]: lang for lang in metrics["loc"]["byLang"]}
+    assert langs["Python"]["loc"] == 2
+    assert langs["TypeScript"]["loc"] == 1
+    assert metrics["complexity"]["functions"] == 2
+    assert metrics["complexity"]["totalScore"] == 4
+    assert classify("x.unknown").name == "Other"
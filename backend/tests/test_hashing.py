@@ -0,0 +1,48 @@
+"""
+Test the password hashing pool
+Run with: pytest tests/test_hashing.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.auth import verify_password
+from app.utils.hashing import PasswordHasher, PasswordHasherBusy
+
+
+def test_hash_and_verify_round_trip():
+    """Test hashing in the pool produces a verifiable bcrypt hash"""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+
+    async def run():
+        hashed = await hasher.hash("TestPass123")
+        return hashed, await hasher.verify("TestPass123", hashed)
+
+    hashed, valid = asyncio.run(run())
+    hasher.shutdown()
+
+    assert verify_password("TestPass123", hashed)
+    assert valid
+    assert hasher.in_flight == 0
+
+
+def test_saturated_pool_sheds_load():
+    """Test work beyond workers + max_pending is rejected instead of queued"""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    gate = threading.Event()
+
+    async def run():
+        blocked = [asyncio.ensure_future(hasher._submit(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("TestPass123")
+        gate.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(run())
+    hasher.shutdown()
+
+    assert hasher.rejected == 1
+    assert hasher.in_flight == 0
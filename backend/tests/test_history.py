@@ -0,0 +1,122 @@
+"""
+Test the streaming commit history miner
+Run with: pytest tests/test_history.py
+"""
+
+import os
+import subprocess
+import time
+from datetime import date
+
+import pytest
+
+from app.analysis.git import GitError
+from app.analysis.history import RECORD, UNIT, mine_history, parse_log, slice_activity, stream_log
+
+
+def commit(repo, author, day, message):
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_DATE": f"{day}T12:00:00Z",
+        "GIT_COMMITTER_DATE": f"{day}T12:00:00Z",
+    }
+    subprocess.run(["git", "add", "."], cwd=repo, check=True, capture_output=True)
+    subprocess.run(
+        ["git", "-c", f"user.name={author}", "-c", "user.email=dev@example.com", "commit", "-q", "-m", message],
+        cwd=repo, check=True, capture_output=True, env=env
+    )
+
+
+@pytest.fixture
+def history_repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    (repo / "app.py").write_text("a\nb\nc\n")
+    commit(repo, "alice", "2025-09-01", "initial")
+    (repo / "app.py").write_text("a\nb\nc\nd\n")
+    (repo / "logo.png").write_bytes(b"\0\1\2")
+    commit(repo, "bob", "2025-09-03", "tweak app")
+    (repo / "README.md").write_text("hello\n")
+    commit(repo, "alice", "2025-09-03", "docs")
+    return str(repo)
+
+
+def test_parse_log_groups_numstat_lines():
+    lines = [
+        f"{RECORD}abc{UNIT}alice{UNIT}1756728000{UNIT}first\n",
+        "\n",
+        "3\t1\tsrc/a.py\n",
+        "-\t-\timg.png\n",
+        f"{RECORD}def{UNIT}bob{UNIT}1756728000{UNIT}merge: a\tb\n",
+    ]
+    commits = list(parse_log(lines))
+    assert [c.sha for c in commits] == ["abc", "def"]
+    assert commits[0].changes == 4
+    assert [f.path for f in commits[0].files] == ["src/a.py", "img.png"]
+    assert commits[1].message == "merge: a\tb"
+    assert commits[1].files == []
+
+
+def test_mine_history_single_pass(history_repo):
+    metrics = mine_history(history_repo)
+    commits = metrics["commits"]
+
+    assert commits["count"] == 3
+    assert [c["message"] for c in commits["perCommit"]] == ["docs", "tweak app", "initial"]
+    assert commits["perCommit"][1]["changes"] == 1  # the png counts 0
+    assert commits["activity"] == [
+        {"date": "2025-09-01", "commits": 1, "additions": 3, "deletions": 0},
+        {"date": "2025-09-03", "commits": 2, "additions": 2, "deletions": 0},
+    ]
+
+    churn = metrics["churn"]
+    assert churn["filesChanged"] == 3
+    assert churn["byFile"][0] == {"path": "app.py", "changes": 2, "added": 4, "deleted": 0, "churn": 4}
+
+    ownership = metrics["ownership"]
+    assert [a["author"] for a in ownership["byAuthor"]] == ["alice", "bob"]
+    app = next(f for f in ownership["byFile"] if f["path"] == "app.py")
+    assert app["owner"] == "alice" and app["authors"] == 2
+
+
+def test_mine_history_range(history_repo):
+    metrics = mine_history(history_repo, since=date(2025, 9, 2), until=date(2025, 9, 3))
+    assert metrics["commits"]["count"] == 2
+    assert [d["date"] for d in metrics["commits"]["activity"]] == ["2025-09-03"]
+
+    full = mine_history(history_repo)["commits"]["activity"]
+    assert slice_activity(full, until=date(2025, 9, 2)) == full[:1]
+
+
+def test_mine_history_empty_repo(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    assert mine_history(str(tmp_path))["commits"]["count"] == 0
+
+
+@pytest.fixture
+def fake_git(tmp_path, monkeypatch):
+    """Put a shell script named git first on PATH"""
+    def install(script):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir(exist_ok=True)
+        (bin_dir / "git").write_text(f"#!/bin/sh\n{script}\n")
+        (bin_dir / "git").chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return install
+
+
+def test_stream_log_times_out_while_streaming(fake_git, tmp_path):
+    """Test a git log that hangs mid-output is killed at the deadline"""
+    fake_git("echo first; sleep 30")
+    start = time.monotonic()
+    with pytest.raises(GitError, match="timed out"):
+        list(stream_log(str(tmp_path), timeout=0.5))
+    assert time.monotonic() - start < 10
+
+
+def test_stream_log_survives_chatty_stderr(fake_git, tmp_path):
+    """Test stderr larger than a pipe buffer neither blocks git nor gets lost"""
+    fake_git("head -c 1000000 /dev/zero | tr '\\0' x >&2; echo 'fatal: broken' >&2; echo line; exit 1")
+    with pytest.raises(GitError, match="fatal: broken"):
+        list(stream_log(str(tmp_path), timeout=20))
@@ -0,0 +1,126 @@
+"""
+Test the metrics registry, request/database instrumentation and request profiling
+Run with: pytest tests/test_instrumentation.py
+"""
+
+import logging
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+import app.main as main
+from app.main import app
+from app.models.user import User
+from app.utils import instrumentation
+from app.utils.database import SessionLocal, init_db
+from app.utils.instrumentation import db_slow_queries, http_request_duration, profile_store
+from app.utils.metrics import Registry
+
+client = TestClient(app)
+
+
+def register(role: str = "user") -> dict:
+    email = f"metrics_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Metrics",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    if role != "user":
+        with SessionLocal() as db:
+            db.execute(update(User).where(User.email == email).values(role=role))
+            db.commit()
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(autouse=True)
+def database():
+    init_db()
+
+
+def test_registry_renders_prometheus_text():
+    """Test histogram buckets are cumulative and label values escaped"""
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    errors = registry.counter("errors_total", "Errors", ["route"])
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    errors.inc(route='say "hi"')
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'errors_total{route="say \\"hi\\""} 1' in text
+
+
+def test_latency_is_labelled_by_route_template():
+    """Test requests are grouped by route template, and unknown paths share one label"""
+    headers = register()
+    route = "/repositories/{repo_id}/reports"
+    before = http_request_duration.count(method="GET", route=route, status="200")
+    assert client.get("/repositories/987654/reports", headers=headers).status_code == 200
+    client.get(f"/no-such-page/{uuid.uuid4().hex}")
+
+    assert http_request_duration.count(method="GET", route=route, status="200") == before + 1
+    text = client.get("/metrics").text
+    assert 'route="/no-such-page' not in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in text
+    assert "db_query_duration_seconds_bucket" in text
+    assert "db_pool_checkout_wait_seconds_count" in text
+
+
+def test_slow_queries_are_logged_with_route(monkeypatch, caplog):
+    """Test statements over DB_SLOW_QUERY_MS are counted and logged with the request's route"""
+    headers = register()
+    monkeypatch.setattr(instrumentation.settings, "DB_SLOW_QUERY_MS", 1e-6)
+    route = "/repositories/{repo_id}/reports"
+    before = db_slow_queries.value(engine="async", route=route)
+
+    with caplog.at_level(logging.WARNING, logger="app.utils.instrumentation"):
+        client.get("/repositories/987654/reports", headers=headers)
+
+    assert db_slow_queries.value(engine="async", route=route) > before
+    assert any(route in record.getMessage() and "SELECT" in record.getMessage() for record in caplog.records)
+
+
+def test_health_reports_database_and_pools(monkeypatch):
+    """Test /health checks the database and returns 503 when it is not ready"""
+    body = client.get("/health").json()
+    assert body["status"] == "healthy"
+    assert body["database"]["ready"] is True
+    assert body["database"]["pools"]["async"]["size"] >= 1
+    assert "auth_cache" in body and "chat" in body
+
+    async def unreachable(timeout):
+        return {"ready": False, "error": "OperationalError"}
+
+    monkeypatch.setattr(main, "ping_database", unreachable)
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unhealthy"
+
+
+def test_admin_can_profile_a_request(monkeypatch, tmp_path):
+    """Test X-Profile stores a folded-stack profile for admins and is ignored for other users"""
+    monkeypatch.setattr(profile_store, "root", str(tmp_path))
+    admin, user = register("admin"), register()
+
+    assert "x-profile-id" not in client.get("/auth/me", headers={**user, "X-Profile": "1"}).headers
+
+    response = client.get("/auth/me", headers={**admin, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+    profile = client.get(f"/profiles/{profile_id}", headers=admin)
+    assert profile.status_code == 200
+    assert profile.text.startswith("# GET /auth/me (/auth/me) -> 200")
+
+    assert client.get(f"/profiles/{profile_id}", headers=user).status_code == 403
+    assert client.get(f"/profiles/{uuid.uuid4().hex}", headers=admin).status_code == 404
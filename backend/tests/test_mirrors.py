@@ -0,0 +1,136 @@
+"""
+Test the bare-mirror clone cache
+Run with: pytest tests/test_mirrors.py
+"""
+
+import os
+import subprocess
+import threading
+
+import pytest
+
+from app.analysis import git as git_helpers
+from app.analysis import mirrors
+from app.analysis.mirrors import MirrorCache, normalize_url
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def make_repo(path, files=1):
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    for i in range(files):
+        (path / f"f{i}.py").write_text(f"x = {i}\n" * 200)
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "initial")
+    return path
+
+
+@pytest.fixture
+def git_calls(monkeypatch):
+    """git subcommands run by the mirror cache, in order"""
+    calls = []
+
+    def recording(args, cwd=None, timeout=None):
+        calls.append(" ".join(a for a in args if not a.startswith("/")))
+        return git_helpers.run_git(args, cwd=cwd, timeout=timeout)
+
+    monkeypatch.setattr(mirrors, "run_git", recording)
+    return calls
+
+
+def test_normalize_url():
+    """Test equivalent links map to one key and credentials keep links apart"""
+    same = {
+        normalize_url("https://GitHub.com/octocat/Hello-World.git"),
+        normalize_url("https://github.com:443/octocat/Hello-World/"),
+        normalize_url("https://github.com/octocat/Hello-World"),
+    }
+    assert same == {"https://github.com/octocat/Hello-World"}
+    assert normalize_url("git@github.com:octocat/Hello-World.git") == "ssh://git@github.com/octocat/Hello-World"
+    assert normalize_url("https://token@github.com/o/r") != normalize_url("https://github.com/o/r")
+
+
+def test_second_checkout_fetches_instead_of_cloning(tmp_path, git_calls):
+    """Test the first analysis mirrors the repository and later ones only fetch"""
+    upstream = make_repo(tmp_path / "upstream")
+    cache = MirrorCache(str(tmp_path / "mirrors"))
+    url = f"file://{upstream}"
+
+    cache.checkout(url, str(tmp_path / "one"))
+    (upstream / "new.py").write_text("y = 1\n")
+    git(upstream, "add", ".")
+    git(upstream, "commit", "-q", "-m", "second")
+    cache.checkout(url + "/", str(tmp_path / "two"))  # same mirror after normalization
+
+    assert [call.split()[0] for call in git_calls] == ["clone", "clone", "fetch", "clone"]
+    assert "--mirror" in git_calls[0]
+    assert (tmp_path / "two" / "new.py").exists()
+    assert git(tmp_path / "two", "rev-list", "--count", "HEAD").strip() == "2"
+    assert len(cache.mirrors()) == 1
+
+
+def test_checkout_branch(tmp_path):
+    """Test a branch other than the default can be checked out from the mirror"""
+    upstream = make_repo(tmp_path / "upstream")
+    git(upstream, "checkout", "-q", "-b", "feature")
+    (upstream / "feature.py").write_text("z = 1\n")
+    git(upstream, "add", ".")
+    git(upstream, "commit", "-q", "-m", "feature")
+    git(upstream, "checkout", "-q", "main")
+
+    cache = MirrorCache(str(tmp_path / "mirrors"))
+    cache.checkout(f"file://{upstream}", str(tmp_path / "out"), branch="feature")
+    assert (tmp_path / "out" / "feature.py").exists()
+
+
+def test_concurrent_jobs_clone_once(tmp_path, git_calls):
+    """Test jobs racing on one repository create a single mirror"""
+    upstream = make_repo(tmp_path / "upstream", files=20)
+    cache = MirrorCache(str(tmp_path / "mirrors"))
+    errors = []
+
+    def job(i):
+        try:
+            cache.checkout(f"file://{upstream}", str(tmp_path / f"out{i}"))
+        except Exception as e:  # pragma: no cover - surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sum("--mirror" in call for call in git_calls) == 1
+    assert all((tmp_path / f"out{i}" / "f0.py").exists() for i in range(4))
+
+
+def test_lru_eviction_keeps_disk_budget(tmp_path):
+    """Test the least recently used mirror is evicted once the budget is exceeded"""
+    first = make_repo(tmp_path / "first", files=5)
+    second = make_repo(tmp_path / "second", files=5)
+    cache = MirrorCache(str(tmp_path / "mirrors"))
+    cache.checkout(f"file://{first}", str(tmp_path / "a"))
+    cache.max_bytes = cache.mirrors()[0][1] + 1  # room for one mirror only
+
+    os.utime(os.path.join(cache.path(f"file://{first}"), mirrors.STAMP_FILE), (1, 1))
+    cache.checkout(f"file://{second}", str(tmp_path / "b"))
+
+    assert [path for _, _, path in cache.mirrors()] == [cache.path(f"file://{second}")]
+    assert (tmp_path / "a" / "f0.py").exists()  # earlier checkouts do not depend on the mirror
+
+
+def test_failed_clone_leaves_no_mirror(tmp_path):
+    """Test a clone error does not leave a broken mirror behind"""
+    cache = MirrorCache(str(tmp_path / "mirrors"))
+    with pytest.raises(git_helpers.GitError):
+        cache.checkout(f"file://{tmp_path}/missing", str(tmp_path / "out"))
+    assert cache.mirrors() == []
+    assert [name for name in os.listdir(cache.root) if not name.endswith(".lock")] == []
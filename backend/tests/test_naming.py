@@ -0,0 +1,150 @@
+"""
+Test the naming quality analyzer
+Run with: pytest tests/test_naming.py
+"""
+
+import subprocess
+
+import numpy as np
+
+from app.analysis.naming import (
+    ABBREVIATION, CASE, KIND_CODES, LANGUAGES, SHORT, UNCLEAR, VAGUE, naming_quality, score_identifiers,
+)
+from app.analysis.parsers.js import parse_js
+from app.analysis.parsers.python import parse_python
+from app.analysis.planner import compile_plan, execute_plan
+
+
+def score(names, kind="variable", language="python"):
+    kinds = np.full(len(names), KIND_CODES[kind])
+    languages = np.full(len(names), LANGUAGES[language])
+    return score_identifiers(names, kinds, languages)
+
+
+def test_js_expression_arrow_parameters():
+    """Test parameters of expression-bodied arrows are reported like those of block bodies"""
+    parsed = parse_js(
+        "const fallback = (retryCount) => retryCount || 1;\n"
+        "const pick = isActive => isActive ? onLabel : offLabel;\n"
+        "rows.map((rowIndex, cellValue = 0) => rowIndex && cellValue);\n"
+    )
+    identifiers = {name: kind for name, kind in parsed.identifiers}
+    for name in ("retryCount", "isActive", "rowIndex", "cellValue"):
+        assert identifiers[name] == "parameter"
+    assert identifiers["fallback"] == identifiers["pick"] == "function"
+
+
+def test_python_identifiers():
+    """Test the Python parser reports declared names with their kinds"""
+    parsed = parse_python(
+        "MAX_ROWS = 10\n"
+        "class ReportBuilder:\n"
+        "    limit = 5\n"
+        "    def add_row(self, row_count):\n"
+        "        self.total_rows = row_count\n"
+        "        for i in range(row_count):\n"
+        "            pass\n"
+        "    def __init__(self):\n"
+        "        pass\n"
+    )
+    identifiers = {name: kind for name, kind in parsed.identifiers}
+    assert identifiers["MAX_ROWS"] == "constant"
+    assert identifiers["ReportBuilder"] == "class"
+    assert identifiers["limit"] == "constant"
+    assert identifiers["add_row"] == "function"
+    assert identifiers["row_count"] == "parameter"
+    assert identifiers["total_rows"] == "variable"
+    assert identifiers["i"] == "variable"
+    assert "self" not in identifiers and "__init__" not in identifiers
+
+
+def test_js_identifiers():
+    """Test the JS parser reports declarations, classes, functions and parameters"""
+    parsed = parse_js(
+        "const API_URL = '/api';\n"
+        "let pageCount = 0;\n"
+        "class UserList {}\n"
+        "function loadUsers(userId, options) { return userId; }\n"
+        "const onClick = event => event;\n"
+    )
+    identifiers = {name: kind for name, kind in parsed.identifiers}
+    assert identifiers["API_URL"] == "constant"
+    assert identifiers["pageCount"] == "variable"
+    assert identifiers["UserList"] == "class"
+    assert identifiers["loadUsers"] == "function"
+    assert identifiers["userId"] == "parameter"
+    assert identifiers["options"] == "parameter"
+    assert identifiers["onClick"] == "function"
+    assert identifiers["event"] == "parameter"
+
+
+def test_case_style_per_language():
+    """Test case rules follow the language and identifier kind"""
+    _, flags = score(["user_count", "userCount", "_private_value", "value_"])
+    assert [bool(f & CASE) for f in flags] == [False, True, False, False]
+
+    _, flags = score(["userCount", "user_count"], language="js")
+    assert [bool(f & CASE) for f in flags] == [False, True]
+
+    _, flags = score(["ReportBuilder", "report_builder"], kind="class")
+    assert [bool(f & CASE) for f in flags] == [False, True]
+
+    _, flags = score(["MAX_ROWS", "max_rows", "MaxRows"], kind="constant")
+    assert [bool(f & CASE) for f in flags] == [False, False, True]
+
+
+def test_vague_abbreviated_short_and_unclear_names():
+    """Test each issue flag on names that should and should not raise it"""
+    names = ["data", "user_data", "usr_cnt", "q", "i", "xqzv_wrt", "request_handler"]
+    scores, flags = score(names)
+    flagged = dict(zip(names, flags))
+    assert flagged["data"] & VAGUE and not flagged["user_data"] & VAGUE
+    assert flagged["usr_cnt"] & ABBREVIATION
+    assert flagged["q"] & SHORT and not flagged["i"] & SHORT
+    assert flagged["xqzv_wrt"] & UNCLEAR
+    assert flagged["request_handler"] == 0
+    assert scores[names.index("request_handler")] == 1.0
+    assert scores[names.index("usr_cnt")] < scores[names.index("user_data")]
+
+
+def test_chunks_match_single_batch(monkeypatch):
+    """Test scoring in chunks gives the same result as one batch"""
+    from app.analysis import naming
+
+    names = ["userCount", "usr_cnt", "data", "HTTPServer", "x1", "load_page"] * 7
+    expected = score(names)
+    monkeypatch.setattr(naming, "CHUNK_ROWS", 5)
+    chunked = score(names)
+    assert np.allclose(expected[0], chunked[0])
+    assert (expected[1] == chunked[1]).all()
+
+
+def test_naming_quality_report():
+    """Test the report lists the worst files first with readable issues"""
+    files = [
+        {"path": "good.py", "identifiers": [["load_report", "function"], ["row_count", "variable"]]},
+        {"path": "bad.py", "identifiers": [["data", "variable"], ["usrCnt", "parameter"]]},
+        {"path": "README.md", "identifiers": []},
+    ]
+    report = naming_quality(files)
+    assert report["identifiers"] == 4
+    assert report["files"] == 2
+    assert [entry["path"] for entry in report["byFile"]] == ["bad.py", "good.py"]
+    assert report["byFile"][0]["issues"] == ["vague name: data", "abbreviation: usrCnt"]
+    assert report["byFile"][1]["issues"] == []
+    assert report["issues"]["vague"] == 1
+    assert report["issues"]["case"] == 1
+    assert naming_quality([])["score"] == 1.0
+
+
+def test_planner_runs_naming_conventions(tmp_path):
+    """Test the "Naming conventions" option plans a parse and fills namingQuality"""
+    (tmp_path / "app.py").write_text("def load_page(page_number):\n    tmp = page_number\n    return tmp\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    plan = compile_plan(["Naming conventions"])
+    assert plan.analyzers == ["parse", "naming"]
+
+    metrics = execute_plan(plan, str(tmp_path))
+    section = metrics["namingQuality"]
+    assert section["identifiers"] == 3
+    assert section["byFile"][0]["issues"] == ["vague name: tmp"]
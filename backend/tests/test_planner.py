@@ -0,0 +1,118 @@
+"""
+Test the SPL option analysis planner
+Run with: pytest tests/test_planner.py
+"""
+
+import subprocess
+
+import pytest
+
+from app.analysis import engine, history, planner
+from app.analysis.planner import compile_plan, execute_plan
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "app.py").write_text("def main(a):\n    if a:\n        return 1\n    return 2\n")
+    (tmp_path / "util.js").write_text("function f(x) { return x ? 1 : 2; }\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def pass_counts(monkeypatch):
+    """Count source walks (by parse mode) and history scans"""
+    counts = {"lines": 0, "parse": 0, "history": 0}
+    collect_files, mine_history = engine.collect_files, history.mine_history
+
+    def counting_collect(*args, parse=True, **kwargs):
+        counts["parse" if parse else "lines"] += 1
+        return collect_files(*args, parse=parse, **kwargs)
+
+    def counting_mine(*args, **kwargs):
+        counts["history"] += 1
+        return mine_history(*args, **kwargs)
+
+    monkeypatch.setattr(planner, "collect_files", counting_collect)
+    monkeypatch.setattr(planner, "mine_history", counting_mine)
+    return counts
+
+
+def test_loc_only_plan_skips_parse_and_history():
+    """Test an SPL-1 LOC-only selection plans line counts only, with no parse or history scan"""
+    assert compile_plan(["LOC"]).analyzers == ["lines", "loc"]
+
+
+def test_parse_provides_lines():
+    """Test a plan needing a parse drops the separate line-count pass"""
+    plan = compile_plan(["LOC", "Number of functions", "Code duplication", "Churn rate"])
+    assert "lines" not in plan.analyzers
+    assert plan.analyzers.count("parse") == 1
+    assert plan.analyzers.index("parse") < plan.analyzers.index("churn")
+    assert plan.analyzers.index("history") < plan.analyzers.index("churn")
+
+
+def test_timeseries_follow_history_options():
+    """Test LOC and complexity timeseries, and the snapshot pass, come only with a history option"""
+    assert "snapshots" not in compile_plan(["LOC", "Code Complexity"]).analyzers
+    plan = compile_plan(["LOC", "Number of commits"])
+    assert plan.analyzers == ["lines", "history", "snapshots", "loc", "loc_timeseries", "commits"]
+    assert {"snapshots", "loc_timeseries", "complexity_timeseries"} <= set(compile_plan([]).analyzers)
+
+
+def test_unknown_options_are_skipped():
+    """Test options nothing implements are reported, not rejected"""
+    plan = compile_plan(["LOC", "CI/CD Evidence"])
+    assert plan.skipped == ["CI/CD Evidence"]
+    assert plan.analyzers == ["lines", "loc"]
+
+
+def test_default_options():
+    """Test an empty selection falls back to OptionPanel's defaults"""
+    plan = compile_plan([])
+    assert plan.options == planner.DEFAULT_OPTIONS
+    assert {"loc", "complexity", "commits"} <= set(plan.analyzers)
+
+
+def test_shared_passes_run_once(repo, pass_counts):
+    """Test every parse-fed and history-fed section shares one pass of each"""
+    plan = compile_plan([
+        "LOC", "Number of functions", "Time complexity", "Code duplication",
+        "Number of commits", "Churn rate", "File change heatmap", "Code Ownership",
+    ])
+    metrics = execute_plan(plan, repo, workers=1)
+
+    assert pass_counts == {"lines": 0, "parse": 1, "history": 1}
+    assert {"loc", "complexity", "duplicates", "commits", "churn", "heatmap", "ownership"} <= set(metrics)
+    assert metrics["complexity"]["functions"] == 2
+    assert metrics["heatmap"]["byFile"][0]["cells"] == [1]
+    assert set(metrics["timings"]["stages"]) == set(plan.analyzers)
+
+
+def test_loc_only_run_computes_only_loc(repo, pass_counts):
+    """Test a LOC-only run neither parses nor reads history"""
+    metrics = execute_plan(compile_plan(["LOC"]), repo, workers=1)
+
+    assert pass_counts == {"lines": 1, "parse": 0, "history": 0}
+    assert metrics["loc"]["total"] == 5
+    assert not {"complexity", "duplicates", "commits", "churn"} & set(metrics)
+    assert metrics["plan"]["analyzers"] == ["lines", "loc"]
+    assert "timeseries" not in metrics["loc"]
+
+
+def test_progress_is_monotonic(repo):
+    """Test stage progress moves forward within the given band"""
+    seen = []
+    execute_plan(compile_plan(["LOC", "Code Complexity", "Commit Activity"]), repo, workers=1,
+                 progress=lambda stage, fraction: seen.append(fraction))
+    assert seen == sorted(seen)
+    assert 0.1 <= seen[0] and seen[-1] <= 0.85
@@ -0,0 +1,208 @@
+"""
+Test the query complexity and database design analyzers
+Run with: pytest tests/test_queries.py
+"""
+
+import subprocess
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.analysis.blob_cache import BlobCache
+from app.analysis.engine import analyze_source, collect_files
+from app.analysis.parsers.js import parse_js
+from app.analysis.parsers.python import parse_python
+from app.analysis.planner import compile_plan, execute_plan
+from app.analysis.queries import database_design, parse_prisma, parse_sql, query_complexity, site_score
+from app.models.analysis import BlobMetric  # noqa: F401  register the cache table
+from app.utils.database import Base
+
+PYTHON_SOURCE = '''
+class User(Base):
+    """Select users from the database"""
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, ForeignKey("orgs.id"))
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    posts = relationship("Post")
+    __table_args__ = (Index("ix_users_team", "team_id", "id"),)
+
+
+class Post(models.Model):
+    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    title = models.CharField(max_length=100)
+
+
+def load(db, ids):
+    users = db.query(User).options(joinedload(User.posts)).all()
+    for user in users:
+        posts = Post.objects.filter(author=user).select_related("author")
+        db.execute(f"SELECT * FROM posts WHERE author_id = {user.id}")
+    recent = [db.execute(text("SELECT a FROM b JOIN c ON b.id = c.id WHERE b.id IN (SELECT id FROM d)")) for _ in ids]
+    db.execute(select(User).where(User.id == ids[0]))
+    db.execute(insert(User).values(id=1))
+'''
+
+JS_SOURCE = '''
+const Order = sequelize.define('Order', {
+  total: DataTypes.INTEGER,
+  customerId: { type: DataTypes.INTEGER, references: { model: 'customers', key: 'id' } },
+});
+Order.belongsTo(Customer);
+
+async function load(ids) {
+  const orders = await Order.findAll({ include: [{ model: Customer }] });
+  for (const order of orders) {
+    await prisma.item.findMany({ where: { orderId: order.id } });
+  }
+  await Promise.all(ids.map((id) => prisma.order.findUnique({ where: { id } })));
+  await prisma.$queryRaw`SELECT id FROM orders WHERE id = ${ids[0]}`;
+  await db.query(`SELECT * FROM orders WHERE id = ${ids[0]}`);
+  const total = Object.create(null);
+}
+'''
+
+
+def by_line(sites):
+    return {site["line"]: site for site in sites}
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def test_python_query_sites():
+    """Test raw SQL and SQLAlchemy/Django chains are found once each, with loops marked"""
+    sites = by_line(parse_python(PYTHON_SOURCE).queries)
+    assert sorted(sites) == [18, 20, 21, 22, 23, 24]
+
+    assert sites[18]["kind"] == "sqlalchemy" and sites[18]["unfiltered"] and sites[18]["joins"] == 1
+    assert sites[20]["kind"] == "django" and sites[20]["inLoop"] and not sites[20]["unfiltered"]
+    assert sites[21]["dynamic"] and sites[21]["selectStar"] and sites[21]["inLoop"]
+    assert sites[22]["inLoop"] and sites[22]["joins"] == 1 and sites[22]["subqueries"] == 1
+    assert not sites[23]["inLoop"] and not sites[23]["unfiltered"]
+    assert not sites[24]["unfiltered"]
+
+
+def test_python_models():
+    """Test SQLAlchemy and Django models with their keys, indexes and relationships"""
+    models = {model["name"]: model for model in parse_python(PYTHON_SOURCE).models}
+    user, post = models["User"], models["Post"]
+    assert user["kind"] == "sqlalchemy" and user["primaryKey"] and user["columns"] == 3
+    assert user["foreignKeys"] == ["org_id", "team_id"] and "team_id" in user["indexed"]
+    assert user["relationships"] == 1
+    assert post["kind"] == "django" and post["primaryKey"]
+    assert post["foreignKeys"] == ["author"] and "author" in post["indexed"]
+
+
+def test_js_query_sites_and_models():
+    """Test Sequelize and Prisma calls, tagged vs interpolated SQL, and iterating callbacks"""
+    parsed = parse_js(JS_SOURCE)
+    sites = by_line(parsed.queries)
+    assert sorted(sites) == [9, 11, 13, 14, 15]
+    assert sites[9]["kind"] == "sequelize" and sites[9]["unfiltered"] and sites[9]["joins"] == 1
+    assert sites[11]["kind"] == "prisma" and sites[11]["inLoop"] and not sites[11]["unfiltered"]
+    assert sites[13]["inLoop"]
+    assert not sites[14]["dynamic"]
+    assert sites[15]["dynamic"] and sites[15]["selectStar"] and not sites[15]["inLoop"]
+
+    order, = parsed.models
+    assert order["name"] == "Order" and order["columns"] == 2 and order["relationships"] == 2
+    assert order["foreignKeys"] == ["customerId"] and order["indexed"] == []
+
+
+def test_sql_and_prisma_schemas():
+    """Test CREATE TABLE / CREATE INDEX and Prisma models, and statements of .sql files"""
+    sites, tables = parse_sql(
+        "-- schema\n"
+        "CREATE TABLE orders (\n"
+        "  id INTEGER PRIMARY KEY,\n"
+        "  customer_id INTEGER REFERENCES customers(id),\n"
+        "  coupon_id INTEGER,\n"
+        "  FOREIGN KEY (coupon_id) REFERENCES coupons(id)\n"
+        ");\n"
+        "CREATE INDEX ix_orders_customer ON orders (customer_id, id);\n"
+        "DELETE FROM orders;\n"
+    )
+    orders, = tables
+    assert orders["primaryKey"] and orders["columns"] == 3
+    assert orders["foreignKeys"] == ["customer_id", "coupon_id"] and "customer_id" in orders["indexed"]
+    assert [(site["line"], site["unfiltered"]) for site in sites] == [(9, True)]
+
+    _, models = parse_prisma(
+        "model User {\n  id Int @id\n  posts Post[]\n}\n"
+        "model Post {\n  id Int @id\n  authorId Int\n  author User @relation(fields: [authorId], references: [id])\n"
+        "  @@index([authorId])\n}\n"
+    )
+    user, post = models
+    assert user["relationships"] == 1 and user["columns"] == 1
+    assert post["foreignKeys"] == ["authorId"] and "authorId" in post["indexed"] and post["columns"] == 2
+
+    assert analyze_source("db/schema.sql", b"CREATE TABLE t (a INT);\n")["models"][0]["name"] == "t"
+    assert "models" not in analyze_source("db/schema.sql", b"CREATE TABLE t (a INT);\n", parse=False)
+
+
+def test_scores_and_hotspots():
+    """Test site scores, N+1 counts and the per-file hot spots for the treemap"""
+    files = [
+        {"path": "app/load.py", "querySites": parse_python(PYTHON_SOURCE).queries},
+        {"path": "web/load.js", "querySites": parse_js(JS_SOURCE).queries},
+        {"path": "app/empty.py"},
+    ]
+    section = query_complexity(files)
+    assert section["sites"] == 11
+    assert section["nPlusOne"] == 5
+    assert section["byKind"]["sql"] == 4
+    assert [f["path"] for f in section["byFile"]] == ["app/load.py", "web/load.js"]
+
+    top = section["byFile"][0]["hotspots"][0]
+    assert top["line"] == 22 and "n+1" in top["issues"] and "subquery" in top["issues"]
+    assert top["score"] == site_score(by_line(files[0]["querySites"])[22])
+    assert section["hotspots"][0] == {"path": "app/load.py", **top}
+    assert query_complexity([])["sites"] == 0
+
+
+def test_database_design_flags_unindexed_foreign_keys():
+    """Test models lose points for a missing primary key and foreign keys no index leads"""
+    files = [
+        {"path": "app/models.py", "models": parse_python(PYTHON_SOURCE).models},
+        {"path": "db/legacy.sql", "models": parse_sql("CREATE TABLE audit (user_id INT REFERENCES users(id));")[1]},
+    ]
+    section = database_design(files)
+    assert section["models"] == 3 and section["unindexedForeignKeys"] == 2
+    scores = {model["name"]: model["score"] for model in section["byModel"]}
+    assert scores == {"User": 85, "Post": 100, "audit": 55}
+    assert section["byModel"][0]["name"] == "audit"
+    assert {"path": "app/models.py", "line": 2, "model": "User", "issue": "unindexed foreign key",
+            "column": "org_id"} in section["issues"]
+    assert database_design([])["score"] is None
+
+
+def test_sites_cached_by_blob_and_planned(tmp_path):
+    """Test both options share one parse and unchanged files' sites come from the blob cache"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(bind=engine)
+    cache = BlobCache(sessionmaker(bind=engine))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "load.py").write_text(PYTHON_SOURCE)
+    (repo / "load.js").write_text(JS_SOURCE)
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "initial")
+
+    plan = compile_plan(["Query Complexity", "Database Design"])
+    assert plan.analyzers == ["parse", "queries", "schema"]
+    first = execute_plan(plan, str(repo), cache=cache)
+    (repo / "load.js").write_text(JS_SOURCE + "// changed\n")
+    git(repo, "commit", "-q", "-am", "change")
+    second = execute_plan(plan, str(repo), cache=cache)
+
+    assert second["cache"]["hits"] == 1 and second["cache"]["misses"] == 1
+    assert first["queryComplexity"] == second["queryComplexity"]
+    assert second["databaseDesign"]["models"] == 3
+    files, _ = collect_files(str(repo), cache=cache)
+    assert {f["path"] for f in files if "querySites" in f} == {"load.py", "load.js"}
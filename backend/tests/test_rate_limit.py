@@ -0,0 +1,164 @@
+"""
+Test rate limiting, concurrency caps and the limiter backends
+Run with: pytest tests/test_rate_limit.py
+"""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from app.main import app
+from app.routes.auth import token_subject
+from app.utils.database import init_db
+from app.utils.rate_limit import (
+    MemoryRateLimitBackend, RateLimiter, RateLimitMiddleware, parse_caps, parse_rules
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def limited_client(rules: str, caps: str = "", backend=None) -> TestClient:
+    limiter = RateLimiter(parse_rules(rules), parse_caps(caps), backend or MemoryRateLimitBackend(),
+                          trust_forwarded=True)
+    return TestClient(RateLimitMiddleware(app, limiter=limiter, identify_user=token_subject))
+
+
+def test_parse_rules():
+    """Test rule and cap specs, including prefixes and malformed entries"""
+    rules = parse_rules("post /auth/login/ ip 10/60, GET /repositories/* user 100/1,")
+    assert [(r.method, r.path, r.scope, r.limit, r.rate) for r in rules] == [
+        ("POST", "/auth/login", "ip", 10, 10 / 60),
+        ("GET", "/repositories/*", "user", 100, 100.0),
+    ]
+    assert parse_caps("POST /analyses 16") == {("POST", "/analyses"): 16}
+    for spec in ("POST /auth/login ip 10", "POST /auth/login host 10/60", "POST /x ip 0/60", "POST /x ip 1/0"):
+        with pytest.raises(ValueError):
+            parse_rules(spec)
+    with pytest.raises(ValueError):
+        parse_caps("POST /analyses many")
+
+
+def test_token_bucket_refills():
+    """Test a full bucket allows a burst, then one request per refill interval"""
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(clock=clock)
+    take = lambda: asyncio.run(backend.take([("k", 3, 0.5)]))  # noqa: E731
+    assert [take() for _ in range(3)] == [0, 0, 0]
+    assert take() == pytest.approx(2.0)
+    clock.now += 2.0
+    assert take() == 0
+    assert take() == pytest.approx(2.0)
+    clock.now += 60
+    assert [take() for _ in range(4)][:3] == [0, 0, 0]
+
+
+def test_denied_request_charges_no_bucket():
+    """Test a request one overlapping rule turns away leaves the other rule's quota alone"""
+    clock = FakeClock()
+    limiter = RateLimiter(parse_rules("POST /analyses user 2/60, POST /analyses ip 3/60"), {},
+                          MemoryRateLimitBackend(clock=clock))
+    rules = limiter.rules_for("POST", "/analyses")
+    retry = lambda user: asyncio.run(limiter.retry_after(rules, "203.0.113.9", user))  # noqa: E731
+
+    assert [retry("a@example.com") for _ in range(2)] == [0, 0]
+    assert all(retry("a@example.com") > 0 for _ in range(5))
+    # Only the two allowed requests came out of the shared IP bucket
+    assert retry("b@example.com") == 0
+    assert retry("b@example.com") == pytest.approx(20.0)
+
+
+def test_memory_backend_is_bounded():
+    """Test many distinct keys never hold more than max_keys buckets"""
+    backend = MemoryRateLimitBackend(max_keys=100)
+    for i in range(10_000):
+        asyncio.run(backend.take([(f"ip:{i}", 5, 1.0)]))
+    assert backend.stats() == {"keys": 100, "max_keys": 100, "evictions": 9_900}
+
+
+def test_login_limited_per_ip():
+    """Test each client IP gets its own login quota and a 429 with Retry-After past it"""
+    init_db()
+    client = limited_client("POST /auth/login ip 3/60")
+    body = {"email": "nobody@example.com", "password": "WrongPass123"}
+    first = {"X-Forwarded-For": "203.0.113.1"}
+    assert [client.post("/auth/login", json=body, headers=first).status_code for _ in range(3)] == [401] * 3
+
+    response = client.post("/auth/login", json=body, headers=first)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests, please retry later"}
+    assert 1 <= int(response.headers["retry-after"]) <= 20
+
+    assert client.post("/auth/login", json=body, headers={"X-Forwarded-For": "203.0.113.2"}).status_code == 401
+    assert client.get("/health").status_code == 200
+
+
+def test_analysis_submission_limited_per_user():
+    """Test per-user quotas follow the token, and anonymous requests fall back to the IP"""
+    init_db()
+    client = limited_client("POST /analyses user 2/60")
+    tokens = []
+    for _ in range(2):
+        email = f"limit_{uuid.uuid4().hex[:8]}@example.com"
+        client.post("/auth/register", json={
+            "firstName": "Limit", "lastName": "User", "email": email,
+            "password": "TestPass123", "confirmPassword": "TestPass123"
+        })
+        tokens.append(client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"])
+
+    # An unsupported scheme is rejected by the route, so nothing is queued
+    body = {"repo_link": "ftp://example.com/repo"}
+    submit = lambda token: client.post("/analyses", json=body, headers={"Authorization": f"Bearer {token}"})  # noqa: E731
+    assert [submit(tokens[0]).status_code for _ in range(3)] == [400, 400, 429]
+    assert submit(tokens[1]).status_code == 400
+
+    assert [submit("not-a-token").status_code for _ in range(3)] == [401, 401, 429]
+
+
+def test_shared_backend_limits_across_workers():
+    """Test limiters in two workers sharing one backend draw on the same buckets"""
+    init_db()
+    backend = MemoryRateLimitBackend()
+    workers = [limited_client("POST /auth/login ip 2/60", backend=backend) for _ in range(2)]
+    body = {"email": "nobody@example.com", "password": "WrongPass123"}
+    headers = {"X-Forwarded-For": "198.51.100.7"}
+    codes = [workers[i % 2].post("/auth/login", json=body, headers=headers).status_code for i in range(3)]
+    assert codes == [401, 401, 429]
+
+
+def test_concurrency_cap_sheds_with_503():
+    """Test requests past a route's in-flight cap get 503 with Retry-After, and the slot frees after"""
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await PlainTextResponse("done")(scope, receive, send)
+
+    limiter = RateLimiter([], parse_caps("POST /analyses 2"), MemoryRateLimitBackend())
+    transport = httpx.ASGITransport(app=RateLimitMiddleware(slow_app, limiter=limiter))
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            held = [asyncio.create_task(client.post("/analyses")) for _ in range(2)]
+            while limiter.inflight[("POST", "/analyses")] < 2:
+                await asyncio.sleep(0)
+            shed = await client.post("/analyses")
+            release.set()
+            done = await asyncio.gather(*held)
+            after = await client.post("/analyses")
+        return shed, done, after
+
+    shed, done, after = asyncio.run(scenario())
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+    assert [response.status_code for response in done] == [200, 200]
+    assert after.status_code == 200
+    assert limiter.stats()["shed"] == 1 and limiter.inflight[("POST", "/analyses")] == 0
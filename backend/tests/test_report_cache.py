@@ -0,0 +1,154 @@
+"""
+Test pre-compressed report responses, content negotiation and the report body cache
+Run with: pytest tests/test_report_cache.py
+"""
+
+import gzip
+import json
+import uuid
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.analysis.reports import build_report
+from app.main import app
+from app.models.user import Report, Repository, User
+from app.utils.cache import SizedLRU
+from app.utils.database import SessionLocal, init_db
+from app.utils.report_cache import negotiate, report_bodies
+
+client = TestClient(app)
+
+METRICS = {
+    "loc": {"total": 1200, "files": 30},
+    "complexity": {"byFile": [{"path": f"src/módulo_{i}.py", "complexity": i} for i in range(2000)]},
+    "heatmap": {1: [0, 2, 4]},
+}
+
+
+@pytest.fixture
+def owner():
+    init_db()
+    email = f"cache_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Cache",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.user_id).where(User.email == email))
+    return {"headers": {"Authorization": f"Bearer {token}"}, "user_id": user_id}
+
+
+def add_report(user_id: int, brotli_copy: bool = True) -> tuple:
+    with SessionLocal() as db:
+        repository = Repository(repo_link="https://example.com/repo", user_id=user_id)
+        db.add(repository)
+        db.flush()
+        report = build_report(repository.repo_id, METRICS)
+        if not brotli_copy:
+            report.payload_br = None
+        db.add(report)
+        db.commit()
+        return repository.repo_id, report.report_id
+
+
+def test_negotiate():
+    """Test q-values, wildcards, excluded identity and the preference order on ties"""
+    available = ("br", "gzip", "identity")
+    assert negotiate(None, available) == "identity"
+    assert negotiate("gzip, deflate, br", available) == "br"
+    assert negotiate("gzip, br;q=0.5", available) == "gzip"
+    assert negotiate("br", ("gzip", "identity")) == "identity"
+    assert negotiate("*", ("gzip", "identity")) == "gzip"
+    assert negotiate("*;q=0, identity;q=0.1", available) == "identity"
+    assert negotiate("GZIP;Q=0.8, br;q=bogus", available) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0, identity;q=0", available) == "identity"
+
+
+def test_sized_lru_evicts_by_bytes():
+    """Test least recently used entries go once the byte budget is exceeded"""
+    cache = SizedLRU(max_bytes=100)
+    cache.set("a", "A", 40)
+    cache.set("b", "B", 40)
+    assert cache.get("a") == "A"
+    cache.set("c", "C", 40)
+    assert cache.get("b") is None and cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.bytes == 80 and cache.stats()["evictions"] == 1
+
+    assert cache.set("huge", "H", 101) is False
+    cache.set("a", "A2", 10)
+    assert cache.bytes == 50 and len(cache) == 2
+    assert SizedLRU(max_bytes=0).set("x", "X", 1) is False
+
+
+def test_build_report_stores_both_encodings():
+    """Test the report is serialised once into byte-identical gzip and brotli bodies"""
+    report = build_report(1, METRICS)
+    raw = gzip.decompress(report.payload)
+    assert brotli.decompress(report.payload_br) == raw
+    assert len(raw) == report.payload_size
+    assert json.loads(raw)["heatmap"] == {"1": [0, 2, 4]}
+    assert "módulo" in raw.decode("utf-8")
+
+
+def test_latest_report_negotiates_encoding(owner):
+    """Test each coding is served as stored, with its own strong ETag and Vary"""
+    repo_id, report_id = add_report(owner["user_id"])
+    url = f"/repositories/{repo_id}/reports/latest"
+
+    responses = {
+        encoding: client.get(url, headers={**owner["headers"], "Accept-Encoding": encoding})
+        for encoding in ("br", "gzip", "identity")
+    }
+    for encoding, response in responses.items():
+        assert response.status_code == 200
+        assert response.json()["loc"]["total"] == 1200
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers.get("content-encoding", "identity") == encoding
+    etags = {response.headers["etag"] for response in responses.values()}
+    assert etags == {f'"r{report_id}-full"', f'"r{report_id}-full.br"', f'"r{report_id}-full.gzip"'}
+
+    with SessionLocal() as db:
+        payload_br = db.scalar(select(Report.payload_br).where(Report.report_id == report_id))
+    assert report_bodies.get(report_id).br == payload_br
+
+
+def test_latest_report_revalidates_each_encoding(owner):
+    """Test If-None-Match with any coding's ETag is a 304 echoing that ETag"""
+    repo_id, report_id = add_report(owner["user_id"])
+    url = f"/repositories/{repo_id}/reports/latest"
+    for encoding in ("br", "gzip", "identity"):
+        etag = client.get(url, headers={**owner["headers"], "Accept-Encoding": encoding}).headers["etag"]
+        response = client.get(url, headers={**owner["headers"], "Accept-Encoding": encoding, "If-None-Match": etag})
+        assert response.status_code == 304 and response.headers["etag"] == etag and response.content == b""
+
+
+def test_hot_reports_come_from_memory(owner):
+    """Test the body is read from the database once and then served from the cache"""
+    repo_id, report_id = add_report(owner["user_id"])
+    url = f"/repositories/{repo_id}/reports/latest"
+    hits = report_bodies.stats()["hits"]
+    client.get(url, headers=owner["headers"])
+    body = report_bodies.get(report_id)
+    assert body is not None and body.size == len(body.gzip) + len(body.br)
+
+    for _ in range(3):
+        assert client.get(url, headers={**owner["headers"], "Accept-Encoding": "br"}).json()["loc"]["total"] == 1200
+    assert report_bodies.stats()["hits"] - hits == 1 + 3
+    assert report_bodies.get(report_id) is body
+
+
+def test_report_without_brotli_falls_back_to_gzip(owner):
+    """Test a report stored before brotli was available is sent as gzip to br clients"""
+    repo_id, report_id = add_report(owner["user_id"], brotli_copy=False)
+    response = client.get(f"/repositories/{repo_id}/reports/latest",
+                          headers={**owner["headers"], "Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'"r{report_id}-full.gzip"'
+    assert response.json()["complexity"]["byFile"][3]["complexity"] == 3
@@ -0,0 +1,125 @@
+"""
+Test report storage, report routes and the schema migration
+Run with: pytest tests/test_reports.py
+"""
+
+import json
+import uuid
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, select, text
+
+from app.analysis.reports import build_report, decode_metrics
+from app.main import app
+from app.models.user import Repository, User
+from app.utils.database import SessionLocal, init_db
+from app.utils.migrations import migrate
+
+client = TestClient(app)
+
+METRICS = {
+    "loc": {"total": 1200, "files": 30, "byLang": [{"lang": "Python", "loc": 1200}]},
+    "complexity": {"totalScore": 80, "functions": 40, "byFile": [{"path": f"f{i}.py"} for i in range(500)]},
+    "commits": {"count": 12},
+    "duplicates": {"percentage": 0.05},
+    "churn": {"rate": 0.3},
+}
+
+
+def register(prefix: str) -> dict:
+    email = f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Report",
+        "lastName": "User",
+        "email": email,
+        "password": "TestPass123",
+        "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.user_id).where(User.email == email))
+    return {"headers": {"Authorization": f"Bearer {token}"}, "user_id": user_id}
+
+
+@pytest.fixture
+def owner():
+    init_db()
+    return register("reports")
+
+
+def add_reports(user_id: int, versions: list) -> int:
+    with SessionLocal() as db:
+        repository = Repository(repo_link="https://example.com/repo", user_id=user_id)
+        db.add(repository)
+        db.flush()
+        for loc in versions:
+            db.add(build_report(repository.repo_id, {**METRICS, "loc": {**METRICS["loc"], "total": loc}}))
+            db.flush()
+        db.commit()
+        return repository.repo_id
+
+
+def test_build_report_compresses_and_summarises():
+    report = build_report(1, METRICS)
+    assert decode_metrics(report.payload) == METRICS
+    assert len(report.payload) < report.payload_size
+    assert (report.loc_total, report.function_count, report.commit_count) == (1200, 40, 12)
+    assert report.duplication_pct == 0.05 and report.churn_rate == 0.3
+
+
+def test_latest_report_and_summaries(owner):
+    repo_id = add_reports(owner["user_id"], [100, 200, 300])
+
+    latest = client.get(f"/repositories/{repo_id}/reports/latest", headers=owner["headers"])
+    assert latest.status_code == 200
+    assert latest.json()["loc"]["total"] == 300
+
+    summaries = client.get(f"/repositories/{repo_id}/reports?limit=2", headers=owner["headers"]).json()
+    assert [s["loc_total"] for s in summaries] == [300, 200]
+    assert "payload" not in summaries[0]
+
+
+def test_reports_of_other_users_are_hidden(owner):
+    repo_id = add_reports(owner["user_id"], [100])
+    stranger = register("stranger")
+    response = client.get(f"/repositories/{repo_id}/reports/latest", headers=stranger["headers"])
+    assert response.status_code == 404
+    assert client.get(f"/repositories/{repo_id}/reports", headers=stranger["headers"]).json() == []
+
+
+def test_latest_report_query_uses_index(owner):
+    with SessionLocal() as db:
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT payload FROM report WHERE repo_id = 1 "
+            "ORDER BY timestamp DESC LIMIT 1"
+        )).all()
+    assert "ix_report_repo_timestamp" in " ".join(str(row) for row in plan)
+
+
+def test_migration_moves_legacy_metrics(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE report (report_id INTEGER PRIMARY KEY, repo_id INTEGER, "
+            "metrics VARCHAR(1000), timestamp DATETIME)"
+        ))
+        legacy = {"loc": {**METRICS["loc"], "timeseries": [{"date": "2024-01-01", "loc": 1000}]}}
+        conn.execute(text("INSERT INTO report (report_id, repo_id, metrics) VALUES (1, 7, :m)"),
+                     {"m": json.dumps(legacy)})
+        conn.execute(text("INSERT INTO report (report_id, repo_id, metrics) VALUES (2, 7, '{\"loc\": {\"tot')"))
+
+    assert migrate(engine) == [1, 2, 3, 4, 5]
+    assert migrate(engine) == []
+
+    with engine.connect() as conn:
+        rows = {row.report_id: row for row in conn.execute(text("SELECT * FROM report")).all()}
+        indexes = {index["name"] for index in inspect(conn).get_indexes("report")}
+        series = conn.execute(text("SELECT report_id, series, resolution FROM report_series")).all()
+    assert decode_metrics(rows[1].payload) == legacy
+    assert json.loads(brotli.decompress(rows[1].payload_br)) == legacy
+    assert rows[1].loc_total == 1200
+    assert rows[2].payload is None  # truncated by the old String(1000) column
+    assert "ix_report_repo_timestamp" in indexes
+    assert sorted(series) == [(1, "loc", "day"), (1, "loc", "month"), (1, "loc", "week")]
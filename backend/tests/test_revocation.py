@@ -0,0 +1,166 @@
+"""
+Test logout token revocation
+Run with: pytest tests/test_revocation.py
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import get_settings
+from app.main import app
+from app.models.user import RevokedToken
+from app.utils.auth import create_access_token
+from app.utils.database import Base, SessionLocal, init_db
+from app.utils.revocation import BloomFilter, RevocationList
+
+client = TestClient(app)
+settings = get_settings()
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a private database, shared by the 'workers' of a test"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'revocations.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def store(sessions, jti: str, expires_at: float):
+    with sessions() as db:
+        db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
+        db.commit()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test every added item is found and the false positive rate stays near its target"""
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    added = [uuid.uuid4().hex for _ in range(10_000)]
+    for item in added:
+        bloom.add(item)
+    assert all(item in bloom for item in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+def test_revoked_until_exp_then_pruned(sessions):
+    """Test a revoked id is denied until its exp, then pruned from memory and the table"""
+    revocations = RevocationList(capacity=100, sessions=sessions)
+    now = time.time()
+    store(sessions, "old", now + 5)
+    revocations.add("old", now + 5)
+    revocations.add("already-expired", now - 1)
+
+    assert revocations.is_revoked("old")
+    assert not revocations.is_revoked("other")
+    assert not revocations.is_revoked(None)
+    assert not revocations.is_revoked("already-expired")
+    assert not revocations.is_revoked("old", now=now + 10)
+
+    assert revocations.prune(now=now + 10) == 1
+    assert revocations.stats()["entries"] == 0
+    with sessions() as db:
+        assert db.scalar(select(func.count()).select_from(RevokedToken)) == 0
+
+
+def test_workers_sync_through_the_database(sessions):
+    """Test a revocation stored by one worker reaches another on its next sync"""
+    first = RevocationList(sessions=sessions)
+    second = RevocationList(sessions=sessions)
+    exp = time.time() + 60
+    store(sessions, "shared", exp)
+    first.add("shared", exp)
+
+    assert not second.is_revoked("shared")
+    assert second.sync() == 1
+    assert second.is_revoked("shared")
+    assert second.sync() == 0
+
+
+def test_filter_grows_past_capacity(sessions):
+    """Test ids beyond the sized capacity are still all denied"""
+    revocations = RevocationList(capacity=10, sessions=sessions)
+    ids = [uuid.uuid4().hex for _ in range(100)]
+    for jti in ids:
+        revocations.add(jti, time.time() + 60)
+    assert all(revocations.is_revoked(jti) for jti in ids)
+    assert revocations.stats()["bloom_bytes"] > BloomFilter(10).nbytes
+
+
+def test_check_costs_microseconds(sessions):
+    """Test the hot-path check of an unrevoked id stays in the microsecond range"""
+    revocations = RevocationList(sessions=sessions)
+    for _ in range(1000):
+        revocations.add(uuid.uuid4().hex, time.time() + 60)
+    ids = [uuid.uuid4().hex for _ in range(10_000)]
+    start = time.perf_counter()
+    for jti in ids:
+        revocations.is_revoked(jti)
+    assert (time.perf_counter() - start) / len(ids) < 50e-6
+
+
+def test_tokens_carry_unique_jti():
+    """Test every issued token has its own jti"""
+    first, second = (
+        jwt.decode(create_access_token({"sub": "a@example.com"}), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        for _ in range(2)
+    )
+    assert first["jti"] and first["jti"] != second["jti"]
+
+
+def test_logout_revokes_token():
+    """Test a token stops working after logout while a second session stays valid"""
+    init_db()
+    email = f"logout_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Log", "lastName": "Out", "email": email,
+        "password": "TestPass123", "confirmPassword": "TestPass123"
+    })
+    tokens = [
+        client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+        for _ in range(2)
+    ]
+    revoked, other = ({"Authorization": f"Bearer {token}"} for token in tokens)
+    assert client.get("/auth/me", headers=revoked).status_code == 200
+
+    assert client.post("/auth/logout", headers=revoked).status_code == 200
+    assert client.get("/auth/me", headers=revoked).status_code == 401
+    assert client.post("/auth/logout", headers=revoked).status_code == 401
+    assert client.get("/auth/me", headers=other).status_code == 200
+    assert client.post("/auth/logout").status_code == 401
+
+
+def test_logout_raced_by_another_worker_succeeds():
+    """Test a jti another worker stored first is treated as already revoked, not a 500"""
+    init_db()
+    token = create_access_token({"sub": f"race_{uuid.uuid4().hex[:8]}@example.com"})
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    # The other worker's insert has not reached this worker's denylist yet
+    with SessionLocal() as db:
+        db.add(RevokedToken(jti=payload["jti"], expires_at=datetime.utcfromtimestamp(payload["exp"])))
+        db.commit()
+
+    assert client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).where(RevokedToken.jti == payload["jti"])) == 1
+
+
+def test_legacy_token_without_jti_still_accepted():
+    """Test tokens issued before jti existed keep working until they expire"""
+    init_db()
+    email = f"legacy_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Old", "lastName": "Token", "email": email,
+        "password": "TestPass123", "confirmPassword": "TestPass123"
+    })
+    token = jwt.encode(
+        {"sub": email, "exp": datetime.utcnow() + timedelta(minutes=5)},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
@@ -0,0 +1,137 @@
+"""
+Test time-series rollups, LTTB downsampling and the conditional timeseries routes
+Run with: pytest tests/test_timeseries.py
+"""
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.analysis.reports import build_report, build_series
+from app.analysis.timeseries import build_rollups, lttb, rollup, select_series
+from app.main import app
+from app.models.user import Repository, User
+from app.utils.database import SessionLocal, init_db
+
+client = TestClient(app)
+
+
+def daily(days: int, start: date = date(2015, 1, 1)) -> list:
+    return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def metrics_for(days: int) -> dict:
+    dates = daily(days)
+    return {
+        "loc": {"total": days, "timeseries": [{"date": d, "loc": 1000 + i} for i, d in enumerate(dates)]},
+        "commits": {"count": 2 * days, "activity": [
+            {"date": d, "commits": 2, "additions": 10, "deletions": 1} for d in dates
+        ]},
+    }
+
+
+def test_rollups_sum_counts_and_keep_last_levels():
+    """Test weekly and monthly buckets sum activity and keep the last LOC value"""
+    rollups = build_rollups(metrics_for(62))  # 2015-01-01 .. 2015-03-03
+    assert set(rollups) == {"loc", "activity"}
+
+    months = rollups["activity"]["month"]
+    assert [m["date"] for m in months] == ["2015-01-01", "2015-02-01", "2015-03-01"]
+    assert [m["commits"] for m in months] == [62, 56, 6]
+    assert months[0]["additions"] == 310
+    assert [m["loc"] for m in rollups["loc"]["month"]] == [1030, 1058, 1061]
+
+    weeks = rollup([{"date": "2015-01-07", "commits": 1}, {"date": "2015-01-11", "commits": 2}], "week", "sum")
+    assert weeks == [{"date": "2015-01-05", "commits": 3}]
+
+
+def test_lttb_keeps_ends_and_peaks():
+    """Test LTTB returns the requested count, keeps both ends and a lone spike"""
+    points = [{"date": d, "loc": 1} for d in daily(1000)]
+    points[500]["loc"] = 100
+    sampled = lttb(points, 50, "loc")
+    assert len(sampled) == 50
+    assert sampled[0] is points[0] and sampled[-1] is points[-1]
+    assert points[500] in sampled
+    assert lttb(points[:10], 50, "loc") == points[:10]
+
+
+def test_select_series_picks_finest_fitting_rollup():
+    """Test auto resolution picks day, week or month by the window, then falls back to LTTB"""
+    rollups = build_rollups(metrics_for(3650))["loc"]
+    assert select_series(rollups, "loc", 500, "2020-01-01", "2020-03-31")["resolution"] == "day"
+    assert select_series(rollups, "loc", 500, "2016-01-01", "2020-12-31")["resolution"] == "week"
+    assert select_series(rollups, "loc", 200)["resolution"] == "month"
+
+    fallback = select_series(rollups, "loc", 50)
+    assert fallback["downsampled"] and fallback["resolution"] == "day"
+    assert len(fallback["points"]) == 50 and fallback["total"] == 3650
+
+    activity = build_rollups(metrics_for(3650))["activity"]
+    assert select_series(activity, "activity", 50)["resolution"] == "month"
+
+    window = select_series(rollups, "loc", 500, "2015-01-10", "2015-02-20", "week")
+    assert window["points"][0]["date"] == "2015-01-05"
+
+
+@pytest.fixture
+def owner():
+    init_db()
+    email = f"series_{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={
+        "firstName": "Series", "lastName": "User", "email": email,
+        "password": "TestPass123", "confirmPassword": "TestPass123"
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "TestPass123"}).json()["access_token"]
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.user_id).where(User.email == email))
+        repository = Repository(repo_link="https://example.com/series", user_id=user_id)
+        db.add(repository)
+        db.flush()
+        metrics = metrics_for(3650)
+        report = build_report(repository.repo_id, metrics)
+        db.add(report)
+        db.flush()
+        db.add_all(build_series(report.report_id, metrics))
+        db.commit()
+        return {"headers": {"Authorization": f"Bearer {token}"}, "repo_id": repository.repo_id,
+                "report_id": report.report_id}
+
+
+def test_timeseries_route_and_conditional_get(owner):
+    """Test the route serves a rollup with an ETag and answers 304 when it still matches"""
+    url = f"/repositories/{owner['repo_id']}/reports/latest/timeseries/activity"
+    response = client.get(url, params={"from": "2019-01-01", "to": "2019-12-31", "max_points": 60},
+                          headers=owner["headers"])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolution"] == "week" and body["report_id"] == owner["report_id"]
+    assert len(body["points"]) <= 60
+    etag = response.headers["etag"]
+
+    again = client.get(url, params={"from": "2019-01-01", "to": "2019-12-31", "max_points": 60},
+                       headers={**owner["headers"], "If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    other = client.get(url, params={"max_points": 60}, headers={**owner["headers"], "If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+
+    by_id = f"/repositories/{owner['repo_id']}/reports/{owner['report_id']}/timeseries/loc"
+    assert client.get(by_id, headers=owner["headers"]).json()["resolution"] == "month"
+    assert client.get(by_id.replace("/loc", "/bogus"), headers=owner["headers"]).status_code == 404
+    assert client.get(by_id.replace("/loc", "/complexity"), headers=owner["headers"]).status_code == 404
+
+
+def test_latest_report_conditional_get(owner):
+    """Test the latest report carries an ETag and is not re-sent while unchanged"""
+    url = f"/repositories/{owner['repo_id']}/reports/latest"
+    first = client.get(url, headers=owner["headers"])
+    assert first.status_code == 200
+    cached = client.get(url, headers={**owner["headers"], "If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    unknown = f"/repositories/{owner['repo_id'] + 10_000}/reports/latest"
+    assert client.get(unknown, headers=owner["headers"]).status_code == 404
@@ -53,7 +53,7 @@ function App() {
             </>
           ) : (
             <div className="flow-section flow-section-summary">
-              <OptionSummary selectedOptions={selectedOptions} />
+              <OptionSummary selectedOptions={selectedOptions} repoLink={submittedLink} />
             </div>
           )}
         </div>
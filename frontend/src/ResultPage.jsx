@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
-import { fetchMetrics } from "./api";
+import { useLocation } from "react-router-dom";
+import { authHeaders, fetchMetrics, submitAnalysis, waitForAnalysis } from "./api";
 import MetricCard from "./components/MetricCard";
 import LOCChart from "./components/LOCChar";
 import ComplexityTreemap from "./components/ComplexityTreemap";
@@ -12,15 +13,41 @@ import "./index.css";
 
 export default function App() {
   const [data, setData] = useState(null);
+  const [progress, setProgress] = useState(null);
+  const [error, setError] = useState(null);
   const [owner] = useState("example");
   const [repo] = useState("demo-repo");
+  const { state } = useLocation();
+  const repoLink = state?.repoLink;
+  const loggedIn = Boolean(authHeaders().Authorization);
+
   useEffect(() => {
     let mounted = true;
-    fetchMetrics({ owner, repo }).then((d) => mounted && setData(d));
+    if (repoLink && loggedIn) {
+      // A real analysis: its repo_id grounds the chat in the repository's retrieval index
+      submitAnalysis({ repoLink, options: state.options })
+        .then((job) => waitForAnalysis(job.job_id, { onProgress: (j) => mounted && setProgress(j) }))
+        .then((job) => {
+          if (!mounted) return;
+          if (job.status !== "succeeded") throw new Error(job.error || "Analysis failed");
+          setData({ repo: repoLink, repo_id: job.repo_id, metrics: job.metrics });
+        })
+        .catch((e) => mounted && setError(e.message));
+    } else {
+      // Guests and direct visits see the demo metrics, with an ungrounded chat
+      fetchMetrics({ owner, repo }).then((d) => mounted && setData({ ...d, repo_id: null }));
+    }
     return () => (mounted = false);
-  }, [owner, repo]);
+  }, [owner, repo, repoLink, loggedIn, state]);
 
-  if (!data) return <div className="app-shell">Loading metrics…</div>;
+  if (error) return <div className="app-shell">Analysis failed: {error}</div>;
+  if (!data) {
+    return (
+      <div className="app-shell">
+        {progress ? `Analysing… ${progress.stage} (${Math.round(progress.progress * 100)}%)` : "Loading metrics…"}
+      </div>
+    );
+  }
 
   const { metrics } = data;
 
@@ -36,24 +63,26 @@ export default function App() {
         {/* Left: metrics and overview (about 60-70% width) */}
         <div className="left">
           <div className="col-3">
-          <MetricCard title="Lines of Code" value={metrics.loc.total.toLocaleString()} sub={`${metrics.loc.byLang[0].lang} dominant`}>
-            <LOCChart series={metrics.loc.timeseries} />
+          <MetricCard title="Lines of Code" value={metrics.loc.total.toLocaleString()} sub={metrics.loc.byLang?.length ? `${metrics.loc.byLang[0].lang} dominant` : ""}>
+            <LOCChart series={metrics.loc.timeseries ?? []} />
           </MetricCard>
 
           <MetricCard title="Code Complexity" value={metrics.complexity.totalScore} sub={`${metrics.complexity.byFile.length} files`}>
             {/* small sparkline using complexity timeseries */}
-            <LOCChart series={metrics.complexity.timeseries.map(t => ({ date: t.date, loc: t.score }))} />
+            <LOCChart series={(metrics.complexity.timeseries ?? []).map(t => ({ date: t.date, loc: t.score }))} />
           </MetricCard>
 
-          <MetricCard title="Commits" value={metrics.commits.count} sub={`Meaningfulness ${Math.round(metrics.commits.meaningfulnessScore*100)}%`}>
-            <CommitActivity series={metrics.commits.activity} />
+          {metrics.commits && (
+          <MetricCard title="Commits" value={metrics.commits.count} sub={`Meaningfulness ${Math.round((metrics.commits.meaningfulnessScore ?? 0)*100)}%`}>
+            <CommitActivity series={metrics.commits.activity ?? []} />
           </MetricCard>
+          )}
           </div>
 
           <div className="col-9">
           <section className="card">
             <h2>LOC over time</h2>
-            <LOCChart series={metrics.loc.timeseries} />
+            <LOCChart series={metrics.loc.timeseries ?? []} />
           </section>
 
           <section className="card">
@@ -61,21 +90,33 @@ export default function App() {
             <ComplexityTreemap items={metrics.complexity.byFile} onDrill={(f)=>alert(`Drill into ${f.path}`)} />
           </section>
 
+          {metrics.queryComplexity && (
+            <section className="card">
+              <h2>Query hot spots</h2>
+              <ComplexityTreemap
+                items={metrics.queryComplexity.byFile.map((f) => ({ ...f, complexity: f.score }))}
+                onDrill={(f) => alert(f.hotspots.map((h) => `${f.path}:${h.line} ${h.kind} (${h.score}) ${h.issues.join(", ")}`).join("\n"))}
+              />
+            </section>
+          )}
+
           <div style={{ display: "flex", gap: 16 }}>
             <section className="card" style={{ flex: 1 }}>
-              <AIUsageGauge percent={metrics.aiPercentage} topFiles={[{path: "src/foo.js", score: 0.9}, {path:"src/bar.js", score:0.7}]} />
+              <AIUsageGauge percent={metrics.aiPercentage} topFiles={metrics.aiDetection?.topFiles} />
             </section>
 
+            {metrics.namingQuality && (
             <section className="card" style={{ flex: 1 }}>
               <NamingQuality score={metrics.namingQuality.score} items={metrics.namingQuality.byFile} />
             </section>
+            )}
           </div>
           </div>
         </div>
 
         {/* Right: chat box (about 30-35% width) */}
         <div className="right">
-          <ChatBox />
+          <ChatBox repoId={data.repo_id} />
         </div>
       </main>
     </div>
@@ -5,7 +5,56 @@ const api = {
 
 export {api};
 
+export function authHeaders() {
+  const token = localStorage.getItem("access_token");
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
 
+// Queue a repository for analysis; resolves with the job status ({ job_id, status, ... }).
+// `from` / `to` (YYYY-MM-DD) limit the commit history metrics to that window.
+export async function submitAnalysis({ repoLink, branch, options, from, to }) {
+  const res = await fetch(`${api.baseURL}/analyses`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", ...authHeaders() },
+    body: JSON.stringify({
+      repo_link: repoLink,
+      branch,
+      options,
+      time_range: from || to ? { from, to } : undefined,
+    }),
+  });
+  if (!res.ok) throw new Error((await res.json()).detail || "Failed to submit analysis");
+  return res.json();
+}
+
+// Poll a job until it finishes; resolves with the final status, including `metrics` on success.
+export async function waitForAnalysis(jobId, { interval = 2000, onProgress } = {}) {
+  for (;;) {
+    const res = await fetch(`${api.baseURL}/analyses/${jobId}`, { headers: authHeaders() });
+    if (!res.ok) throw new Error((await res.json()).detail || "Failed to load analysis");
+    const job = await res.json();
+    if (onProgress) onProgress(job);
+    if (job.status === "succeeded" || job.status === "failed") return job;
+    await new Promise((r) => setTimeout(r, interval));
+  }
+}
+
+
+
+// Chart series of a report ("latest" or a report id): the finest day/week/month rollup of
+// `series` (loc, complexity, activity) with at most `maxPoints` points between `from` and `to`.
+// Responses carry an ETag, so the browser revalidates instead of downloading unchanged reports.
+export async function fetchTimeseries(repoId, series, { reportId = "latest", from, to, maxPoints = 500 } = {}) {
+  const params = new URLSearchParams({ max_points: String(maxPoints) });
+  if (from) params.set("from", from);
+  if (to) params.set("to", to);
+  const res = await fetch(
+    `${api.baseURL}/repositories/${repoId}/reports/${reportId}/timeseries/${series}?${params}`,
+    { headers: authHeaders(), cache: "no-cache" }
+  );
+  if (!res.ok) throw new Error((await res.json()).detail || "Failed to load time series");
+  return res.json();
+}
 
 // A minimal API wrapper — currently returns mock data.
 // Replace fetchMetrics() with a real call to your backend that returns
@@ -56,6 +105,13 @@ export async function fetchMetrics({ owner, repo, branch, from, to }) {
         }))
       },
       aiPercentage: 0.18,
+      aiDetection: {
+        percentage: 0.18,
+        files: 42,
+        likelyFiles: 6,
+        topFiles: [{ path: "src/foo.js", score: 0.9 }, { path: "src/bar.js", score: 0.7 }],
+        model: "builtin-1"
+      },
       namingQuality: {
         score: 0.83,
         byFile: [
@@ -63,6 +119,23 @@ export async function fetchMetrics({ owner, repo, branch, from, to }) {
           { path: "src/components/Button.jsx", score: 0.95, issues: [] }
         ]
       },
+      queryComplexity: {
+        sites: 12,
+        score: 58,
+        averageScore: 4.83,
+        nPlusOne: 2,
+        byFile: [
+          {
+            path: "src/api/orders.js",
+            sites: 4,
+            score: 27,
+            nPlusOne: 2,
+            hotspots: [{ line: 42, kind: "prisma", score: 8, issues: ["n+1", "unfiltered"] }]
+          },
+          { path: "src/api/users.js", sites: 3, score: 9, nPlusOne: 0, hotspots: [] }
+        ]
+      },
+      databaseDesign: { score: 85, models: 6, relationships: 5, indexes: 9, unindexedForeignKeys: 1, byModel: [], issues: [] },
       duplicates: { totalDuplications: 14, byFile: [] }
     }
   };
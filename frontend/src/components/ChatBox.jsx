@@ -1,10 +1,10 @@
 import React, {useState, useRef, useEffect} from "react";
 import {User, Bot} from "lucide-react";
 import "./ChatBox.css";
-import {api} from "../api.js";
+import {api, authHeaders} from "../api.js";
 import ReactMarkdown from "react-markdown";
 
-const ChatBox = () => {
+const ChatBox = ({repoId}) => {
     const [messages, setMessages] = useState([]);
     const [input, setInput] = useState("");
     const [isLoading, setIsLoading] = useState(false);
@@ -40,32 +40,33 @@ const ChatBox = () => {
         return () => window.removeEventListener("resize", handleResize);
     }, [messages, streamingText]);
 
-    const typeText = (text, delay = 10) => {
-        return new Promise((resolve) => {
-            setIsStreaming(true);
-            streamingCancelledRef.current = false;
-            setStreamingText("");
-            let index = 0;
+    // Read the /chat Server-Sent Events stream, showing tokens as they arrive
+    const readStream = async (res) => {
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let text = "";
+        setIsStreaming(true);
+        setStreamingText("");
 
-            const interval = setInterval(() => {
-                // stop if aborted
-                if (streamingCancelledRef.current || (controllerRef.current && controllerRef.current.signal && controllerRef.current.signal.aborted)) {
-                    clearInterval(interval);
-                    setIsStreaming(false);
-                    resolve('aborted');
-                    return;
+        while (true) {
+            const {value, done} = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, {stream: true});
+            const events = buffer.split("\n\n");
+            buffer = events.pop();
+            for (const raw of events) {
+                const event = /^event: (.*)$/m.exec(raw)?.[1];
+                const data = JSON.parse(/^data: (.*)$/m.exec(raw)?.[1] || "{}");
+                if (event === "token") {
+                    text += data.text;
+                    setStreamingText(text);
+                } else if (event === "error") {
+                    throw new Error(data.detail);
                 }
-
-                if (index < text.length) {
-                    setStreamingText(text.substring(0, index + 1));
-                    index++;
-                } else {
-                    clearInterval(interval);
-                    setIsStreaming(false);
-                    resolve();
-                }
-            }, delay);
-        });
+            }
+        }
+        return text;
     };
 
     const handleSubmit = async (e) => {
@@ -91,27 +92,22 @@ const ChatBox = () => {
                 window.location.hostname === "localhost" || window.location.hostname === "127.0.0.1"
                     ? api.baseURL
                     : `http://${window.location.hostname}:8000`;
+            const history = messages.slice(-10).map(({role, text}) => ({role, text}));
             const res = await fetch(`${backendBaseURL}/chat`, {
                 method: "POST",
-                headers: {"Content-Type": "application/json"},
-                body: JSON.stringify({message: messageToSend}),
+                headers: {"Content-Type": "application/json", ...authHeaders()},
+                body: JSON.stringify({message: messageToSend, repo_id: repoId ?? null, history}),
                 signal: controller.signal,
             });
-
-            const data = await res.json();
-            const responseText = data.response || data.error || "No response";
+            if (!res.ok) {
+                const data = await res.json().catch(() => ({}));
+                throw new Error(data.detail || `Chat failed (${res.status})`);
+            }
 
             setIsLoading(false);
-            const result = await typeText(responseText);
-
-            if (result === 'aborted') {
-                setStreamingText("");
-                setMessages((prev) => [...prev, {role: 'assistant', text: '[Stopped]'}]);
-            } else {
-                const aiMessage = {role: "assistant", text: responseText};
-                setMessages((prev) => [...prev, aiMessage]);
-                setStreamingText("");
-            }
+            const responseText = await readStream(res);
+            setMessages((prev) => [...prev, {role: "assistant", text: responseText || "No response"}]);
+            setStreamingText("");
         } catch (err) {
             if (err && err.name === 'AbortError') {
                 setIsLoading(false);
@@ -121,9 +117,8 @@ const ChatBox = () => {
             } else {
                 console.error("Error chatting:", err);
                 setIsLoading(false);
-                await typeText("[Error connecting to AI]");
-                setMessages((prev) => [...prev, {role: "assistant", text: "[Error connecting to AI]"}]);
                 setStreamingText("");
+                setMessages((prev) => [...prev, {role: "assistant", text: "[Error connecting to AI]"}]);
             }
         } finally {
             controllerRef.current = null;
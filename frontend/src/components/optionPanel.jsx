@@ -17,7 +17,10 @@ export default function OptionPanel({ spl, setShowSummary, setSelectedOptions })
   };
 
   const handleNext = () => {
-    const selected = Object.keys(checked).filter((key) => checked[key]);
+    // Group children are keyed "<groupIndex>-<option>"; the backend planner wants the option name
+    const selected = [...new Set(
+      Object.keys(checked).filter((key) => checked[key]).map((key) => key.replace(/^\d+-/, ""))
+    )];
     setSelectedOptions(selected.length > 0 ? selected : defaultOptions);
     setShowSummary(true);
   };
@@ -1,11 +1,19 @@
 import React from "react";
+import { useNavigate } from "react-router-dom";
 
-export default function OptionSummary({ selectedOptions }) {
+export default function OptionSummary({ selectedOptions, repoLink }) {
+  const navigate = useNavigate();
   return (
     <div className="result fade-in">
       <h3>Selected Options:</h3>
       <p>{selectedOptions.join(", ")}</p>
-      <h3>hola</h3>
+      <button
+        className="generate_summary"
+        disabled={!repoLink}
+        onClick={() => navigate("/result-page", { state: { repoLink, options: selectedOptions } })}
+      >
+        {repoLink ? "Analyse repository" : "Submit a repository link first"}
+      </button>
     </div>
   );
 }